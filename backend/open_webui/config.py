@@ -19,6 +19,7 @@ from authlib.integrations.starlette_client import OAuth
 from open_webui.env import (
     DATA_DIR,
     DATABASE_URL,
+    ENABLE_FAST_START,
     ENV,
     REDIS_URL,
     REDIS_KEY_PREFIX,
@@ -32,8 +33,9 @@ from open_webui.env import (
     WEBUI_NAME,
     log,
 )
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, is_schema_current
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.startup import startup_profile
 
 
 class EndpointFilter(logging.Filter):
@@ -175,10 +177,16 @@ def delayed_migration_execution():
     import threading
     import time
 
+    if ENABLE_FAST_START and is_schema_current():
+        # Nothing to upgrade, and the schema fixups only patch older databases
+        startup_profile.skip("db.alembic_migrations", "schema is current")
+        return
+
     def run_delayed():
         time.sleep(1)  # Short delay to let imports settle
         try:
-            run_migrations()
+            with startup_profile.phase("db.alembic_migrations"):
+                run_migrations()
         except Exception as e:
             log.error(f"Failed to run delayed migrations: {e}")
 
@@ -969,6 +977,15 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Upper bound for local copies of remote (s3/gcs/azure) objects kept in UPLOAD_DIR
+STORAGE_LOCAL_CACHE_MAX_SIZE_MB = os.environ.get(
+    "STORAGE_LOCAL_CACHE_MAX_SIZE_MB", "2048"
+)
+try:
+    STORAGE_LOCAL_CACHE_MAX_SIZE_MB = int(STORAGE_LOCAL_CACHE_MAX_SIZE_MB)
+except ValueError:
+    STORAGE_LOCAL_CACHE_MAX_SIZE_MB = 2048
+
 ####################################
 # File Upload DIR
 ####################################
@@ -2014,6 +2031,32 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Max concurrent vector DB calls issued from async handlers (empty = per-backend default)
+VECTOR_DB_MAX_CONCURRENCY = os.environ.get("VECTOR_DB_MAX_CONCURRENCY", "")
+try:
+    VECTOR_DB_MAX_CONCURRENCY = int(VECTOR_DB_MAX_CONCURRENCY)
+except ValueError:
+    VECTOR_DB_MAX_CONCURRENCY = None
+
+# Seconds an async handler waits for a vector DB call (including queueing)
+VECTOR_DB_TIMEOUT = os.environ.get("VECTOR_DB_TIMEOUT", "30")
+try:
+    VECTOR_DB_TIMEOUT = float(VECTOR_DB_TIMEOUT)
+except ValueError:
+    VECTOR_DB_TIMEOUT = 30.0
+
+# Size of the process-wide pool that runs retrieval searches in parallel
+RAG_RETRIEVAL_MAX_WORKERS = os.environ.get("RAG_RETRIEVAL_MAX_WORKERS", "16")
+try:
+    RAG_RETRIEVAL_MAX_WORKERS = max(int(RAG_RETRIEVAL_MAX_WORKERS), 1)
+except ValueError:
+    RAG_RETRIEVAL_MAX_WORKERS = 16
+
+# Cache ranked retrieval results per (collections + content version, query, settings)
+ENABLE_RAG_RETRIEVAL_CACHE = (
+    os.environ.get("ENABLE_RAG_RETRIEVAL_CACHE", "True").lower() == "true"
+)
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -2140,6 +2183,23 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+# Inserts/upserts with at least this many items use COPY into a staging table
+# followed by a set-based merge (psycopg2 only). Set to 0 to disable.
+PGVECTOR_BULK_INSERT_MIN_ITEMS = os.environ.get("PGVECTOR_BULK_INSERT_MIN_ITEMS", 64)
+try:
+    PGVECTOR_BULK_INSERT_MIN_ITEMS = int(PGVECTOR_BULK_INSERT_MIN_ITEMS)
+except Exception:
+    PGVECTOR_BULK_INSERT_MIN_ITEMS = 64
+
+# Rows copied and committed per bulk batch, bounds memory for large ingestions
+PGVECTOR_BULK_INSERT_BATCH_SIZE = os.environ.get(
+    "PGVECTOR_BULK_INSERT_BATCH_SIZE", 2000
+)
+try:
+    PGVECTOR_BULK_INSERT_BATCH_SIZE = max(int(PGVECTOR_BULK_INSERT_BATCH_SIZE), 1)
+except Exception:
+    PGVECTOR_BULK_INSERT_BATCH_SIZE = 2000
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
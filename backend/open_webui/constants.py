@@ -103,6 +103,9 @@ class ERROR_MESSAGES(str, Enum):
         "Duplicate content detected. Please provide unique content to proceed."
     )
     FILE_NOT_PROCESSED = "Extracted content is not available for this file. Please ensure that the file is processed before proceeding."
+    EXTRACTION_BUDGET_EXCEEDED = (
+        lambda err="": f"The file is too large or takes too long to extract. {err}"
+    )
 
 
 class TASKS(str, Enum):
@@ -94,6 +94,11 @@ log_sources = [
     "WEBHOOK",
     "SOCKET",
     "OAUTH",
+    "MIDJOURNEY",
+    "KLING",
+    "JIMENG",
+    "DREAMWORK",
+    "FLUX",
 ]
 
 SRC_LOG_LEVELS = {}
@@ -107,6 +112,19 @@ for source in log_sources:
 
 log.setLevel(SRC_LOG_LEVELS["CONFIG"])
 
+# "text" for the colored console format, "json" for one JSON object per line
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+
+# Write log records from a background thread instead of the calling thread
+LOG_ENQUEUE = os.environ.get("LOG_ENQUEUE", "True").lower() == "true"
+
+# Log records marked as sampled (e.g. task polling) pass at most once per
+# interval and call site (0 = no sampling)
+try:
+    LOG_SAMPLE_INTERVAL = float(os.environ.get("LOG_SAMPLE_INTERVAL", "30"))
+except ValueError:
+    LOG_SAMPLE_INTERVAL = 30.0
+
 WEBUI_NAME = os.environ.get("WEBUI_NAME", "Open WebUI")
 if WEBUI_NAME != "Open WebUI":
     WEBUI_NAME += " (Open WebUI)"
@@ -443,6 +461,10 @@ ENABLE_COMPRESSION_MIDDLEWARE = (
     os.environ.get("ENABLE_COMPRESSION_MIDDLEWARE", "True").lower() == "true"
 )
 
+# Internal reverse proxy location mapped to DATA_DIR (e.g. nginx `internal;`).
+# When set, local files are served through X-Accel-Redirect instead of the app.
+X_ACCEL_REDIRECT_LOCATION = os.environ.get("X_ACCEL_REDIRECT_LOCATION", "")
+
 
 ####################################
 # SCIM Configuration
@@ -492,6 +514,20 @@ else:
         MODELS_CACHE_TTL = 1
 
 
+####################################
+# CACHE MANAGER
+####################################
+
+# JSON object of per-namespace TTL overrides in seconds, e.g. {"models": 30}
+CACHE_NAMESPACE_TTLS = os.environ.get("CACHE_NAMESPACE_TTLS", "")
+try:
+    CACHE_NAMESPACE_TTLS = {
+        str(namespace): int(ttl)
+        for namespace, ttl in json.loads(CACHE_NAMESPACE_TTLS or "{}").items()
+    }
+except Exception:
+    CACHE_NAMESPACE_TTLS = {}
+
 ####################################
 # CHAT
 ####################################
@@ -586,6 +622,15 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# Seconds between background refreshes of the tool server specs, 0 disables
+TOOL_SERVER_SPEC_REFRESH_INTERVAL = os.environ.get(
+    "TOOL_SERVER_SPEC_REFRESH_INTERVAL", "300"
+)
+try:
+    TOOL_SERVER_SPEC_REFRESH_INTERVAL = max(int(TOOL_SERVER_SPEC_REFRESH_INTERVAL), 0)
+except ValueError:
+    TOOL_SERVER_SPEC_REFRESH_INTERVAL = 300
+
 AIOHTTP_CLIENT_READ_BUFFER_SIZE = int(
     os.environ.get("AIOHTTP_CLIENT_READ_BUFFER_SIZE", 2**16)
 )
@@ -635,6 +680,250 @@ else:
     except Exception:
         SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS = None
 
+####################################
+# AUDIO TRANSCRIPTION
+####################################
+
+# Number of audio segments transcribed concurrently for long recordings
+AUDIO_STT_MAX_WORKERS = os.environ.get("AUDIO_STT_MAX_WORKERS", "4")
+try:
+    AUDIO_STT_MAX_WORKERS = int(AUDIO_STT_MAX_WORKERS)
+    if AUDIO_STT_MAX_WORKERS < 1:
+        AUDIO_STT_MAX_WORKERS = 4
+except ValueError:
+    AUDIO_STT_MAX_WORKERS = 4
+
+# Fixed bitrate (kbps) used when re-encoding long recordings into segments
+AUDIO_STT_SEGMENT_BITRATE = os.environ.get("AUDIO_STT_SEGMENT_BITRATE", "32")
+try:
+    AUDIO_STT_SEGMENT_BITRATE = int(AUDIO_STT_SEGMENT_BITRATE)
+except ValueError:
+    AUDIO_STT_SEGMENT_BITRATE = 32
+
+####################################
+# WEBHOOKS
+####################################
+
+# Seconds allowed for a single webhook request
+WEBHOOK_TIMEOUT = os.environ.get("WEBHOOK_TIMEOUT", "10")
+try:
+    WEBHOOK_TIMEOUT = float(WEBHOOK_TIMEOUT)
+except ValueError:
+    WEBHOOK_TIMEOUT = 10.0
+
+# Delivery workers per process
+WEBHOOK_WORKERS = os.environ.get("WEBHOOK_WORKERS", "4")
+try:
+    WEBHOOK_WORKERS = max(int(WEBHOOK_WORKERS), 1)
+except ValueError:
+    WEBHOOK_WORKERS = 4
+
+# Concurrent requests to the same webhook URL
+WEBHOOK_MAX_CONCURRENCY_PER_URL = os.environ.get("WEBHOOK_MAX_CONCURRENCY_PER_URL", "2")
+try:
+    WEBHOOK_MAX_CONCURRENCY_PER_URL = max(int(WEBHOOK_MAX_CONCURRENCY_PER_URL), 1)
+except ValueError:
+    WEBHOOK_MAX_CONCURRENCY_PER_URL = 2
+
+# Retries before a notification is dead-lettered, backing off exponentially
+WEBHOOK_MAX_RETRIES = os.environ.get("WEBHOOK_MAX_RETRIES", "4")
+try:
+    WEBHOOK_MAX_RETRIES = max(int(WEBHOOK_MAX_RETRIES), 0)
+except ValueError:
+    WEBHOOK_MAX_RETRIES = 4
+
+WEBHOOK_RETRY_BASE_DELAY = os.environ.get("WEBHOOK_RETRY_BASE_DELAY", "2")
+try:
+    WEBHOOK_RETRY_BASE_DELAY = float(WEBHOOK_RETRY_BASE_DELAY)
+except ValueError:
+    WEBHOOK_RETRY_BASE_DELAY = 2.0
+
+# Pending text notifications to the same URL combined into one request
+WEBHOOK_BATCH_SIZE = os.environ.get("WEBHOOK_BATCH_SIZE", "10")
+try:
+    WEBHOOK_BATCH_SIZE = max(int(WEBHOOK_BATCH_SIZE), 1)
+except ValueError:
+    WEBHOOK_BATCH_SIZE = 10
+
+####################################
+# CODE INTERPRETER
+####################################
+
+# Warm Jupyter kernels kept per worker (0 = new kernel for every execution)
+CODE_INTERPRETER_JUPYTER_POOL_SIZE = os.environ.get(
+    "CODE_INTERPRETER_JUPYTER_POOL_SIZE", "8"
+)
+try:
+    CODE_INTERPRETER_JUPYTER_POOL_SIZE = max(int(CODE_INTERPRETER_JUPYTER_POOL_SIZE), 0)
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_POOL_SIZE = 8
+
+# Seconds an unused pooled kernel is kept before it is shut down
+CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT = os.environ.get(
+    "CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT", "300"
+)
+try:
+    CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT = float(
+        CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT
+    )
+except ValueError:
+    CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT = 300.0
+
+# What happens to a kernel's state when it is handed to another session,
+# which may belong to another user:
+# - "restart" (default) restarts the kernel process, so nothing of the previous
+#   session survives; the handover costs a kernel restart
+# - "reset" only clears the namespace (%reset -f). Faster, but imported and
+#   patched modules, the working directory, environment variables, files and
+#   background threads stay, so one user's code can read or tamper with the
+#   next user's session. Only use it when all users trust each other
+# - "none" keeps the state as is
+CODE_INTERPRETER_JUPYTER_POOL_ISOLATION = os.environ.get(
+    "CODE_INTERPRETER_JUPYTER_POOL_ISOLATION", "restart"
+).lower()
+if CODE_INTERPRETER_JUPYTER_POOL_ISOLATION not in ("none", "reset", "restart"):
+    CODE_INTERPRETER_JUPYTER_POOL_ISOLATION = "restart"
+
+####################################
+# DOCUMENT EXTRACTION
+####################################
+
+# Worker processes extracting PDF pages in parallel (1 = extract in-process)
+DOCUMENT_EXTRACTION_MAX_WORKERS = os.environ.get(
+    "DOCUMENT_EXTRACTION_MAX_WORKERS", str(min(4, os.cpu_count() or 1))
+)
+try:
+    DOCUMENT_EXTRACTION_MAX_WORKERS = max(int(DOCUMENT_EXTRACTION_MAX_WORKERS), 1)
+except ValueError:
+    DOCUMENT_EXTRACTION_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Pages handed to a worker per task
+DOCUMENT_EXTRACTION_PAGES_PER_TASK = os.environ.get(
+    "DOCUMENT_EXTRACTION_PAGES_PER_TASK", "16"
+)
+try:
+    DOCUMENT_EXTRACTION_PAGES_PER_TASK = max(int(DOCUMENT_EXTRACTION_PAGES_PER_TASK), 1)
+except ValueError:
+    DOCUMENT_EXTRACTION_PAGES_PER_TASK = 16
+
+# Per-file extraction budget in seconds (0 = unlimited)
+DOCUMENT_EXTRACTION_TIMEOUT = os.environ.get("DOCUMENT_EXTRACTION_TIMEOUT", "600")
+try:
+    DOCUMENT_EXTRACTION_TIMEOUT = float(DOCUMENT_EXTRACTION_TIMEOUT)
+except ValueError:
+    DOCUMENT_EXTRACTION_TIMEOUT = 600.0
+
+# Per-file budget of extracted characters (0 = unlimited)
+DOCUMENT_EXTRACTION_MAX_CHARS = os.environ.get("DOCUMENT_EXTRACTION_MAX_CHARS", "0")
+try:
+    DOCUMENT_EXTRACTION_MAX_CHARS = int(DOCUMENT_EXTRACTION_MAX_CHARS)
+except ValueError:
+    DOCUMENT_EXTRACTION_MAX_CHARS = 0
+
+####################################
+# MEDIA TASK ADMISSION
+####################################
+
+# Concurrency limits for Midjourney/Kling/Jimeng/Flux/DreamWork/lip-sync tasks
+ENABLE_MEDIA_TASK_ADMISSION = (
+    os.environ.get("ENABLE_MEDIA_TASK_ADMISSION", "True").lower() == "true"
+)
+
+# Running tasks per user and provider (0 = only the provider limit applies)
+MEDIA_TASK_USER_MAX_CONCURRENCY = os.environ.get("MEDIA_TASK_USER_MAX_CONCURRENCY", "3")
+try:
+    MEDIA_TASK_USER_MAX_CONCURRENCY = max(int(MEDIA_TASK_USER_MAX_CONCURRENCY), 0)
+except ValueError:
+    MEDIA_TASK_USER_MAX_CONCURRENCY = 3
+
+# Provider limit when its configuration has no max_concurrent_tasks
+MEDIA_TASK_DEFAULT_MAX_CONCURRENCY = os.environ.get(
+    "MEDIA_TASK_DEFAULT_MAX_CONCURRENCY", "5"
+)
+try:
+    MEDIA_TASK_DEFAULT_MAX_CONCURRENCY = max(int(MEDIA_TASK_DEFAULT_MAX_CONCURRENCY), 1)
+except ValueError:
+    MEDIA_TASK_DEFAULT_MAX_CONCURRENCY = 5
+
+# Seconds a submission waits in the queue before it is rejected with 429
+MEDIA_TASK_QUEUE_TIMEOUT = os.environ.get("MEDIA_TASK_QUEUE_TIMEOUT", "60")
+try:
+    MEDIA_TASK_QUEUE_TIMEOUT = float(MEDIA_TASK_QUEUE_TIMEOUT)
+except ValueError:
+    MEDIA_TASK_QUEUE_TIMEOUT = 60.0
+
+# Seconds a running task holds its slot if its completion is never observed
+MEDIA_TASK_LEASE_TTL = os.environ.get("MEDIA_TASK_LEASE_TTL", "1800")
+try:
+    MEDIA_TASK_LEASE_TTL = int(MEDIA_TASK_LEASE_TTL)
+except ValueError:
+    MEDIA_TASK_LEASE_TTL = 1800
+
+# After a provider answers 429 its limit is halved, then one slot is given
+# back every this many seconds
+MEDIA_TASK_RATE_LIMIT_RECOVERY = os.environ.get("MEDIA_TASK_RATE_LIMIT_RECOVERY", "30")
+try:
+    MEDIA_TASK_RATE_LIMIT_RECOVERY = max(float(MEDIA_TASK_RATE_LIMIT_RECOVERY), 1.0)
+except ValueError:
+    MEDIA_TASK_RATE_LIMIT_RECOVERY = 30.0
+
+####################################
+# CREDIT LOG RETENTION
+####################################
+
+# Days of credit_log kept in the database; older rows are exported to
+# zstd-compressed Parquet archives and removed (0 = keep everything)
+CREDIT_LOG_RETENTION_DAYS = os.environ.get("CREDIT_LOG_RETENTION_DAYS", "0")
+try:
+    CREDIT_LOG_RETENTION_DAYS = max(int(CREDIT_LOG_RETENTION_DAYS), 0)
+except ValueError:
+    CREDIT_LOG_RETENTION_DAYS = 0
+
+# local | cos (uses the Tencent COS cloud storage configuration)
+CREDIT_LOG_ARCHIVE_STORAGE = os.environ.get(
+    "CREDIT_LOG_ARCHIVE_STORAGE", "local"
+).lower()
+CREDIT_LOG_ARCHIVE_DIR = os.environ.get(
+    "CREDIT_LOG_ARCHIVE_DIR", f"{DATA_DIR}/archive/credit_log"
+)
+
+# Rows read from the database per batch and rows written per archive file
+CREDIT_LOG_ARCHIVE_BATCH_SIZE = os.environ.get("CREDIT_LOG_ARCHIVE_BATCH_SIZE", "5000")
+try:
+    CREDIT_LOG_ARCHIVE_BATCH_SIZE = max(int(CREDIT_LOG_ARCHIVE_BATCH_SIZE), 100)
+except ValueError:
+    CREDIT_LOG_ARCHIVE_BATCH_SIZE = 5000
+
+CREDIT_LOG_ARCHIVE_FILE_ROWS = os.environ.get("CREDIT_LOG_ARCHIVE_FILE_ROWS", "50000")
+try:
+    CREDIT_LOG_ARCHIVE_FILE_ROWS = max(int(CREDIT_LOG_ARCHIVE_FILE_ROWS), 1000)
+except ValueError:
+    CREDIT_LOG_ARCHIVE_FILE_ROWS = 50000
+
+# Rows deleted per transaction, so archival never holds long table locks
+CREDIT_LOG_DELETE_CHUNK_SIZE = os.environ.get("CREDIT_LOG_DELETE_CHUNK_SIZE", "1000")
+try:
+    CREDIT_LOG_DELETE_CHUNK_SIZE = max(int(CREDIT_LOG_DELETE_CHUNK_SIZE), 1)
+except ValueError:
+    CREDIT_LOG_DELETE_CHUNK_SIZE = 1000
+
+# Seconds between two retention runs
+CREDIT_LOG_ARCHIVE_INTERVAL = os.environ.get("CREDIT_LOG_ARCHIVE_INTERVAL", "3600")
+try:
+    CREDIT_LOG_ARCHIVE_INTERVAL = max(int(CREDIT_LOG_ARCHIVE_INTERVAL), 60)
+except ValueError:
+    CREDIT_LOG_ARCHIVE_INTERVAL = 3600
+
+####################################
+# STARTUP
+####################################
+
+# Fast start for rolling deploys: migrations are skipped when the database is
+# already at the latest revision, embedding/reranker/whisper models are loaded
+# in a background warm-up (see /health/ready) and the initial model list is
+# fetched in the background
+ENABLE_FAST_START = os.environ.get("ENABLE_FAST_START", "False").lower() == "true"
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -745,6 +1034,25 @@ OTEL_LOGS_OTLP_SPAN_EXPORTER = os.environ.get(
     "OTEL_LOGS_OTLP_SPAN_EXPORTER", OTEL_OTLP_SPAN_EXPORTER
 ).lower()  # grpc or http
 
+####################################
+# CHAT PROFILING
+####################################
+
+# Admins may send the X-Chat-Profile header to capture a profile of one chat
+# request, written to CHAT_PROFILING_DIR
+ENABLE_CHAT_PROFILING = (
+    os.environ.get("ENABLE_CHAT_PROFILING", "False").lower() == "true"
+)
+
+# Share of the requested captures that are actually taken
+CHAT_PROFILING_SAMPLE_RATE = os.environ.get("CHAT_PROFILING_SAMPLE_RATE", "1.0")
+try:
+    CHAT_PROFILING_SAMPLE_RATE = min(max(float(CHAT_PROFILING_SAMPLE_RATE), 0.0), 1.0)
+except ValueError:
+    CHAT_PROFILING_SAMPLE_RATE = 1.0
+
+CHAT_PROFILING_DIR = os.environ.get("CHAT_PROFILING_DIR", f"{DATA_DIR}/profiles")
+
 ####################################
 # TOOLS/FUNCTIONS PIP OPTIONS
 ####################################
@@ -258,7 +258,7 @@ async def generate_function_chat_completion(
 
                 # Directly return if the response is a StreamingResponse
                 if isinstance(res, StreamingResponse):
-                    with CreditDeduct(
+                    async with CreditDeduct(
                         user=user,
                         model_id=model_id,
                         body=form_data,
@@ -274,7 +274,7 @@ async def generate_function_chat_completion(
                     return
 
                 if isinstance(res, dict):
-                    with CreditDeduct(
+                    async with CreditDeduct(
                         user=user,
                         model_id=model_id,
                         body=form_data,
@@ -290,7 +290,7 @@ async def generate_function_chat_completion(
                 yield f"data: {json.dumps({'error': {'detail': str(e)}})}\n\n"
                 return
 
-            with CreditDeduct(
+            async with CreditDeduct(
                 user=user,
                 model_id=model_id,
                 body=form_data,
@@ -336,7 +336,7 @@ async def generate_function_chat_completion(
             return {"error": {"detail": str(e)}}
 
         async def to_stream(response):
-            with CreditDeduct(
+            async with CreditDeduct(
                 user=user,
                 model_id=model_id,
                 body=form_data,
@@ -352,7 +352,7 @@ async def generate_function_chat_completion(
         if isinstance(res, StreamingResponse):
             return StreamingResponse(to_stream(res), media_type="text/event-stream")
 
-        with CreditDeduct(
+        async with CreditDeduct(
             user=user,
             model_id=model_id,
             body=form_data,
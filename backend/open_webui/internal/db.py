@@ -2,9 +2,11 @@ import os
 import json
 import logging
 from contextlib import contextmanager
+from functools import cache
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
+from open_webui.utils.startup import startup_profile
 from open_webui.env import (
     OPEN_WEBUI_DIR,
     DATABASE_URL,
@@ -14,9 +16,10 @@ from open_webui.env import (
     DATABASE_POOL_RECYCLE,
     DATABASE_POOL_SIZE,
     DATABASE_POOL_TIMEOUT,
+    ENABLE_FAST_START,
 )
 from peewee_migrate import Router
-from sqlalchemy import Dialect, create_engine, MetaData, types
+from sqlalchemy import Dialect, create_engine, MetaData, inspect, text, types
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
@@ -76,9 +79,6 @@ def handle_peewee_migration(DATABASE_URL):
         assert db.is_closed(), "Database connection is still open."
 
 
-handle_peewee_migration(DATABASE_URL)
-
-
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
 # Handle SQLCipher URLs
@@ -142,6 +142,37 @@ Base = declarative_base(metadata=metadata_obj)
 Session = scoped_session(SessionLocal)
 
 
+@cache
+def is_schema_current() -> bool:
+    """
+    True when the database is stamped with every alembic head shipped in this
+    build, i.e. neither the peewee nor the alembic migrations have work to do.
+    Evaluated once per process.
+    """
+    try:
+        from alembic.script import ScriptDirectory
+
+        heads = set(ScriptDirectory(str(OPEN_WEBUI_DIR / "migrations")).get_heads())
+        with engine.connect() as conn:
+            if not inspect(conn).has_table("alembic_version"):
+                return False
+            applied = {
+                row[0]
+                for row in conn.execute(text("SELECT version_num FROM alembic_version"))
+            }
+        return bool(heads) and applied == heads
+    except Exception as e:
+        log.warning(f"Could not determine the schema version: {e}")
+        return False
+
+
+if ENABLE_FAST_START and is_schema_current():
+    startup_profile.skip("db.peewee_migrations", "schema is current")
+else:
+    with startup_profile.phase("db.peewee_migrations"):
+        handle_peewee_migration(DATABASE_URL)
+
+
 def get_session():
     db = SessionLocal()
     try:
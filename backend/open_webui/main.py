@@ -6,6 +6,7 @@ import os
 import sys
 import time
 import random
+from typing import Optional
 from uuid import uuid4
 
 from contextlib import asynccontextmanager
@@ -29,7 +30,13 @@ from fastapi import (
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, FileResponse, JSONResponse, RedirectResponse
+from fastapi.responses import (
+    Response,
+    FileResponse,
+    JSONResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 
 from starlette_compress import CompressMiddleware
@@ -84,6 +91,7 @@ from open_webui.routers import (
     jimeng,
     storage,
     flux,
+    creations,
 )
 
 from open_webui.routers.retrieval import (
@@ -99,6 +107,7 @@ from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 from open_webui.models.users import Users
 from open_webui.models.chats import Chats
+from open_webui.models.creations import Creations
 
 from open_webui.config import (
     # Ollama
@@ -419,6 +428,9 @@ from open_webui.config import (
     CUSTOM_SVG,
 )
 from open_webui.env import (
+    CREDIT_LOG_RETENTION_DAYS,
+    TOOL_SERVER_SPEC_REFRESH_INTERVAL,
+    ENABLE_FAST_START,
     LICENSE_KEY,
     AUDIT_EXCLUDED_PATHS,
     AUDIT_LOG_LEVEL,
@@ -451,6 +463,7 @@ from open_webui.env import (
     RESET_CONFIG_ON_START,
     ENABLE_VERSION_UPDATE_CHECK,
     ENABLE_OTEL,
+    ENABLE_CHAT_PROFILING,
     EXTERNAL_PWA_MANIFEST_URL,
     AIOHTTP_CLIENT_SESSION_SSL,
 )
@@ -480,6 +493,30 @@ from open_webui.utils.plugin import install_tool_and_function_dependencies
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.cache_manager import get_cache_manager, init_cache_manager
+from open_webui.retrieval.loaders.pdf import reset_extraction_pool
+from open_webui.utils.code_interpreter import kernel_pool
+from open_webui.utils.webhook import webhook_queue
+from open_webui.utils.startup import startup_profile
+from open_webui.utils.credit.archive import periodic_credit_log_archive
+from open_webui.utils.tools import periodic_tool_server_refresh
+from open_webui.utils.telemetry.stages import (
+    finish_chat_timings,
+    install_db_write_counter,
+    stage,
+    start_chat_timings,
+    track_upstream_response,
+)
+from open_webui.utils.admission import init_admission_controller
+from open_webui.utils.task_events import (
+    add_task_change_handler,
+    format_sse,
+    init_task_event_bus,
+    install_task_event_hooks,
+    iter_task_events,
+    STREAM_IDLE_TIMEOUT,
+    task_event_bus,
+)
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -537,6 +574,7 @@ https://github.com/open-webui/open-webui
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    startup_profile.mark_imported()
     app.state.instance_id = INSTANCE_ID
     start_logger()
 
@@ -549,7 +587,8 @@ async def lifespan(app: FastAPI):
     # This should be blocking (sync) so functions are not deactivated on first /get_models calls
     # when the first user lands on the / route.
     log.info("Installing external dependencies of functions and tools...")
-    install_tool_and_function_dependencies()
+    with startup_profile.phase("function_dependencies"):
+        install_tool_and_function_dependencies()
 
     app.state.redis = get_redis_connection(
         redis_url=REDIS_URL,
@@ -565,14 +604,37 @@ async def lifespan(app: FastAPI):
             redis_task_command_listener(app)
         )
 
+        publisher = get_redis_connection(
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            redis_cluster=REDIS_CLUSTER,
+            async_mode=False,
+        )
+
+        init_cache_manager(app.state.redis, publisher=publisher)
+        app.state.cache_invalidation_listener = asyncio.create_task(
+            get_cache_manager().listen_for_invalidations()
+        )
+
+        init_task_event_bus(app.state.redis, publisher=publisher)
+        app.state.task_event_listener = asyncio.create_task(task_event_bus.listen())
+
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
 
+    if CREDIT_LOG_RETENTION_DAYS:
+        asyncio.create_task(periodic_credit_log_archive())
+
+    if TOOL_SERVER_SPEC_REFRESH_INTERVAL:
+        asyncio.create_task(periodic_tool_server_refresh(app))
+
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
-        await get_all_models(
+        base_models_cache = get_all_models(
             Request(
                 # Creating a mock request object to pass to get_all_models
                 {
@@ -591,12 +653,42 @@ async def lifespan(app: FastAPI):
             ),
             None,
         )
+        if ENABLE_FAST_START:
+            # The first /api/models call fetches the list itself if this is not done yet
+            asyncio.create_task(base_models_cache)
+        else:
+            with startup_profile.phase("base_models_cache"):
+                await base_models_cache
+
+    install_task_event_hooks()
+    add_task_change_handler(Creations.record_task_change)
+    init_admission_controller(app.state.redis)
+    await webhook_queue.start()
+
+    if startup_profile.warmups:
+        app.state.warmup_task = asyncio.create_task(startup_profile.run_warmups())
+
+    startup_profile.mark_serving()
+    startup_profile.log_report()
 
     yield
 
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if hasattr(app.state, "cache_invalidation_listener"):
+        app.state.cache_invalidation_listener.cancel()
+
+    if hasattr(app.state, "task_event_listener"):
+        app.state.task_event_listener.cancel()
+
+    reset_extraction_pool()
+
+    if kernel_pool is not None:
+        await kernel_pool.shutdown()
+
+    await webhook_queue.shutdown()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -631,6 +723,9 @@ if ENABLE_OTEL:
 
     setup_opentelemetry(app=app, db_engine=engine)
 
+if ENABLE_OTEL or ENABLE_CHAT_PROFILING:
+    install_db_write_counter(engine)
+
 ########################################
 #
 # OLLAMA
@@ -930,59 +1025,87 @@ app.state.rf = None
 
 app.state.YOUTUBE_LOADER_TRANSLATION = None
 
-try:
-    app.state.ef = get_ef(
+
+def load_embedding_model():
+    try:
+        app.state.ef = get_ef(
+            app.state.config.RAG_EMBEDDING_ENGINE,
+            app.state.config.RAG_EMBEDDING_MODEL,
+            RAG_EMBEDDING_MODEL_AUTO_UPDATE,
+        )
+    except Exception as e:
+        log.error(f"Error updating models: {e}")
+        pass
+
+    app.state.EMBEDDING_FUNCTION = get_embedding_function(
         app.state.config.RAG_EMBEDDING_ENGINE,
         app.state.config.RAG_EMBEDDING_MODEL,
-        RAG_EMBEDDING_MODEL_AUTO_UPDATE,
+        embedding_function=app.state.ef,
+        url=(
+            app.state.config.RAG_OPENAI_API_BASE_URL
+            if app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                app.state.config.RAG_OLLAMA_BASE_URL
+                if app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else app.state.config.RAG_AZURE_OPENAI_BASE_URL
+            )
+        ),
+        key=(
+            app.state.config.RAG_OPENAI_API_KEY
+            if app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                app.state.config.RAG_OLLAMA_API_KEY
+                if app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else app.state.config.RAG_AZURE_OPENAI_API_KEY
+            )
+        ),
+        embedding_batch_size=app.state.config.RAG_EMBEDDING_BATCH_SIZE,
+        azure_api_version=(
+            app.state.config.RAG_AZURE_OPENAI_API_VERSION
+            if app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+            else None
+        ),
     )
 
-    app.state.rf = get_rf(
+
+def load_reranking_model():
+    try:
+        app.state.rf = get_rf(
+            app.state.config.RAG_RERANKING_ENGINE,
+            app.state.config.RAG_RERANKING_MODEL,
+            app.state.config.RAG_EXTERNAL_RERANKER_URL,
+            app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
+            RAG_RERANKING_MODEL_AUTO_UPDATE,
+        )
+    except Exception as e:
+        log.error(f"Error updating models: {e}")
+        pass
+
+    app.state.RERANKING_FUNCTION = get_reranking_function(
         app.state.config.RAG_RERANKING_ENGINE,
         app.state.config.RAG_RERANKING_MODEL,
-        app.state.config.RAG_EXTERNAL_RERANKER_URL,
-        app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
-        RAG_RERANKING_MODEL_AUTO_UPDATE,
+        reranking_function=app.state.rf,
     )
-except Exception as e:
-    log.error(f"Error updating models: {e}")
-    pass
-
-app.state.EMBEDDING_FUNCTION = get_embedding_function(
-    app.state.config.RAG_EMBEDDING_ENGINE,
-    app.state.config.RAG_EMBEDDING_MODEL,
-    embedding_function=app.state.ef,
-    url=(
-        app.state.config.RAG_OPENAI_API_BASE_URL
-        if app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-        else (
-            app.state.config.RAG_OLLAMA_BASE_URL
-            if app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-            else app.state.config.RAG_AZURE_OPENAI_BASE_URL
-        )
-    ),
-    key=(
-        app.state.config.RAG_OPENAI_API_KEY
-        if app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-        else (
-            app.state.config.RAG_OLLAMA_API_KEY
-            if app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-            else app.state.config.RAG_AZURE_OPENAI_API_KEY
-        )
-    ),
-    embedding_batch_size=app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-    azure_api_version=(
-        app.state.config.RAG_AZURE_OPENAI_API_VERSION
-        if app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-        else None
-    ),
-)
 
-app.state.RERANKING_FUNCTION = get_reranking_function(
-    app.state.config.RAG_RERANKING_ENGINE,
-    app.state.config.RAG_RERANKING_MODEL,
-    reranking_function=app.state.rf,
-)
+
+# Only local models are deferred to the background warm-up, remote engines
+# are usable as soon as they are configured
+if ENABLE_FAST_START and app.state.config.RAG_EMBEDDING_ENGINE == "":
+    startup_profile.add_warmup("embedding_model", load_embedding_model)
+else:
+    with startup_profile.phase("embedding_model"):
+        load_embedding_model()
+
+if (
+    ENABLE_FAST_START
+    and app.state.config.RAG_RERANKING_MODEL
+    and app.state.config.RAG_RERANKING_ENGINE != "external"
+):
+    startup_profile.add_warmup("reranking_model", load_reranking_model)
+else:
+    with startup_profile.phase("reranking_model"):
+        load_reranking_model()
+
 
 ########################################
 #
@@ -1081,6 +1204,18 @@ app.state.config.TTS_AZURE_SPEECH_BASE_URL = AUDIO_TTS_AZURE_SPEECH_BASE_URL
 app.state.config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = AUDIO_TTS_AZURE_SPEECH_OUTPUT_FORMAT
 
 app.state.faster_whisper_model = None
+
+
+def load_whisper_model():
+    from open_webui.routers.audio import set_faster_whisper_model
+
+    app.state.faster_whisper_model = set_faster_whisper_model(
+        app.state.config.WHISPER_MODEL
+    )
+
+
+if ENABLE_FAST_START and app.state.config.STT_ENGINE == "":
+    startup_profile.add_warmup("whisper_model", load_whisper_model)
 app.state.speech_synthesiser = None
 app.state.speech_speaker_embeddings_dataset = None
 
@@ -1267,6 +1402,7 @@ app.include_router(
 )
 app.include_router(jimeng.router, prefix="/api/v1", tags=["jimeng"])
 app.include_router(flux.router, prefix="/api/v1", tags=["flux"])
+app.include_router(creations.router, prefix="/api/v1/creations", tags=["creations"])
 app.include_router(storage.router, prefix="/api/v1/storage", tags=["storage"])
 
 app.include_router(channels.router, prefix="/api/v1/channels", tags=["channels"])
@@ -1451,6 +1587,8 @@ async def chat_completion(
     model_item = form_data.pop("model_item", {})
     tasks = form_data.pop("background_tasks", None)
 
+    timings = start_chat_timings(request, user, model_id)
+
     metadata = {}
     try:
         if not model_item.get("direct", False):
@@ -1528,6 +1666,7 @@ async def chat_completion(
         )
     except Exception as e:
         log.debug(f"Error processing chat payload: {e}")
+        finish_chat_timings(timings, force=True)
         if metadata.get("chat_id") and metadata.get("message_id"):
             # Update the chat message with the error
             Chats.upsert_message_to_chat_by_id_and_message_id(
@@ -1546,7 +1685,11 @@ async def chat_completion(
     form_data["metadata"]["features_for_credit"] = form_data["metadata"]["features"]
 
     try:
-        response = await chat_completion_handler(request, form_data, user)
+        if timings is not None:
+            timings.upstream_started_at = time.perf_counter()
+        with stage("upstream"):
+            response = await chat_completion_handler(request, form_data, user)
+        response = track_upstream_response(timings, response)
         if metadata.get("chat_id") and metadata.get("message_id"):
             Chats.upsert_message_to_chat_by_id_and_message_id(
                 metadata["chat_id"],
@@ -1556,11 +1699,14 @@ async def chat_completion(
                 },
             )
 
-        return await process_chat_response(
+        response = await process_chat_response(
             request, response, form_data, user, metadata, model, events, tasks
         )
+        finish_chat_timings(timings)
+        return response
     except Exception as e:
         log.debug(f"Error in chat completion: {e}")
+        finish_chat_timings(timings, force=True)
         if metadata.get("chat_id") and metadata.get("message_id"):
             # Update the chat message with the error
             Chats.upsert_message_to_chat_by_id_and_message_id(
@@ -1636,6 +1782,31 @@ async def list_tasks_endpoint(request: Request, user=Depends(get_verified_user))
     return {"tasks": await list_tasks(request.app.state.redis)}
 
 
+@app.get("/api/tasks/events")
+async def stream_task_events_endpoint(
+    provider: Optional[str] = None, user=Depends(get_verified_user)
+):
+    """
+    Server-sent events for the user's image/video generation tasks
+    (Midjourney, Kling, Jimeng, Flux, DreamWork, lip-sync). Each event carries
+    the task as returned by its provider's API. `provider` takes a
+    comma-separated filter. The stream ends with a `stream_end` event once no
+    task event has arrived for STREAM_IDLE_TIMEOUT seconds; clients
+    reconnect when they start a new task.
+    """
+    providers = provider.split(",") if provider else None
+
+    async def generate():
+        async with task_event_bus.subscription(user.id) as queue:
+            async for event_data in iter_task_events(
+                queue, providers, idle_timeout=STREAM_IDLE_TIMEOUT
+            ):
+                yield format_sse(event_data) if event_data else ": keepalive\n\n"
+        yield format_sse({"type": "stream_end"})
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
 @app.get("/api/tasks/chat/{chat_id}")
 async def list_tasks_by_chat_id_endpoint(
     request: Request, chat_id: str, user=Depends(get_verified_user)
@@ -1862,6 +2033,22 @@ async def get_current_usage(user=Depends(get_verified_user)):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats(user=Depends(get_admin_user)):
+    """
+    Get hit/miss statistics of the shared application cache.
+    """
+    return get_cache_manager().get_stats()
+
+
+@app.get("/api/webhooks/stats")
+async def get_webhook_stats(user=Depends(get_admin_user)):
+    """
+    Get delivery statistics and recent dead letters of the webhook queue.
+    """
+    return webhook_queue.get_metrics()
+
+
 ############################
 # OAuth Login & Callback
 ############################
@@ -1948,6 +2135,21 @@ async def healthcheck_with_db():
     return {"status": True}
 
 
+@app.get("/health/ready")
+async def healthcheck_ready():
+    """Ready once the background warm-up of local models has finished"""
+    ready = startup_profile.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": ready, "warmup": startup_profile.get_warmup_status()},
+    )
+
+
+@app.get("/api/startup")
+async def get_startup_profile(user=Depends(get_admin_user)):
+    return startup_profile.get_report()
+
+
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
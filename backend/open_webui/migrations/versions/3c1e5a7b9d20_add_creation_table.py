@@ -0,0 +1,142 @@
+"""add creation table
+
+Revision ID: 3c1e5a7b9d20
+Revises: merge_heads_kling_lip_sync
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import open_webui.internal.db
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1e5a7b9d20"
+down_revision: Union[str, None] = "merge_heads_kling_lip_sync"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# provider -> (task table, media type)
+TASK_TABLES = {
+    "midjourney": ("mj_tasks", "image"),
+    "kling": ("kling_tasks", "video"),
+    "jimeng": ("jimeng_tasks", "video"),
+    "flux": ("flux_tasks", "image"),
+    "dreamwork": ("dreamwork_tasks", "image"),
+    "kling_lip_sync": ("kling_lip_sync_tasks", "video"),
+}
+
+URL_COLUMNS = ("cloud_image_url", "cloud_video_url", "image_url", "video_url")
+BATCH_SIZE = 1000
+
+
+def _to_epoch(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def upgrade() -> None:
+    creation = op.create_table(
+        "creation",
+        sa.Column("id", sa.String(100), primary_key=True),
+        sa.Column("user_id", sa.String(50), nullable=False),
+        sa.Column("provider", sa.String(30), nullable=False),
+        sa.Column("task_id", sa.String(100), nullable=False),
+        sa.Column("media_type", sa.String(10), nullable=True),
+        sa.Column("action", sa.String(50), nullable=True),
+        sa.Column("status", sa.String(50), nullable=True),
+        sa.Column("prompt", sa.Text(), nullable=True),
+        sa.Column("url", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+    op.create_index(
+        "idx_creation_user_created", "creation", ["user_id", "created_at", "id"]
+    )
+    op.create_index(
+        "idx_creation_user_provider_created",
+        "creation",
+        ["user_id", "provider", "created_at", "id"],
+    )
+
+    # Backfill from the provider task tables that exist in this database
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    now = int(datetime.now(timezone.utc).timestamp())
+
+    for provider, (table_name, media_type) in TASK_TABLES.items():
+        if table_name not in existing_tables:
+            continue
+
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if not {"id", "user_id"} <= columns:
+            continue
+
+        selected = [
+            sa.column(name)
+            for name in (
+                "id",
+                "user_id",
+                "status",
+                "action",
+                "task_type",
+                "prompt",
+                "text",
+                "created_at",
+                "submit_time",
+                "updated_at",
+                *URL_COLUMNS,
+            )
+            if name in columns
+        ]
+        result = conn.execute(sa.select(*selected).select_from(sa.table(table_name)))
+
+        while True:
+            rows = result.mappings().fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+
+            values = []
+            for row in rows:
+                created_at = (
+                    _to_epoch(row.get("created_at"))
+                    or _to_epoch(row.get("submit_time"))
+                    or now
+                )
+                values.append(
+                    {
+                        "id": f"{provider}:{row['id']}",
+                        "user_id": row["user_id"],
+                        "provider": provider,
+                        "task_id": str(row["id"]),
+                        "media_type": media_type,
+                        "action": row.get("action") or row.get("task_type"),
+                        "status": row.get("status"),
+                        "prompt": row.get("prompt") or row.get("text"),
+                        "url": next(
+                            (row[name] for name in URL_COLUMNS if row.get(name)),
+                            None,
+                        ),
+                        "created_at": created_at,
+                        "updated_at": _to_epoch(row.get("updated_at")) or created_at,
+                    }
+                )
+            op.bulk_insert(creation, values)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_creation_user_provider_created", table_name="creation")
+    op.drop_index("idx_creation_user_created", table_name="creation")
+    op.drop_table("creation")
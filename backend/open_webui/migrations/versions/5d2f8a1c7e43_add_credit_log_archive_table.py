@@ -0,0 +1,51 @@
+"""add credit log archive table
+
+Revision ID: 5d2f8a1c7e43
+Revises: 3c1e5a7b9d20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import open_webui.internal.db
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f8a1c7e43"
+down_revision: Union[str, None] = "3c1e5a7b9d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "credit_log_archive" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "credit_log_archive",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("storage", sa.String(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("start_time", sa.BigInteger(), nullable=False),
+        sa.Column("end_time", sa.BigInteger(), nullable=False),
+        sa.Column("row_count", sa.BigInteger(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_credit_log_archive_start_time", "credit_log_archive", ["start_time"]
+    )
+    op.create_index(
+        "ix_credit_log_archive_end_time", "credit_log_archive", ["end_time"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_credit_log_archive_end_time", table_name="credit_log_archive")
+    op.drop_index("ix_credit_log_archive_start_time", table_name="credit_log_archive")
+    op.drop_table("credit_log_archive")
@@ -4,9 +4,15 @@ from datetime import datetime
 from open_webui.internal.db import Base, get_db
 from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Any, Dict
+import logging
 import time
 import uuid
 
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
 
 ####################
 # 云存储配置模型
@@ -221,7 +227,7 @@ class CloudStorageTable:
             with get_db() as db:
                 return db.query(CloudStorageConfig).first()
         except Exception as e:
-            print(f"获取配置错误: {e}")
+            log.error(f"获取配置错误: {e}")
             return None
 
     def create_or_update_config(
@@ -255,10 +261,7 @@ class CloudStorageTable:
                 db.refresh(config)
                 return config
         except Exception as e:
-            print(f"创建或更新配置错误: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"创建或更新配置错误: {e}")
             raise e
 
     def delete_config(self) -> bool:
@@ -295,10 +298,7 @@ class GeneratedFileTable:
                 db.refresh(file_record)
                 return file_record
         except Exception as e:
-            print(f"创建文件记录错误: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"创建文件记录错误: {e}")
             raise e
 
     def get_file_by_id(self, file_id: str) -> Optional[GeneratedFile]:
@@ -0,0 +1,250 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.internal.db import Base, get_db
+from open_webui.utils.misc import decode_keyset_cursor, encode_keyset_cursor
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Index, String, Text, and_, or_
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Media produced by each generation provider
+PROVIDER_MEDIA_TYPES = {
+    "midjourney": "image",
+    "kling": "video",
+    "jimeng": "video",
+    "flux": "image",
+    "dreamwork": "image",
+    "kling_lip_sync": "video",
+}
+
+# Result columns in order of preference, cloud copies first
+RESULT_URL_FIELDS = (
+    "cloud_image_url",
+    "cloud_video_url",
+    "image_url",
+    "video_url",
+)
+
+####################
+# Creation DB Schema
+####################
+
+
+class Creation(Base):
+    """
+    One row per generation task of any provider, kept in sync with the
+    provider task tables so a user's gallery is a single index range scan.
+    """
+
+    __tablename__ = "creation"
+
+    id = Column(String(100), primary_key=True)  # "{provider}:{task_id}"
+    user_id = Column(String(50), nullable=False)
+    provider = Column(String(30), nullable=False)
+    task_id = Column(String(100), nullable=False)
+
+    media_type = Column(String(10))
+    action = Column(String(50))
+    status = Column(String(50))
+    prompt = Column(Text)
+    url = Column(Text)
+
+    created_at = Column(BigInteger, nullable=False)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        Index("idx_creation_user_created", "user_id", "created_at", "id"),
+        Index(
+            "idx_creation_user_provider_created",
+            "user_id",
+            "provider",
+            "created_at",
+            "id",
+        ),
+    )
+
+
+class CreationModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: str
+    provider: str
+    task_id: str
+
+    media_type: Optional[str] = None
+    action: Optional[str] = None
+    status: Optional[str] = None
+    prompt: Optional[str] = None
+    url: Optional[str] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: Optional[int] = None  # timestamp in epoch
+
+
+class CreationListResponse(BaseModel):
+    items: list[CreationModel]
+    next_cursor: Optional[str] = None
+
+
+####################
+# Helpers
+####################
+
+
+def get_creation_id(provider: str, task_id: str) -> str:
+    return f"{provider}:{task_id}"
+
+
+def to_epoch(value) -> Optional[int]:
+    """Task tables store naive UTC datetimes"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    return None
+
+
+def get_creation_values(provider: str, task) -> dict:
+    """Map a provider task row onto the columns of the creation index"""
+    url = next(
+        (
+            getattr(task, field)
+            for field in RESULT_URL_FIELDS
+            if getattr(task, field, None)
+        ),
+        None,
+    )
+    return {
+        "user_id": task.user_id,
+        "provider": provider,
+        "task_id": str(task.id),
+        "media_type": PROVIDER_MEDIA_TYPES.get(provider),
+        "action": getattr(task, "action", None) or getattr(task, "task_type", None),
+        "status": task.status,
+        "prompt": getattr(task, "prompt", None) or getattr(task, "text", None),
+        "url": url,
+        "created_at": to_epoch(
+            getattr(task, "created_at", None) or getattr(task, "submit_time", None)
+        )
+        or int(time.time()),
+        "updated_at": to_epoch(getattr(task, "updated_at", None)) or int(time.time()),
+    }
+
+
+####################
+# Creation Table
+####################
+
+
+class CreationsTable:
+    def upsert_from_task(self, provider: str, task) -> Optional[CreationModel]:
+        values = get_creation_values(provider, task)
+        creation_id = get_creation_id(provider, values["task_id"])
+
+        for _ in range(2):
+            try:
+                with get_db() as db:
+                    creation = db.get(Creation, creation_id)
+                    if creation is None:
+                        creation = Creation(id=creation_id, **values)
+                        db.add(creation)
+                    else:
+                        # The creation time never moves, it is the keyset order
+                        values.pop("created_at", None)
+                        for key, value in values.items():
+                            setattr(creation, key, value)
+                    db.commit()
+                    db.refresh(creation)
+                    return CreationModel.model_validate(creation)
+            except IntegrityError:
+                # Inserted concurrently by another commit, update it instead
+                continue
+            except Exception as e:
+                log.error(f"Failed to index {provider} task {values['task_id']}: {e}")
+                return None
+        return None
+
+    def delete_by_task_id(self, provider: str, task_id: str) -> bool:
+        with get_db() as db:
+            db.query(Creation).filter_by(id=get_creation_id(provider, task_id)).delete()
+            db.commit()
+            return True
+
+    def delete_by_provider_before(self, provider: str, created_before: int) -> int:
+        with get_db() as db:
+            deleted = (
+                db.query(Creation)
+                .filter(
+                    Creation.provider == provider,
+                    Creation.created_at < created_before,
+                )
+                .delete()
+            )
+            db.commit()
+            return deleted
+
+    def record_task_change(self, provider: str, task_id: str, task):
+        """Task event hook: `task` is the committed row, None once deleted"""
+        if task is None:
+            self.delete_by_task_id(provider, task_id)
+        else:
+            self.upsert_from_task(provider, task)
+
+    def get_creations_by_user_id(
+        self,
+        user_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 30,
+        providers: Optional[list[str]] = None,
+        media_type: Optional[str] = None,
+    ) -> CreationListResponse:
+        """Newest first, continuing after `cursor` (the last item of the previous page)"""
+        with get_db() as db:
+            query = db.query(Creation).filter(Creation.user_id == user_id)
+
+            if providers:
+                query = query.filter(Creation.provider.in_(providers))
+            if media_type:
+                query = query.filter(Creation.media_type == media_type)
+
+            if cursor:
+                created_at, creation_id = decode_keyset_cursor(cursor)
+                query = query.filter(
+                    or_(
+                        Creation.created_at < created_at,
+                        and_(
+                            Creation.created_at == created_at,
+                            Creation.id < creation_id,
+                        ),
+                    )
+                )
+
+            rows = (
+                query.order_by(Creation.created_at.desc(), Creation.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+
+            items = [CreationModel.model_validate(row) for row in rows[:limit]]
+            return CreationListResponse(
+                items=items,
+                next_cursor=(
+                    encode_keyset_cursor(items[-1].created_at, items[-1].id)
+                    if len(rows) > limit and items
+                    else None
+                ),
+            )
+
+
+Creations = CreationsTable()
@@ -1,11 +1,11 @@
 import time
 import uuid
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from fastapi import HTTPException
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import JSON, BigInteger, Column, Numeric, String, or_
+from sqlalchemy import JSON, BigInteger, Column, Numeric, String, and_, func, or_, text
 
 from open_webui.env import (
     REDIS_URL,
@@ -14,6 +14,7 @@ from open_webui.env import (
     REDIS_CLUSTER,
 )
 from open_webui.internal.db import Base, get_db
+from open_webui.utils.misc import decode_keyset_cursor, encode_keyset_cursor
 from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
 
 
@@ -44,6 +45,23 @@ class CreditLog(Base):
     created_at = Column(BigInteger, index=True)
 
 
+class CreditLogArchive(Base):
+    __tablename__ = "credit_log_archive"
+
+    id = Column(String, primary_key=True)
+    storage = Column(String, nullable=False)
+    path = Column(String, nullable=False)
+    # created_at range of the archived rows, both inclusive
+    start_time = Column(BigInteger, index=True, nullable=False)
+    end_time = Column(BigInteger, index=True, nullable=False)
+    row_count = Column(BigInteger, nullable=False)
+    size = Column(BigInteger, nullable=True)
+    # pending: file written, rows still being removed from credit_log
+    status = Column(String, nullable=False)
+
+    created_at = Column(BigInteger)
+
+
 class TradeTicket(Base):
     __tablename__ = "trade_ticket"
 
@@ -91,6 +109,19 @@ class CreditLogModel(BaseModel):
     created_at: int = Field(default_factory=lambda: int(time.time()))
 
 
+class CreditLogArchiveModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    storage: str
+    path: str
+    start_time: int
+    end_time: int
+    row_count: int
+    size: Optional[int] = None
+    status: str = "pending"
+    created_at: int = Field(default_factory=lambda: int(time.time()))
+
+
 class CreditLogUsage(BaseModel):
     model_config = ConfigDict(from_attributes=True, extra="allow")
     total_price: Optional[Decimal] = None
@@ -170,6 +201,9 @@ class RedemptionCodeModel(BaseModel):
 # Tables
 ####################
 
+# Unfiltered counts above this many rows use the planner estimate
+APPROXIMATE_COUNT_THRESHOLD = 100_000
+
 
 class CreditsTable:
     def insert_new_credit(self, user_id: str) -> Optional[CreditModel]:
@@ -319,13 +353,90 @@ class TradeTicketTable:
 TradeTickets = TradeTicketTable()
 
 
+def get_estimated_row_count(db, table_name: str) -> Optional[int]:
+    """Planner statistics instead of a full scan, None when not available"""
+    if db.bind.dialect.name != "postgresql":
+        return None
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+        {"name": table_name},
+    ).scalar()
+    # -1 until the table has been analyzed
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+def keyset_before(created_at_column, id_column, cursor: str):
+    """Rows after `cursor` in (created_at, id) descending order"""
+    created_at, id = decode_keyset_cursor(cursor)
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < id),
+    )
+
+
 class CreditLogTable:
-    def count_credit_log(self, user_ids: list[str] = None) -> int:
+    def count_credit_log(
+        self, user_ids: list[str] = None, approximate: bool = False
+    ) -> int:
         with get_db() as db:
-            query = db.query(CreditLog).order_by(CreditLog.created_at.desc())
+            if approximate and not user_ids:
+                estimate = get_estimated_row_count(db, CreditLog.__tablename__)
+                if estimate is not None and estimate >= APPROXIMATE_COUNT_THRESHOLD:
+                    return estimate
+            query = db.query(func.count(CreditLog.id))
+            if user_ids:
+                query = query.filter(CreditLog.user_id.in_(user_ids))
+            return query.scalar()
+
+    def get_credit_log_by_cursor(
+        self,
+        user_ids: list[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 30,
+    ) -> Tuple[list[CreditLogSimpleModel], Optional[str]]:
+        """Newest first, continuing after `cursor`; returns the page and the next cursor"""
+        with get_db() as db:
+            query = db.query(CreditLog)
+            if user_ids:
+                query = query.filter(CreditLog.user_id.in_(user_ids))
+            if cursor:
+                query = query.filter(
+                    keyset_before(CreditLog.created_at, CreditLog.id, cursor)
+                )
+            rows = (
+                query.order_by(CreditLog.created_at.desc(), CreditLog.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+            logs = [CreditLogSimpleModel.model_validate(log) for log in rows[:limit]]
+            next_cursor = (
+                encode_keyset_cursor(logs[-1].created_at, logs[-1].id)
+                if len(rows) > limit
+                else None
+            )
+            return logs, next_cursor
+
+    def iter_credit_logs(
+        self,
+        user_ids: list[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[CreditLogModel]:
+        """Oldest first, streamed from a server-side cursor"""
+        with get_db() as db:
+            query = db.query(CreditLog)
             if user_ids:
                 query = query.filter(CreditLog.user_id.in_(user_ids))
-            return query.count()
+            if start_time is not None:
+                query = query.filter(CreditLog.created_at >= start_time)
+            if end_time is not None:
+                query = query.filter(CreditLog.created_at < end_time)
+            query = query.order_by(CreditLog.created_at.asc(), CreditLog.id.asc())
+            for log in query.execution_options(stream_results=True).yield_per(
+                batch_size
+            ):
+                yield CreditLogModel.model_validate(log)
 
     def get_credit_log_by_page(
         self,
@@ -359,14 +470,62 @@ class CreditLogTable:
         except Exception:
             return []
 
-    def delete_log_by_timestamp(self, timestamp: int) -> int:
-        try:
+    def get_logs_before(
+        self,
+        timestamp: int,
+        after: Optional[Tuple[int, str]] = None,
+        limit: int = 1000,
+    ) -> list[CreditLogModel]:
+        """Logs older than timestamp, oldest first, continuing after (created_at, id)"""
+        with get_db() as db:
+            query = db.query(CreditLog).filter(CreditLog.created_at < timestamp)
+            if after:
+                query = query.filter(
+                    or_(
+                        CreditLog.created_at > after[0],
+                        and_(CreditLog.created_at == after[0], CreditLog.id > after[1]),
+                    )
+                )
+            logs = (
+                query.order_by(CreditLog.created_at.asc(), CreditLog.id.asc())
+                .limit(limit)
+                .all()
+            )
+            return [CreditLogModel.model_validate(log) for log in logs]
+
+    def delete_logs_by_ids(self, ids: list[str], chunk_size: int = 1000) -> int:
+        total = 0
+        for i in range(0, len(ids), chunk_size):
             with get_db() as db:
-                query = db.query(CreditLog).filter(CreditLog.created_at < timestamp)
-                total = query.count()
-                query.delete()
+                total += (
+                    db.query(CreditLog)
+                    .filter(CreditLog.id.in_(ids[i : i + chunk_size]))
+                    .delete(synchronize_session=False)
+                )
                 db.commit()
-                return total
+        return total
+
+    def delete_log_by_timestamp(self, timestamp: int, chunk_size: int = 1000) -> int:
+        # delete in short transactions instead of one long lock on the table
+        try:
+            total = 0
+            while True:
+                with get_db() as db:
+                    ids = [
+                        id
+                        for (id,) in db.query(CreditLog.id)
+                        .filter(CreditLog.created_at < timestamp)
+                        .limit(chunk_size)
+                        .all()
+                    ]
+                    if not ids:
+                        return total
+                    total += (
+                        db.query(CreditLog)
+                        .filter(CreditLog.id.in_(ids))
+                        .delete(synchronize_session=False)
+                    )
+                    db.commit()
         except Exception as err:
             raise HTTPException(status_code=500, detail=str(err))
 
@@ -374,6 +533,42 @@ class CreditLogTable:
 CreditLogs = CreditLogTable()
 
 
+class CreditLogArchiveTable:
+    def insert_archive(self, archive: CreditLogArchiveModel) -> CreditLogArchiveModel:
+        with get_db() as db:
+            db.add(CreditLogArchive(**archive.model_dump()))
+            db.commit()
+            return archive
+
+    def update_archive_status(self, id: str, status: str) -> None:
+        with get_db() as db:
+            db.query(CreditLogArchive).filter(CreditLogArchive.id == id).update(
+                {"status": status}
+            )
+            db.commit()
+
+    def get_archives(
+        self,
+        status: Optional[str] = "done",
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> list[CreditLogArchiveModel]:
+        """Archives overlapping [start_time, end_time), newest first"""
+        with get_db() as db:
+            query = db.query(CreditLogArchive)
+            if status:
+                query = query.filter(CreditLogArchive.status == status)
+            if start_time is not None:
+                query = query.filter(CreditLogArchive.end_time >= start_time)
+            if end_time is not None:
+                query = query.filter(CreditLogArchive.start_time < end_time)
+            archives = query.order_by(CreditLogArchive.end_time.desc()).all()
+            return [CreditLogArchiveModel.model_validate(item) for item in archives]
+
+
+CreditLogArchives = CreditLogArchiveTable()
+
+
 class RedemptionCodeTable:
     def get_code(self, code: str) -> Optional[RedemptionCodeModel]:
         try:
@@ -393,15 +588,9 @@ class RedemptionCodeTable:
         self, keyword: str = None, offset: int = None, limit: int = None
     ) -> Tuple[int, List[RedemptionCodeModel]]:
         with get_db() as db:
-            query = db.query(RedemptionCode).order_by(RedemptionCode.created_at.desc())
-            if keyword:
-                query = query.filter(
-                    or_(
-                        RedemptionCode.code == keyword,
-                        RedemptionCode.purpose == keyword,
-                    )
-                )
+            query = self._filter_keyword(db.query(RedemptionCode), keyword)
             total = query.count()
+            query = query.order_by(RedemptionCode.created_at.desc())
             if offset:
                 query = query.offset(offset)
             if limit:
@@ -410,6 +599,55 @@ class RedemptionCodeTable:
                 RedemptionCodeModel.model_validate(code) for code in query.all()
             ]
 
+    def _filter_keyword(self, query, keyword=None):
+        if keyword:
+            query = query.filter(
+                or_(
+                    RedemptionCode.code == keyword,
+                    RedemptionCode.purpose == keyword,
+                )
+            )
+        return query
+
+    def get_codes_by_cursor(
+        self, keyword: str = None, cursor: Optional[str] = None, limit: int = 30
+    ) -> Tuple[List[RedemptionCodeModel], Optional[str]]:
+        """Newest first, continuing after `cursor`; returns the page and the next cursor"""
+        with get_db() as db:
+            query = self._filter_keyword(db.query(RedemptionCode), keyword)
+            if cursor:
+                query = query.filter(
+                    keyset_before(
+                        RedemptionCode.created_at, RedemptionCode.code, cursor
+                    )
+                )
+            rows = (
+                query.order_by(
+                    RedemptionCode.created_at.desc(), RedemptionCode.code.desc()
+                )
+                .limit(limit + 1)
+                .all()
+            )
+            codes = [RedemptionCodeModel.model_validate(code) for code in rows[:limit]]
+            next_cursor = (
+                encode_keyset_cursor(codes[-1].created_at, codes[-1].code)
+                if len(rows) > limit
+                else None
+            )
+            return codes, next_cursor
+
+    def iter_codes(
+        self, keyword: str = None, batch_size: int = 1000
+    ) -> Iterator[RedemptionCodeModel]:
+        with get_db() as db:
+            query = self._filter_keyword(db.query(RedemptionCode), keyword).order_by(
+                RedemptionCode.created_at.desc(), RedemptionCode.code.desc()
+            )
+            for code in query.execution_options(stream_results=True).yield_per(
+                batch_size
+            ):
+                yield RedemptionCodeModel.model_validate(code)
+
     def insert_codes(self, redemption_codes: List[RedemptionCodeModel]) -> None:
         try:
             with get_db() as db:
@@ -18,11 +18,16 @@ from sqlalchemy import (
 )
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
+import logging
 import json
 import uuid
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.users import Users
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["DREAMWORK"])
 
 # ======================== Pydantic 模型 ========================
 
@@ -302,7 +307,7 @@ class DreamWorkTask(Base):
         """从API响应更新任务数据"""
         try:
             with get_db() as db:
-                print(f"🎨 【DreamWork】更新任务: {self.id}")
+                log.info(f"🎨 【DreamWork】更新任务: {self.id}")
 
                 # 更新状态
                 if "error" in api_response:
@@ -338,13 +343,12 @@ class DreamWorkTask(Base):
                 db.commit()
                 db.refresh(self)
 
-                print(f"🎨 【DreamWork】任务更新完成: {self.id}, 状态: {self.status}")
+                log.info(
+                    f"🎨 【DreamWork】任务更新完成: {self.id}, 状态: {self.status}"
+                )
 
         except Exception as e:
-            print(f"❌ 【DreamWork】更新任务失败: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"❌ 【DreamWork】更新任务失败: {e}")
             raise
 
     def to_dict(self):
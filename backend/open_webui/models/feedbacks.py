@@ -152,6 +152,15 @@ class FeedbackTable:
                 .all()
             ]
 
+    def get_rating_feedbacks(self) -> list[tuple]:
+        """(id, data, created_at) of every feedback, without the chat snapshots"""
+        with get_db() as db:
+            return (
+                db.query(Feedback.id, Feedback.data, Feedback.created_at)
+                .order_by(Feedback.created_at.asc())
+                .all()
+            )
+
     def get_feedbacks_by_type(self, type: str) -> list[FeedbackModel]:
         with get_db() as db:
             return [
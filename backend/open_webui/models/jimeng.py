@@ -19,10 +19,21 @@ from sqlalchemy.sql import func
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
+import logging
 import uuid
 import json
 
 from open_webui.internal.db import Base, SessionLocal, get_db
+from open_webui.utils.cache_manager import (
+    PROVIDER_CONFIG_NAMESPACE,
+    copy_row,
+    get_cache_manager,
+)
+from open_webui.utils.task_events import record_task_write
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["JIMENG"])
 
 
 # ======================== Pydantic 数据模型 ========================
@@ -161,6 +172,20 @@ class JimengConfig(Base):
 
     @classmethod
     def get_config(cls) -> Optional["JimengConfig"]:
+        """获取即梦配置（进程内缓存，保存时失效）"""
+        return get_cache_manager().get_or_load(
+            PROVIDER_CONFIG_NAMESPACE,
+            cls.__tablename__,
+            cls._load_config,
+            copy=copy_row,
+        )
+
+    @classmethod
+    def invalidate_config_cache(cls):
+        get_cache_manager().invalidate(PROVIDER_CONFIG_NAMESPACE, cls.__tablename__)
+
+    @classmethod
+    def _load_config(cls) -> Optional["JimengConfig"]:
         """获取即梦配置（安全查询，兼容缺失字段）"""
         with get_db() as db:
             try:
@@ -168,7 +193,7 @@ class JimengConfig(Base):
                 return db.query(cls).first()
             except Exception as e:
                 # 如果ORM查询失败（通常是因为字段缺失），使用原始SQL查询
-                print(f"⚠️  ORM查询失败，使用安全查询: {e}")
+                log.warning(f"⚠️  ORM查询失败，使用安全查询: {e}")
                 try:
                     # 检查表是否存在
                     import sqlalchemy as sa
@@ -232,16 +257,25 @@ class JimengConfig(Base):
                     ):
                         config.default_watermark = False
 
-                    print(f"✅ 安全查询成功，字段: {list(row_dict.keys())}")
+                    log.info(f"✅ 安全查询成功，字段: {list(row_dict.keys())}")
                     return config
 
                 except Exception as safe_error:
-                    print(f"❌ 安全查询也失败: {safe_error}")
+                    log.error(f"❌ 安全查询也失败: {safe_error}")
                     return None
 
     @classmethod
     def save_config(cls, config_data: dict) -> "JimengConfig":
         """保存即梦配置（安全保存，兼容缺失字段）"""
+        try:
+            return cls._save_config(config_data)
+        finally:
+            cls.invalidate_config_cache()
+
+    @classmethod
+    def _save_config(cls, config_data: dict) -> "JimengConfig":
+        # 读取并修改的是数据库中的最新配置，而不是缓存中的共享对象
+        cls.invalidate_config_cache()
         with get_db() as db:
             # 使用安全的get_config方法获取现有配置
             config = cls.get_config()
@@ -283,16 +317,16 @@ class JimengConfig(Base):
                         db.execute(sa.text(sql), update_values)
                         db.commit()
 
-                        print(f"✅ 配置更新成功，字段: {list(update_values.keys())}")
+                        log.info(f"✅ 配置更新成功，字段: {list(update_values.keys())}")
 
                         # 重新获取更新后的配置
                         return cls.get_config()
 
                 except Exception as update_error:
-                    print(f"⚠️  安全更新失败: {update_error}")
+                    log.warning(f"⚠️  安全更新失败: {update_error}")
                     # 如果数据库是只读的，直接返回当前配置对象（已更新内存中的值）
                     if "readonly database" in str(update_error):
-                        print("⚠️  数据库只读，返回内存中的配置对象")
+                        log.warning("⚠️  数据库只读，返回内存中的配置对象")
                         return config
                     else:
                         # 其他错误，抛出异常
@@ -338,13 +372,13 @@ class JimengConfig(Base):
                         db.commit()
                         db.refresh(config)
 
-                        print(f"✅ 新配置创建成功")
+                        log.info(f"✅ 新配置创建成功")
                         return config
                     else:
                         raise Exception("jimeng_config 表不存在")
 
                 except Exception as create_error:
-                    print(f"❌ 创建配置失败: {create_error}")
+                    log.error(f"❌ 创建配置失败: {create_error}")
                     raise Exception(f"保存配置失败: {create_error}")
 
             return config
@@ -486,8 +520,8 @@ class JimengTask(Base):
                 return task
 
             except Exception as e:
-                print(f"⚠️  JimengTask标准创建失败，使用安全创建: {e}")
-                print(f"🔍 错误详情: {type(e).__name__}: {str(e)}")
+                log.warning(f"⚠️  JimengTask标准创建失败，使用安全创建: {e}")
+                log.error(f"🔍 错误详情: {type(e).__name__}: {str(e)}")
 
                 # 检查是否是只读数据库错误或字段缺失错误
                 error_message = str(e)
@@ -498,7 +532,7 @@ class JimengTask(Base):
                     or "watermark" in error_message.lower()
                 ):
 
-                    print("⚠️ 数据库字段问题或只读，返回模拟任务对象用于测试")
+                    log.warning("⚠️ 数据库字段问题或只读，返回模拟任务对象用于测试")
                     # 在数据库有问题的情况下，返回一个模拟的任务对象
                     task = cls(
                         id=task_id,
@@ -515,7 +549,7 @@ class JimengTask(Base):
                         credits_cost=credits_cost,
                         properties=properties or {},
                     )
-                    print(f"✅ 返回模拟任务对象（数据库字段问题）: {task_id}")
+                    log.info(f"✅ 返回模拟任务对象（数据库字段问题）: {task_id}")
                     return task
 
                 # 回滚当前事务
@@ -589,7 +623,7 @@ class JimengTask(Base):
                     db.execute(sa.text(sql), safe_data)
                     db.commit()
 
-                    print(f"✅ 安全创建任务成功，字段: {safe_fields}")
+                    log.info(f"✅ 安全创建任务成功，字段: {safe_fields}")
 
                     # 直接构造任务对象返回，避免再次查询数据库
                     task = cls()
@@ -601,12 +635,15 @@ class JimengTask(Base):
                     if not hasattr(task, "watermark"):
                         task.watermark = watermark
 
-                    print(f"✅ 返回创建的任务对象: {task_id}")
+                    # 原生SQL绕过了会话钩子，显式同步作品索引和任务事件
+                    record_task_write("jimeng", task)
+
+                    log.info(f"✅ 返回创建的任务对象: {task_id}")
                     return task
 
                 except Exception as safe_error:
-                    print(f"❌ 安全创建任务也失败: {safe_error}")
-                    print(
+                    log.error(f"❌ 安全创建任务也失败: {safe_error}")
+                    log.error(
                         f"🔍 安全创建错误详情: {type(safe_error).__name__}: {str(safe_error)}"
                     )
 
@@ -621,7 +658,7 @@ class JimengTask(Base):
                         or "database is locked" in error_message.lower()
                     ):
 
-                        print("⚠️ 数据库问题，返回模拟任务对象用于测试")
+                        log.warning("⚠️ 数据库问题，返回模拟任务对象用于测试")
                         # 在数据库有问题的情况下，返回一个模拟的任务对象
                         task = cls()
                         for key, value in safe_data.items():
@@ -632,7 +669,7 @@ class JimengTask(Base):
                         if not hasattr(task, "watermark"):
                             task.watermark = watermark
 
-                        print(f"✅ 返回模拟任务对象（数据库问题）: {task_id}")
+                        log.info(f"✅ 返回模拟任务对象（数据库问题）: {task_id}")
                         return task
                     else:
                         raise Exception(f"创建任务失败: {safe_error}")
@@ -646,7 +683,7 @@ class JimengTask(Base):
                 return db.query(cls).filter(cls.id == task_id).first()
             except Exception as e:
                 # 如果ORM查询失败，使用原生SQL查询
-                print(f"⚠️  JimengTask按ID查询失败，使用安全查询: {e}")
+                log.warning(f"⚠️  JimengTask按ID查询失败，使用安全查询: {e}")
                 try:
                     import sqlalchemy as sa
 
@@ -713,11 +750,11 @@ class JimengTask(Base):
                     if not hasattr(task, "watermark"):
                         task.watermark = False
 
-                    print(f"✅ 安全查询获取任务成功: {task_id}")
+                    log.info(f"✅ 安全查询获取任务成功: {task_id}")
                     return task
 
                 except Exception as safe_error:
-                    print(f"❌ 安全查询任务失败: {safe_error}")
+                    log.error(f"❌ 安全查询任务失败: {safe_error}")
                     return None
 
     @classmethod
@@ -739,7 +776,7 @@ class JimengTask(Base):
                 )
             except Exception as e:
                 # 如果ORM查询失败，使用原生SQL查询
-                print(f"⚠️  JimengTask ORM查询失败，使用安全查询: {e}")
+                log.warning(f"⚠️  JimengTask ORM查询失败，使用安全查询: {e}")
                 try:
                     import sqlalchemy as sa
 
@@ -818,11 +855,11 @@ class JimengTask(Base):
 
                         tasks.append(task)
 
-                    print(f"✅ 安全查询获取到 {len(tasks)} 个任务")
+                    log.info(f"✅ 安全查询获取到 {len(tasks)} 个任务")
                     return tasks
 
                 except Exception as safe_error:
-                    print(f"❌ 安全查询也失败: {safe_error}")
+                    log.error(f"❌ 安全查询也失败: {safe_error}")
                     return []
 
     @classmethod
@@ -834,7 +871,7 @@ class JimengTask(Base):
                 return db.query(cls).filter(cls.user_id == user_id).count()
             except Exception as e:
                 # 如果ORM查询失败，使用原生SQL查询
-                print(f"⚠️  JimengTask count查询失败，使用安全查询: {e}")
+                log.warning(f"⚠️  JimengTask count查询失败，使用安全查询: {e}")
                 try:
                     import sqlalchemy as sa
 
@@ -847,11 +884,11 @@ class JimengTask(Base):
                     sql = "SELECT COUNT(*) FROM jimeng_tasks WHERE user_id = :user_id"
                     result = db.execute(sa.text(sql), {"user_id": user_id}).scalar()
 
-                    print(f"✅ 安全count查询成功，用户任务总数: {result}")
+                    log.info(f"✅ 安全count查询成功，用户任务总数: {result}")
                     return result or 0
 
                 except Exception as safe_error:
-                    print(f"❌ 安全count查询也失败: {safe_error}")
+                    log.error(f"❌ 安全count查询也失败: {safe_error}")
                     return 0
 
     def update_status(self, status: str, progress: str = None):
@@ -879,11 +916,11 @@ class JimengTask(Base):
                         if progress:
                             self.progress = progress
 
-                        print(f"✅ 更新任务状态成功: {self.id} -> {status}")
+                        log.info(f"✅ 更新任务状态成功: {self.id} -> {status}")
                         return
 
                 except Exception as e:
-                    print(f"⚠️  JimengTask状态更新失败，使用安全更新: {e}")
+                    log.warning(f"⚠️  JimengTask状态更新失败，使用安全更新: {e}")
                     db.rollback()
 
                     # 检查是否是只读数据库
@@ -893,7 +930,7 @@ class JimengTask(Base):
                         or "attempt to write a readonly database"
                         in error_message.lower()
                     ):
-                        print("⚠️ 数据库只读，仅更新内存中的任务状态")
+                        log.warning("⚠️ 数据库只读，仅更新内存中的任务状态")
                         # 只更新当前实例
                         self.status = status
                         if progress:
@@ -908,7 +945,7 @@ class JimengTask(Base):
                         inspector = sa.inspect(db.bind)
 
                         if not inspector.has_table("jimeng_tasks"):
-                            print("⚠️ jimeng_tasks 表不存在")
+                            log.warning("⚠️ jimeng_tasks 表不存在")
                             return
 
                         # 获取现有字段
@@ -946,22 +983,25 @@ class JimengTask(Base):
                             sql = f"UPDATE jimeng_tasks SET {', '.join(update_fields)} WHERE id = :task_id"
                             db.execute(sa.text(sql), update_values)
                             db.commit()
-                            print(f"✅ 安全更新任务状态成功: {self.id}")
+                            log.info(f"✅ 安全更新任务状态成功: {self.id}")
 
                         # 更新当前实例
                         self.status = status
                         if progress:
                             self.progress = progress
 
+                        if update_fields:
+                            record_task_write("jimeng", self)
+
                     except Exception as safe_error:
-                        print(f"❌ 安全更新也失败: {safe_error}")
+                        log.error(f"❌ 安全更新也失败: {safe_error}")
                         # 至少更新当前实例
                         self.status = status
                         if progress:
                             self.progress = progress
 
         except Exception as e:
-            print(f"❌ 更新任务状态时出现异常: {e}")
+            log.error(f"❌ 更新任务状态时出现异常: {e}")
             # 至少更新当前实例
             self.status = status
             if progress:
@@ -969,7 +1009,7 @@ class JimengTask(Base):
 
     def update_from_api_response(self, response: dict):
         """从API响应更新任务信息（安全更新，兼容缺失字段）"""
-        print(f"🎬 【即梦任务】更新任务 {self.id} 从API响应: {response}")
+        log.info(f"🎬 【即梦任务】更新任务 {self.id} 从API响应: {response}")
 
         # 解析即梦API响应，准备更新数据
         update_data = {}
@@ -981,12 +1021,12 @@ class JimengTask(Base):
                 update_data.update(
                     {"external_task_id": str(external_task_id), "status": "processing"}
                 )
-                print(f"🎬 【即梦任务】任务提交成功，外部ID: {external_task_id}")
+                log.info(f"🎬 【即梦任务】任务提交成功，外部ID: {external_task_id}")
         else:
             # 提交失败
             error_message = response.get("message", "提交失败")
             update_data.update({"status": "failed", "fail_reason": error_message})
-            print(f"❌ 【即梦任务】任务提交失败: {error_message}")
+            log.error(f"❌ 【即梦任务】任务提交失败: {error_message}")
 
         try:
             with get_db() as db:
@@ -994,7 +1034,7 @@ class JimengTask(Base):
                     # 先尝试ORM查询和更新
                     task = db.query(JimengTask).filter(JimengTask.id == self.id).first()
                     if not task:
-                        print(f"❌ 【即梦任务】任务 {self.id} 不存在")
+                        log.error(f"❌ 【即梦任务】任务 {self.id} 不存在")
                         # 至少更新当前实例
                         for key, value in update_data.items():
                             if hasattr(self, key):
@@ -1025,11 +1065,11 @@ class JimengTask(Base):
                         if hasattr(self, key):
                             setattr(self, key, value)
 
-                    print(f"✅ API响应更新成功: {self.id}")
+                    log.info(f"✅ API响应更新成功: {self.id}")
                     return
 
                 except Exception as e:
-                    print(f"⚠️  JimengTask API响应更新失败，使用安全更新: {e}")
+                    log.warning(f"⚠️  JimengTask API响应更新失败，使用安全更新: {e}")
                     db.rollback()
 
                     # 检查是否是只读数据库
@@ -1039,7 +1079,7 @@ class JimengTask(Base):
                         or "attempt to write a readonly database"
                         in error_message.lower()
                     ):
-                        print("⚠️ 数据库只读，仅更新内存中的任务状态")
+                        log.warning("⚠️ 数据库只读，仅更新内存中的任务状态")
                         # 只更新当前实例
                         for key, value in update_data.items():
                             if hasattr(self, key):
@@ -1054,7 +1094,7 @@ class JimengTask(Base):
                         inspector = sa.inspect(db.bind)
 
                         if not inspector.has_table("jimeng_tasks"):
-                            print("⚠️ jimeng_tasks 表不存在")
+                            log.warning("⚠️ jimeng_tasks 表不存在")
                             return
 
                         # 获取现有字段
@@ -1094,22 +1134,25 @@ class JimengTask(Base):
                             sql = f"UPDATE jimeng_tasks SET {', '.join(update_fields)} WHERE id = :task_id"
                             db.execute(sa.text(sql), update_values)
                             db.commit()
-                            print(f"✅ 安全API响应更新成功: {self.id}")
+                            log.info(f"✅ 安全API响应更新成功: {self.id}")
 
                         # 更新当前实例
                         for key, value in update_data.items():
                             if hasattr(self, key):
                                 setattr(self, key, value)
 
+                        if update_fields:
+                            record_task_write("jimeng", self)
+
                     except Exception as safe_error:
-                        print(f"❌ 安全API响应更新也失败: {safe_error}")
+                        log.error(f"❌ 安全API响应更新也失败: {safe_error}")
                         # 至少更新当前实例
                         for key, value in update_data.items():
                             if hasattr(self, key):
                                 setattr(self, key, value)
 
         except Exception as e:
-            print(f"❌ API响应更新时出现异常: {e}")
+            log.error(f"❌ API响应更新时出现异常: {e}")
             # 至少更新当前实例
             for key, value in update_data.items():
                 if hasattr(self, key):
@@ -1135,11 +1178,11 @@ class JimengTask(Base):
                         self.status = status
                         self.progress = "100%"
 
-                        print(f"✅ 更新任务结果成功: {self.id}")
+                        log.info(f"✅ 更新任务结果成功: {self.id}")
                         return
 
                 except Exception as e:
-                    print(f"⚠️  JimengTask结果更新失败，使用安全更新: {e}")
+                    log.warning(f"⚠️  JimengTask结果更新失败，使用安全更新: {e}")
                     db.rollback()
 
                     # 检查是否是只读数据库
@@ -1149,7 +1192,7 @@ class JimengTask(Base):
                         or "attempt to write a readonly database"
                         in error_message.lower()
                     ):
-                        print("⚠️ 数据库只读，仅更新内存中的任务结果")
+                        log.warning("⚠️ 数据库只读，仅更新内存中的任务结果")
                         # 只更新当前实例
                         self.video_url = video_url
                         self.status = status
@@ -1164,7 +1207,7 @@ class JimengTask(Base):
                         inspector = sa.inspect(db.bind)
 
                         if not inspector.has_table("jimeng_tasks"):
-                            print("⚠️ jimeng_tasks 表不存在")
+                            log.warning("⚠️ jimeng_tasks 表不存在")
                             return
 
                         # 获取现有字段
@@ -1200,22 +1243,25 @@ class JimengTask(Base):
                             sql = f"UPDATE jimeng_tasks SET {', '.join(update_fields)} WHERE id = :task_id"
                             db.execute(sa.text(sql), update_values)
                             db.commit()
-                            print(f"✅ 安全更新任务结果成功: {self.id}")
+                            log.info(f"✅ 安全更新任务结果成功: {self.id}")
 
                         # 更新当前实例
                         self.video_url = video_url
                         self.status = status
                         self.progress = "100%"
 
+                        if update_fields:
+                            record_task_write("jimeng", self)
+
                     except Exception as safe_error:
-                        print(f"❌ 安全结果更新也失败: {safe_error}")
+                        log.error(f"❌ 安全结果更新也失败: {safe_error}")
                         # 至少更新当前实例
                         self.video_url = video_url
                         self.status = status
                         self.progress = "100%"
 
         except Exception as e:
-            print(f"❌ 更新任务结果时出现异常: {e}")
+            log.error(f"❌ 更新任务结果时出现异常: {e}")
             # 至少更新当前实例
             self.video_url = video_url
             self.status = status
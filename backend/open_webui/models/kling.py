@@ -12,6 +12,11 @@ import json
 import uuid
 
 from open_webui.internal.db import Base, get_db
+from open_webui.utils.cache_manager import (
+    PROVIDER_CONFIG_NAMESPACE,
+    copy_row,
+    get_cache_manager,
+)
 
 # ======================== SQLAlchemy 数据库模型 ========================
 
@@ -55,13 +60,27 @@ class KlingConfig(Base):
 
     @classmethod
     def get_config(cls):
-        """获取可灵配置"""
+        """获取可灵配置（进程内缓存，保存时失效）"""
+        return get_cache_manager().get_or_load(
+            PROVIDER_CONFIG_NAMESPACE,
+            cls.__tablename__,
+            cls._load_config,
+            copy=copy_row,
+        )
+
+    @classmethod
+    def _load_config(cls):
         with get_db() as db:
             return db.query(cls).filter(cls.id == 1).first()
 
+    @classmethod
+    def invalidate_config_cache(cls):
+        get_cache_manager().invalidate(PROVIDER_CONFIG_NAMESPACE, cls.__tablename__)
+
     @classmethod
     def save_config(cls, config_data: dict):
         """保存可灵配置"""
+        cls.invalidate_config_cache()
         with get_db() as db:
             config = db.query(cls).filter(cls.id == 1).first()
 
@@ -79,6 +98,7 @@ class KlingConfig(Base):
 
             db.commit()
             db.refresh(config)
+            cls.invalidate_config_cache()
             return config
 
     def to_dict(self) -> dict:
@@ -18,11 +18,21 @@ from sqlalchemy import (
 )
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
+import logging
 import json
 import uuid
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.users import Users
+from open_webui.utils.cache_manager import (
+    PROVIDER_CONFIG_NAMESPACE,
+    copy_row,
+    get_cache_manager,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MIDJOURNEY"])
 
 # ======================== Pydantic 模型 ========================
 
@@ -127,7 +137,16 @@ class MJConfig(Base):
 
     @classmethod
     def get_config(cls):
-        """获取配置"""
+        """获取配置（进程内缓存，保存时失效）"""
+        return get_cache_manager().get_or_load(
+            PROVIDER_CONFIG_NAMESPACE,
+            cls.__tablename__,
+            cls._load_config,
+            copy=copy_row,
+        )
+
+    @classmethod
+    def _load_config(cls):
         with get_db() as db:
             config = db.query(cls).first()
             return config
@@ -135,6 +154,7 @@ class MJConfig(Base):
     @classmethod
     def save_config(cls, config_data: dict):
         """保存配置"""
+        get_cache_manager().invalidate(PROVIDER_CONFIG_NAMESPACE, cls.__tablename__)
         with get_db() as db:
             config = db.query(cls).first()
             if config:
@@ -152,6 +172,7 @@ class MJConfig(Base):
 
             db.commit()
             db.refresh(config)
+            get_cache_manager().invalidate(PROVIDER_CONFIG_NAMESPACE, cls.__tablename__)
             return config
 
     def save(self):
@@ -160,6 +181,7 @@ class MJConfig(Base):
             self.updated_at = datetime.utcnow()
             db.merge(self)
             db.commit()
+        get_cache_manager().invalidate(PROVIDER_CONFIG_NAMESPACE, self.__tablename__)
 
     def to_dict(self):
         return {
@@ -300,19 +322,19 @@ class MJTask(Base):
         """从MJ响应更新任务数据 - 修复版本"""
         try:
             with get_db() as db:
-                print(f"🔥 【数据库修复版】开始更新任务: {self.id}")
+                log.info(f"🔥 【数据库修复版】开始更新任务: {self.id}")
 
                 # 获取图片URL
                 new_image_url = mj_data.get("imageUrl", self.image_url)
                 new_status = mj_data.get("status", self.status)
 
-                print(
+                log.info(
                     f"🔥 【数据库修复版】原始数据: 状态={new_status}, 图片={bool(new_image_url)}"
                 )
 
                 # 🔥 核心修复：如果有图片URL，直接强制设置为SUCCESS
                 if new_image_url:
-                    print(
+                    log.info(
                         f"🔥 【数据库修复版】发现图片URL，强制完成: {new_image_url[:50]}..."
                     )
                     new_status = "SUCCESS"
@@ -360,10 +382,10 @@ class MJTask(Base):
                 db.commit()
                 db.refresh(self)
 
-                print(f"🔥 【数据库修复版】更新完成:")
-                print(f"   状态: {old_status} -> {self.status}")
-                print(f"   进度: {old_progress} -> {self.progress}")
-                print(f"   图片: {bool(old_image_url)} -> {bool(self.image_url)}")
+                log.info(f"🔥 【数据库修复版】更新完成:")
+                log.info(f"   状态: {old_status} -> {self.status}")
+                log.info(f"   进度: {old_progress} -> {self.progress}")
+                log.info(f"   图片: {bool(old_image_url)} -> {bool(self.image_url)}")
 
                 # 🔥 验证数据库中的实际值
                 with get_db() as verify_db:
@@ -371,17 +393,14 @@ class MJTask(Base):
                         verify_db.query(MJTask).filter(MJTask.id == self.id).first()
                     )
                     if verified_task:
-                        print(
+                        log.info(
                             f"🔥 【数据库修复版】验证成功: 状态={verified_task.status}, 进度={verified_task.progress}, 图片={bool(verified_task.image_url)}"
                         )
                     else:
-                        print(f"❌ 【数据库修复版】验证失败: 任务不存在")
+                        log.error(f"❌ 【数据库修复版】验证失败: 任务不存在")
 
         except Exception as e:
-            print(f"❌ 【数据库修复版】更新失败: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"❌ 【数据库修复版】更新失败: {e}")
             raise
 
     def _normalize_progress(self, progress):
@@ -14,6 +14,7 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 from open_webui.utils.access_control import has_access
+from open_webui.utils.cache_manager import MODELS_NAMESPACE, get_cache_manager
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -178,6 +179,7 @@ class ModelsTable:
                 db.add(result)
                 db.commit()
                 db.refresh(result)
+                get_cache_manager().invalidate(MODELS_NAMESPACE, result.id)
 
                 if result:
                     return ModelModel.model_validate(result)
@@ -225,6 +227,15 @@ class ModelsTable:
         ]
 
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
+        # Hand out a deep copy so callers mutating fields don't leak into the cache
+        return get_cache_manager().get_or_load(
+            MODELS_NAMESPACE,
+            id,
+            lambda: self._get_model_by_id(id),
+            copy=lambda model: model.model_copy(deep=True),
+        )
+
+    def _get_model_by_id(self, id: str) -> Optional[ModelModel]:
         try:
             with get_db() as db:
                 model = db.get(Model, id)
@@ -244,6 +255,7 @@ class ModelsTable:
                     }
                 )
                 db.commit()
+                get_cache_manager().invalidate(MODELS_NAMESPACE, id)
 
                 return self.get_model_by_id(id)
             except Exception:
@@ -259,6 +271,7 @@ class ModelsTable:
                     .update(model.model_dump(exclude={"id"}))
                 )
                 db.commit()
+                get_cache_manager().invalidate(MODELS_NAMESPACE, id)
 
                 model = db.get(Model, id)
                 db.refresh(model)
@@ -272,6 +285,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
                 db.commit()
+                get_cache_manager().invalidate(MODELS_NAMESPACE, id)
 
                 return True
         except Exception:
@@ -282,6 +296,7 @@ class ModelsTable:
             with get_db() as db:
                 db.query(Model).delete()
                 db.commit()
+                get_cache_manager().invalidate(MODELS_NAMESPACE)
 
                 return True
         except Exception:
@@ -323,6 +338,7 @@ class ModelsTable:
                         db.delete(model)
 
                 db.commit()
+                get_cache_manager().invalidate(MODELS_NAMESPACE)
 
                 return [
                     ModelModel.model_validate(model) for model in db.query(Model).all()
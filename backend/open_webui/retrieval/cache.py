@@ -0,0 +1,86 @@
+import copy
+import hashlib
+import json
+import logging
+import uuid
+from typing import Callable, Iterable, Optional
+
+from open_webui.config import ENABLE_RAG_RETRIEVAL_CACHE
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.cache_manager import (
+    COLLECTION_VERSION_NAMESPACE,
+    RETRIEVAL_NAMESPACE,
+    get_cache_manager,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(str(query).split())
+
+
+def get_collection_version(collection_name: str) -> str:
+    """
+    Opaque token identifying the current content of a collection. A new token
+    is issued after invalidate_retrieval_cache, so results cached for the old
+    content are never looked up again and simply age out.
+    """
+    return get_cache_manager().get_or_load(
+        COLLECTION_VERSION_NAMESPACE, collection_name, lambda: uuid.uuid4().hex
+    )
+
+
+def get_retrieval_cache_key(
+    collection_names: Iterable[str], queries: list[str], **params
+) -> str:
+    payload = {
+        # Versions are read before the search runs, so a result computed while
+        # the collection changes is stored under the outdated version
+        "collections": {
+            name: get_collection_version(name) for name in sorted(collection_names)
+        },
+        "queries": [normalize_query(query) for query in queries],
+        "params": params,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_cached_retrieval(
+    collection_names: Iterable[str],
+    queries: list[str],
+    loader: Callable[[], dict],
+    **params,
+) -> dict:
+    """
+    Return the ranked result of `loader` for these collections, queries and
+    retrieval settings, running the embed/search/rerank pipeline only on a miss.
+    """
+    if not ENABLE_RAG_RETRIEVAL_CACHE:
+        return loader()
+
+    cache = get_cache_manager()
+    key = get_retrieval_cache_key(collection_names, queries, **params)
+    result = cache.get_or_load(RETRIEVAL_NAMESPACE, key, loader)
+
+    # Empty results usually mean the search failed, don't keep serving them
+    if not result or not any(result.get("documents") or []):
+        cache.invalidate(RETRIEVAL_NAMESPACE, key, broadcast=False)
+        return result
+
+    # Callers attach and mutate metadata, keep the cached copy pristine
+    return copy.deepcopy(result)
+
+
+def invalidate_retrieval_cache(collection_name: Optional[str] = None):
+    """
+    Forget cached retrieval results for a collection whose content changed,
+    on every worker. Without a collection name all results are dropped.
+    """
+    cache = get_cache_manager()
+    cache.invalidate(COLLECTION_VERSION_NAMESPACE, collection_name)
+    if collection_name is None:
+        cache.invalidate(RETRIEVAL_NAMESPACE)
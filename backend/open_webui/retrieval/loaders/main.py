@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Callable, Optional
 
 from langchain_community.document_loaders import (
     AzureAIDocumentIntelligenceLoader,
@@ -25,6 +26,7 @@ from langchain_core.documents import Document
 from open_webui.retrieval.loaders.external_document import ExternalDocumentLoader
 
 from open_webui.retrieval.loaders.mistral import MistralLoader
+from open_webui.retrieval.loaders.pdf import ParallelPDFLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
 
 
@@ -212,9 +214,15 @@ class Loader:
         self.kwargs = kwargs
 
     def load(
-        self, filename: str, file_content_type: str, file_path: str
+        self,
+        filename: str,
+        file_content_type: str,
+        file_path: str,
+        on_progress: Optional[Callable[[int, int], None]] = None,
     ) -> list[Document]:
         loader = self._get_loader(filename, file_content_type, file_path)
+        if on_progress is not None and isinstance(loader, ParallelPDFLoader):
+            loader.on_progress = on_progress
         docs = loader.load()
 
         return [
@@ -365,9 +373,12 @@ class Loader:
             )
         else:
             if file_ext == "pdf":
-                loader = PyPDFLoader(
-                    file_path, extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES")
-                )
+                if self.kwargs.get("PDF_EXTRACT_IMAGES"):
+                    loader = PyPDFLoader(
+                        file_path, extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES")
+                    )
+                else:
+                    loader = ParallelPDFLoader(file_path)
             elif file_ext == "csv":
                 loader = CSVLoader(file_path, autodetect_encoding=True)
             elif file_ext == "rst":
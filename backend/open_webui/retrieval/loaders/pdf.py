@@ -0,0 +1,237 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, List, Optional
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+from open_webui.env import (
+    DOCUMENT_EXTRACTION_MAX_CHARS,
+    DOCUMENT_EXTRACTION_MAX_WORKERS,
+    DOCUMENT_EXTRACTION_PAGES_PER_TASK,
+    DOCUMENT_EXTRACTION_TIMEOUT,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class ExtractionBudgetExceeded(Exception):
+    pass
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all extractions. Workers are spawned rather than
+    forked so they never inherit the server's threads, locks or connections.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=DOCUMENT_EXTRACTION_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def reset_extraction_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """Drop the shared pool, or only `pool` if it is still the shared one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and pool in (None, _pool):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def terminate_extraction_pool(pool: ProcessPoolExecutor):
+    """
+    Stop the workers of `pool`. Ranges that are already running ignore
+    cancellation, so this is the only way to end them once a file has used
+    up its time budget. Extractions sharing the pool fail with
+    BrokenProcessPool and the next one starts a fresh pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+    terminate_workers = getattr(pool, "terminate_workers", None)
+    if terminate_workers is not None:
+        # Python 3.14+
+        terminate_workers()
+        return
+    # shutdown() forgets the processes, so they are collected first
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def extract_pdf_pages(
+    file_path: str, start: int, end: int, labels: list[str]
+) -> list[tuple]:
+    """
+    Extract the text of pages [start, end), labelled with `labels` of the
+    same range. Runs inside a pool worker.
+    """
+    reader = PdfReader(file_path)
+    return [
+        (
+            page_number,
+            labels[page_number - start],
+            reader.pages[page_number].extract_text(extraction_mode="plain"),
+        )
+        for page_number in range(start, min(end, len(reader.pages)))
+    ]
+
+
+def get_document_metadata(reader: PdfReader, file_path: str) -> dict:
+    """Document-level metadata in the shape PyPDFLoader produces."""
+    metadata = {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+    for key, value in (reader.metadata or {}).items():
+        if isinstance(value, (str, int, float)):
+            metadata[key.lstrip("/").lower()] = str(value)
+    metadata["source"] = file_path
+    metadata["total_pages"] = len(reader.pages)
+    return metadata
+
+
+class ParallelPDFLoader(BaseLoader):
+    """
+    Local PDF loader that splits the document into page ranges and extracts
+    them in a process pool, yielding one Document per page in page order as
+    ranges finish. Output matches PyPDFLoader's page mode.
+
+    Extraction stops with ExtractionBudgetExceeded when the file takes longer
+    than `timeout` seconds or yields more than `max_chars` characters.
+    `on_progress(pages_done, total_pages)` is called as ranges complete.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        max_workers: int = DOCUMENT_EXTRACTION_MAX_WORKERS,
+        pages_per_task: int = DOCUMENT_EXTRACTION_PAGES_PER_TASK,
+        timeout: float = DOCUMENT_EXTRACTION_TIMEOUT,
+        max_chars: int = DOCUMENT_EXTRACTION_MAX_CHARS,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        self.file_path = file_path
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.on_progress = on_progress
+
+    def load(self) -> List[Document]:
+        return list(self.lazy_load())
+
+    def lazy_load(self) -> Iterator[Document]:
+        reader = PdfReader(self.file_path)
+        metadata = get_document_metadata(reader, self.file_path)
+        total_pages = metadata["total_pages"]
+        deadline = time.monotonic() + self.timeout if self.timeout > 0 else None
+        # walks the whole page tree, so it is done once instead of per range
+        labels = list(reader.page_labels)
+        labels += [
+            str(page_number + 1) for page_number in range(len(labels), total_pages)
+        ]
+
+        ranges = [
+            (start, min(start + self.pages_per_task, total_pages))
+            for start in range(0, total_pages, self.pages_per_task)
+        ]
+
+        pages_done = 0
+        chars = 0
+        for pages in self._extract_ranges(ranges, labels, deadline):
+            for page_number, page_label, text in pages:
+                chars += len(text)
+                if self.max_chars > 0 and chars > self.max_chars:
+                    raise ExtractionBudgetExceeded(
+                        f"{self.file_path} exceeds the extraction budget of "
+                        f"{self.max_chars} characters"
+                    )
+                yield Document(
+                    page_content=text,
+                    metadata={
+                        **metadata,
+                        "page": page_number,
+                        "page_label": page_label,
+                    },
+                )
+
+            pages_done += len(pages)
+            if self.on_progress is not None:
+                try:
+                    self.on_progress(pages_done, total_pages)
+                except Exception as e:
+                    log.debug(f"Extraction progress callback failed: {e}")
+
+    def _extract_ranges(
+        self,
+        ranges: list[tuple[int, int]],
+        labels: list[str],
+        deadline: Optional[float],
+    ) -> Iterator[list[tuple]]:
+        if self.max_workers <= 1 or len(ranges) <= 1:
+            for start, end in ranges:
+                self._check_deadline(deadline)
+                yield extract_pdf_pages(self.file_path, start, end, labels[start:end])
+            return
+
+        pool = get_extraction_pool()
+        try:
+            futures = [
+                pool.submit(
+                    extract_pdf_pages, self.file_path, start, end, labels[start:end]
+                )
+                for start, end in ranges
+            ]
+        except BrokenProcessPool:
+            reset_extraction_pool(pool)
+            raise
+
+        try:
+            # Results are consumed in page order while later ranges keep running
+            for future in futures:
+                remaining = (
+                    max(deadline - time.monotonic(), 0)
+                    if deadline is not None
+                    else None
+                )
+                try:
+                    pages = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    for pending in futures:
+                        pending.cancel()
+                    if not all(pending.done() for pending in futures):
+                        terminate_extraction_pool(pool)
+                    raise self._timeout_error()
+                except BrokenProcessPool:
+                    reset_extraction_pool(pool)
+                    raise
+                yield pages
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _timeout_error(self) -> ExtractionBudgetExceeded:
+        return ExtractionBudgetExceeded(
+            f"Extracting {self.file_path} exceeded the budget of {self.timeout} seconds"
+        )
+
+    def _check_deadline(self, deadline: Optional[float]):
+        if deadline is not None and time.monotonic() > deadline:
+            raise self._timeout_error()
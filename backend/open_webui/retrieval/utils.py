@@ -1,3 +1,4 @@
+import contextvars
 import logging
 import os
 from typing import Optional, Union
@@ -7,6 +8,8 @@ import hashlib
 from concurrent.futures import ThreadPoolExecutor
 import time
 
+import numpy as np
+
 from urllib.parse import quote
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
@@ -21,7 +24,12 @@ from open_webui.models.files import Files
 from open_webui.models.knowledge import Knowledges
 from open_webui.models.notes import Notes
 
-from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.cache import get_cached_retrieval
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    stack_search_results,
+)
 from open_webui.utils.access_control import has_access
 
 
@@ -31,16 +39,24 @@ from open_webui.env import (
     ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 from open_webui.config import (
+    RAG_RETRIEVAL_MAX_WORKERS,
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
 )
 from open_webui.utils.credit.usage import CreditDeduct
 from open_webui.utils.credit.utils import check_credit_by_user_id
+from open_webui.utils.telemetry.stages import stage
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Process-wide pool for retrieval fan-out, shared by all requests instead of
+# creating (and tearing down) a pool per query
+RETRIEVAL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=RAG_RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval"
+)
+
 
 from typing import Any
 
@@ -48,10 +64,27 @@ from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.retrievers import BaseRetriever
 
 
+class CandidateVectors:
+    """
+    Vectors seen while retrieving the candidates of a single query (the query
+    embedding and the stored vectors returned by the vector DB, keyed by
+    document text), so RerankCompressor can score candidates without
+    embedding them again.
+    """
+
+    def __init__(self):
+        self.query_vector: Optional[list[float]] = None
+        self.documents: dict[str, list[float]] = {}
+
+
 class VectorSearchRetriever(BaseRetriever):
     collection_name: Any
     embedding_function: Any
     top_k: int
+    candidate_vectors: Optional[Any] = None
+    # Query embedding and search result computed up front by a batched search
+    query_vector: Optional[Any] = None
+    search_result: Optional[Any] = None
 
     def _get_relevant_documents(
         self,
@@ -59,16 +92,30 @@ class VectorSearchRetriever(BaseRetriever):
         *,
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
-        result = VECTOR_DB_CLIENT.search(
-            collection_name=self.collection_name,
-            vectors=[self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)],
-            limit=self.top_k,
-        )
+        query_vector = self.query_vector
+        if query_vector is None:
+            query_vector = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
+
+        result = self.search_result
+        if result is None:
+            result = VECTOR_DB_CLIENT.search(
+                collection_name=self.collection_name,
+                vectors=[query_vector],
+                limit=self.top_k,
+                include_vectors=self.candidate_vectors is not None,
+            )
 
         ids = result.ids[0]
         metadatas = result.metadatas[0]
         documents = result.documents[0]
 
+        if self.candidate_vectors is not None:
+            self.candidate_vectors.query_vector = query_vector
+            if result.embeddings:
+                for document, vector in zip(documents, result.embeddings[0]):
+                    if vector is not None:
+                        self.candidate_vectors.documents[document] = vector
+
         results = []
         for idx in range(len(ids)):
             results.append(
@@ -124,6 +171,8 @@ def query_doc_with_hybrid_search(
     k_reranker: int,
     r: float,
     hybrid_bm25_weight: float,
+    query_vector: Optional[list[float]] = None,
+    search_result: Optional[SearchResult] = None,
 ) -> dict:
     try:
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
@@ -133,10 +182,17 @@ def query_doc_with_hybrid_search(
         )
         bm25_retriever.k = k
 
+        # Without a reranking model candidates are scored by cosine similarity,
+        # reuse the vectors the search already returned for that
+        candidate_vectors = CandidateVectors() if reranking_function is None else None
+
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
             embedding_function=embedding_function,
             top_k=k,
+            candidate_vectors=candidate_vectors,
+            query_vector=query_vector,
+            search_result=search_result,
         )
 
         if hybrid_bm25_weight <= 0:
@@ -158,6 +214,7 @@ def query_doc_with_hybrid_search(
             top_n=k_reranker,
             reranking_function=reranking_function,
             r_score=r,
+            candidate_vectors=candidate_vectors,
         )
 
         compression_retriever = ContextualCompressionRetriever(
@@ -272,6 +329,100 @@ def get_all_items_from_collections(collection_names: list[str]) -> dict:
     return merge_get_results(results)
 
 
+def get_search_result_row(result: SearchResult, idx: int) -> SearchResult:
+    """Single-vector view of row `idx` of a multi-vector search result."""
+    return SearchResult(
+        ids=[result.ids[idx]],
+        distances=[result.distances[idx]],
+        documents=[result.documents[idx]],
+        metadatas=[result.metadatas[idx]],
+        embeddings=[result.embeddings[idx]] if result.embeddings else None,
+    )
+
+
+def search_collections(
+    collection_names: list[str],
+    query_embeddings: list[list[float]],
+    k: int,
+    include_vectors: bool = False,
+) -> dict:
+    """
+    Search every collection with every query embedding using as few vector DB
+    requests as the backend allows: one request in total for backends that
+    search several collections at once, one per collection for backends that
+    take several query vectors, and one per (collection, query) otherwise.
+    Requests run in parallel on RETRIEVAL_EXECUTOR.
+
+    Returns {collection_name: SearchResult with one row per query embedding,
+    or the exception raised while searching that collection}.
+    """
+    collection_names = list(dict.fromkeys(name for name in collection_names if name))
+    if not collection_names or not query_embeddings:
+        return {}
+
+    with stage("retrieval_search"):
+        return _search_collections(
+            collection_names, query_embeddings, k, include_vectors
+        )
+
+
+def _search_collections(
+    collection_names: list[str],
+    query_embeddings: list[list[float]],
+    k: int,
+    include_vectors: bool,
+) -> dict:
+    if VECTOR_DB_CLIENT.supports_multi_collection_search:
+        try:
+            return VECTOR_DB_CLIENT.search_collections(
+                collection_names=collection_names,
+                vectors=query_embeddings,
+                limit=k,
+                include_vectors=include_vectors,
+            )
+        except Exception as e:
+            log.exception(f"Error when searching the collections: {e}")
+            return {name: e for name in collection_names}
+
+    def search(collection_name, vectors):
+        return VECTOR_DB_CLIENT.search(
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=k,
+            include_vectors=include_vectors,
+        )
+
+    if VECTOR_DB_CLIENT.supports_multi_vector_search:
+        futures = {
+            name: [RETRIEVAL_EXECUTOR.submit(search, name, query_embeddings)]
+            for name in collection_names
+        }
+    else:
+        futures = {
+            name: [
+                RETRIEVAL_EXECUTOR.submit(search, name, [query_embedding])
+                for query_embedding in query_embeddings
+            ]
+            for name in collection_names
+        }
+
+    results = {}
+    for name, collection_futures in futures.items():
+        try:
+            rows = [future.result() for future in collection_futures]
+        except Exception as e:
+            log.exception(f"Error when querying the collection {name}: {e}")
+            results[name] = e
+            continue
+
+        results[name] = (
+            rows[0]
+            if VECTOR_DB_CLIENT.supports_multi_vector_search
+            else stack_search_results(rows)
+        )
+    return results
+
+
 def query_collection(
     collection_names: list[str],
     queries: list[str],
@@ -281,42 +432,24 @@ def query_collection(
     results = []
     error = False
 
-    def process_query_collection(collection_name, query_embedding):
-        try:
-            if collection_name:
-                result = query_doc(
-                    collection_name=collection_name,
-                    k=k,
-                    query_embedding=query_embedding,
-                )
-                if result is not None:
-                    return result.model_dump(), None
-            return None, None
-        except Exception as e:
-            log.exception(f"Error when querying the collection: {e}")
-            return None, e
-
     # Generate all query embeddings (in one call)
-    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+    with stage("retrieval_embed"):
+        query_embeddings = embedding_function(
+            queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+        )
     log.debug(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
-
-    for result, err in task_results:
-        if err is not None:
+    for collection_name, result in search_collections(
+        collection_names, query_embeddings, k
+    ).items():
+        if isinstance(result, Exception):
             error = True
         elif result is not None:
-            results.append(result)
+            log.info(f"query_collection:result {result.ids} {result.metadatas}")
+            for idx in range(len(result.ids or [])):
+                results.append(get_search_result_row(result, idx).model_dump())
 
     if error and not results:
         log.warning("All collection queries failed. No results returned.")
@@ -355,18 +488,47 @@ def query_collection_with_hybrid_search(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
     )
 
-    def process_query(collection_name, query):
+    # Embed all queries once and run the vector half of every (collection, query)
+    # pair as one batched search; retrievers without a prefetched result (e.g.
+    # when the batched search failed) fall back to searching on their own
+    query_embeddings = [None] * len(queries)
+    search_results = {}
+    if hybrid_bm25_weight < 1:
+        try:
+            with stage("retrieval_embed"):
+                query_embeddings = embedding_function(
+                    queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+                )
+            search_results = search_collections(
+                [cn for cn in collection_names if collection_results[cn] is not None],
+                query_embeddings,
+                k,
+                include_vectors=reranking_function is None,
+            )
+        except Exception as e:
+            log.exception(f"Batched vector search failed: {e}")
+            query_embeddings = [None] * len(queries)
+
+    def process_query(collection_name, query_idx):
+        search_result = search_results.get(collection_name)
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
                 collection_result=collection_results[collection_name],
-                query=query,
+                query=queries[query_idx],
                 embedding_function=embedding_function,
                 k=k,
                 reranking_function=reranking_function,
                 k_reranker=k_reranker,
                 r=r,
                 hybrid_bm25_weight=hybrid_bm25_weight,
+                query_vector=query_embeddings[query_idx],
+                search_result=(
+                    get_search_result_row(search_result, query_idx)
+                    if isinstance(search_result, SearchResult)
+                    and query_idx < len(search_result.ids or [])
+                    else None
+                ),
             )
             return result, None
         except Exception as e:
@@ -376,15 +538,20 @@ def query_collection_with_hybrid_search(
     # Prepare tasks for all collections and queries
     # Avoid running any tasks for collections that failed to fetch data (have assigned None)
     tasks = [
-        (cn, q)
+        (cn, idx)
         for cn in collection_names
         if collection_results[cn] is not None
-        for q in queries
+        for idx in range(len(queries))
     ]
 
-    with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
-        task_results = [future.result() for future in future_results]
+    # carry the request context over, the stages below are timed per request
+    future_results = [
+        RETRIEVAL_EXECUTOR.submit(
+            contextvars.copy_context().run, process_query, cn, idx
+        )
+        for cn, idx in tasks
+    ]
+    task_results = [future.result() for future in future_results]
 
     for result, err in task_results:
         if err is not None:
@@ -479,6 +646,22 @@ def get_sources_from_items(
     extracted_collections = []
     query_results = []
 
+    # Models that shape the ranking, part of the retrieval cache key
+    retrieval_settings = {
+        "embedding": (
+            request.app.state.config.RAG_EMBEDDING_ENGINE,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+        ),
+        "reranking": (
+            (
+                request.app.state.config.RAG_RERANKING_ENGINE,
+                request.app.state.config.RAG_RERANKING_MODEL,
+            )
+            if reranking_function
+            else None
+        ),
+    }
+
     for item in items:
         query_result = None
         collection_names = []
@@ -636,15 +819,25 @@ def get_sources_from_items(
                     query_result = None  # Initialize to None
                     if hybrid_search:
                         try:
-                            query_result = query_collection_with_hybrid_search(
-                                collection_names=collection_names,
-                                queries=queries,
-                                embedding_function=embedding_function,
+                            query_result = get_cached_retrieval(
+                                collection_names,
+                                queries,
+                                lambda: query_collection_with_hybrid_search(
+                                    collection_names=collection_names,
+                                    queries=queries,
+                                    embedding_function=embedding_function,
+                                    k=k,
+                                    reranking_function=reranking_function,
+                                    k_reranker=k_reranker,
+                                    r=r,
+                                    hybrid_bm25_weight=hybrid_bm25_weight,
+                                ),
+                                hybrid_search=True,
                                 k=k,
-                                reranking_function=reranking_function,
                                 k_reranker=k_reranker,
                                 r=r,
                                 hybrid_bm25_weight=hybrid_bm25_weight,
+                                **retrieval_settings,
                             )
                         except Exception as e:
                             log.debug(
@@ -653,11 +846,18 @@ def get_sources_from_items(
 
                     # fallback to non-hybrid search
                     if not hybrid_search and query_result is None:
-                        query_result = query_collection(
-                            collection_names=collection_names,
-                            queries=queries,
-                            embedding_function=embedding_function,
+                        query_result = get_cached_retrieval(
+                            collection_names,
+                            queries,
+                            lambda: query_collection(
+                                collection_names=collection_names,
+                                queries=queries,
+                                embedding_function=embedding_function,
+                                k=k,
+                            ),
+                            hybrid_search=False,
                             k=k,
+                            **retrieval_settings,
                         )
             except Exception as e:
                 log.exception(e)
@@ -993,16 +1193,61 @@ from langchain_core.callbacks import Callbacks
 from langchain_core.documents import BaseDocumentCompressor, Document
 
 
+def cosine_similarity_scores(
+    query_vector: list[float], document_vectors: list[list[float]]
+) -> list[float]:
+    """Cosine similarity of one query against many documents in a single matrix product."""
+    if not document_vectors:
+        return []
+
+    # Backends may zero-pad (or truncate) stored vectors to a fixed width;
+    # compare on the common prefix, trailing zeros don't change the result
+    dim = min(len(query_vector), *(len(vector) for vector in document_vectors))
+    query = np.asarray(query_vector[:dim], dtype=np.float32)
+    documents = np.asarray(
+        [vector[:dim] for vector in document_vectors], dtype=np.float32
+    )
+
+    dots = documents @ query
+    norms = np.linalg.norm(documents, axis=1) * np.linalg.norm(query)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0).tolist()
+
+
 class RerankCompressor(BaseDocumentCompressor):
     embedding_function: Any
     top_n: int
     reranking_function: Any
     r_score: float
+    candidate_vectors: Optional[Any] = None
 
     class Config:
         extra = "forbid"
         arbitrary_types_allowed = True
 
+    def _embedding_scores(self, documents: Sequence[Document], query: str):
+        candidate_vectors = self.candidate_vectors or CandidateVectors()
+
+        query_vector = candidate_vectors.query_vector
+        if query_vector is None:
+            query_vector = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
+
+        vectors = [
+            candidate_vectors.documents.get(doc.page_content) for doc in documents
+        ]
+
+        # Only candidates without a stored vector (e.g. BM25-only hits) are embedded
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        if missing:
+            log.debug(f"RerankCompressor: embedding {len(missing)} candidates")
+            embeddings = self.embedding_function(
+                [documents[idx].page_content for idx in missing],
+                RAG_EMBEDDING_CONTENT_PREFIX,
+            )
+            for idx, embedding in zip(missing, embeddings):
+                vectors[idx] = embedding
+
+        return cosine_similarity_scores(query_vector, vectors)
+
     def compress_documents(
         self,
         documents: Sequence[Document],
@@ -1011,18 +1256,13 @@ class RerankCompressor(BaseDocumentCompressor):
     ) -> Sequence[Document]:
         reranking = self.reranking_function is not None
 
-        if reranking:
-            scores = self.reranking_function(
-                [(query, doc.page_content) for doc in documents]
-            )
-        else:
-            from sentence_transformers import util
-
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
-            )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+        with stage("retrieval_rerank"):
+            if reranking:
+                scores = self.reranking_function(
+                    [(query, doc.page_content) for doc in documents]
+                )
+            else:
+                scores = self._embedding_scores(documents, query)
 
         docs_with_scores = list(
             zip(documents, scores.tolist() if not isinstance(scores, list) else scores)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, TypeVar, Union
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+)
+from open_webui.retrieval.vector.type import VectorType
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+T = TypeVar("T")
+
+# Embedded stores serialize writes internally, remote servers handle more parallelism
+DEFAULT_MAX_CONCURRENCY = {
+    VectorType.CHROMA: 4,
+    VectorType.PGVECTOR: 8,
+    VectorType.ORACLE23AI: 8,
+    VectorType.MILVUS: 16,
+    VectorType.QDRANT: 16,
+    VectorType.ELASTICSEARCH: 16,
+    VectorType.OPENSEARCH: 16,
+    VectorType.PINECONE: 16,
+    VectorType.S3VECTOR: 16,
+}
+
+
+class VectorDBTimeoutError(TimeoutError):
+    pass
+
+
+class AsyncVectorDBClient:
+    """
+    Async facade over a synchronous VectorDBBase backend.
+
+    Calls run on a dedicated, bounded thread pool so a slow vector store never
+    blocks the event loop, and never starves the default executor used by the
+    rest of the app. The pool size is the backend's concurrency limit; callers
+    beyond it queue, and `timeout` covers queueing plus execution time.
+    """
+
+    def __init__(
+        self,
+        client: VectorDBBase,
+        max_concurrency: int = 8,
+        timeout: Optional[float] = 30.0,
+    ):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="vector-db"
+        )
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # The worker thread cannot be interrupted; it finishes in the background
+            log.warning(
+                f"Vector DB call {func.__name__} timed out after {self.timeout}s"
+            )
+            raise VectorDBTimeoutError(
+                f"Vector DB call {func.__name__} timed out after {self.timeout}s"
+            )
+
+    async def has_collection(self, collection_name: str) -> bool:
+        return await self._run(
+            self.client.has_collection, collection_name=collection_name
+        )
+
+    async def delete_collection(self, collection_name: str) -> None:
+        return await self._run(
+            self.client.delete_collection, collection_name=collection_name
+        )
+
+    async def insert(
+        self, collection_name: str, items: List[Union[VectorItem, dict]]
+    ) -> None:
+        return await self._run(
+            self.client.insert, collection_name=collection_name, items=items
+        )
+
+    async def upsert(
+        self, collection_name: str, items: List[Union[VectorItem, dict]]
+    ) -> None:
+        return await self._run(
+            self.client.upsert, collection_name=collection_name, items=items
+        )
+
+    async def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Optional[SearchResult]:
+        return await self._run(
+            self.client.search,
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+            include_vectors=include_vectors,
+        )
+
+    async def query(
+        self,
+        collection_name: str,
+        filter: Dict,
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
+    ) -> Optional[GetResult]:
+        return await self._run(
+            self.client.query,
+            collection_name=collection_name,
+            filter=filter,
+            limit=limit,
+            include_vectors=include_vectors,
+        )
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        return await self._run(self.client.get, collection_name=collection_name)
+
+    async def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        return await self._run(
+            self.client.delete, collection_name=collection_name, ids=ids, filter=filter
+        )
+
+    async def reset(self) -> None:
+        return await self._run(self.client.reset)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -31,6 +31,8 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class ChromaClient(VectorDBBase):
+    supports_multi_vector_search = True
+
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -71,22 +73,31 @@ class ChromaClient(VectorDBBase):
         return self.client.delete_collection(name=collection_name)
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         try:
             collection = self.client.get_collection(name=collection_name)
             if collection:
+                include = ["documents", "metadatas", "distances"]
+                if include_vectors:
+                    include.append("embeddings")
+
                 result = collection.query(
                     query_embeddings=vectors,
                     n_results=limit,
+                    include=include,
                 )
 
                 # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
                 # https://docs.trychroma.com/docs/collections/configure cosine equation
-                distances: list = result["distances"][0]
-                distances = [2 - dist for dist in distances]
-                distances = [[dist / 2 for dist in distances]]
+                distances = [
+                    [(2 - dist) / 2 for dist in row] for row in result["distances"]
+                ]
 
                 return SearchResult(
                     **{
@@ -94,6 +105,14 @@ class ChromaClient(VectorDBBase):
                         "distances": distances,
                         "documents": result["documents"],
                         "metadatas": result["metadatas"],
+                        "embeddings": (
+                            [
+                                [list(map(float, vector)) for vector in embeddings]
+                                for embeddings in result["embeddings"]
+                            ]
+                            if include_vectors
+                            else None
+                        ),
                     }
                 )
             return None
@@ -101,15 +120,24 @@ class ChromaClient(VectorDBBase):
             return None
 
     def query(
-        self, collection_name: str, filter: dict, limit: Optional[int] = None
+        self,
+        collection_name: str,
+        filter: dict,
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
     ) -> Optional[GetResult]:
         # Query the items from the collection based on the filter.
         try:
             collection = self.client.get_collection(name=collection_name)
             if collection:
+                include = ["documents", "metadatas"]
+                if include_vectors:
+                    include.append("embeddings")
+
                 result = collection.get(
                     where=filter,
                     limit=limit,
+                    include=include,
                 )
 
                 return GetResult(
@@ -117,6 +145,16 @@ class ChromaClient(VectorDBBase):
                         "ids": [result["ids"]],
                         "documents": [result["documents"]],
                         "metadatas": [result["metadatas"]],
+                        "embeddings": (
+                            [
+                                [
+                                    list(map(float, vector))
+                                    for vector in result["embeddings"]
+                                ]
+                            ]
+                            if include_vectors
+                            else None
+                        ),
                     }
                 )
             return None
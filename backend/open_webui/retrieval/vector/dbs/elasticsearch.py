@@ -153,7 +153,11 @@ class ElasticsearchClient(VectorDBBase):
 
     # Status: works
     def search(
-        self, collection_name: str, vectors: list[list[float]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         query = {
             "size": limit,
@@ -181,7 +185,11 @@ class ElasticsearchClient(VectorDBBase):
 
     # Status: only tested halfwat
     def query(
-        self, collection_name: str, filter: dict, limit: Optional[int] = None
+        self,
+        collection_name: str,
+        filter: dict,
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
     ) -> Optional[GetResult]:
         if not self.has_collection(collection_name):
             return None
@@ -1,6 +1,8 @@
-from typing import Optional, List, Dict, Any
+from typing import Iterable, Optional, List, Dict, Any, Sequence
+import io
 import logging
 import json
+import struct
 from sqlalchemy import (
     func,
     literal,
@@ -43,6 +45,8 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_BULK_INSERT_MIN_ITEMS,
+    PGVECTOR_BULK_INSERT_BATCH_SIZE,
 )
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -62,6 +66,102 @@ def pgcrypto_decrypt(col, key, outtype="text"):
     return func.cast(func.pgp_sym_decrypt(col, literal(key)), outtype)
 
 
+def vector_to_list(vector) -> Optional[List[float]]:
+    # pgvector returns numpy arrays
+    if vector is None:
+        return None
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
+####################
+# Bulk ingestion (COPY ... FORMAT binary into a staging table + set-based merge)
+####################
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+
+STAGING_TABLE = "document_chunk_staging"
+STAGING_COLUMNS = ("id", "vector", "collection_name", "text", "vmetadata")
+
+
+def encode_vector_binary(vector: List[float]) -> bytes:
+    """pgvector binary format: int16 dim, int16 unused, float4[dim], big-endian."""
+    return struct.pack(f">HH{len(vector)}f", len(vector), 0, *vector)
+
+
+def encode_copy_binary(rows: Iterable[Sequence[Optional[bytes]]]) -> io.BytesIO:
+    """Encode already serialized field values as a PostgreSQL binary COPY stream."""
+    buffer = io.BytesIO()
+    buffer.write(PGCOPY_HEADER)
+    for row in rows:
+        buffer.write(struct.pack(">h", len(row)))
+        for field in row:
+            if field is None:
+                buffer.write(struct.pack(">i", -1))
+            else:
+                buffer.write(struct.pack(">i", len(field)))
+                buffer.write(field)
+    buffer.write(PGCOPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+def create_staging_table_sql(staging_table: str, dim: int) -> str:
+    # Rows are dropped on commit, so every batch starts with an empty table
+    return (
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} ("
+        "seq BIGSERIAL, id TEXT, "
+        f"vector vector({dim}), "
+        "collection_name TEXT, text TEXT, vmetadata TEXT"
+        ") ON COMMIT DELETE ROWS"
+    )
+
+
+def build_merge_sql(
+    target_table: str,
+    staging_table: str,
+    encrypted: bool,
+    on_conflict: Optional[str] = None,
+) -> str:
+    """
+    Move staged rows into the target table in a single statement.
+    Encryption happens server-side (the key is bound as %(key)s), and only the
+    last staged row per id is kept so ON CONFLICT never touches a row twice.
+    """
+    if encrypted:
+        text_expr = "pgp_sym_encrypt(s.text, %(key)s)"
+        metadata_expr = "pgp_sym_encrypt(s.vmetadata, %(key)s)"
+    else:
+        text_expr = "s.text"
+        metadata_expr = "s.vmetadata::jsonb"
+
+    sql = (
+        f"INSERT INTO {target_table} (id, vector, collection_name, text, vmetadata) "
+        f"SELECT s.id, s.vector, s.collection_name, {text_expr}, {metadata_expr} "
+        f"FROM (SELECT DISTINCT ON (id) * FROM {staging_table} "
+        "ORDER BY id, seq DESC) AS s"
+    )
+    if on_conflict == "nothing":
+        sql += " ON CONFLICT (id) DO NOTHING"
+    elif on_conflict == "update":
+        sql += (
+            " ON CONFLICT (id) DO UPDATE SET "
+            "vector = EXCLUDED.vector, "
+            "collection_name = EXCLUDED.collection_name, "
+            "text = EXCLUDED.text, "
+            "vmetadata = EXCLUDED.vmetadata"
+        )
+    return sql
+
+
+def copy_rows(cursor, staging_table: str, rows: Iterable[Sequence[Optional[bytes]]]):
+    cursor.copy_expert(
+        f"COPY {staging_table} ({', '.join(STAGING_COLUMNS)}) "
+        "FROM STDIN WITH (FORMAT binary)",
+        encode_copy_binary(rows),
+    )
+
+
 class DocumentChunk(Base):
     __tablename__ = "document_chunk"
 
@@ -78,6 +178,9 @@ class DocumentChunk(Base):
 
 
 class PgvectorClient(VectorDBBase):
+    supports_multi_vector_search = True
+    supports_multi_collection_search = True
+
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
@@ -197,9 +300,72 @@ class PgvectorClient(VectorDBBase):
             vector = vector[:VECTOR_LENGTH]
         return vector
 
+    def _use_bulk_insert(self, items: List[VectorItem]) -> bool:
+        return (
+            PGVECTOR_BULK_INSERT_MIN_ITEMS > 0
+            and len(items) >= PGVECTOR_BULK_INSERT_MIN_ITEMS
+            and self.session.bind.dialect.driver == "psycopg2"
+        )
+
+    def _encode_bulk_row(self, collection_name: str, item: VectorItem) -> tuple:
+        vector = self.adjust_vector_length(list(item["vector"]))
+        if PGVECTOR_PGCRYPTO:
+            metadata = json.dumps(item["metadata"])
+        else:
+            metadata = json.dumps(stringify_metadata(item["metadata"]))
+        return (
+            item["id"].encode(),
+            encode_vector_binary(vector),
+            collection_name.encode(),
+            item["text"].encode() if item["text"] is not None else None,
+            metadata.encode(),
+        )
+
+    def bulk_write(
+        self,
+        collection_name: str,
+        items: List[VectorItem],
+        on_conflict: Optional[str] = None,
+    ) -> None:
+        """
+        COPY items into a temporary staging table and merge them into
+        document_chunk with one INSERT ... SELECT per batch.
+
+        Each batch of PGVECTOR_BULK_INSERT_BATCH_SIZE rows is committed on its
+        own to keep memory bounded, so a failure leaves earlier batches stored.
+        """
+        merge_sql = build_merge_sql(
+            DocumentChunk.__tablename__, STAGING_TABLE, PGVECTOR_PGCRYPTO, on_conflict
+        )
+        params = {"key": PGVECTOR_PGCRYPTO_KEY} if PGVECTOR_PGCRYPTO else None
+
+        for start in range(0, len(items), PGVECTOR_BULK_INSERT_BATCH_SIZE):
+            batch = items[start : start + PGVECTOR_BULK_INSERT_BATCH_SIZE]
+            cursor = self.session.connection().connection.cursor()
+            try:
+                cursor.execute(create_staging_table_sql(STAGING_TABLE, VECTOR_LENGTH))
+                copy_rows(
+                    cursor,
+                    STAGING_TABLE,
+                    (self._encode_bulk_row(collection_name, item) for item in batch),
+                )
+                cursor.execute(merge_sql, params)
+            finally:
+                cursor.close()
+            self.session.commit()
+
     def insert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
-            if PGVECTOR_PGCRYPTO:
+            if self._use_bulk_insert(items):
+                self.bulk_write(
+                    collection_name,
+                    items,
+                    on_conflict="nothing" if PGVECTOR_PGCRYPTO else None,
+                )
+                log.info(
+                    f"Bulk inserted {len(items)} items into collection '{collection_name}'."
+                )
+            elif PGVECTOR_PGCRYPTO:
                 for item in items:
                     vector = self.adjust_vector_length(item["vector"])
                     # Use raw SQL for BYTEA/pgcrypto
@@ -254,7 +420,12 @@ class PgvectorClient(VectorDBBase):
 
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
-            if PGVECTOR_PGCRYPTO:
+            if self._use_bulk_insert(items):
+                self.bulk_write(collection_name, items, on_conflict="update")
+                log.info(
+                    f"Bulk upserted {len(items)} items into collection '{collection_name}'."
+                )
+            elif PGVECTOR_PGCRYPTO:
                 for item in items:
                     vector = self.adjust_vector_length(item["vector"])
                     json_metadata = json.dumps(item["metadata"])
@@ -324,10 +495,32 @@ class PgvectorClient(VectorDBBase):
         collection_name: str,
         vectors: List[List[float]],
         limit: Optional[int] = None,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
+        if not vectors:
+            return None
+
+        results = self.search_collections(
+            [collection_name], vectors, limit, include_vectors=include_vectors
+        )
+        return results.get(collection_name)
+
+    def search_collections(
+        self,
+        collection_names: List[str],
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """
+        Answer every (collection, query vector) pair with a single statement:
+        the query vectors and collection names are VALUES lists joined to a
+        LATERAL top-k subquery.
+        """
         try:
-            if not vectors:
-                return None
+            if not vectors or not collection_names:
+                return {}
+            collection_names = list(dict.fromkeys(collection_names))
 
             # Adjust query vectors to VECTOR_LENGTH
             vectors = [self.adjust_vector_length(vector) for vector in vectors]
@@ -347,6 +540,15 @@ class PgvectorClient(VectorDBBase):
                 .alias("query_vectors")
             )
 
+            # Create the values for the searched collections
+            cid_col = column("cid", Integer)
+            c_name_col = column("c_name", Text)
+            query_collections = (
+                values(cid_col, c_name_col)
+                .data([(idx, name) for idx, name in enumerate(collection_names)])
+                .alias("query_collections")
+            )
+
             result_fields = [
                 DocumentChunk.id,
             ]
@@ -364,16 +566,18 @@ class PgvectorClient(VectorDBBase):
             else:
                 result_fields.append(DocumentChunk.text)
                 result_fields.append(DocumentChunk.vmetadata)
+            if include_vectors:
+                result_fields.append(DocumentChunk.vector)
             result_fields.append(
                 (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
                     "distance"
                 )
             )
 
-            # Build the lateral subquery for each query vector
+            # Build the lateral subquery for each (collection, query vector) pair
             subq = (
                 select(*result_fields)
-                .where(DocumentChunk.collection_name == collection_name)
+                .where(DocumentChunk.collection_name == query_collections.c.c_name)
                 .order_by(
                     (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
                 )
@@ -382,56 +586,64 @@ class PgvectorClient(VectorDBBase):
                 subq = subq.limit(limit)
             subq = subq.lateral("result")
 
-            # Build the main query by joining query_vectors and the lateral subquery
+            # Build the main query by joining query_vectors, query_collections
+            # and the lateral subquery
             stmt = (
                 select(
+                    query_collections.c.cid,
                     query_vectors.c.qid,
                     subq.c.id,
                     subq.c.text,
                     subq.c.vmetadata,
                     subq.c.distance,
+                    *([subq.c.vector] if include_vectors else []),
                 )
                 .select_from(query_vectors)
+                .join(query_collections, true())
                 .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
+                .order_by(query_collections.c.cid, query_vectors.c.qid, subq.c.distance)
             )
 
             result_proxy = self.session.execute(stmt)
             results = result_proxy.all()
 
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
-
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
+            search_results = {}
+            for name in collection_names:
+                search_results[name] = SearchResult(
+                    ids=[[] for _ in range(num_queries)],
+                    distances=[[] for _ in range(num_queries)],
+                    documents=[[] for _ in range(num_queries)],
+                    metadatas=[[] for _ in range(num_queries)],
+                    embeddings=(
+                        [[] for _ in range(num_queries)] if include_vectors else None
+                    ),
                 )
 
             for row in results:
+                result = search_results[collection_names[int(row.cid)]]
                 qid = int(row.qid)
-                ids[qid].append(row.id)
+                result.ids[qid].append(row.id)
                 # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
                 # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
+                result.distances[qid].append((2.0 - row.distance) / 2.0)
+                result.documents[qid].append(row.text)
+                result.metadatas[qid].append(row.vmetadata)
+                if include_vectors:
+                    result.embeddings[qid].append(vector_to_list(row.vector))
 
             self.session.rollback()  # read-only transaction
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
-            )
+            return search_results
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during search: {e}")
-            return None
+            return {}
 
     def query(
-        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+        self,
+        collection_name: str,
+        filter: Dict[str, Any],
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
     ) -> Optional[GetResult]:
         try:
             if PGVECTOR_PGCRYPTO:
@@ -453,6 +665,7 @@ class PgvectorClient(VectorDBBase):
                     pgcrypto_decrypt(
                         DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
                     ).label("vmetadata"),
+                    *([DocumentChunk.vector] if include_vectors else []),
                 ).where(*where_clauses)
                 if limit is not None:
                     stmt = stmt.limit(limit)
@@ -478,12 +691,18 @@ class PgvectorClient(VectorDBBase):
             ids = [[result.id for result in results]]
             documents = [[result.text for result in results]]
             metadatas = [[result.vmetadata for result in results]]
+            embeddings = (
+                [[vector_to_list(result.vector) for result in results]]
+                if include_vectors
+                else None
+            )
 
             self.session.rollback()  # read-only transaction
             return GetResult(
                 ids=ids,
                 documents=documents,
                 metadatas=metadatas,
+                embeddings=embeddings,
             )
         except Exception as e:
             self.session.rollback()
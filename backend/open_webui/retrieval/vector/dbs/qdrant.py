@@ -66,7 +66,7 @@ class QdrantClient(VectorDBBase):
                 timeout=QDRANT_TIMEOUT,
             )
 
-    def _result_to_get_result(self, points) -> GetResult:
+    def _result_to_get_result(self, points, include_vectors: bool = False) -> GetResult:
         ids = []
         documents = []
         metadatas = []
@@ -82,6 +82,9 @@ class QdrantClient(VectorDBBase):
                 "ids": [ids],
                 "documents": [documents],
                 "metadatas": [metadatas],
+                "embeddings": (
+                    [[point.vector for point in points]] if include_vectors else None
+                ),
             }
         )
 
@@ -147,7 +150,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         if limit is None:
@@ -157,17 +164,25 @@ class QdrantClient(VectorDBBase):
             collection_name=f"{self.collection_prefix}_{collection_name}",
             query=vectors[0],
             limit=limit,
+            with_vectors=include_vectors,
         )
-        get_result = self._result_to_get_result(query_response.points)
+        get_result = self._result_to_get_result(query_response.points, include_vectors)
         return SearchResult(
             ids=get_result.ids,
             documents=get_result.documents,
             metadatas=get_result.metadatas,
+            embeddings=get_result.embeddings,
             # qdrant distance is [-1, 1], normalize to [0, 1]
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
-    def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
+    def query(
+        self,
+        collection_name: str,
+        filter: dict,
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
+    ):
         # Construct the filter string for querying
         if not self.has_collection(collection_name):
             return None
@@ -187,8 +202,9 @@ class QdrantClient(VectorDBBase):
                 collection_name=f"{self.collection_prefix}_{collection_name}",
                 scroll_filter=models.Filter(should=field_conditions),
                 limit=limit,
+                with_vectors=include_vectors,
             )
-            return self._result_to_get_result(points[0])
+            return self._result_to_get_result(points[0], include_vectors)
         except Exception as e:
             log.exception(f"Error querying a collection '{collection_name}': {e}")
             return None
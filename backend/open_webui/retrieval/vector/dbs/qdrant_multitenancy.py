@@ -90,14 +90,21 @@ class QdrantClient(VectorDBBase):
         self.WEB_SEARCH_COLLECTION = f"{self.collection_prefix}_web-search"
         self.HASH_BASED_COLLECTION = f"{self.collection_prefix}_hash-based"
 
-    def _result_to_get_result(self, points) -> GetResult:
+    def _result_to_get_result(self, points, include_vectors: bool = False) -> GetResult:
         ids, documents, metadatas = [], [], []
         for point in points:
             payload = point.payload
             ids.append(point.id)
             documents.append(payload["text"])
             metadatas.append(payload["metadata"])
-        return GetResult(ids=[ids], documents=[documents], metadatas=[metadatas])
+        return GetResult(
+            ids=[ids],
+            documents=[documents],
+            metadatas=[metadatas],
+            embeddings=(
+                [[point.vector for point in points]] if include_vectors else None
+            ),
+        )
 
     def _get_collection_and_tenant_id(self, collection_name: str) -> Tuple[str, str]:
         """
@@ -249,7 +256,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: List[List[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[float | int]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
         """
         Search for the nearest neighbor items based on the vectors with tenant isolation.
@@ -267,17 +278,23 @@ class QdrantClient(VectorDBBase):
             query=vectors[0],
             limit=limit,
             query_filter=models.Filter(must=[tenant_filter]),
+            with_vectors=include_vectors,
         )
-        get_result = self._result_to_get_result(query_response.points)
+        get_result = self._result_to_get_result(query_response.points, include_vectors)
         return SearchResult(
             ids=get_result.ids,
             documents=get_result.documents,
             metadatas=get_result.metadatas,
+            embeddings=get_result.embeddings,
             distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
         )
 
     def query(
-        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+        self,
+        collection_name: str,
+        filter: Dict[str, Any],
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
     ):
         """
         Query points with filters and tenant isolation.
@@ -297,8 +314,9 @@ class QdrantClient(VectorDBBase):
             collection_name=mt_collection,
             scroll_filter=combined_filter,
             limit=limit,
+            with_vectors=include_vectors,
         )
-        return self._result_to_get_result(points[0])
+        return self._result_to_get_result(points[0], include_vectors)
 
     def get(self, collection_name: str) -> Optional[GetResult]:
         """
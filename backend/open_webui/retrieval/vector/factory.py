@@ -1,6 +1,15 @@
 from open_webui.retrieval.vector.main import VectorDBBase
+from open_webui.retrieval.vector.async_client import (
+    AsyncVectorDBClient,
+    DEFAULT_MAX_CONCURRENCY,
+)
 from open_webui.retrieval.vector.type import VectorType
-from open_webui.config import VECTOR_DB, ENABLE_QDRANT_MULTITENANCY_MODE
+from open_webui.config import (
+    VECTOR_DB,
+    VECTOR_DB_MAX_CONCURRENCY,
+    VECTOR_DB_TIMEOUT,
+    ENABLE_QDRANT_MULTITENANCY_MODE,
+)
 
 
 class Vector:
@@ -61,3 +70,11 @@ class Vector:
 
 
 VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+
+# Use from async code paths so vector DB calls never block the event loop
+ASYNC_VECTOR_DB_CLIENT = AsyncVectorDBClient(
+    VECTOR_DB_CLIENT,
+    max_concurrency=VECTOR_DB_MAX_CONCURRENCY
+    or DEFAULT_MAX_CONCURRENCY.get(VECTOR_DB, 8),
+    timeout=VECTOR_DB_TIMEOUT,
+)
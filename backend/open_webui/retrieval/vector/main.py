@@ -14,12 +14,38 @@ class GetResult(BaseModel):
     ids: Optional[List[List[str]]]
     documents: Optional[List[List[str]]]
     metadatas: Optional[List[List[Any]]]
+    # Only populated when requested with include_vectors=True and supported by the backend
+    embeddings: Optional[List[List[Optional[List[float | int]]]]] = None
 
 
 class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
 
 
+def stack_search_results(
+    results: List[Optional[SearchResult]],
+) -> Optional[SearchResult]:
+    """Combine single-vector search results into one result with a row per vector."""
+    if all(result is None for result in results):
+        return None
+
+    stacked = {
+        "ids": [],
+        "documents": [],
+        "metadatas": [],
+        "distances": [],
+        "embeddings": [],
+    }
+    for result in results:
+        for key, rows in stacked.items():
+            value = getattr(result, key, None) if result is not None else None
+            rows.append(value[0] if value else [])
+
+    if not any(stacked["embeddings"]):
+        stacked["embeddings"] = None
+    return SearchResult(**stacked)
+
+
 class VectorDBBase(ABC):
     """
     Abstract base class for all vector database backends.
@@ -31,6 +57,11 @@ class VectorDBBase(ABC):
     implement all abstract methods.
     """
 
+    # Whether a single `search` call answers several query vectors at once
+    supports_multi_vector_search: bool = False
+    # Whether `search_collections` answers several collections in one request
+    supports_multi_collection_search: bool = False
+
     @abstractmethod
     def has_collection(self, collection_name: str) -> bool:
         """Check if the collection exists in the vector DB."""
@@ -53,14 +84,57 @@ class VectorDBBase(ABC):
 
     @abstractmethod
     def search(
-        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_vectors: bool = False,
     ) -> Optional[SearchResult]:
-        """Search for similar vectors in a collection."""
+        """
+        Search for similar vectors in a collection.
+        With include_vectors, backends that can return stored vectors fill
+        `embeddings`; others leave it as None.
+        """
         pass
 
+    def search_collections(
+        self,
+        collection_names: List[str],
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        include_vectors: bool = False,
+    ) -> Dict[str, Optional[SearchResult]]:
+        """
+        Search several collections with several query vectors.
+        Returns one SearchResult per collection with a row per query vector.
+        The default issues one `search` per collection (or per collection and
+        vector when the backend only answers the first vector); backends that
+        can do better set supports_multi_collection_search and override this.
+        """
+        results = {}
+        for collection_name in collection_names:
+            if self.supports_multi_vector_search:
+                results[collection_name] = self.search(
+                    collection_name, vectors, limit, include_vectors=include_vectors
+                )
+                continue
+
+            rows = [
+                self.search(
+                    collection_name, [vector], limit, include_vectors=include_vectors
+                )
+                for vector in vectors
+            ]
+            results[collection_name] = stack_search_results(rows)
+        return results
+
     @abstractmethod
     def query(
-        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+        self,
+        collection_name: str,
+        filter: Dict,
+        limit: Optional[int] = None,
+        include_vectors: bool = False,
     ) -> Optional[GetResult]:
         """Query vectors from a collection using metadata filter."""
         pass
@@ -5,10 +5,10 @@ import os
 import uuid
 from functools import lru_cache
 from pathlib import Path
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
+from pydub.utils import mediainfo
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from typing import Iterator, Optional
 
 from fnmatch import fnmatch
 import aiohttp
@@ -29,10 +29,11 @@ from fastapi import (
     APIRouter,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
+from open_webui.utils.audio import iter_audio_segments
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
@@ -45,6 +46,8 @@ from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
     AIOHTTP_CLIENT_SESSION_SSL,
     AIOHTTP_CLIENT_TIMEOUT,
+    AUDIO_STT_MAX_WORKERS,
+    AUDIO_STT_SEGMENT_BITRATE,
     ENV,
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
@@ -73,9 +76,6 @@ SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 #
 ##########################################
 
-from pydub import AudioSegment
-from pydub.utils import mediainfo
-
 
 def is_audio_conversion_required(file_path):
     """
@@ -107,19 +107,6 @@ def is_audio_conversion_required(file_path):
         return False
 
 
-def convert_audio_to_mp3(file_path):
-    """Convert audio file to mp3 format."""
-    try:
-        output_path = os.path.splitext(file_path)[0] + ".mp3"
-        audio = AudioSegment.from_file(file_path)
-        audio.export(output_path, format="mp3")
-        log.info(f"Converted {file_path} to {output_path}")
-        return output_path
-    except Exception as e:
-        log.error(f"Error converting audio file: {e}")
-        return None
-
-
 def set_faster_whisper_model(model: str, auto_update: bool = False):
     whisper_model = None
     if model:
@@ -806,126 +793,94 @@ def transcription_handler(request, file_path, metadata):
             )
 
 
-def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
+def iter_transcriptions(
+    request: Request, file_path: str, metadata: Optional[dict] = None
+) -> Iterator[dict]:
+    """
+    Transcribe an audio file segment by segment.
+
+    Small files in a supported format are sent as-is. Everything else is cut into
+    fixed-bitrate mp3 segments by ffmpeg; segments are handed to a bounded worker
+    pool as soon as they are written and results are yielded in segment order.
+    """
     log.info(f"transcribe: {file_path} {metadata}")
 
-    if is_audio_conversion_required(file_path):
-        file_path = convert_audio_to_mp3(file_path)
+    if os.path.getsize(file_path) <= MAX_FILE_SIZE and not (
+        is_audio_conversion_required(file_path)
+    ):
+        yield transcription_handler(request, file_path, metadata)
+        return
 
-    try:
-        file_path = compress_audio(file_path)
-    except Exception as e:
-        log.exception(e)
+    segment_paths = []
+    pending = deque()
 
-    # Always produce a list of chunk paths (could be one entry if small)
-    try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
-    except Exception as e:
-        log.exception(e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=ERROR_MESSAGES.DEFAULT(e),
-        )
+    def next_result():
+        future = pending.popleft()
+        try:
+            return future.result()
+        except Exception as transcribe_exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error transcribing chunk: {transcribe_exc}",
+            )
 
-    results = []
+    executor = ThreadPoolExecutor(max_workers=AUDIO_STT_MAX_WORKERS)
     try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
-            for future in futures:
-                try:
-                    results.append(future.result())
-                except Exception as transcribe_exc:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error transcribing chunk: {transcribe_exc}",
+        try:
+            segments = iter_audio_segments(
+                file_path, MAX_FILE_SIZE, bitrate_kbps=AUDIO_STT_SEGMENT_BITRATE
+            )
+            for segment_path in segments:
+                segment_paths.append(segment_path)
+                pending.append(
+                    executor.submit(
+                        transcription_handler, request, segment_path, metadata
                     )
+                )
+
+                # Keep at most AUDIO_STT_MAX_WORKERS segments in flight and emit
+                # finished results from the head of the queue as early as possible
+                while pending and (
+                    len(pending) >= AUDIO_STT_MAX_WORKERS or pending[0].done()
+                ):
+                    yield next_result()
+        except HTTPException:
+            raise
+        except Exception as e:
+            log.exception(e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERROR_MESSAGES.DEFAULT(e),
+            )
+
+        while pending:
+            yield next_result()
     finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
         # Clean up only the temporary chunks, never the original file
-        for chunk_path in chunk_paths:
-            if chunk_path != file_path and os.path.isfile(chunk_path):
+        for segment_path in segment_paths:
+            if segment_path != file_path and os.path.isfile(segment_path):
                 try:
-                    os.remove(chunk_path)
+                    os.remove(segment_path)
                 except Exception:
                     pass
 
+
+def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
+    results = list(iter_transcriptions(request, file_path, metadata))
+
     return {
         "text": " ".join([result["text"] for result in results]),
     }
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
-
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
-
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
-
-        return compressed_path
-    else:
-        return file_path
-
-
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
-    """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
-    """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
-
-    audio = AudioSegment.from_file(file_path)
-    duration_ms = len(audio)
-    orig_size = file_size
-
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
-    chunks = []
-    start = 0
-    i = 0
-
-    base, _ = os.path.splitext(file_path)
-
-    while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
-
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
-
-        chunks.append(chunk_path)
-        start = end
-        i += 1
-
-    return chunks
-
-
 @router.post("/transcriptions")
 def transcription(
     request: Request,
     file: UploadFile = File(...),
     language: Optional[str] = Form(None),
+    stream: bool = Form(False),
     user=Depends(get_verified_user),
 ):
     log.info(f"file.content_type: {file.content_type}")
@@ -968,6 +923,12 @@ def transcription(
             if language:
                 metadata = {"language": language}
 
+            if stream:
+                return StreamingResponse(
+                    stream_transcription(request, file_path, metadata),
+                    media_type="text/event-stream",
+                )
+
             result = transcribe(request, file_path, metadata)
 
             return {
@@ -992,6 +953,27 @@ def transcription(
         )
 
 
+def stream_transcription(request: Request, file_path: str, metadata: Optional[dict]):
+    texts = []
+    try:
+        for index, result in enumerate(
+            iter_transcriptions(request, file_path, metadata)
+        ):
+            texts.append(result["text"])
+            yield f"data: {json.dumps({'index': index, 'text': result['text']})}\n\n"
+
+        done = {
+            "done": True,
+            "text": " ".join(texts),
+            "filename": os.path.basename(file_path),
+        }
+        yield f"data: {json.dumps(done)}\n\n"
+    except Exception as e:
+        log.exception(e)
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        yield f"data: {json.dumps({'error': detail})}\n\n"
+
+
 def get_available_models(request: Request) -> list[dict]:
     available_models = []
     if request.app.state.config.TTS_ENGINE == "openai":
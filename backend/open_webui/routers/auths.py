@@ -68,7 +68,7 @@ from open_webui.utils.auth import (
     send_verify_email,
     verify_email_by_code,
 )
-from open_webui.utils.webhook import post_webhook
+from open_webui.utils.webhook import enqueue_webhook
 from open_webui.utils.access_control import get_permissions
 
 from typing import Optional, List
@@ -675,7 +675,7 @@ async def signup(request: Request, response: Response, form_data: SignupForm):
             )
 
             if request.app.state.config.WEBHOOK_URL:
-                post_webhook(
+                enqueue_webhook(
                     request.app.state.WEBUI_NAME,
                     request.app.state.config.WEBHOOK_URL,
                     WEBHOOK_MESSAGES.USER_SIGNUP(user.name),
@@ -0,0 +1,62 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.creations import (
+    PROVIDER_MEDIA_TYPES,
+    CreationListResponse,
+    Creations,
+)
+from open_webui.utils.auth import get_verified_user
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+router = APIRouter()
+
+############################
+# GetCreations
+############################
+
+
+@router.get("/", response_model=CreationListResponse)
+async def get_creations(
+    cursor: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100),
+    provider: Optional[str] = None,
+    media_type: Optional[str] = None,
+    user=Depends(get_verified_user),
+):
+    """
+    The user's generations across all media providers, newest first. Pass the
+    returned `next_cursor` back as `cursor` to fetch the next page.
+    `provider` accepts a comma separated list.
+    """
+    providers = (
+        [name.strip() for name in provider.split(",") if name.strip()]
+        if provider
+        else None
+    )
+    if providers and any(name not in PROVIDER_MEDIA_TYPES for name in providers):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Unknown provider"),
+        )
+
+    try:
+        return Creations.get_creations_by_user_id(
+            user.id,
+            cursor=cursor,
+            limit=limit,
+            providers=providers,
+            media_type=media_type,
+        )
+    except (ValueError, TypeError) as e:
+        log.debug(f"Invalid creations cursor {cursor}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT("Invalid cursor"),
+        )
@@ -1,14 +1,22 @@
+import asyncio
+import csv
 import datetime
+import io
 import logging
 import time
 import uuid
 from collections import defaultdict
 from decimal import Decimal
-from typing import Optional
+from typing import Iterator, Optional
 from urllib.parse import quote
 
 from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.responses import PlainTextResponse, RedirectResponse, Response
+from fastapi.responses import (
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel, Field
 
 from open_webui.config import EZFP_CALLBACK_HOST
@@ -20,11 +28,22 @@ from open_webui.models.credits import (
     CreditLogs,
     RedemptionCodes,
     RedemptionCodeModel,
+    CreditLogArchiveModel,
+    CreditLogArchives,
 )
 from open_webui.models.models import Models, ModelPriceForm
 from open_webui.models.users import UserModel, Users
 from open_webui.utils.auth import get_verified_user, get_admin_user
+from open_webui.utils.credit.archive import (
+    archive_credit_logs,
+    count_archived_logs,
+    get_archived_logs_by_cursor,
+    get_archived_logs_by_page,
+    get_archived_logs_by_time,
+    iter_archived_logs,
+)
 from open_webui.utils.credit.ezfp import ezfp_client
+from open_webui.utils.misc import encode_keyset_cursor
 from open_webui.utils.models import get_all_models
 
 log = logging.getLogger(__name__)
@@ -33,6 +52,48 @@ log.setLevel(SRC_LOG_LEVELS["MAIN"])
 router = APIRouter()
 
 PAGE_ITEM_COUNT = 30
+MAX_PAGE_ITEM_COUNT = 500
+# rows written to the stream at once by the exports
+EXPORT_CHUNK_ROWS = 200
+
+
+def get_page_limit(limit: Optional[int]) -> int:
+    return min(max(limit or PAGE_ITEM_COUNT, 1), MAX_PAGE_ITEM_COUNT)
+
+
+def invalid_cursor(cursor: str) -> HTTPException:
+    log.debug(f"Invalid cursor: {cursor}")
+    return HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def format_timestamp(timestamp: Optional[int]) -> str:
+    if not timestamp:
+        return ""
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def stream_csv(header: list[str], rows: Iterator[list]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if index % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def stream_ndjson(items: Iterator[BaseModel]) -> Iterator[str]:
+    lines = []
+    for item in items:
+        lines.append(item.model_dump_json())
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
 
 
 @router.get("/config")
@@ -45,8 +106,22 @@ async def get_config(request: Request):
 
 @router.get("/logs", response_model=list[CreditLogSimpleModel])
 async def list_credit_logs(
-    page: Optional[int] = None, user: UserModel = Depends(get_verified_user)
+    response: Response,
+    page: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user: UserModel = Depends(get_verified_user),
 ) -> TradeTicketModel:
+    # keyset pagination, an empty cursor asks for the first page
+    if cursor is not None:
+        try:
+            logs, next_cursor = CreditLogs.get_credit_log_by_cursor(
+                user_ids=[user.id], cursor=cursor or None, limit=PAGE_ITEM_COUNT
+            )
+        except ValueError:
+            raise invalid_cursor(cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return logs
     if page:
         limit = PAGE_ITEM_COUNT
         offset = (page - 1) * limit
@@ -74,28 +149,142 @@ async def update_model_price(
     )
 
 
+@router.post("/logs/archive")
+async def archive_logs(
+    form_data: DeleteLogsForm, _: UserModel = Depends(get_admin_user)
+) -> dict:
+    return await asyncio.to_thread(archive_credit_logs, form_data.timestamp)
+
+
+@router.get("/logs/export")
+async def export_credit_logs(
+    format: str = "csv",
+    query: Optional[str] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    _: UserModel = Depends(get_admin_user),
+) -> StreamingResponse:
+    """
+    Stream credit logs oldest first as CSV or NDJSON, archived rows included.
+    """
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="Unsupported export format.")
+    user_ids = None
+    if query:
+        users = Users.get_users(filter={"query": query})
+        user_ids = [user.id for user in users["users"]] or ["-"]
+
+    def iter_logs():
+        yield from iter_archived_logs(user_ids, start_time, end_time)
+        yield from CreditLogs.iter_credit_logs(user_ids, start_time, end_time)
+
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_ndjson(iter_logs()),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=credit_logs.ndjson"},
+        )
+
+    def iter_rows():
+        for log in iter_logs():
+            model = (log.detail.get("api_params") or {}).get("model") or {}
+            usage = log.detail.get("usage") or {}
+            yield [
+                log.id,
+                log.user_id,
+                str(log.credit),
+                model.get("id", "") if isinstance(model, dict) else "",
+                usage.get("prompt_tokens", ""),
+                usage.get("completion_tokens", ""),
+                usage.get("total_tokens", ""),
+                usage.get("total_price", ""),
+                log.detail.get("desc", ""),
+                format_timestamp(log.created_at),
+            ]
+
+    return StreamingResponse(
+        stream_csv(
+            [
+                "ID",
+                "User ID",
+                "Credit",
+                "Model",
+                "Prompt Tokens",
+                "Completion Tokens",
+                "Total Tokens",
+                "Total Price",
+                "Description",
+                "Created At",
+            ],
+            iter_rows(),
+        ),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=credit_logs.csv"},
+    )
+
+
+@router.get("/logs/archives", response_model=list[CreditLogArchiveModel])
+async def list_log_archives(_: UserModel = Depends(get_admin_user)):
+    return CreditLogArchives.get_archives(status=None)
+
+
 @router.get("/all_logs")
 async def get_all_logs(
     query: Optional[str] = None,
     page: Optional[int] = None,
     limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     _: UserModel = Depends(get_admin_user),
 ):
     # init params
     page = page or 1
-    limit = limit or PAGE_ITEM_COUNT
+    limit = get_page_limit(limit)
     offset = (page - 1) * limit
     # query users
     users = Users.get_users(filter={"query": query})
     user_map = {user.id: user.name for user in users["users"]}
     if query and not user_map:
-        return {"total": 0, "results": []}
-    # query db
+        return {"total": 0, "results": [], "next_cursor": None}
     user_ids = list(user_map.keys()) if query else None
+    total = CreditLogs.count_credit_log(
+        user_ids=user_ids, approximate=True
+    ) + await asyncio.to_thread(count_archived_logs, user_ids)
+    # keyset pagination, an empty cursor asks for the first page
+    if cursor is not None:
+        try:
+            results, next_cursor = CreditLogs.get_credit_log_by_cursor(
+                user_ids=user_ids, cursor=cursor or None, limit=limit
+            )
+            if next_cursor is None:
+                # archived rows are all older than the ones kept in db
+                archived, next_cursor = await asyncio.to_thread(
+                    get_archived_logs_by_cursor,
+                    user_ids=user_ids,
+                    cursor=(
+                        encode_keyset_cursor(results[-1].created_at, results[-1].id)
+                        if results
+                        else cursor or None
+                    ),
+                    limit=limit - len(results),
+                )
+                results += archived
+        except ValueError:
+            raise invalid_cursor(cursor)
+        for result in results:
+            setattr(result, "username", user_map.get(result.user_id, ""))
+        return {"total": total, "results": results, "next_cursor": next_cursor}
+    # query db, then the archives for pages past the rows kept in db
     results = CreditLogs.get_credit_log_by_page(
         user_ids=user_ids, offset=offset, limit=limit
     )
-    total = CreditLogs.count_credit_log(user_ids=user_ids)
+    if len(results) < limit:
+        db_total = CreditLogs.count_credit_log(user_ids=user_ids)
+        results += await asyncio.to_thread(
+            get_archived_logs_by_page,
+            user_ids=user_ids,
+            offset=max(offset - db_total, 0),
+            limit=limit - len(results),
+        )
     # add username to results
     for result in results:
         setattr(result, "username", user_map.get(result.user_id, ""))
@@ -189,7 +378,10 @@ async def get_statistics(
     form_data: StatisticRequest, _: UserModel = Depends(get_admin_user)
 ):
     # load credit data
-    logs = CreditLogs.get_log_by_time(form_data.start_time, form_data.end_time)
+    logs = await asyncio.to_thread(
+        get_archived_logs_by_time, form_data.start_time, form_data.end_time
+    )
+    logs += CreditLogs.get_log_by_time(form_data.start_time, form_data.end_time)
     trade_logs = TradeTickets.get_ticket_by_time(
         form_data.start_time, form_data.end_time
     )
@@ -271,32 +463,45 @@ async def get_redemption_codes(
     keyword: Optional[str] = None,
     page: Optional[int] = None,
     limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     _: UserModel = Depends(get_admin_user),
 ) -> dict:
     """
     Get all redemption codes.
+    Pass `cursor` (empty for the first page) for keyset pagination; the
+    response then carries `next_cursor` instead of a total.
     """
     # init params
     page = page or 1
-    limit = limit or PAGE_ITEM_COUNT
+    limit = get_page_limit(limit)
     offset = (page - 1) * limit
     # query codes
     try:
         keyword = int(keyword)
     except (ValueError, TypeError):
         pass
-    total, codes = RedemptionCodes.get_codes(
-        keyword=keyword, offset=offset, limit=limit
-    )
+    if cursor is not None:
+        try:
+            codes, next_cursor = RedemptionCodes.get_codes_by_cursor(
+                keyword=keyword, cursor=cursor or None, limit=limit
+            )
+        except ValueError:
+            raise invalid_cursor(cursor)
+        response = {"results": codes, "next_cursor": next_cursor}
+    else:
+        total, codes = RedemptionCodes.get_codes(
+            keyword=keyword, offset=offset, limit=limit
+        )
+        response = {"total": total, "results": codes}
     if not codes:
-        return {"total": 0, "results": []}
+        return response
     # query users
     users = Users.get_users_by_user_ids(user_ids={code.user_id for code in codes})
     user_map = {user.id: user.name for user in users}
     for code in codes:
         setattr(code, "username", user_map.get(code.user_id, ""))
     # response
-    return {"total": total, "results": codes}
+    return response
 
 
 class CreateRedemptionCodeForm(BaseModel):
@@ -388,47 +593,42 @@ async def export_redemption_codes(
     keyword: str, _: UserModel = Depends(get_admin_user)
 ) -> Response:
     """
-    Export all redemption codes as a plain text response.
+    Export all redemption codes as CSV, streamed row by row.
     """
-    _, codes = RedemptionCodes.get_codes(keyword=keyword)
-    # build CSV content
-    csv_content = "Code,Purpose,Amount,User ID,Created At,Expired At,Received At\n"
-    for code in codes:
-        csv_content += (
-            ",".join(
-                [
-                    code.code,
-                    f'"{code.purpose}"',
-                    str(code.amount),
-                    str(code.user_id) if code.user_id else "",
-                    datetime.datetime.fromtimestamp(code.created_at).strftime(
-                        "%Y-%m-%d %H:%M:%S"
-                    ),
-                    (
-                        datetime.datetime.fromtimestamp(code.expired_at).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-                        if code.expired_at
-                        else ""
-                    ),
-                    (
-                        datetime.datetime.fromtimestamp(code.received_at).strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        )
-                        if code.received_at
-                        else ""
-                    ),
-                ]
-            )
-            + "\n"
-        )
+
+    def iter_rows():
+        for code in RedemptionCodes.iter_codes(keyword=keyword):
+            yield [
+                code.code,
+                code.purpose,
+                str(code.amount),
+                str(code.user_id) if code.user_id else "",
+                format_timestamp(code.created_at),
+                format_timestamp(code.expired_at),
+                format_timestamp(code.received_at),
+            ]
+
     # set the response headers
     headers = {
         "Content-Disposition": f"attachment; filename={quote(keyword)}.csv",
-        "Content-Type": "text/csv",
     }
     # return the response
-    return Response(content=csv_content, headers=headers)
+    return StreamingResponse(
+        stream_csv(
+            [
+                "Code",
+                "Purpose",
+                "Amount",
+                "User ID",
+                "Created At",
+                "Expired At",
+                "Received At",
+            ],
+            iter_rows(),
+        ),
+        media_type="text/csv",
+        headers=headers,
+    )
 
 
 @router.get("/redemption_codes/{code}/receive")
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import logging
 import httpx
 import json
 import asyncio
@@ -33,11 +34,26 @@ from open_webui.utils.dreamwork import (
     process_dreamwork_generation,
 )
 from open_webui.services.file_manager import get_file_manager
+from open_webui.utils.admission import AdmissionTicket, media_task_admission
 
 # 导入修复版函数
 from open_webui.utils.dreamwork_fixed import generate_image_to_image_fixed
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.logger import provider_log_context
 
-router = APIRouter(prefix="/dreamwork", tags=["dreamwork"])
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["DREAMWORK"])
+
+router = APIRouter(
+    prefix="/dreamwork",
+    tags=["dreamwork"],
+    dependencies=[Depends(provider_log_context("dreamwork"))],
+)
+
+# 生成在请求内同步完成，名额在请求期间占用
+dreamwork_admission = media_task_admission(
+    "dreamwork", lambda: DreamWorkConfig.get_config().max_concurrent_tasks
+)
 
 # 全局变量存储DreamWork配置
 dreamwork_config = None
@@ -148,10 +164,7 @@ async def save_dreamwork_config(config_data: dict, user=Depends(get_admin_user))
             "config": config.to_dict(),
         }
     except Exception as e:
-        import traceback
-
-        print(f"Error saving DreamWork config: {e}")
-        traceback.print_exc()
+        log.exception(f"Error saving DreamWork config: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to save configuration: {str(e)}"
         )
@@ -191,7 +204,7 @@ async def test_dreamwork_connection(user=Depends(get_admin_user)):
                 status_code=400, detail="DreamWork service not configured"
             )
 
-        print(
+        log.info(
             f"🎨 【DreamWork测试】配置检查: enabled={config.enabled}, base_url={config.base_url}, api_key={'***' if config.api_key else 'None'}"
         )
 
@@ -205,7 +218,7 @@ async def test_dreamwork_connection(user=Depends(get_admin_user)):
 
         # 构建测试URL
         test_url = f"{config.base_url.rstrip('/')}/v1/images/generations"
-        print(f"🎨 【DreamWork测试】测试URL: {test_url}")
+        log.info(f"🎨 【DreamWork测试】测试URL: {test_url}")
 
         # 简单测试 - 分步骤检查连接
         async with httpx.AsyncClient(timeout=15.0) as http_client:
@@ -215,11 +228,11 @@ async def test_dreamwork_connection(user=Depends(get_admin_user)):
                     base_response = await http_client.get(
                         config.base_url.rstrip("/"), timeout=10.0
                     )
-                    print(
+                    log.info(
                         f"🎨 【DreamWork测试】基础连接测试: {base_response.status_code}"
                     )
                 except Exception as e:
-                    print(f"🎨 【DreamWork测试】基础连接失败: {e}")
+                    log.error(f"🎨 【DreamWork测试】基础连接失败: {e}")
 
                 # 第二步：测试API端点
                 test_payload = {
@@ -229,7 +242,7 @@ async def test_dreamwork_connection(user=Depends(get_admin_user)):
                     "response_format": "url",
                 }
 
-                print(f"🎨 【DreamWork测试】请求数据: {test_payload}")
+                log.info(f"🎨 【DreamWork测试】请求数据: {test_payload}")
 
                 response = await http_client.post(
                     test_url,
@@ -241,8 +254,8 @@ async def test_dreamwork_connection(user=Depends(get_admin_user)):
                     timeout=15.0,
                 )
 
-                print(f"🎨 【DreamWork测试】响应状态: {response.status_code}")
-                print(f"🎨 【DreamWork测试】响应内容: {response.text[:200]}...")
+                log.info(f"🎨 【DreamWork测试】响应状态: {response.status_code}")
+                log.info(f"🎨 【DreamWork测试】响应内容: {response.text[:200]}...")
 
                 # 如果API返回任何响应（即使是错误），说明连接成功
                 if response.status_code in [200, 400, 401, 403, 422]:
@@ -268,28 +281,25 @@ async def test_dreamwork_connection(user=Depends(get_admin_user)):
                     }
 
             except httpx.ConnectError as e:
-                print(f"❌ 【DreamWork测试】连接错误: {e}")
+                log.error(f"❌ 【DreamWork测试】连接错误: {e}")
                 raise HTTPException(
                     status_code=400,
                     detail=f"Cannot connect to DreamWork API server: {str(e)}",
                 )
             except httpx.TimeoutException as e:
-                print(f"❌ 【DreamWork测试】超时错误: {e}")
+                log.error(f"❌ 【DreamWork测试】超时错误: {e}")
                 raise HTTPException(
                     status_code=400,
                     detail=f"Connection to DreamWork API timed out: {str(e)}",
                 )
             except Exception as e:
-                print(f"❌ 【DreamWork测试】其他错误: {e}")
+                log.error(f"❌ 【DreamWork测试】其他错误: {e}")
                 raise HTTPException(status_code=400, detail=f"Request failed: {str(e)}")
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【DreamWork测试】系统错误: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【DreamWork测试】系统错误: {e}")
         raise HTTPException(status_code=500, detail=f"Connection test failed: {str(e)}")
 
 
@@ -301,24 +311,25 @@ async def submit_text_to_image_task(
     request: DreamWorkGenerateRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(dreamwork_admission),
 ):
     """提交文生图任务"""
     try:
-        print(f"🎨 【DreamWork后端】收到文生图请求: 用户={user.id}")
-        print(
+        log.info(f"🎨 【DreamWork后端】收到文生图请求: 用户={user.id}")
+        log.info(
             f"🎨 【DreamWork后端】请求参数: model={request.model}, prompt={request.prompt[:50]}..., size={request.size}"
         )
-        print(
+        log.info(
             f"🎨 【DreamWork后端】其他参数: guidance_scale={request.guidance_scale}, seed={request.seed}, watermark={request.watermark}"
         )
 
         # 使用工具函数处理任务
-        print(f"🎨 【DreamWork后端】开始处理文生图任务...")
+        log.info(f"🎨 【DreamWork后端】开始处理文生图任务...")
         task = await process_dreamwork_generation(
             user_id=user.id, request=request, action="TEXT_TO_IMAGE"
         )
 
-        print(f"🎨 【DreamWork后端】任务创建成功: {task.id}")
+        log.info(f"🎨 【DreamWork后端】任务创建成功: {task.id}")
         return {
             "success": True,
             "task_id": task.id,
@@ -328,10 +339,7 @@ async def submit_text_to_image_task(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【DreamWork后端】文生图任务提交失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【DreamWork后端】文生图任务提交失败: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to submit text-to-image task: {str(e)}"
         )
@@ -342,23 +350,24 @@ async def submit_image_to_image_task(
     request: DreamWorkGenerateRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(dreamwork_admission),
 ):
     """提交图生图任务"""
     try:
-        print(f"🎨 【DreamWork后端】收到图生图请求: 用户={user.id}")
-        print(
+        log.info(f"🎨 【DreamWork后端】收到图生图请求: 用户={user.id}")
+        log.info(
             f"🎨 【DreamWork后端】请求参数: model={request.model}, prompt={request.prompt[:50]}..., size={request.size}"
         )
-        print(
+        log.info(
             f"🎨 【DreamWork后端】输入图片: {len(request.image) if request.image else 0}字符"
         )
-        print(
+        log.info(
             f"🎨 【DreamWork后端】其他参数: guidance_scale={request.guidance_scale}, seed={request.seed}, watermark={request.watermark}"
         )
 
         # 验证输入图片
         if not request.image:
-            print("❌ 【DreamWork后端】缺少输入图片")
+            log.error("❌ 【DreamWork后端】缺少输入图片")
             raise HTTPException(
                 status_code=400,
                 detail="Input image is required for image-to-image generation",
@@ -367,7 +376,7 @@ async def submit_image_to_image_task(
         # 验证图片数据基本格式
         image_data = request.image.strip()
         if len(image_data) < 100:
-            print(f"❌ 【DreamWork后端】图片数据太短: {len(image_data)}字符")
+            log.error(f"❌ 【DreamWork后端】图片数据太短: {len(image_data)}字符")
             raise HTTPException(
                 status_code=400,
                 detail=f"Image data too short: {len(image_data)} characters",
@@ -375,10 +384,10 @@ async def submit_image_to_image_task(
 
         # 记录图片数据前缀用于调试
         prefix = image_data[:50] if len(image_data) > 50 else image_data
-        print(f"🎨 【DreamWork后端】图片数据前缀: {prefix}...")
+        log.info(f"🎨 【DreamWork后端】图片数据前缀: {prefix}...")
 
         # 使用修复版API进行图生图处理
-        print(f"🎨 【DreamWork后端】开始处理图生图任务（使用修复版API）...")
+        log.info(f"🎨 【DreamWork后端】开始处理图生图任务（使用修复版API）...")
 
         # 检查配置
         config = DreamWorkConfig.get_config()
@@ -457,20 +466,20 @@ async def submit_image_to_image_task(
                                     update_task.cloud_image_url = file_record.cloud_url
                                     update_db.commit()
                                 update_db.commit()
-                            print(
+                            log.info(
                                 f"☁️ 【云存储】DreamWork图生图上传成功，已更新URL: {task.id}"
                             )
                         else:
-                            print(
+                            log.error(
                                 f"☁️ 【云存储】DreamWork图生图上传失败: {task.id} - {message}"
                             )
                 except Exception as upload_error:
-                    print(
+                    log.error(
                         f"☁️ 【云存储】DreamWork图生图自动上传异常: {task.id} - {upload_error}"
                     )
 
         except Exception as e:
-            print(f"❌ 【DreamWork后端】修复版API调用失败: {e}")
+            log.error(f"❌ 【DreamWork后端】修复版API调用失败: {e}")
             # 发生错误时退还积分
             add_user_credits(
                 user.id,
@@ -482,7 +491,7 @@ async def submit_image_to_image_task(
             task.fail_reason = str(e)
             raise HTTPException(status_code=500, detail=str(e))
 
-        print(f"🎨 【DreamWork后端】任务创建成功: {task.id}")
+        log.info(f"🎨 【DreamWork后端】任务创建成功: {task.id}")
         return {
             "success": True,
             "task_id": task.id,
@@ -492,10 +501,7 @@ async def submit_image_to_image_task(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【DreamWork后端】图生图任务提交失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【DreamWork后端】图生图任务提交失败: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to submit image-to-image task: {str(e)}"
         )
@@ -508,12 +514,16 @@ async def submit_image_to_image_task(
 async def get_dreamwork_task_status(task_id: str, user=Depends(get_verified_user)):
     """获取任务状态"""
     try:
-        print(f"🎨 【DreamWork API】获取任务状态: {task_id}, 用户: {user.id}")
+        log.info(
+            f"🎨 【DreamWork API】获取任务状态: {task_id}, 用户: {user.id}",
+            extra={"sampled": True},
+        )
 
         # 先查本地数据库
         task = DreamWorkTask.get_task_by_id(task_id)
-        print(
-            f"🎨 【DreamWork API】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}"
+        log.info(
+            f"🎨 【DreamWork API】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}",
+            extra={"sampled": True},
         )
 
         # 验证任务所有权
@@ -524,7 +534,9 @@ async def get_dreamwork_task_status(task_id: str, user=Depends(get_verified_user
 
         # 如果任务已完成，直接返回
         if task.status in ["SUCCESS", "FAILURE"]:
-            print(f"🎨 【DreamWork API】任务已完成: {task.id}")
+            log.info(
+                f"🎨 【DreamWork API】任务已完成: {task.id}", extra={"sampled": True}
+            )
 
             # 🔥 检查是否需要补充上传到云存储
             if task.status == "SUCCESS" and task.image_url:
@@ -567,19 +579,21 @@ async def get_dreamwork_task_status(task_id: str, user=Depends(get_verified_user
                                             file_record.cloud_url
                                         )
                                         update_db.commit()
-                                print(
-                                    f"☁️ 【云存储】DreamWork补充上传成功，已更新URL: {task.id}"
+                                log.info(
+                                    f"☁️ 【云存储】DreamWork补充上传成功，已更新URL: {task.id}",
+                                    extra={"sampled": True},
                                 )
                             else:
-                                print(
+                                log.error(
                                     f"☁️ 【云存储】DreamWork补充上传失败: {task.id} - {message}"
                                 )
                         else:
-                            print(
-                                f"☁️ 【云存储】DreamWork图片已存在，跳过上传: {task.id}"
+                            log.warning(
+                                f"☁️ 【云存储】DreamWork图片已存在，跳过上传: {task.id}",
+                                extra={"sampled": True},
                             )
                 except Exception as upload_error:
-                    print(
+                    log.error(
                         f"☁️ 【云存储】DreamWork补充上传异常: {task.id} - {upload_error}"
                     )
 
@@ -591,10 +605,7 @@ async def get_dreamwork_task_status(task_id: str, user=Depends(get_verified_user
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【DreamWork API】获取任务状态失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【DreamWork API】获取任务状态失败: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to get task status: {str(e)}"
         )
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel
@@ -12,6 +13,7 @@ from open_webui.models.feedbacks import (
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.leaderboard import leaderboard
 
 router = APIRouter()
 
@@ -56,6 +58,48 @@ async def update_config(
     }
 
 
+############################
+# Leaderboard
+############################
+
+
+class LeaderboardEntry(BaseModel):
+    model_id: str
+    rating: int
+    bt_rating: int
+    won: int
+    lost: int
+    count: int
+
+
+@router.get("/leaderboard", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    request: Request,
+    query: Optional[str] = None,
+    tag: Optional[str] = None,
+    user=Depends(get_admin_user),
+):
+    if tag:
+        return await asyncio.to_thread(leaderboard.get_filtered_rankings, tag=tag)
+
+    if query and query.strip():
+        return await asyncio.to_thread(
+            leaderboard.get_filtered_rankings,
+            query=query.strip(),
+            embed=lambda texts: request.app.state.EMBEDDING_FUNCTION(texts, user=user),
+            embedding_model=f"{request.app.state.config.RAG_EMBEDDING_ENGINE}:{request.app.state.config.RAG_EMBEDDING_MODEL}",
+        )
+
+    return await asyncio.to_thread(leaderboard.get_rankings)
+
+
+@router.post("/leaderboard/rebuild")
+async def rebuild_leaderboard(user=Depends(get_admin_user)):
+    await asyncio.to_thread(leaderboard.invalidate)
+    count = await asyncio.to_thread(leaderboard.rebuild)
+    return {"count": count}
+
+
 class UserResponse(BaseModel):
     id: str
     name: str
@@ -90,6 +134,7 @@ async def get_all_feedbacks(user=Depends(get_admin_user)):
 @router.delete("/feedbacks/all")
 async def delete_all_feedbacks(user=Depends(get_admin_user)):
     success = Feedbacks.delete_all_feedbacks()
+    await asyncio.to_thread(leaderboard.invalidate)
     return success
 
 
@@ -108,6 +153,7 @@ async def get_feedbacks(user=Depends(get_verified_user)):
 @router.delete("/feedbacks", response_model=bool)
 async def delete_feedbacks(user=Depends(get_verified_user)):
     success = Feedbacks.delete_feedbacks_by_user_id(user.id)
+    await asyncio.to_thread(leaderboard.invalidate)
     return success
 
 
@@ -124,6 +170,9 @@ async def create_feedback(
             detail=ERROR_MESSAGES.DEFAULT(),
         )
 
+    await asyncio.to_thread(
+        leaderboard.on_feedback_saved, feedback.id, feedback.data, feedback.created_at
+    )
     return feedback
 
 
@@ -158,6 +207,9 @@ async def update_feedback_by_id(
             status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
         )
 
+    await asyncio.to_thread(
+        leaderboard.on_feedback_saved, feedback.id, feedback.data, feedback.created_at
+    )
     return feedback
 
 
@@ -173,4 +225,5 @@ async def delete_feedback_by_id(id: str, user=Depends(get_verified_user)):
             status_code=status.HTTP_404_NOT_FOUND, detail=ERROR_MESSAGES.NOT_FOUND
         )
 
+    await asyncio.to_thread(leaderboard.on_feedback_deleted, id)
     return success
@@ -31,6 +31,7 @@ from open_webui.models.flux import (
 from open_webui.models.credits import Credits
 from open_webui.utils.credit.utils import check_credit_by_user_id
 from open_webui.utils.flux_api import FluxAPIClient, FluxAPIError
+from open_webui.utils.admission import AdmissionTicket, media_task_admission
 
 
 def replace_flux_response_urls(response: dict, configured_base_url: str) -> dict:
@@ -58,10 +59,22 @@ def replace_flux_response_urls(response: dict, configured_base_url: str) -> dict
 
 
 from open_webui.services.file_manager import get_file_manager
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.logger import provider_log_context
 
 logger = logging.getLogger(__name__)
+logger.setLevel(SRC_LOG_LEVELS["FLUX"])
 
-router = APIRouter(prefix="/flux", tags=["flux"])
+router = APIRouter(
+    prefix="/flux",
+    tags=["flux"],
+    dependencies=[Depends(provider_log_context("flux"))],
+)
+
+# 提交任务前按 max_concurrent_tasks 排队获取名额
+flux_admission = media_task_admission(
+    "flux", lambda: FluxConfigs.get_config().max_concurrent_tasks
+)
 
 # 全局变量存储Flux配置
 flux_config = None
@@ -81,7 +94,7 @@ def get_flux_api_client():
     # TODO: 生产环境可以恢复缓存机制
     flux_client = FluxAPIClient(config)
     flux_config = config
-    print(
+    logger.debug(
         f"🔄 【客户端重建】Created new FluxAPIClient with base_url: {config.base_url}"
     )
 
@@ -420,10 +433,7 @@ async def upload_image_for_flux(
             return FluxUploadResponse(success=False, message=f"上传失败: {message}")
 
     except Exception as e:
-        logger.error(f"Image upload failed: {e}")
-        import traceback
-
-        traceback.print_exc()
+        logger.exception(f"Image upload failed: {e}")
 
         # 提供更详细的错误信息
         error_message = str(e)
@@ -533,6 +543,7 @@ async def create_text_to_image_task(
     request: FluxTextToImageRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(flux_admission),
 ):
     """创建文本生图任务"""
     try:
@@ -608,6 +619,7 @@ async def create_text_to_image_task(
 
         # 启动后台任务轮询状态
         if not request.sync_mode:
+            ticket.bind(task.id)
             background_tasks.add_task(poll_flux_task_status, task.id)
 
         # 积分扣费将在后台任务完成时进行
@@ -645,6 +657,7 @@ async def create_image_to_image_task(
     request: FluxImageToImageRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(flux_admission),
 ):
     """创建单图片生成图片任务"""
     try:
@@ -694,6 +707,7 @@ async def create_image_to_image_task(
 
         # 启动后台任务轮询状态
         if not request.sync_mode:
+            ticket.bind(task.id)
             background_tasks.add_task(poll_flux_task_status, task.id)
 
         logger.info(f"Single image-to-image task created: {task.id}")
@@ -722,6 +736,7 @@ async def create_multi_image_edit_task(
     request: FluxMultiImageRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(flux_admission),
 ):
     """创建多图片编辑任务（实验性功能）"""
     try:
@@ -789,6 +804,7 @@ async def create_multi_image_edit_task(
 
         # 启动后台任务轮询状态
         if not request.sync_mode:
+            ticket.bind(task.id)
             background_tasks.add_task(poll_flux_task_status, task.id)
 
         logger.info(f"Multi-image edit task created: {task.id}")
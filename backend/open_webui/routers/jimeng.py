@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
 from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import logging
 import httpx
 import json
 import asyncio
@@ -15,6 +16,7 @@ import uuid
 
 from open_webui.models.users import Users
 from open_webui.utils.auth import get_verified_user, get_admin_user
+from open_webui.utils.file_response import get_file_response
 from open_webui.config import CACHE_DIR
 import os
 from open_webui.internal.db import get_db
@@ -34,8 +36,23 @@ from open_webui.utils.jimeng import (
     process_jimeng_generation,
 )
 from open_webui.services.file_manager import get_file_manager
+from open_webui.utils.admission import AdmissionTicket, media_task_admission
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.logger import provider_log_context
 
-router = APIRouter(prefix="/jimeng", tags=["jimeng"])
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["JIMENG"])
+
+router = APIRouter(
+    prefix="/jimeng",
+    tags=["jimeng"],
+    dependencies=[Depends(provider_log_context("jimeng"))],
+)
+
+# 提交任务前按 max_concurrent_tasks 排队获取名额
+jimeng_admission = media_task_admission(
+    "jimeng", lambda: JimengConfig.get_config().max_concurrent_tasks
+)
 
 # 全局变量存储即梦配置
 jimeng_config = None
@@ -144,10 +161,7 @@ async def save_jimeng_config(config_data: dict, user=Depends(get_admin_user)):
 
         return {"message": "配置保存成功", "config": config.to_dict()}
     except Exception as e:
-        import traceback
-
-        print(f"Error saving Jimeng config: {e}")
-        traceback.print_exc()
+        log.exception(f"Error saving Jimeng config: {e}")
         raise HTTPException(status_code=500, detail=f"保存配置失败: {str(e)}")
 
 
@@ -183,7 +197,7 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
         if not config:
             raise HTTPException(status_code=400, detail="即梦服务未配置")
 
-        print(
+        log.info(
             f"🎬 【即梦测试】配置检查: enabled={config.enabled}, base_url={config.base_url}, api_key={'***' if config.api_key else 'None'}"
         )
 
@@ -219,14 +233,14 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
         successful_path = None
         test_results = []
 
-        print(
+        log.info(
             f"🎬 【即梦测试】开始智能路径检测，测试 {len(possible_paths)} 种路径模式..."
         )
 
         async with httpx.AsyncClient(timeout=15.0) as http_client:
             for i, path in enumerate(possible_paths):
                 test_url = f"{base_url}{path}"
-                print(
+                log.info(
                     f"🎬 【即梦测试】测试路径 {i+1}/{len(possible_paths)}: {test_url}"
                 )
 
@@ -235,7 +249,7 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
                         test_url, headers=headers, json=test_payload, timeout=10.0
                     )
 
-                    print(f"🎬 【即梦测试】路径 {i+1} 响应: {response.status_code}")
+                    log.info(f"🎬 【即梦测试】路径 {i+1} 响应: {response.status_code}")
 
                     test_results.append(
                         {
@@ -255,7 +269,7 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
                         422,
                     ]:  # 200=成功, 400/422=参数错误但端点存在
                         successful_path = path
-                        print(
+                        log.info(
                             f"✅ 【即梦测试】找到有效路径: {test_url} (状态: {response.status_code})"
                         )
 
@@ -276,9 +290,10 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
                             with get_db() as db:
                                 db.merge(config)
                                 db.commit()
-                            print(f"✅ 【即梦测试】已保存检测到的API路径: {path}")
+                            JimengConfig.invalidate_config_cache()
+                            log.info(f"✅ 【即梦测试】已保存检测到的API路径: {path}")
                         except Exception as save_error:
-                            print(f"⚠️ 【即梦测试】保存API路径失败: {save_error}")
+                            log.warning(f"⚠️ 【即梦测试】保存API路径失败: {save_error}")
 
                         return {
                             "status": status,
@@ -294,7 +309,7 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
                         }
 
                     elif response.status_code == 401:
-                        print(f"🔑 【即梦测试】路径 {i+1} API密钥问题")
+                        log.info(f"🔑 【即梦测试】路径 {i+1} API密钥问题")
                         # 401表示路径正确但密钥有问题，也算找到了路径
                         return {
                             "status": "error",
@@ -311,7 +326,7 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
                         }
 
                     elif response.status_code == 403:
-                        print(f"🚫 【即梦测试】路径 {i+1} 权限问题")
+                        log.info(f"🚫 【即梦测试】路径 {i+1} 权限问题")
                         # 403也表示路径正确但权限不足
                         return {
                             "status": "warning",
@@ -327,28 +342,28 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
                         }
 
                 except httpx.ConnectError as e:
-                    print(f"❌ 【即梦测试】路径 {i+1} 连接错误: {e}")
+                    log.error(f"❌ 【即梦测试】路径 {i+1} 连接错误: {e}")
                     test_results.append(
                         {"path": path, "url": test_url, "error": f"连接错误: {str(e)}"}
                     )
                     continue
 
                 except httpx.TimeoutException as e:
-                    print(f"⏱️ 【即梦测试】路径 {i+1} 超时: {e}")
+                    log.info(f"⏱️ 【即梦测试】路径 {i+1} 超时: {e}")
                     test_results.append(
                         {"path": path, "url": test_url, "error": f"请求超时: {str(e)}"}
                     )
                     continue
 
                 except Exception as e:
-                    print(f"❓ 【即梦测试】路径 {i+1} 其他错误: {e}")
+                    log.error(f"❓ 【即梦测试】路径 {i+1} 其他错误: {e}")
                     test_results.append(
                         {"path": path, "url": test_url, "error": f"请求错误: {str(e)}"}
                     )
                     continue
 
         # 如果所有路径都失败了
-        print(f"❌ 【即梦测试】所有路径测试完毕，未找到有效路径")
+        log.error(f"❌ 【即梦测试】所有路径测试完毕，未找到有效路径")
 
         return {
             "status": "error",
@@ -371,10 +386,7 @@ async def test_jimeng_connection(user=Depends(get_admin_user)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【即梦测试】系统错误: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【即梦测试】系统错误: {e}")
         raise HTTPException(status_code=500, detail=f"连接测试失败: {str(e)}")
 
 
@@ -412,7 +424,7 @@ async def parse_content_for_jimeng(
                     if img_url and not image_url:  # 只取第一个图片
                         # 检查是否是base64数据URL
                         if img_url.startswith("data:image/"):
-                            print(
+                            log.info(
                                 f"🎬 【即梦content解析】检测到base64图片数据，上传到云存储..."
                             )
                             try:
@@ -460,14 +472,14 @@ async def parse_content_for_jimeng(
 
                                 if success and file_record and file_record.cloud_url:
                                     image_url = file_record.cloud_url
-                                    print(
+                                    log.info(
                                         f"✅ 【即梦content解析】图片上传云存储成功，URL: {image_url}"
                                     )
                                 else:
                                     raise Exception(f"云存储上传失败: {message}")
 
                             except Exception as convert_error:
-                                print(
+                                log.error(
                                     f"❌ 【即梦content解析】图片上传失败: {convert_error}"
                                 )
                                 # 转换失败时，保持原始URL，后续处理会报错
@@ -485,22 +497,23 @@ async def submit_text_to_video_task(
     background_tasks: BackgroundTasks,
     http_request: Request,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(jimeng_admission),
 ):
     """提交文生视频任务"""
     try:
-        print(f"🎬 【即梦后端】收到文生视频请求: 用户={user.id}")
+        log.info(f"🎬 【即梦后端】收到文生视频请求: 用户={user.id}")
 
         # 解析content数组或使用现有prompt
         parsed_prompt, parsed_image_url = await request.get_parsed_content(
             user.id, http_request
         )
-        print(
+        log.info(
             f"🎬 【即梦后端】解析后的内容: prompt={parsed_prompt[:50]}..., image_url={parsed_image_url}"
         )
 
         # 如果解析到了图片URL，这实际上是图生视频任务
         if parsed_image_url:
-            print(f"🎬 【即梦后端】检测到图片URL，转为图生视频任务")
+            log.info(f"🎬 【即梦后端】检测到图片URL，转为图生视频任务")
             # 更新请求对象
             request.prompt = parsed_prompt
             request.image_url = parsed_image_url
@@ -509,8 +522,9 @@ async def submit_text_to_video_task(
             task = await process_jimeng_generation(
                 user_id=user.id, request=request, action="IMAGE_TO_VIDEO"
             )
+            ticket.bind(task.id)
 
-            print(f"🎬 【即梦后端】图生视频任务创建成功: {task.id}")
+            log.info(f"🎬 【即梦后端】图生视频任务创建成功: {task.id}")
             return {
                 "success": True,
                 "task_id": task.id,
@@ -518,7 +532,7 @@ async def submit_text_to_video_task(
             }
         # 如果有base64图片数据但没有图片URL，上传到云存储获取公网URL
         elif request.image and not request.image_url:
-            print(f"🎬 【即梦后端】检测到base64图片数据，转为图生视频任务...")
+            log.info(f"🎬 【即梦后端】检测到base64图片数据，转为图生视频任务...")
             try:
                 import base64
                 import uuid
@@ -563,7 +577,7 @@ async def submit_text_to_video_task(
                 if success and file_record and file_record.cloud_url:
                     request.image_url = file_record.cloud_url
                     request.prompt = parsed_prompt
-                    print(
+                    log.info(
                         f"✅ 【即梦后端】图片上传云存储成功，URL: {request.image_url}"
                     )
 
@@ -574,8 +588,9 @@ async def submit_text_to_video_task(
                     task = await process_jimeng_generation(
                         user_id=user.id, request=request, action="IMAGE_TO_VIDEO"
                     )
+                    ticket.bind(task.id)
 
-                    print(f"🎬 【即梦后端】图生视频任务创建成功: {task.id}")
+                    log.info(f"🎬 【即梦后端】图生视频任务创建成功: {task.id}")
                     return {
                         "success": True,
                         "task_id": task.id,
@@ -585,24 +600,25 @@ async def submit_text_to_video_task(
                     raise Exception(f"云存储上传失败: {message}")
 
             except Exception as convert_error:
-                print(f"❌ 【即梦后端】图片上传失败: {convert_error}")
+                log.error(f"❌ 【即梦后端】图片上传失败: {convert_error}")
                 raise HTTPException(
                     status_code=400, detail=f"图片上传失败: {str(convert_error)}"
                 )
         else:
             # 纯文生视频任务
             request.prompt = parsed_prompt
-            print(
+            log.info(
                 f"🎬 【即梦后端】文生视频任务参数: prompt={request.prompt[:50]}..., duration={request.duration}"
             )
 
             # 使用工具函数处理任务
-            print(f"🎬 【即梦后端】开始处理文生视频任务...")
+            log.info(f"🎬 【即梦后端】开始处理文生视频任务...")
             task = await process_jimeng_generation(
                 user_id=user.id, request=request, action="TEXT_TO_VIDEO"
             )
+            ticket.bind(task.id)
 
-            print(f"🎬 【即梦后端】任务创建成功: {task.id}")
+            log.info(f"🎬 【即梦后端】任务创建成功: {task.id}")
             return {
                 "success": True,
                 "task_id": task.id,
@@ -612,10 +628,7 @@ async def submit_text_to_video_task(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【即梦后端】文生视频任务提交失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【即梦后端】文生视频任务提交失败: {e}")
 
         # 检查是否是即梦API错误，提供友好提示
         error_message = str(e)
@@ -645,16 +658,17 @@ async def submit_image_to_video_task(
     background_tasks: BackgroundTasks,
     http_request: Request,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(jimeng_admission),
 ):
     """提交图生视频任务"""
     try:
-        print(f"🎬 【即梦后端】收到图生视频请求: 用户={user.id}")
+        log.info(f"🎬 【即梦后端】收到图生视频请求: 用户={user.id}")
 
         # 解析content数组或使用现有prompt和image_url
         parsed_prompt, parsed_image_url = await request.get_parsed_content(
             user.id, http_request
         )
-        print(
+        log.info(
             f"🎬 【即梦后端】解析后的内容: prompt={parsed_prompt[:50]}..., image_url={parsed_image_url}"
         )
 
@@ -664,20 +678,20 @@ async def submit_image_to_video_task(
         if parsed_image_url:
             request.image_url = parsed_image_url
 
-        print(
+        log.info(
             f"🎬 【即梦后端】请求参数: prompt={request.prompt[:50] if request.prompt else ''}..., duration={request.duration}"
         )
 
         # 验证图生视频必需参数
         if not request.image_url and not request.image:
-            print("❌ 【即梦后端】缺少输入图片")
+            log.error("❌ 【即梦后端】缺少输入图片")
             raise HTTPException(
                 status_code=400, detail="图生视频需要输入图片URL或图片数据"
             )
 
         # 如果提供的是base64图片数据，上传到云存储获取公网URL
         if request.image and not request.image_url:
-            print(f"🎬 【即梦后端】检测到base64图片数据，上传到云存储...")
+            log.info(f"🎬 【即梦后端】检测到base64图片数据，上传到云存储...")
             try:
                 import base64
                 import uuid
@@ -721,7 +735,7 @@ async def submit_image_to_video_task(
 
                 if success and file_record and file_record.cloud_url:
                     request.image_url = file_record.cloud_url
-                    print(
+                    log.info(
                         f"✅ 【即梦后端】图片上传云存储成功，URL: {request.image_url}"
                     )
 
@@ -731,27 +745,25 @@ async def submit_image_to_video_task(
                     raise Exception(f"云存储上传失败: {message}")
 
             except Exception as convert_error:
-                print(f"❌ 【即梦后端】图片上传失败: {convert_error}")
+                log.error(f"❌ 【即梦后端】图片上传失败: {convert_error}")
                 raise HTTPException(
                     status_code=400, detail=f"图片上传失败: {str(convert_error)}"
                 )
 
         # 使用工具函数处理任务
-        print(f"🎬 【即梦后端】开始处理图生视频任务...")
+        log.info(f"🎬 【即梦后端】开始处理图生视频任务...")
         task = await process_jimeng_generation(
             user_id=user.id, request=request, action="IMAGE_TO_VIDEO"
         )
+        ticket.bind(task.id)
 
-        print(f"🎬 【即梦后端】任务创建成功: {task.id}")
+        log.info(f"🎬 【即梦后端】任务创建成功: {task.id}")
         return {"success": True, "task_id": task.id, "message": "图生视频任务提交成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【即梦后端】图生视频任务提交失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【即梦后端】图生视频任务提交失败: {e}")
 
         # 检查是否是即梦API错误，提供友好提示
         error_message = str(e)
@@ -782,41 +794,50 @@ async def submit_image_to_video_task(
 async def get_jimeng_task_status(task_id: str, user=Depends(get_verified_user)):
     """获取任务状态"""
     try:
-        print(f"🎬 【即梦API】获取任务状态: {task_id}, 用户: {user.id}")
+        log.info(
+            f"🎬 【即梦API】获取任务状态: {task_id}, 用户: {user.id}",
+            extra={"sampled": True},
+        )
 
         # 先查本地数据库
         task = JimengTask.get_task_by_id(task_id)
-        print(
-            f"🎬 【即梦API】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}"
+        log.info(
+            f"🎬 【即梦API】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}",
+            extra={"sampled": True},
         )
 
         # 验证任务所有权
         if not task:
-            print(f"❌ 【即梦API】任务不存在: {task_id}")
+            log.error(f"❌ 【即梦API】任务不存在: {task_id}")
             raise HTTPException(status_code=404, detail="任务不存在")
 
         if task.user_id != user.id:
-            print(
+            log.error(
                 f"❌ 【即梦API】无权访问任务: 任务用户={task.user_id}, 请求用户={user.id}"
             )
             raise HTTPException(status_code=404, detail="无权访问此任务")
 
         # 如果任务已完成，直接返回
         if task.status in ["succeed", "failed"]:
-            print(f"🎬 【即梦API】任务已完成: {task.id}")
+            log.info(f"🎬 【即梦API】任务已完成: {task.id}", extra={"sampled": True})
             return task.to_dict()
 
         # 如果任务未完成且有external_task_id，查询即梦API获取最新状态
         if task.external_task_id and task.status not in ["succeed", "failed"]:
             try:
-                print(f"🎬 【即梦API】查询即梦API获取最新状态: {task.external_task_id}")
+                log.info(
+                    f"🎬 【即梦API】查询即梦API获取最新状态: {task.external_task_id}",
+                    extra={"sampled": True},
+                )
 
                 # 获取即梦客户端
                 client = get_jimeng_client()
 
                 # 查询远程任务状态
                 api_result = await client.query_task(task.external_task_id)
-                print(f"🎬 【即梦API】API查询结果: {api_result}")
+                log.info(
+                    f"🎬 【即梦API】API查询结果: {api_result}", extra={"sampled": True}
+                )
 
                 if api_result.get("code") == "success":
                     api_data = api_result.get("data", {})
@@ -838,7 +859,10 @@ async def get_jimeng_task_status(task_id: str, user=Depends(get_verified_user)):
 
                             if video_url:
                                 db_task.video_url = video_url
-                                print(f"✅ 【即梦API】更新视频URL: {video_url}")
+                                log.info(
+                                    f"✅ 【即梦API】更新视频URL: {video_url}",
+                                    extra={"sampled": True},
+                                )
 
                             if fail_reason:
                                 db_task.fail_reason = fail_reason
@@ -878,40 +902,39 @@ async def get_jimeng_task_status(task_id: str, user=Depends(get_verified_user)):
                                         # 更新任务记录中的云存储URL
                                         db_task.cloud_video_url = file_record.cloud_url
                                         db.commit()
-                                        print(
-                                            f"☁️ 【云存储】即梦视频上传成功，已更新URL: {task_id}"
+                                        log.info(
+                                            f"☁️ 【云存储】即梦视频上传成功，已更新URL: {task_id}",
+                                            extra={"sampled": True},
                                         )
                                     else:
-                                        print(
+                                        log.error(
                                             f"☁️ 【云存储】即梦视频上传失败: {task_id} - {message}"
                                         )
                                 except Exception as upload_error:
-                                    print(
+                                    log.error(
                                         f"☁️ 【云存储】即梦自动上传异常: {task_id} - {upload_error}"
                                     )
 
                             # 返回更新后的任务
                             return db_task.to_dict()
                 else:
-                    print(
-                        f"⚠️ 【即梦API】API查询失败: {api_result.get('message', '未知错误')}"
+                    log.warning(
+                        f"⚠️ 【即梦API】API查询失败: {api_result.get('message', '未知错误')}",
+                        extra={"sampled": True},
                     )
 
             except Exception as e:
-                print(f"❌ 【即梦API】查询API状态失败: {e}")
+                log.error(f"❌ 【即梦API】查询API状态失败: {e}")
                 # 即使查询失败，也返回本地状态
 
         # 返回当前本地状态
-        print(f"🎬 【即梦API】返回本地任务状态")
+        log.info(f"🎬 【即梦API】返回本地任务状态", extra={"sampled": True})
         return task.to_dict()
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【即梦API】获取任务状态失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【即梦API】获取任务状态失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取任务状态失败: {str(e)}")
 
 
@@ -1061,7 +1084,7 @@ async def admin_cleanup_old_tasks(days: int = 30, user=Depends(get_admin_user)):
 
 
 @router.get("/temp-image/{filename}")
-async def serve_temp_image(filename: str):
+async def serve_temp_image(filename: str, request: Request):
     """提供临时图片文件 - 无需认证，供即梦API访问"""
     try:
         # 安全检查：只允许访问即梦临时图片目录
@@ -1080,11 +1103,14 @@ async def serve_temp_image(filename: str):
         if not os.path.isfile(file_path):
             raise HTTPException(status_code=404, detail="File not found")
 
-        print(f"🎬 【即梦临时文件】提供文件: {file_path}")
-        return FileResponse(file_path)
+        log.info(f"🎬 【即梦临时文件】提供文件: {file_path}")
+        # 临时文件名唯一且内容不变，允许客户端/代理缓存并支持 Range 请求
+        return get_file_response(
+            request.headers, file_path, cache_control="public, max-age=3600"
+        )
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【即梦临时文件】服务文件失败: {e}")
+        log.error(f"❌ 【即梦临时文件】服务文件失败: {e}")
         raise HTTPException(status_code=500, detail="Failed to serve file")
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import logging
 import httpx
 import json
 import asyncio
@@ -33,8 +34,23 @@ from open_webui.utils.kling import (
     process_kling_generation,
 )
 from open_webui.services.file_manager import get_file_manager
+from open_webui.utils.admission import AdmissionTicket, media_task_admission
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.logger import provider_log_context, set_log_context
 
-router = APIRouter(prefix="/kling", tags=["kling"])
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["KLING"])
+
+router = APIRouter(
+    prefix="/kling",
+    tags=["kling"],
+    dependencies=[Depends(provider_log_context("kling"))],
+)
+
+# 提交任务前按 max_concurrent_tasks 排队获取名额
+kling_admission = media_task_admission(
+    "kling", lambda: KlingConfig.get_config().max_concurrent_tasks
+)
 
 # 全局变量存储可灵配置
 kling_config = None
@@ -162,10 +178,7 @@ async def save_kling_config(config_data: dict, user=Depends(get_admin_user)):
 
         return {"message": "配置保存成功", "config": config.to_dict()}
     except Exception as e:
-        import traceback
-
-        print(f"Error saving Kling config: {e}")
-        traceback.print_exc()
+        log.exception(f"Error saving Kling config: {e}")
         raise HTTPException(status_code=500, detail=f"保存配置失败: {str(e)}")
 
 
@@ -201,7 +214,7 @@ async def test_kling_connection(user=Depends(get_admin_user)):
         if not config:
             raise HTTPException(status_code=400, detail="可灵服务未配置")
 
-        print(
+        log.info(
             f"🎬 【可灵测试】配置检查: enabled={config.enabled}, base_url={config.base_url}, api_key={'***' if config.api_key else 'None'}"
         )
 
@@ -237,14 +250,14 @@ async def test_kling_connection(user=Depends(get_admin_user)):
         successful_path = None
         test_results = []
 
-        print(
+        log.info(
             f"🎬 【可灵测试】开始智能路径检测，测试 {len(possible_paths)} 种路径模式..."
         )
 
         async with httpx.AsyncClient(timeout=15.0) as http_client:
             for i, path in enumerate(possible_paths):
                 test_url = f"{base_url}{path}"
-                print(
+                log.info(
                     f"🎬 【可灵测试】测试路径 {i+1}/{len(possible_paths)}: {test_url}"
                 )
 
@@ -253,7 +266,7 @@ async def test_kling_connection(user=Depends(get_admin_user)):
                         test_url, headers=headers, json=test_payload, timeout=10.0
                     )
 
-                    print(f"🎬 【可灵测试】路径 {i+1} 响应: {response.status_code}")
+                    log.info(f"🎬 【可灵测试】路径 {i+1} 响应: {response.status_code}")
 
                     test_results.append(
                         {
@@ -273,7 +286,7 @@ async def test_kling_connection(user=Depends(get_admin_user)):
                         422,
                     ]:  # 200=成功, 400/422=参数错误但端点存在
                         successful_path = path
-                        print(
+                        log.info(
                             f"✅ 【可灵测试】找到有效路径: {test_url} (状态: {response.status_code})"
                         )
 
@@ -294,9 +307,10 @@ async def test_kling_connection(user=Depends(get_admin_user)):
                             with get_db() as db:
                                 db.merge(config)
                                 db.commit()
-                            print(f"✅ 【可灵测试】已保存检测到的API路径: {path}")
+                            KlingConfig.invalidate_config_cache()
+                            log.info(f"✅ 【可灵测试】已保存检测到的API路径: {path}")
                         except Exception as save_error:
-                            print(f"⚠️ 【可灵测试】保存API路径失败: {save_error}")
+                            log.warning(f"⚠️ 【可灵测试】保存API路径失败: {save_error}")
 
                         return {
                             "status": status,
@@ -312,7 +326,7 @@ async def test_kling_connection(user=Depends(get_admin_user)):
                         }
 
                     elif response.status_code == 401:
-                        print(f"🔑 【可灵测试】路径 {i+1} API密钥问题")
+                        log.info(f"🔑 【可灵测试】路径 {i+1} API密钥问题")
                         # 401表示路径正确但密钥有问题，也算找到了路径
                         return {
                             "status": "error",
@@ -329,7 +343,7 @@ async def test_kling_connection(user=Depends(get_admin_user)):
                         }
 
                     elif response.status_code == 403:
-                        print(f"🚫 【可灵测试】路径 {i+1} 权限问题")
+                        log.info(f"🚫 【可灵测试】路径 {i+1} 权限问题")
                         # 403也表示路径正确但权限不足
                         return {
                             "status": "warning",
@@ -345,28 +359,28 @@ async def test_kling_connection(user=Depends(get_admin_user)):
                         }
 
                 except httpx.ConnectError as e:
-                    print(f"❌ 【可灵测试】路径 {i+1} 连接错误: {e}")
+                    log.error(f"❌ 【可灵测试】路径 {i+1} 连接错误: {e}")
                     test_results.append(
                         {"path": path, "url": test_url, "error": f"连接错误: {str(e)}"}
                     )
                     continue
 
                 except httpx.TimeoutException as e:
-                    print(f"⏱️ 【可灵测试】路径 {i+1} 超时: {e}")
+                    log.info(f"⏱️ 【可灵测试】路径 {i+1} 超时: {e}")
                     test_results.append(
                         {"path": path, "url": test_url, "error": f"请求超时: {str(e)}"}
                     )
                     continue
 
                 except Exception as e:
-                    print(f"❓ 【可灵测试】路径 {i+1} 其他错误: {e}")
+                    log.error(f"❓ 【可灵测试】路径 {i+1} 其他错误: {e}")
                     test_results.append(
                         {"path": path, "url": test_url, "error": f"请求错误: {str(e)}"}
                     )
                     continue
 
         # 如果所有路径都失败了
-        print(f"❌ 【可灵测试】所有路径测试完毕，未找到有效路径")
+        log.error(f"❌ 【可灵测试】所有路径测试完毕，未找到有效路径")
 
         return {
             "status": "error",
@@ -389,10 +403,7 @@ async def test_kling_connection(user=Depends(get_admin_user)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【可灵测试】系统错误: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【可灵测试】系统错误: {e}")
         raise HTTPException(status_code=500, detail=f"连接测试失败: {str(e)}")
 
 
@@ -404,36 +415,35 @@ async def submit_text_to_video_task(
     request: KlingGenerateRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(kling_admission),
 ):
     """提交文生视频任务"""
     try:
-        print(f"🎬 【可灵后端】收到文生视频请求: 用户={user.id}")
-        print(
+        log.info(f"🎬 【可灵后端】收到文生视频请求: 用户={user.id}")
+        log.info(
             f"🎬 【可灵后端】请求参数: model={request.model_name}, prompt={request.prompt[:50]}..., mode={request.mode}, duration={request.duration}"
         )
-        print(
+        log.info(
             f"🎬 【可灵后端】其他参数: aspect_ratio={request.aspect_ratio}, cfg_scale={request.cfg_scale}"
         )
 
         # 使用工具函数处理任务
-        print(f"🎬 【可灵后端】开始处理文生视频任务...")
+        log.info(f"🎬 【可灵后端】开始处理文生视频任务...")
         task = await process_kling_generation(
             user_id=user.id, request=request, action="TEXT_TO_VIDEO"
         )
 
         # 添加后台轮询任务
+        ticket.bind(task.id)
         background_tasks.add_task(poll_kling_task_status, task.id, user.id)
 
-        print(f"🎬 【可灵后端】任务创建成功: {task.id}")
+        log.info(f"🎬 【可灵后端】任务创建成功: {task.id}")
         return {"success": True, "task_id": task.id, "message": "文生视频任务提交成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【可灵后端】文生视频任务提交失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【可灵后端】文生视频任务提交失败: {e}")
         raise HTTPException(status_code=500, detail=f"提交文生视频任务失败: {str(e)}")
 
 
@@ -442,55 +452,54 @@ async def submit_image_to_video_task(
     request: KlingGenerateRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(kling_admission),
 ):
     """提交图生视频任务"""
     try:
-        print(f"🎬 【可灵后端】收到图生视频请求: 用户={user.id}")
-        print(
+        log.info(f"🎬 【可灵后端】收到图生视频请求: 用户={user.id}")
+        log.info(
             f"🎬 【可灵后端】请求参数: model={request.model_name}, prompt={request.prompt[:50]}..., mode={request.mode}, duration={request.duration}"
         )
-        print(
+        log.info(
             f"🎬 【可灵后端】输入图片: {len(request.image) if request.image else 0}字符"
         )
         if request.dynamic_masks:
-            print(f"🎬 【可灵后端】动态笔刷: {len(request.dynamic_masks)}组")
+            log.info(f"🎬 【可灵后端】动态笔刷: {len(request.dynamic_masks)}组")
 
         # 验证输入图片
         if not request.image:
-            print("❌ 【可灵后端】缺少输入图片")
+            log.error("❌ 【可灵后端】缺少输入图片")
             raise HTTPException(status_code=400, detail="图生视频需要输入图片")
 
         # 验证图片数据基本格式
         image_data = request.image.strip()
         if len(image_data) < 100:
-            print(f"❌ 【可灵后端】图片数据太短: {len(image_data)}字符")
+            log.error(f"❌ 【可灵后端】图片数据太短: {len(image_data)}字符")
             raise HTTPException(
                 status_code=400, detail=f"图片数据太短: {len(image_data)}字符"
             )
 
         # 记录图片数据前缀用于调试
         prefix = image_data[:50] if len(image_data) > 50 else image_data
-        print(f"🎬 【可灵后端】图片数据前缀: {prefix}...")
+        log.info(f"🎬 【可灵后端】图片数据前缀: {prefix}...")
 
         # 使用工具函数处理任务
-        print(f"🎬 【可灵后端】开始处理图生视频任务...")
+        log.info(f"🎬 【可灵后端】开始处理图生视频任务...")
         task = await process_kling_generation(
             user_id=user.id, request=request, action="IMAGE_TO_VIDEO"
         )
 
         # 添加后台轮询任务
+        ticket.bind(task.id)
         background_tasks.add_task(poll_kling_task_status, task.id, user.id)
 
-        print(f"🎬 【可灵后端】任务创建成功: {task.id}")
+        log.info(f"🎬 【可灵后端】任务创建成功: {task.id}")
         return {"success": True, "task_id": task.id, "message": "图生视频任务提交成功"}
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【可灵后端】图生视频任务提交失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【可灵后端】图生视频任务提交失败: {e}")
         raise HTTPException(status_code=500, detail=f"提交图生视频任务失败: {str(e)}")
 
 
@@ -501,59 +510,73 @@ async def submit_image_to_video_task(
 async def get_kling_task_status(task_id: str, user=Depends(get_verified_user)):
     """获取任务状态"""
     try:
-        print(f"🎬 【可灵API】获取任务状态: {task_id}, 用户: {user.id}")
+        log.info(
+            f"🎬 【可灵API】获取任务状态: {task_id}, 用户: {user.id}",
+            extra={"sampled": True},
+        )
 
         # 先查本地数据库
         task = KlingTask.get_task_by_id(task_id)
-        print(
-            f"🎬 【可灵API】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}"
+        log.info(
+            f"🎬 【可灵API】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}",
+            extra={"sampled": True},
         )
 
         # 验证任务所有权
         if not task:
-            print(f"❌ 【可灵API】任务不存在: {task_id}")
+            log.error(f"❌ 【可灵API】任务不存在: {task_id}")
             raise HTTPException(status_code=404, detail="任务不存在")
 
         if task.user_id != user.id:
-            print(
+            log.error(
                 f"❌ 【可灵API】无权访问任务: 任务用户={task.user_id}, 请求用户={user.id}"
             )
             raise HTTPException(status_code=404, detail="无权访问此任务")
 
         # 如果任务已完成，直接返回
         if task.status in ["succeed", "failed"]:
-            print(f"🎬 【可灵API】任务已完成: {task.id}")
+            log.info(f"🎬 【可灵API】任务已完成: {task.id}", extra={"sampled": True})
             return task.to_dict()
 
         # 如果任务还在进行中，可以选择查询远程状态
         # 注意：可灵API查询需要external_task_id
         if task.external_task_id is not None and task.external_task_id != "":
             try:
-                print(f"🔍 【可灵API】查询远程状态: {task.external_task_id}")
+                log.debug(
+                    f"🔍 【可灵API】查询远程状态: {task.external_task_id}",
+                    extra={"sampled": True},
+                )
                 client = get_kling_client()
                 remote_status = await client.query_task(task.external_task_id)
-                print(f"📡 【可灵API】远程响应: {str(remote_status)[:200]}...")
+                log.info(
+                    f"📡 【可灵API】远程响应: {str(remote_status)[:200]}...",
+                    extra={"sampled": True},
+                )
                 task.update_from_api_response(remote_status)
-                print(f"🎬 【可灵API】更新远程状态成功: {task.status}")
+                log.info(
+                    f"🎬 【可灵API】更新远程状态成功: {task.status}",
+                    extra={"sampled": True},
+                )
             except Exception as e:
-                print(f"⚠️ 【可灵API】查询远程状态失败: {e}")
-                import traceback
-
-                traceback.print_exc()
+                log.warning(
+                    f"⚠️ 【可灵API】查询远程状态失败: {e}",
+                    exc_info=True,
+                    extra={"sampled": True},
+                )
                 # 查询失败不影响返回本地状态
 
-        print(f"📤 【可灵API】准备返回任务状态")
+        log.info(f"📤 【可灵API】准备返回任务状态", extra={"sampled": True})
         result = task.to_dict()
-        print(f"✅ 【可灵API】任务状态序列化成功，包含 {len(result)} 个字段")
+        log.info(
+            f"✅ 【可灵API】任务状态序列化成功，包含 {len(result)} 个字段",
+            extra={"sampled": True},
+        )
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【可灵API】获取任务状态失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【可灵API】获取任务状态失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取任务状态失败: {str(e)}")
 
 
@@ -704,13 +727,14 @@ async def admin_cleanup_old_tasks(days: int = 30, user=Depends(get_admin_user)):
 
 async def poll_kling_task_status(task_id: str, user_id: str):
     """后台轮询可灵任务状态"""
+    set_log_context(provider="kling", task_id=task_id, user_id=user_id)
     import asyncio
     from open_webui.models.kling import KlingTask
 
     max_attempts = 60  # 最多轮询60次
     interval = 10  # 每10秒轮询一次
 
-    print(f"🚀 【可灵轮询】开始后台轮询任务 {task_id}")
+    log.info(f"🚀 【可灵轮询】开始后台轮询任务 {task_id}")
 
     for attempt in range(1, max_attempts + 1):
         try:
@@ -719,12 +743,15 @@ async def poll_kling_task_status(task_id: str, user_id: str):
             # 获取任务
             task = KlingTask.get_task_by_id(task_id)
             if not task:
-                print(f"❌ 【可灵轮询】任务 {task_id} 不存在")
+                log.error(f"❌ 【可灵轮询】任务 {task_id} 不存在")
                 break
 
             # 检查任务是否已完成
             if task.status in ["succeed", "failed"]:
-                print(f"✅ 【可灵轮询】任务 {task_id} 已完成: {task.status}")
+                log.info(
+                    f"✅ 【可灵轮询】任务 {task_id} 已完成: {task.status}",
+                    extra={"sampled": True},
+                )
 
                 # 🔥 检查本地已完成任务是否需要上传
                 if task.status == "succeed" and task.video_url:
@@ -769,19 +796,21 @@ async def poll_kling_task_status(task_id: str, user_id: str):
                                             file_record.cloud_url
                                         )
                                         db.commit()
-                                    print(
-                                        f"☁️ 【云存储】可灵本地检查视频上传成功，已更新URL: {task_id}"
+                                    log.info(
+                                        f"☁️ 【云存储】可灵本地检查视频上传成功，已更新URL: {task_id}",
+                                        extra={"sampled": True},
                                     )
                                 else:
-                                    print(
+                                    log.error(
                                         f"☁️ 【云存储】可灵本地检查视频上传失败: {task_id} - {message}"
                                     )
                             else:
-                                print(
-                                    f"☁️ 【云存储】可灵视频已存在，跳过上传: {task_id}"
+                                log.warning(
+                                    f"☁️ 【云存储】可灵视频已存在，跳过上传: {task_id}",
+                                    extra={"sampled": True},
                                 )
                     except Exception as upload_error:
-                        print(
+                        log.error(
                             f"☁️ 【云存储】可灵本地检查自动上传异常: {task_id} - {upload_error}"
                         )
 
@@ -792,8 +821,9 @@ async def poll_kling_task_status(task_id: str, user_id: str):
                 try:
                     client = get_kling_client()
                     remote_status = await client.query_task(task.external_task_id)
-                    print(
-                        f"📡 【可灵轮询】轮询 {attempt}/{max_attempts} - 任务 {task_id} 远程状态: {remote_status.get('data', {}).get('task_status', 'unknown')}"
+                    log.info(
+                        f"📡 【可灵轮询】轮询 {attempt}/{max_attempts} - 任务 {task_id} 远程状态: {remote_status.get('data', {}).get('task_status', 'unknown')}",
+                        extra={"sampled": True},
                     )
 
                     # 更新任务状态
@@ -801,8 +831,9 @@ async def poll_kling_task_status(task_id: str, user_id: str):
 
                     # 检查是否完成
                     if task.status in ["succeed", "failed"]:
-                        print(
-                            f"🎯 【可灵轮询】任务 {task_id} 状态更新为: {task.status}"
+                        log.info(
+                            f"🎯 【可灵轮询】任务 {task_id} 状态更新为: {task.status}",
+                            extra={"sampled": True},
                         )
 
                         # 🔥 如果任务成功且有视频URL，自动上传到云存储
@@ -845,36 +876,41 @@ async def poll_kling_task_status(task_id: str, user_id: str):
                                                 file_record.cloud_url
                                             )
                                             db.commit()
-                                        print(
-                                            f"☁️ 【云存储】可灵视频上传成功，已更新URL: {task_id}"
+                                        log.info(
+                                            f"☁️ 【云存储】可灵视频上传成功，已更新URL: {task_id}",
+                                            extra={"sampled": True},
                                         )
                                     else:
-                                        print(
+                                        log.error(
                                             f"☁️ 【云存储】可灵视频上传失败: {task_id} - {message}"
                                         )
                             except Exception as upload_error:
-                                print(
+                                log.error(
                                     f"☁️ 【云存储】可灵自动上传异常: {task_id} - {upload_error}"
                                 )
 
                         break
 
                 except Exception as e:
-                    print(
-                        f"⚠️ 【可灵轮询】轮询任务 {task_id} 第 {attempt} 次查询失败: {e}"
+                    log.warning(
+                        f"⚠️ 【可灵轮询】轮询任务 {task_id} 第 {attempt} 次查询失败: {e}",
+                        extra={"sampled": True},
                     )
                     # 查询失败不中断轮询
                     continue
             else:
-                print(f"⚠️ 【可灵轮询】任务 {task_id} 缺少external_task_id，跳过轮询")
+                log.warning(
+                    f"⚠️ 【可灵轮询】任务 {task_id} 缺少external_task_id，跳过轮询",
+                    extra={"sampled": True},
+                )
                 break
 
         except Exception as e:
-            print(f"❌ 【可灵轮询】轮询任务 {task_id} 第 {attempt} 次出错: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"❌ 【可灵轮询】轮询任务 {task_id} 第 {attempt} 次出错: {e}")
             # 出错不中断轮询
             continue
 
-    print(f"🏁 【可灵轮询】任务 {task_id} 轮询结束，共 {attempt} 次")
+    log.info(
+        f"🏁 【可灵轮询】任务 {task_id} 轮询结束，共 {attempt} 次",
+        extra={"sampled": True},
+    )
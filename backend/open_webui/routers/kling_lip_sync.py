@@ -21,11 +21,17 @@ from open_webui.utils.auth import get_current_user, get_admin_user
 from open_webui.utils.kling_lip_sync import kling_lip_sync_service
 from open_webui.models.credits import Credits, AddCreditForm, SetCreditFormDetail
 from open_webui.services.file_manager import get_file_manager
+from open_webui.utils.admission import AdmissionTicket, media_task_admission
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 对口型配置没有并发上限，使用 MEDIA_TASK_DEFAULT_MAX_CONCURRENCY
+lip_sync_admission = media_task_admission(
+    "kling_lip_sync", lambda: None, get_user=get_current_user
+)
+
 # ======================== URL验证函数 ========================
 
 
@@ -299,7 +305,9 @@ async def get_user_kling_lip_sync_config(
 
 @router.post("/submit")
 async def submit_kling_lip_sync_task(
-    request: KlingLipSyncRequestModel, user=Depends(get_current_user)
+    request: KlingLipSyncRequestModel,
+    user=Depends(get_current_user),
+    ticket: AdmissionTicket = Depends(lip_sync_admission),
 ) -> TaskSubmitResponse:
     """提交对口型任务"""
     try:
@@ -413,6 +421,7 @@ async def submit_kling_lip_sync_task(
                     "properties": {"external_task_id": result.get("external_task_id")},
                 }
                 KlingLipSyncTasks.update_task(task_id, updates)
+                ticket.bind(task_id)
                 logger.info(f"🎬 【可灵对口型用户】任务提交成功: {task_id}")
 
                 return TaskSubmitResponse(
@@ -7,9 +7,11 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import logging
 import httpx
 import json
 import asyncio
+import time
 from datetime import datetime, timedelta
 import uuid
 
@@ -34,8 +36,27 @@ from open_webui.utils.midjourney import (
     validate_user_credits,
 )
 from open_webui.services.file_manager import get_file_manager
+from open_webui.utils.task_events import iter_task_events, task_event_bus
+from open_webui.utils.admission import AdmissionTicket, media_task_admission
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.logger import provider_log_context, set_log_context
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MIDJOURNEY"])
+
+router = APIRouter(
+    prefix="/midjourney",
+    tags=["midjourney"],
+    dependencies=[Depends(provider_log_context("midjourney"))],
+)
+
+MJ_FINISHED_STATUSES = ("SUCCESS", "FAILURE", "FAILED")
+MJ_STREAM_MAX_DURATION = 600  # 单次任务流最长 10 分钟
 
-router = APIRouter(prefix="/midjourney", tags=["midjourney"])
+# 提交任务前按 max_concurrent_tasks 排队获取名额
+mj_admission = media_task_admission(
+    "midjourney", lambda: MJConfig.get_config().max_concurrent_tasks
+)
 
 # 全局变量存储MJ配置
 mj_config = None
@@ -149,10 +170,7 @@ async def save_mj_config(config_data: dict, user=Depends(get_admin_user)):
             "config": config.to_dict(),
         }
     except Exception as e:
-        import traceback
-
-        print(f"Error saving MJ config: {e}")
-        traceback.print_exc()
+        log.exception(f"Error saving MJ config: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to save configuration: {str(e)}"
         )
@@ -217,6 +235,7 @@ async def submit_imagine_task(
     request: MJGenerateRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(mj_admission),
 ):
     """提交文生图任务"""
     try:
@@ -244,14 +263,16 @@ async def submit_imagine_task(
 
         # 如果有参考图片，添加到请求中
         if request.reference_images:
-            print(f"🖼️ 【后端调试】准备发送 {len(request.reference_images)} 张参考图片")
+            log.debug(
+                f"🖼️ 【后端调试】准备发送 {len(request.reference_images)} 张参考图片"
+            )
 
             # 检查每张图片的数据
             for i, img in enumerate(request.reference_images):
                 base64_preview = (
                     img.base64[:50] + "..." if len(img.base64) > 50 else img.base64
                 )
-                print(
+                log.debug(
                     f"🖼️ 【后端调试】图片{i+1}: 类型={img.type}, 权重={img.weight}, Base64={base64_preview}"
                 )
 
@@ -271,10 +292,10 @@ async def submit_imagine_task(
             if any(w != 1.0 for w in weights):  # 只有在有非默认权重时才添加
                 imagine_data["imageWeights"] = weights
 
-            print(
+            log.debug(
                 f"🖼️ 【后端调试】发送数据: base64Array={len(imagine_data['base64Array'])}, imageWeights={imagine_data.get('imageWeights')}"
             )
-            print(f"🖼️ 【后端调试】最终请求数据keys: {list(imagine_data.keys())}")
+            log.debug(f"🖼️ 【后端调试】最终请求数据keys: {list(imagine_data.keys())}")
 
         # 提交任务
         mj_response = await client.submit_imagine(imagine_data)
@@ -292,6 +313,7 @@ async def submit_imagine_task(
             )
 
             # 后台轮询任务状态
+            ticket.bind(mj_response["result"])
             background_tasks.add_task(poll_task_status, mj_response["result"], user.id)
 
             return mj_response
@@ -313,7 +335,10 @@ async def submit_imagine_task(
 
 @router.post("/submit/blend")
 async def submit_blend_task(
-    request: dict, background_tasks: BackgroundTasks, user=Depends(get_verified_user)
+    request: dict,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(mj_admission),
 ):
     """提交图片混合任务"""
     try:
@@ -345,6 +370,7 @@ async def submit_blend_task(
                 mj_response=mj_response,
             )
 
+            ticket.bind(mj_response["result"])
             background_tasks.add_task(poll_task_status, mj_response["result"], user.id)
             return mj_response
         else:
@@ -362,7 +388,10 @@ async def submit_blend_task(
 
 @router.post("/submit/describe")
 async def submit_describe_task(
-    request: dict, background_tasks: BackgroundTasks, user=Depends(get_verified_user)
+    request: dict,
+    background_tasks: BackgroundTasks,
+    user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(mj_admission),
 ):
     """提交图生文任务"""
     try:
@@ -389,6 +418,7 @@ async def submit_describe_task(
                 mj_response=mj_response,
             )
 
+            ticket.bind(mj_response["result"])
             background_tasks.add_task(poll_task_status, mj_response["result"], user.id)
             return mj_response
         else:
@@ -412,6 +442,7 @@ async def submit_action_task(
     request: MJActionRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(mj_admission),
 ):
     """执行任务动作（U1-U4, V1-V4等）"""
     try:
@@ -444,6 +475,7 @@ async def submit_action_task(
                 parent_task_id=request.task_id,
             )
 
+            ticket.bind(mj_response["result"])
             background_tasks.add_task(poll_task_status, mj_response["result"], user.id)
             return mj_response
         else:
@@ -462,6 +494,7 @@ async def submit_modal_task(
     request: MJModalRequest,
     background_tasks: BackgroundTasks,
     user=Depends(get_verified_user),
+    ticket: AdmissionTicket = Depends(mj_admission),
 ):
     """提交Modal确认任务"""
     try:
@@ -485,6 +518,7 @@ async def submit_modal_task(
         if mj_response["code"] == 1:
             # 更新原任务状态
             task.update_status("IN_PROGRESS")
+            ticket.bind(mj_response["result"])
             background_tasks.add_task(poll_task_status, mj_response["result"], user.id)
             return mj_response
         else:
@@ -503,22 +537,28 @@ async def submit_modal_task(
 async def get_task_status(task_id: str, user=Depends(get_verified_user)):
     """获取任务状态 - 修复版本"""
     try:
-        print(
-            f"🔍 【API修复版】获取任务状态: {task_id}, 用户: {user.id if user else 'None'}"
+        log.debug(
+            f"🔍 【API修复版】获取任务状态: {task_id}, 用户: {user.id if user else 'None'}",
+            extra={"sampled": True},
         )
 
         # 先查本地数据库
         task = MJTask.get_task_by_id(task_id)
-        print(
-            f"🔍 【API修复版】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}"
+        log.debug(
+            f"🔍 【API修复版】本地任务: {task.id if task else 'None'}, 状态: {task.status if task else 'None'}",
+            extra={"sampled": True},
         )
 
         # 🔥 强制返回本地数据（如果存在且正确）
         if task and task.image_url and task.status == "SUCCESS":
-            print(f"🔥 【API修复版】直接返回本地完成任务: {task.id}")
+            log.info(
+                f"🔥 【API修复版】直接返回本地完成任务: {task.id}",
+                extra={"sampled": True},
+            )
             result = task.to_dict()
-            print(
-                f"🔥 【API修复版】返回数据: status={result.get('status')}, imageUrl={bool(result.get('imageUrl'))}, progress={result.get('progress')}"
+            log.info(
+                f"🔥 【API修复版】返回数据: status={result.get('status')}, imageUrl={bool(result.get('imageUrl'))}, progress={result.get('progress')}",
+                extra={"sampled": True},
             )
             return result
 
@@ -526,22 +566,29 @@ async def get_task_status(task_id: str, user=Depends(get_verified_user)):
         try:
             client = get_mj_client()
             mj_task = await client.get_task_status(task_id)
-            print(
-                f"🔍 【API修复版】远程状态: {mj_task.get('status') if mj_task else 'None'}, 图片: {bool(mj_task.get('imageUrl')) if mj_task else False}"
+            log.debug(
+                f"🔍 【API修复版】远程状态: {mj_task.get('status') if mj_task else 'None'}, 图片: {bool(mj_task.get('imageUrl')) if mj_task else False}",
+                extra={"sampled": True},
             )
         except Exception as e:
-            print(f"⚠️ 【API修复版】远程查询失败: {e}")
+            log.warning(f"⚠️ 【API修复版】远程查询失败: {e}", extra={"sampled": True})
             mj_task = None
 
         if mj_task:
             # 🔥 强制更新本地记录
             if task:
-                print(f"🔥 【API修复版】强制更新数据库 - 任务ID: {task.id}")
+                log.info(
+                    f"🔥 【API修复版】强制更新数据库 - 任务ID: {task.id}",
+                    extra={"sampled": True},
+                )
                 # 如果有图片URL，强制设置为SUCCESS
                 image_url = mj_task.get("imageUrl", "")
                 status = mj_task.get("status", "UNKNOWN")
                 if image_url:
-                    print(f"🖼️ 【API修复版】发现图片URL，强制完成: {image_url[:50]}...")
+                    log.info(
+                        f"🖼️ 【API修复版】发现图片URL，强制完成: {image_url[:50]}...",
+                        extra={"sampled": True},
+                    )
                     mj_task_copy = mj_task.copy()
                     mj_task_copy["status"] = "SUCCESS"
                     mj_task_copy["progress"] = "100%"
@@ -549,13 +596,17 @@ async def get_task_status(task_id: str, user=Depends(get_verified_user)):
                 else:
                     task.update_from_mj_response(mj_task)
                 result = task.to_dict()
-                print(
-                    f"🔥 【API修复版】数据库已更新: status={result.get('status')}, imageUrl={bool(result.get('imageUrl'))}, progress={result.get('progress')}"
+                log.info(
+                    f"🔥 【API修复版】数据库已更新: status={result.get('status')}, imageUrl={bool(result.get('imageUrl'))}, progress={result.get('progress')}",
+                    extra={"sampled": True},
                 )
                 return result
             else:
                 # 🔥 如果本地没有任务，创建一个新的任务记录
-                print(f"🔥 【API修复版】本地没有任务记录，创建新的任务: {task_id}")
+                log.info(
+                    f"🔥 【API修复版】本地没有任务记录，创建新的任务: {task_id}",
+                    extra={"sampled": True},
+                )
                 image_url = (
                     mj_task.get("imageUrl")
                     or mj_task.get("image_url")
@@ -566,7 +617,10 @@ async def get_task_status(task_id: str, user=Depends(get_verified_user)):
 
                 # 如果有图片URL，强制设置为SUCCESS
                 if image_url:
-                    print(f"🖼️ 【API修复版】远程有图片，强制设置为SUCCESS")
+                    log.info(
+                        f"🖼️ 【API修复版】远程有图片，强制设置为SUCCESS",
+                        extra={"sampled": True},
+                    )
                     status = "SUCCESS"
                     progress = "100%"
 
@@ -581,7 +635,10 @@ async def get_task_status(task_id: str, user=Depends(get_verified_user)):
                         credits_cost=0,
                         mj_response=mj_task,
                     )
-                    print(f"🔥 【API修复版】已创建新任务记录: {new_task.id}")
+                    log.info(
+                        f"🔥 【API修复版】已创建新任务记录: {new_task.id}",
+                        extra={"sampled": True},
+                    )
                     # 再次更新以确保状态正确
                     if image_url:
                         final_data = {
@@ -595,7 +652,7 @@ async def get_task_status(task_id: str, user=Depends(get_verified_user)):
                         new_task.update_from_mj_response(final_data)
                     return new_task.to_dict()
                 except Exception as e:
-                    print(f"🔥 【API修复版】创建任务记录失败: {e}")
+                    log.error(f"🔥 【API修复版】创建任务记录失败: {e}")
 
                 # 如果创建失败，返回标准化数据
                 standardized = {
@@ -609,24 +666,26 @@ async def get_task_status(task_id: str, user=Depends(get_verified_user)):
                     "properties": mj_task.get("properties", {}),
                     "buttons": mj_task.get("buttons", []),
                 }
-                print(f"🔄 【API修复版】返回标准化数据: {standardized}")
+                log.info(
+                    f"🔄 【API修复版】返回标准化数据: {standardized}",
+                    extra={"sampled": True},
+                )
                 return standardized
         else:
             # 如果远程也没有，返回本地记录
             if task:
-                print(f"🔄 【API修复版】返回本地记录: {task.id}")
+                log.info(
+                    f"🔄 【API修复版】返回本地记录: {task.id}", extra={"sampled": True}
+                )
                 return task.to_dict()
             else:
-                print(f"❌ 【API修复版】任务不存在: {task_id}")
+                log.error(f"❌ 【API修复版】任务不存在: {task_id}")
                 raise HTTPException(status_code=404, detail="Task not found")
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 【API修复版】获取任务状态失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【API修复版】获取任务状态失败: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to get task status: {str(e)}"
         )
@@ -724,7 +783,7 @@ async def fix_task_states(user=Depends(get_verified_user)):
         remote_checked = 0
         tasks = MJTask.get_user_tasks(user.id, 1, 100)  # 获取最近100个任务
 
-        print(
+        log.info(
             f"🔧 【强制修复版】开始修复用户 {user.id} 的任务状态，共 {len(tasks)} 个任务"
         )
 
@@ -734,7 +793,7 @@ async def fix_task_states(user=Depends(get_verified_user)):
             old_progress = task.progress
             old_image_url = task.image_url
 
-            print(
+            log.info(
                 f"🔧 【强制修复版】检查任务 {task.id}: 状态={task.status}, 进度={task.progress}, 图片={bool(task.image_url)}"
             )
 
@@ -744,7 +803,7 @@ async def fix_task_states(user=Depends(get_verified_user)):
                 or not task.image_url
             ):
                 try:
-                    print(f"🔧 【强制修复版】查询远程状态: {task.id}")
+                    log.info(f"🔧 【强制修复版】查询远程状态: {task.id}")
                     client = get_mj_client()
                     mj_task = await client.get_task_status(task.id)
                     remote_checked += 1
@@ -753,7 +812,7 @@ async def fix_task_states(user=Depends(get_verified_user)):
                         remote_image = mj_task.get("imageUrl")
                         remote_status = mj_task.get("status", "UNKNOWN")
 
-                        print(
+                        log.info(
                             f"🔧 【强制修复版】远程状态: {task.id} - 状态={remote_status}, 图片={bool(remote_image)}"
                         )
 
@@ -761,28 +820,28 @@ async def fix_task_states(user=Depends(get_verified_user)):
                         if remote_image:
                             needs_fix = True
                             task.image_url = remote_image
-                            print(f"🔧 【强制修复版】发现远程图片: {task.id}")
+                            log.info(f"🔧 【强制修复版】发现远程图片: {task.id}")
                         # 如果远程状态更新了，也修复
                         elif remote_status in ["SUCCESS", "FAILURE", "FAILED"]:
                             needs_fix = True
-                            print(
+                            log.info(
                                 f"🔧 【强制修复版】远程状态已完成: {task.id} -> {remote_status}"
                             )
 
                 except Exception as e:
-                    print(f"🔧 【强制修复版】查询远程状态失败: {task.id} - {e}")
+                    log.error(f"🔧 【强制修复版】查询远程状态失败: {task.id} - {e}")
 
             # 条件1: 有图片URL但状态不是完成状态
             if task.image_url and task.status not in ["SUCCESS", "FAILURE", "FAILED"]:
                 needs_fix = True
-                print(
+                log.error(
                     f"🔧 【强制修复版】发现异常: 任务 {task.id} 有图片但状态为 {task.status}"
                 )
 
             # 条件2: 有图片但进度不是100%
             elif task.image_url and task.progress != "100%":
                 needs_fix = True
-                print(
+                log.error(
                     f"🔧 【强制修复版】发现异常: 任务 {task.id} 有图片但进度为 {task.progress}"
                 )
 
@@ -807,16 +866,18 @@ async def fix_task_states(user=Depends(get_verified_user)):
                         db.commit()
                         db.refresh(task)
 
-                    print(f"🔧 【强制修复版】修复完成: {task.id}")
-                    print(f"   状态: {old_status} -> {task.status}")
-                    print(f"   进度: {old_progress} -> {task.progress}")
-                    print(f"   图片: {bool(old_image_url)} -> {bool(task.image_url)}")
+                    log.info(f"🔧 【强制修复版】修复完成: {task.id}")
+                    log.info(f"   状态: {old_status} -> {task.status}")
+                    log.info(f"   进度: {old_progress} -> {task.progress}")
+                    log.info(
+                        f"   图片: {bool(old_image_url)} -> {bool(task.image_url)}"
+                    )
                     fixed_count += 1
 
                 except Exception as e:
-                    print(f"🔧 【强制修复版】修复任务失败: {task.id} - {e}")
+                    log.error(f"🔧 【强制修复版】修复任务失败: {task.id} - {e}")
 
-        print(
+        log.info(
             f"🔧 【强制修复版】修复完成，共修复 {fixed_count} 个任务，查询了 {remote_checked} 个远程状态"
         )
 
@@ -827,10 +888,7 @@ async def fix_task_states(user=Depends(get_verified_user)):
         }
 
     except Exception as e:
-        print(f"🔧 【强制修复版】修复任务状态失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"🔧 【强制修复版】修复任务状态失败: {e}")
         raise HTTPException(
             status_code=500, detail=f"Failed to fix task states: {str(e)}"
         )
@@ -841,12 +899,10 @@ async def fix_task_states(user=Depends(get_verified_user)):
 
 @router.get("/stream/user")
 async def stream_user_tasks(user=Depends(get_verified_user)):
-    """用户任务状态实时流 - 修复版本"""
+    """用户任务状态实时流：连接时读取一次最近任务，之后只推送任务事件总线中的变化"""
 
     async def generate():
         try:
-            print(f"🔄 【流媒体修复版】开始用户 {user.id} 的任务流")
-
             # 检查MJ服务是否配置
             config = MJConfig.get_config()
             if not config or not config.enabled:
@@ -854,72 +910,39 @@ async def stream_user_tasks(user=Depends(get_verified_user)):
                 yield f"data: {json.dumps({'type': 'stream_end', 'message': 'Stream completed'})}\n\n"
                 return
 
-            sent_completed_tasks = set()  # 记录已发送的完成任务，避免重复
-            max_iterations = 200  # 最多运行200次 (约10分钟)
-            iteration = 0
-
-            while iteration < max_iterations:
-                try:
-                    # 获取用户最新任务状态 - 只获取最近更新的未完成任务
-                    recent_tasks = MJTask.get_user_recent_tasks(user.id, limit=5)
-
-                    active_tasks_found = False
-
-                    for task in recent_tasks:
-                        # 🔥 只推送真正需要更新的任务
-                        should_send = False
-
-                        # 1. 未完成的任务 - 总是发送
-                        if task.status not in ["SUCCESS", "FAILURE", "FAILED"]:
-                            should_send = True
-                            active_tasks_found = True
-                            print(
-                                f"🔄 【流媒体修复版】发送进行中任务: {task.id}, 状态: {task.status}"
-                            )
-
-                        # 2. 刚完成的任务 - 只发送一次
-                        elif task.status in ["SUCCESS", "FAILURE", "FAILED"]:
-                            if task.id not in sent_completed_tasks:
-                                should_send = True
-                                sent_completed_tasks.add(task.id)
-                                print(
-                                    f"🔄 【流媒体修复版】发送完成任务(首次): {task.id}, 状态: {task.status}"
-                                )
-                            else:
-                                print(
-                                    f"🔄 【流媒体修复版】跳过已发送的完成任务: {task.id}"
-                                )
-
-                        # 3. 最近更新的任务 (5秒内)
-                        elif task.updated_at > datetime.utcnow() - timedelta(seconds=5):
-                            should_send = True
-                            print(f"🔄 【流媒体修复版】发送最近更新任务: {task.id}")
-
-                        if should_send:
-                            task_data = task.to_dict()
-                            yield f"data: {json.dumps(task_data)}\n\n"
-
-                    # 🔥 如果没有活跃任务且已经发送了所有完成任务，则停止流
-                    if not active_tasks_found and len(sent_completed_tasks) > 0:
-                        print(f"🔄 【流媒体修复版】没有活跃任务，停止流媒体")
-                        break
-
-                    await asyncio.sleep(2)  # 每2秒检查一次
-                    iteration += 1
-
-                except Exception as e:
-                    print(f"🔄 【流媒体修复版】流媒体错误: {e}")
-                    yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                    break
+            # 先订阅再读取快照，避免两者之间的状态变化丢失
+            async with task_event_bus.subscription(user.id) as queue:
+                active_tasks = set()
+
+                for task in MJTask.get_user_recent_tasks(user.id, limit=5):
+                    if task.status not in MJ_FINISHED_STATUSES:
+                        active_tasks.add(task.id)
+                    yield f"data: {json.dumps(task.to_dict())}\n\n"
+
+                deadline = time.monotonic() + MJ_STREAM_MAX_DURATION
+                events = iter_task_events(queue, providers=["midjourney"])
+
+                # 活跃任务全部结束后立即结束；连接时没有活跃任务则只发送快照
+                while active_tasks and time.monotonic() < deadline:
+                    event_data = await anext(events)
+                    if event_data is None:
+                        yield ": keepalive\n\n"
+                        continue
+                    if event_data["type"] != "task_update":
+                        continue
+
+                    task_data = event_data["task"]
+                    if task_data["status"] in MJ_FINISHED_STATUSES:
+                        active_tasks.discard(task_data["id"])
+                    else:
+                        active_tasks.add(task_data["id"])
+                    yield f"data: {json.dumps(task_data)}\n\n"
 
-            print(
-                f"🔄 【流媒体修复版】用户 {user.id} 的任务流结束，共 {iteration} 次迭代"
-            )
             # 发送结束标记
             yield f"data: {json.dumps({'type': 'stream_end', 'message': 'Stream completed'})}\n\n"
 
         except Exception as e:
-            print(f"🔄 【流媒体修复版】生成器错误: {e}")
+            log.error(f"❌ MJ任务流错误: {e}")
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
     return StreamingResponse(generate(), media_type="text/event-stream")
@@ -930,10 +953,11 @@ async def stream_user_tasks(user=Depends(get_verified_user)):
 
 async def poll_task_status(task_id: str, user_id: str):
     """后台轮询任务状态 - 修复版本"""
+    set_log_context(provider="midjourney", task_id=task_id, user_id=user_id)
     max_attempts = 300  # 增加到300次 (约10分钟)
     attempt = 0
 
-    print(f"🚀 【修复版】开始后台轮询任务 {task_id}")
+    log.info(f"🚀 【修复版】开始后台轮询任务 {task_id}")
 
     while attempt < max_attempts:
         try:
@@ -945,18 +969,25 @@ async def poll_task_status(task_id: str, user_id: str):
                 progress = mj_task.get("progress", "0%")
                 image_url = mj_task.get("imageUrl", "")
 
-                print(
-                    f"📊 【修复版】任务 {task_id} - 状态: {status}, 进度: {progress}, 有图片: {bool(image_url)}"
+                log.info(
+                    f"📊 【修复版】任务 {task_id} - 状态: {status}, 进度: {progress}, 有图片: {bool(image_url)}",
+                    extra={"sampled": True},
                 )
 
                 # 🔥 强制更新数据库 - 每次轮询都更新
                 task = MJTask.get_task_by_id(task_id)
                 if task:
-                    print(f"💾 【修复版】强制更新数据库: {task_id}")
+                    log.info(
+                        f"💾 【修复版】强制更新数据库: {task_id}",
+                        extra={"sampled": True},
+                    )
 
                     # 如果有图片URL，无论什么状态都设置为SUCCESS
                     if image_url:
-                        print(f"🖼️ 【修复版】发现图片，强制完成: {image_url}")
+                        log.info(
+                            f"🖼️ 【修复版】发现图片，强制完成: {image_url}",
+                            extra={"sampled": True},
+                        )
                         forced_data = {
                             "status": "SUCCESS",
                             "progress": "100%",
@@ -966,7 +997,10 @@ async def poll_task_status(task_id: str, user_id: str):
                             "buttons": mj_task.get("buttons", []),
                         }
                         task.update_from_mj_response(forced_data)
-                        print(f"✅ 【修复版】任务 {task_id} 已强制完成")
+                        log.info(
+                            f"✅ 【修复版】任务 {task_id} 已强制完成",
+                            extra={"sampled": True},
+                        )
 
                         # 🔥 自动上传到云存储
                         try:
@@ -1001,17 +1035,21 @@ async def poll_task_status(task_id: str, user_id: str):
                                             file_record.cloud_url
                                         )
                                         update_db.commit()
-                                        print(
-                                            f"☁️ 【云存储】Midjourney图片上传成功，已更新URL: {task_id}"
+                                        log.info(
+                                            f"☁️ 【云存储】Midjourney图片上传成功，已更新URL: {task_id}",
+                                            extra={"sampled": True},
                                         )
                                     else:
-                                        print(f"☁️ 【云存储】找不到任务记录: {task_id}")
+                                        log.info(
+                                            f"☁️ 【云存储】找不到任务记录: {task_id}",
+                                            extra={"sampled": True},
+                                        )
                             else:
-                                print(
+                                log.error(
                                     f"☁️ 【云存储】Midjourney图片上传失败: {task_id} - {message}"
                                 )
                         except Exception as upload_error:
-                            print(
+                            log.error(
                                 f"☁️ 【云存储【Midjourney自动上传异常: {task_id} - {upload_error}"
                             )
 
@@ -1022,34 +1060,41 @@ async def poll_task_status(task_id: str, user_id: str):
 
                 # 检查任务是否完成
                 if status in ["SUCCESS", "FAILURE", "FAILED"]:
-                    print(f"✅ 【修复版】任务 {task_id} 正常完成，最终状态: {status}")
+                    log.info(
+                        f"✅ 【修复版】任务 {task_id} 正常完成，最终状态: {status}",
+                        extra={"sampled": True},
+                    )
                     break
 
             else:
-                print(f"⚠️ 【修复版】任务 {task_id} 返回空响应")
+                log.warning(
+                    f"⚠️ 【修复版】任务 {task_id} 返回空响应", extra={"sampled": True}
+                )
 
             await asyncio.sleep(2)  # 固定2秒间隔
             attempt += 1
 
         except Exception as e:
-            print(f"❌ 【修复版】轮询任务 {task_id} 出错: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"❌ 【修复版】轮询任务 {task_id} 出错: {e}")
             await asyncio.sleep(3)
             attempt += 1
 
-    print(f"🏁 【修复版】任务 {task_id} 轮询结束，共 {attempt} 次")
+    log.info(
+        f"🏁 【修复版】任务 {task_id} 轮询结束，共 {attempt} 次",
+        extra={"sampled": True},
+    )
 
     # 🔥 最终检查 - 如果还没完成，再查一次远程状态
     try:
-        print(f"🔍 【修复版】最终检查任务状态: {task_id}")
+        log.debug(f"🔍 【修复版】最终检查任务状态: {task_id}", extra={"sampled": True})
         client = get_mj_client()
         final_task = await client.get_task_status(task_id)
         if final_task and final_task.get("imageUrl"):
             task = MJTask.get_task_by_id(task_id)
             if task:
-                print(f"🔥 【修复版】最终强制完成: {task_id}")
+                log.info(
+                    f"🔥 【修复版】最终强制完成: {task_id}", extra={"sampled": True}
+                )
                 final_data = {
                     "status": "SUCCESS",
                     "progress": "100%",
@@ -1091,18 +1136,22 @@ async def poll_task_status(task_id: str, user_id: str):
                             if update_task:
                                 update_task.cloud_image_url = file_record.cloud_url
                                 update_db.commit()
-                                print(
-                                    f"☁️ 【云存储】Midjourney最终检查图片上传成功，已更新URL: {task_id}"
+                                log.info(
+                                    f"☁️ 【云存储】Midjourney最终检查图片上传成功，已更新URL: {task_id}",
+                                    extra={"sampled": True},
                                 )
                             else:
-                                print(f"☁️ 【云存储】找不到任务记录: {task_id}")
+                                log.info(
+                                    f"☁️ 【云存储】找不到任务记录: {task_id}",
+                                    extra={"sampled": True},
+                                )
                     else:
-                        print(
+                        log.error(
                             f"☁️ 【云存储】Midjourney最终检查图片上传失败: {task_id} - {message}"
                         )
                 except Exception as upload_error:
-                    print(
+                    log.error(
                         f"☁️ 【云存储】Midjourney最终检查自动上传异常: {task_id} - {upload_error}"
                     )
     except Exception as e:
-        print(f"❌ 【修复版】最终检查失败: {e}")
+        log.error(f"❌ 【修复版】最终检查失败: {e}")
@@ -907,7 +907,7 @@ async def generate_chat_completion(
         if "text/event-stream" in r.headers.get("Content-Type", ""):
 
             async def consumer_content(content):
-                with CreditDeduct(
+                async with CreditDeduct(
                     user=user,
                     model_id=model_id,
                     body=form_data,
@@ -941,7 +941,7 @@ async def generate_chat_completion(
                 else:
                     return PlainTextResponse(status_code=r.status, content=response)
 
-            with CreditDeduct(
+            async with CreditDeduct(
                 user=user,
                 model_id=model_id,
                 body=form_data,
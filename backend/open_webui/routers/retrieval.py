@@ -38,9 +38,11 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.cache import invalidate_retrieval_cache
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
+from open_webui.retrieval.loaders.pdf import ExtractionBudgetExceeded
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
@@ -1258,6 +1260,7 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                invalidate_retrieval_cache(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1316,6 +1319,7 @@ def save_docs_to_vector_db(
             collection_name=collection_name,
             items=items,
         )
+        invalidate_retrieval_cache(collection_name)
 
         return True
     except Exception as e:
@@ -1350,6 +1354,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                invalidate_retrieval_cache(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1435,8 +1440,27 @@ def process_file(
                     DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
                     MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
                 )
+
+                def on_progress(pages_done: int, total_pages: int):
+                    # Exposed through the file's data so clients can poll it
+                    log.debug(
+                        f"process_file: extracted {pages_done}/{total_pages} pages of {file.id}"
+                    )
+                    Files.update_file_data_by_id(
+                        file.id,
+                        {
+                            "extraction": {
+                                "pages_done": pages_done,
+                                "total_pages": total_pages,
+                            }
+                        },
+                    )
+
                 docs = loader.load(
-                    file.filename, file.meta.get("content_type"), file_path
+                    file.filename,
+                    file.meta.get("content_type"),
+                    file_path,
+                    on_progress=on_progress,
                 )
 
                 docs = [
@@ -1515,6 +1539,12 @@ def process_file(
                 "content": text_content,
             }
 
+    except ExtractionBudgetExceeded as e:
+        log.warning(f"process_file: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.EXTRACTION_BUDGET_EXCEEDED(e),
+        )
     except Exception as e:
         log.exception(e)
         if "No pandoc was found" in str(e):
@@ -2185,6 +2215,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            invalidate_retrieval_cache(form_data.collection_name)
             return {"status": True}
         else:
             return {"status": False}
@@ -2196,6 +2227,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    invalidate_retrieval_cache()
     Knowledges.delete_all_knowledge()
 
 
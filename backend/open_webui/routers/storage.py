@@ -1,7 +1,10 @@
 import logging
+import os
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import RedirectResponse
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.file_response import get_file_response
 from open_webui.models.cloud_storage import (
     CloudStorageConfigForm,
     CloudStorageConfigResponse,
@@ -227,6 +230,51 @@ async def get_generated_files(
         )
 
 
+# 签名URL有效期（秒），重定向响应的缓存时间略短于该值
+GENERATED_FILE_SIGNED_URL_EXPIRES = 3600
+
+
+@router.get("/files/generated/{file_id}/content")
+async def get_generated_file_content(
+    file_id: str, request: Request, user=Depends(get_verified_user)
+):
+    """获取生成文件内容
+
+    已上传到COS的文件重定向到签名URL，不经过应用进程转发；
+    本地文件支持 Range/ETag/304。
+    """
+    file_record = GeneratedFiles().get_file_by_id(file_id)
+    if not file_record or (file_record.user_id != user.id and user.role != "admin"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文件不存在")
+
+    signed_url = get_file_manager().get_signed_url(
+        file_record, GENERATED_FILE_SIGNED_URL_EXPIRES
+    )
+    if signed_url:
+        return RedirectResponse(
+            signed_url,
+            status_code=status.HTTP_302_FOUND,
+            headers={
+                "Cache-Control": f"private, max-age={GENERATED_FILE_SIGNED_URL_EXPIRES - 300}"
+            },
+        )
+
+    if file_record.local_path and os.path.isfile(file_record.local_path):
+        return get_file_response(
+            request.headers,
+            file_record.local_path,
+            media_type=file_record.mime_type,
+            cache_control="private, max-age=86400",
+        )
+
+    if file_record.cloud_url:
+        return RedirectResponse(
+            file_record.cloud_url, status_code=status.HTTP_302_FOUND
+        )
+
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="文件不存在")
+
+
 @router.delete("/files/generated/{file_id}")
 async def delete_generated_file(file_id: str, user=Depends(get_verified_user)):
     """删除生成的文件"""
@@ -13,7 +13,7 @@ from starlette.responses import FileResponse
 from open_webui.utils.misc import get_gravatar_url
 from open_webui.utils.pdf_generator import PDFGenerator
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.code_interpreter import execute_code_jupyter
+from open_webui.utils.code_interpreter import execute_code_jupyter, kernel_pool
 from open_webui.env import SRC_LOG_LEVELS
 
 
@@ -62,6 +62,7 @@ async def execute_code(
                 else None
             ),
             request.app.state.config.CODE_EXECUTION_JUPYTER_TIMEOUT,
+            session_id=f"user:{user.id}",
         )
 
         return output
@@ -72,6 +73,13 @@ async def execute_code(
         )
 
 
+@router.get("/code/kernels")
+async def get_code_kernel_pool_metrics(user=Depends(get_admin_user)):
+    if kernel_pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **kernel_pool.get_metrics()}
+
+
 class MarkdownForm(BaseModel):
     md: str
 
@@ -278,6 +278,27 @@ class GeneratedFileManager:
             logger.error(f"删除生成文件失败: {str(e)}")
             return False, f"删除失败: {str(e)}"
 
+    def get_signed_url(
+        self, file_record: GeneratedFile, expires_in: int = 3600
+    ) -> Optional[str]:
+        """获取已上传到云存储文件的签名访问URL
+
+        Args:
+            file_record: 文件记录
+            expires_in: 签名有效期（秒）
+
+        Returns:
+            Optional[str]: 签名URL，文件不在云存储或服务不可用时返回None
+        """
+        if not file_record.cloud_path or file_record.status != "uploaded":
+            return None
+
+        cos_service = self._get_cos_service()
+        if not cos_service or not cos_service.is_available():
+            return None
+
+        return cos_service.get_presigned_url(file_record.cloud_path, expires_in)
+
     def get_user_files(
         self,
         user_id: str,
@@ -364,182 +385,9 @@ class GeneratedFileManager:
             Dict: 存储统计信息
         """
         try:
-            # 获取基本统计
-            with get_db() as db:
-                from sqlalchemy import func, desc
-                from datetime import datetime, timedelta
-
-                total_files = db.query(GeneratedFile).count()
-                uploaded_files = (
-                    db.query(GeneratedFile)
-                    .filter(GeneratedFile.status == "uploaded")
-                    .count()
-                )
-                failed_files = (
-                    db.query(GeneratedFile)
-                    .filter(GeneratedFile.status == "failed")
-                    .count()
-                )
-                pending_files = (
-                    db.query(GeneratedFile)
-                    .filter(GeneratedFile.status == "pending")
-                    .count()
-                )
-
-                # 计算总存储大小（字节）
-                total_size = (
-                    db.query(func.sum(GeneratedFile.file_size))
-                    .filter(GeneratedFile.status == "uploaded")
-                    .scalar()
-                    or 0
-                )
-
-                # 按类型统计（包含大小）
-                type_stats = (
-                    db.query(
-                        GeneratedFile.file_type,
-                        func.count(GeneratedFile.id).label("count"),
-                        func.sum(GeneratedFile.file_size).label("total_size"),
-                    )
-                    .filter(GeneratedFile.status == "uploaded")
-                    .group_by(GeneratedFile.file_type)
-                    .all()
-                )
-
-                # 按来源统计（包含大小）
-                source_stats = (
-                    db.query(
-                        GeneratedFile.source_type,
-                        func.count(GeneratedFile.id).label("count"),
-                        func.sum(GeneratedFile.file_size).label("total_size"),
-                    )
-                    .filter(GeneratedFile.status == "uploaded")
-                    .group_by(GeneratedFile.source_type)
-                    .all()
-                )
-
-                # 按用户统计（前10个用户）
-                user_stats = (
-                    db.query(
-                        GeneratedFile.user_id,
-                        func.count(GeneratedFile.id).label("count"),
-                        func.sum(GeneratedFile.file_size).label("total_size"),
-                    )
-                    .filter(GeneratedFile.status == "uploaded")
-                    .group_by(GeneratedFile.user_id)
-                    .order_by(desc("total_size"))
-                    .limit(10)
-                    .all()
-                )
-
-                # 最近7天的上传趋势
-                seven_days_ago = datetime.now() - timedelta(days=7)
-                daily_stats = (
-                    db.query(
-                        func.date(GeneratedFile.created_at).label("date"),
-                        func.count(GeneratedFile.id).label("count"),
-                        func.sum(GeneratedFile.file_size).label("total_size"),
-                    )
-                    .filter(
-                        GeneratedFile.created_at >= seven_days_ago,
-                        GeneratedFile.status == "uploaded",
-                    )
-                    .group_by(func.date(GeneratedFile.created_at))
-                    .order_by("date")
-                    .all()
-                )
-
-                # 最近失败的文件（前5个）
-                recent_failures = (
-                    db.query(GeneratedFile)
-                    .filter(GeneratedFile.status == "failed")
-                    .order_by(GeneratedFile.created_at.desc())
-                    .limit(5)
-                    .all()
-                )
+            from open_webui.services.stats_service import get_storage_stats
 
-                # 格式化大小为人类可读格式
-                def format_size(size_bytes):
-                    if size_bytes == 0:
-                        return "0B"
-                    size_names = ("B", "KB", "MB", "GB", "TB")
-                    i = int(math.floor(math.log(size_bytes, 1024)))
-                    p = math.pow(1024, i)
-                    s = round(size_bytes / p, 2)
-                    return f"{s} {size_names[i]}"
-
-                import math
-
-                return {
-                    "summary": {
-                        "total_files": total_files,
-                        "uploaded_files": uploaded_files,
-                        "failed_files": failed_files,
-                        "pending_files": pending_files,
-                        "total_size": total_size,
-                        "total_size_formatted": format_size(total_size),
-                        "success_rate": round(
-                            (
-                                (uploaded_files / total_files * 100)
-                                if total_files > 0
-                                else 0
-                            ),
-                            2,
-                        ),
-                    },
-                    "type_distribution": {
-                        stat[0]: {
-                            "count": stat[1],
-                            "size": stat[2] or 0,
-                            "size_formatted": format_size(stat[2] or 0),
-                        }
-                        for stat in type_stats
-                    },
-                    "source_distribution": {
-                        stat[0]: {
-                            "count": stat[1],
-                            "size": stat[2] or 0,
-                            "size_formatted": format_size(stat[2] or 0),
-                        }
-                        for stat in source_stats
-                    },
-                    "top_users": [
-                        {
-                            "user_id": stat[0],
-                            "count": stat[1],
-                            "size": stat[2] or 0,
-                            "size_formatted": format_size(stat[2] or 0),
-                        }
-                        for stat in user_stats
-                    ],
-                    "daily_trend": [
-                        {
-                            "date": (
-                                stat[0].strftime("%Y-%m-%d")
-                                if stat[0] and hasattr(stat[0], "strftime")
-                                else str(stat[0]) if stat[0] else ""
-                            ),
-                            "count": stat[1],
-                            "size": stat[2] or 0,
-                            "size_formatted": format_size(stat[2] or 0),
-                        }
-                        for stat in daily_stats
-                    ],
-                    "recent_failures": [
-                        {
-                            "id": f.id,
-                            "filename": f.filename,
-                            "source_type": f.source_type,
-                            "error": f.error_message,
-                            "created_at": (
-                                f.created_at.strftime("%Y-%m-%d %H:%M:%S")
-                                if f.created_at
-                                else ""
-                            ),
-                        }
-                        for f in recent_failures
-                    ],
-                }
+            return get_storage_stats()
 
         except Exception as e:
             logger.error(f"获取存储统计失败: {str(e)}")
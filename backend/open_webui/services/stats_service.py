@@ -0,0 +1,406 @@
+"""
+统计服务
+为管理后台提供生成任务与存储使用的统计数据：
+
+- 每张表只执行一次分组查询，"今日"使用 [今日0点, 明日0点) 的时间范围而不是
+  func.date(created_at)，保证条件可以走 created_at 索引
+- 统计结果以快照形式缓存在 cache_manager 中，仪表盘读取直接命中快照
+- 任务写入/状态变化时通过 ORM 事件记录计数变化，事务提交后再增量更新快照
+  （含当日计数，回滚则丢弃），缓存过期后重新以数据库为准（raw SQL 更新、
+  其他 worker 的变化在TTL内收敛）
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import case, desc, event, func, inspect
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.internal.db import SessionLocal, get_db
+from open_webui.models.cloud_storage import GeneratedFile
+from open_webui.models.dreamwork import DreamWorkTask
+from open_webui.models.jimeng import JimengTask
+from open_webui.models.kling import KlingTask
+from open_webui.models.midjourney import MJTask
+from open_webui.utils.cache_manager import STATS_NAMESPACE, get_cache_manager
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+SESSION_INFO_KEY = "task_stats"
+
+
+@dataclass(frozen=True)
+class TaskStatsSpec:
+    """任务表的统计定义"""
+
+    model: Any
+    success_status: str
+    group_field: str  # 分布统计字段，如 mode / action
+    group_key: str  # 返回结果中的分布字段名
+
+
+TASK_STATS_SPECS: Dict[str, TaskStatsSpec] = {
+    "midjourney": TaskStatsSpec(MJTask, "SUCCESS", "mode", "mode_distribution"),
+    "kling": TaskStatsSpec(KlingTask, "succeed", "action", "action_distribution"),
+    "jimeng": TaskStatsSpec(JimengTask, "succeed", "action", "action_distribution"),
+    "dreamwork": TaskStatsSpec(
+        DreamWorkTask, "SUCCESS", "action", "action_distribution"
+    ),
+}
+
+
+def get_day_range(day: date) -> Tuple[datetime, datetime]:
+    """返回某一天的 [开始, 结束) 时间范围（UTC，与任务表 created_at 一致）"""
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def _increment(counter: Dict[Any, int], key: Any, delta: int):
+    value = counter.get(key, 0) + delta
+    if value > 0:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+
+@dataclass
+class TaskStatsSnapshot:
+    """单个任务表的统计快照"""
+
+    spec: TaskStatsSpec
+    day: date
+    status_counts: Dict[Any, int] = field(default_factory=dict)
+    group_counts: Dict[Any, int] = field(default_factory=dict)
+    # 当日创建的任务按当前状态计数
+    today_status_counts: Dict[Any, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def apply_insert(self, status: Optional[str], group_value: Any):
+        with self.lock:
+            _increment(self.status_counts, status, 1)
+            _increment(self.group_counts, group_value, 1)
+            _increment(self.today_status_counts, status, 1)
+
+    def apply_transition(
+        self,
+        old_status: Optional[str],
+        new_status: Optional[str],
+        created_at: Optional[datetime],
+    ):
+        with self.lock:
+            _increment(self.status_counts, old_status, -1)
+            _increment(self.status_counts, new_status, 1)
+
+            start, end = get_day_range(self.day)
+            if created_at is not None and start <= created_at < end:
+                _increment(self.today_status_counts, old_status, -1)
+                _increment(self.today_status_counts, new_status, 1)
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            total_tasks = sum(self.status_counts.values())
+            success_tasks = self.status_counts.get(self.spec.success_status, 0)
+            return {
+                "total_tasks": total_tasks,
+                "success_tasks": success_tasks,
+                "today_tasks": sum(self.today_status_counts.values()),
+                "success_rate": (
+                    round(success_tasks / total_tasks * 100, 2)
+                    if total_tasks > 0
+                    else 0
+                ),
+                "status_distribution": dict(self.status_counts),
+                self.spec.group_key: dict(self.group_counts),
+                "today_status_distribution": dict(self.today_status_counts),
+                "date": self.day.isoformat(),
+            }
+
+
+def compute_task_stats(spec: TaskStatsSpec, day: Optional[date] = None):
+    """以一次分组查询计算任务表统计"""
+    model = spec.model
+    day = day or datetime.utcnow().date()
+    start, end = get_day_range(day)
+    group_column = getattr(model, spec.group_field)
+
+    with get_db() as db:
+        rows = (
+            db.query(
+                model.status,
+                group_column,
+                func.count(model.id),
+                func.sum(
+                    case(
+                        (
+                            (model.created_at >= start) & (model.created_at < end),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ),
+            )
+            .group_by(model.status, group_column)
+            .all()
+        )
+
+    snapshot = TaskStatsSnapshot(spec=spec, day=day)
+    for status, group_value, count, today_count in rows:
+        _increment(snapshot.status_counts, status, count)
+        _increment(snapshot.group_counts, group_value, count)
+        _increment(snapshot.today_status_counts, status, int(today_count or 0))
+    return snapshot
+
+
+def _get_cached_snapshot(provider: str) -> Optional[TaskStatsSnapshot]:
+    """只读取已缓存的快照，不触发加载"""
+    return get_cache_manager().peek(STATS_NAMESPACE, provider)
+
+
+def get_task_stats(provider: str) -> dict:
+    """获取任务系统统计（命中缓存快照，跨天自动重新计算）"""
+    spec = TASK_STATS_SPECS[provider]
+    cache = get_cache_manager()
+
+    snapshot = cache.get_or_load(
+        STATS_NAMESPACE, provider, lambda: compute_task_stats(spec)
+    )
+    if snapshot.day != datetime.utcnow().date():
+        cache.invalidate(STATS_NAMESPACE, provider, broadcast=False)
+        snapshot = cache.get_or_load(
+            STATS_NAMESPACE, provider, lambda: compute_task_stats(spec)
+        )
+    return snapshot.to_dict()
+
+
+def _defer_until_commit(target, change: Callable[[], None]):
+    """flush 中的变化在事务提交后才应用到快照，回滚时丢弃"""
+    session = inspect(target).session
+    if session is None:
+        return
+    session.info.setdefault(SESSION_INFO_KEY, []).append(change)
+
+
+def _apply_pending_changes(session):
+    for change in session.info.pop(SESSION_INFO_KEY, ()):
+        try:
+            change()
+        except Exception as e:
+            log.error(f"Failed to update task stats snapshot: {e}")
+
+
+def _discard_pending_changes(session, previous_transaction):
+    session.info.pop(SESSION_INFO_KEY, None)
+
+
+def _register_task_listeners(provider: str, spec: TaskStatsSpec):
+    def apply_insert(status, group_value):
+        snapshot = _get_cached_snapshot(provider)
+        if snapshot is not None:
+            snapshot.apply_insert(status, group_value)
+
+    def apply_transition(old_status, new_status, created_at):
+        snapshot = _get_cached_snapshot(provider)
+        if snapshot is not None:
+            snapshot.apply_transition(old_status, new_status, created_at)
+
+    def invalidate():
+        get_cache_manager().invalidate(STATS_NAMESPACE, provider, broadcast=False)
+
+    def after_insert(mapper, connection, target):
+        status = getattr(target, "status", None)
+        group_value = getattr(target, spec.group_field)
+        _defer_until_commit(target, lambda: apply_insert(status, group_value))
+
+    def after_update(mapper, connection, target):
+        state = inspect(target)
+        history = state.attrs.status.history
+        if not history.has_changes():
+            return
+
+        if not history.deleted:
+            # 旧状态未加载，无法增量更新，丢弃快照等待下次重新计算
+            _defer_until_commit(target, invalidate)
+            return
+
+        old_status = history.deleted[0]
+        new_status = history.added[0] if history.added else None
+        if old_status == new_status:
+            return
+
+        # 不在 flush 过程中触发懒加载，未加载的 created_at 视为非当日
+        created_at = state.dict.get("created_at")
+        _defer_until_commit(
+            target, lambda: apply_transition(old_status, new_status, created_at)
+        )
+
+    event.listen(spec.model, "after_insert", after_insert)
+    event.listen(spec.model, "after_update", after_update)
+
+
+for _provider, _spec in TASK_STATS_SPECS.items():
+    _register_task_listeners(_provider, _spec)
+
+event.listen(SessionLocal, "after_commit", _apply_pending_changes)
+event.listen(SessionLocal, "after_soft_rollback", _discard_pending_changes)
+
+
+####################
+# 存储统计
+####################
+
+
+def format_size(size_bytes) -> str:
+    """格式化大小为人类可读格式"""
+    if not size_bytes:
+        return "0B"
+    size_names = ("B", "KB", "MB", "GB", "TB")
+    i = min(int(math.floor(math.log(size_bytes, 1024))), len(size_names) - 1)
+    p = math.pow(1024, i)
+    s = round(size_bytes / p, 2)
+    return f"{s} {size_names[i]}"
+
+
+def _size_entry(count: int, size: int) -> dict:
+    return {"count": count, "size": size, "size_formatted": format_size(size)}
+
+
+def compute_storage_stats() -> dict:
+    """计算存储使用统计
+
+    状态、类型、来源的汇总来自一次分组查询；用户排行、7天趋势与最近失败记录
+    的分组维度不同，各自单独查询（时间条件均为范围比较）。
+    """
+    with get_db() as db:
+        rows = (
+            db.query(
+                GeneratedFile.status,
+                GeneratedFile.file_type,
+                GeneratedFile.source_type,
+                func.count(GeneratedFile.id),
+                func.sum(GeneratedFile.file_size),
+            )
+            .group_by(
+                GeneratedFile.status,
+                GeneratedFile.file_type,
+                GeneratedFile.source_type,
+            )
+            .all()
+        )
+
+        # 按用户统计（前10个用户）
+        user_stats = (
+            db.query(
+                GeneratedFile.user_id,
+                func.count(GeneratedFile.id).label("count"),
+                func.sum(GeneratedFile.file_size).label("total_size"),
+            )
+            .filter(GeneratedFile.status == "uploaded")
+            .group_by(GeneratedFile.user_id)
+            .order_by(desc("total_size"))
+            .limit(10)
+            .all()
+        )
+
+        # 最近7天的上传趋势
+        seven_days_ago = datetime.now() - timedelta(days=7)
+        daily_stats = (
+            db.query(
+                func.date(GeneratedFile.created_at).label("date"),
+                func.count(GeneratedFile.id).label("count"),
+                func.sum(GeneratedFile.file_size).label("total_size"),
+            )
+            .filter(
+                GeneratedFile.created_at >= seven_days_ago,
+                GeneratedFile.status == "uploaded",
+            )
+            .group_by(func.date(GeneratedFile.created_at))
+            .order_by("date")
+            .all()
+        )
+
+        # 最近失败的文件（前5个）
+        recent_failures = (
+            db.query(GeneratedFile)
+            .filter(GeneratedFile.status == "failed")
+            .order_by(GeneratedFile.created_at.desc())
+            .limit(5)
+            .all()
+        )
+
+    status_counts: Dict[str, int] = {}
+    type_stats: Dict[str, list] = {}
+    source_stats: Dict[str, list] = {}
+    for status, file_type, source_type, count, size in rows:
+        _increment(status_counts, status, count)
+        if status != "uploaded":
+            continue
+
+        size = size or 0
+        for stats, key in ((type_stats, file_type), (source_stats, source_type)):
+            entry = stats.setdefault(key, [0, 0])
+            entry[0] += count
+            entry[1] += size
+
+    total_files = sum(status_counts.values())
+    uploaded_files = status_counts.get("uploaded", 0)
+    total_size = sum(size for _, size in type_stats.values())
+
+    return {
+        "summary": {
+            "total_files": total_files,
+            "uploaded_files": uploaded_files,
+            "failed_files": status_counts.get("failed", 0),
+            "pending_files": status_counts.get("pending", 0),
+            "total_size": total_size,
+            "total_size_formatted": format_size(total_size),
+            "success_rate": round(
+                (uploaded_files / total_files * 100) if total_files > 0 else 0,
+                2,
+            ),
+        },
+        "type_distribution": {
+            key: _size_entry(count, size) for key, (count, size) in type_stats.items()
+        },
+        "source_distribution": {
+            key: _size_entry(count, size) for key, (count, size) in source_stats.items()
+        },
+        "top_users": [
+            {"user_id": stat[0], **_size_entry(stat[1], stat[2] or 0)}
+            for stat in user_stats
+        ],
+        "daily_trend": [
+            {
+                "date": (
+                    stat[0].strftime("%Y-%m-%d")
+                    if stat[0] and hasattr(stat[0], "strftime")
+                    else str(stat[0]) if stat[0] else ""
+                ),
+                **_size_entry(stat[1], stat[2] or 0),
+            }
+            for stat in daily_stats
+        ],
+        "recent_failures": [
+            {
+                "id": f.id,
+                "filename": f.filename,
+                "source_type": f.source_type,
+                "error": f.error_message,
+                "created_at": (
+                    f.created_at.strftime("%Y-%m-%d %H:%M:%S") if f.created_at else ""
+                ),
+            }
+            for f in recent_failures
+        ],
+    }
+
+
+def get_storage_stats() -> dict:
+    """获取存储使用统计（缓存快照）"""
+    return get_cache_manager().get_or_load(
+        STATS_NAMESPACE, "storage", compute_storage_stats
+    )
@@ -1,14 +1,19 @@
 import os
 import shutil
 import json
+import hashlib
 import logging
 import re
+import threading
+import uuid
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple, Dict
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import BinaryIO, Callable, Optional, Tuple, Dict
 
 import boto3
 from botocore.config import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from open_webui.config import (
     S3_ACCESS_KEY_ID,
     S3_BUCKET_NAME,
@@ -25,7 +30,9 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_LOCAL_CACHE_MAX_SIZE_MB,
     UPLOAD_DIR,
+    CACHE_DIR,
 )
 from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError, NotFound
@@ -39,6 +46,183 @@ from open_webui.env import SRC_LOG_LEVELS
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Size of the buffer used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class LocalFileCache:
+    """
+    Read-through cache for local copies of remote storage objects.
+
+    Entries are indexed by the object key and validated against the remote ETag,
+    so an object is only downloaded again when it changed. Concurrent requests for
+    the same key share a single download, and the least recently used copies are
+    removed once the total size exceeds max_size.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._loaded = False
+
+    @property
+    def index_dir(self) -> str:
+        return os.path.join(CACHE_DIR, "storage")
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(
+            self.index_dir, hashlib.sha256(key.encode()).hexdigest() + ".json"
+        )
+
+    def _load(self):
+        """Rebuild the in-memory LRU from the on-disk index (oldest access first)."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not os.path.isdir(self.index_dir):
+            return
+
+        records = []
+        for name in os.listdir(self.index_dir):
+            index_path = os.path.join(self.index_dir, name)
+            try:
+                with open(index_path, "r") as f:
+                    entry = json.load(f)
+                records.append((os.path.getmtime(index_path), entry))
+            except Exception:
+                continue
+
+        for _, entry in sorted(records, key=lambda record: record[0]):
+            if os.path.isfile(entry["path"]):
+                self._entries[entry["key"]] = entry
+
+    def _save(self, entry: dict):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self._index_path(entry["key"]), "w") as f:
+            json.dump(entry, f)
+
+    def _lookup(self, key: str, etag: Optional[str], local_path: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or etag is None:
+            return None
+        if entry["etag"] != etag or entry["path"] != local_path:
+            return None
+        if not os.path.isfile(entry["path"]):
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._index_path(key))
+        except OSError:
+            pass
+        return entry["path"]
+
+    def put(self, key: str, etag: Optional[str], path: str):
+        """Record an already materialized local copy (e.g. right after an upload)."""
+        if etag is None or not os.path.isfile(path):
+            return
+
+        etag = str(etag)
+        entry = {
+            "key": key,
+            "etag": etag,
+            "path": path,
+            "size": os.path.getsize(path),
+        }
+        with self._lock:
+            self._load()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._save(entry)
+        self.prune()
+
+    def get(
+        self,
+        key: str,
+        etag: Optional[str],
+        local_path: str,
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Return a local path for `key`, calling download(tmp_path) only on a miss.
+        Callers waiting on an in-flight download for the same key reuse its result.
+        """
+        etag = str(etag) if etag is not None else None
+        with self._lock:
+            self._load()
+            cached_path = self._lookup(key, etag, local_path)
+            if cached_path:
+                return cached_path
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            tmp_path = f"{local_path}.{uuid.uuid4().hex}.part"
+            try:
+                download(tmp_path)
+                os.replace(tmp_path, local_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            future.set_result(local_path)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        self.put(key, etag, local_path)
+        return local_path
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._load()
+            self._entries.pop(key, None)
+            try:
+                os.remove(self._index_path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            shutil.rmtree(self.index_dir, ignore_errors=True)
+
+    def prune(self):
+        """Evict least recently used local copies until the cache fits max_size."""
+        with self._lock:
+            total = sum(entry["size"] for entry in self._entries.values())
+            for key in list(self._entries.keys()):
+                if total <= self.max_size:
+                    break
+                if key in self._inflight:
+                    continue
+
+                entry = self._entries.pop(key)
+                total -= entry["size"]
+                try:
+                    os.remove(self._index_path(key))
+                    if os.path.isfile(entry["path"]):
+                        os.remove(entry["path"])
+                except OSError as e:
+                    log.warning(f"Failed to evict cached file {entry['path']}: {e}")
+
+
+StorageCache = LocalFileCache(max_size=STORAGE_LOCAL_CACHE_MAX_SIZE_MB * 1024 * 1024)
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -48,7 +232,7 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         pass
 
     @abstractmethod
@@ -64,14 +248,19 @@ class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[int, str]:
+        """Streams the file to local storage and returns its size and path."""
         file_path = f"{UPLOAD_DIR}/{filename}"
+        size = 0
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                size += len(chunk)
+
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -144,9 +333,9 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
             self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
@@ -165,20 +354,31 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
+        s3_file_path = f"s3://{self.bucket_name}/{s3_key}"
+        try:
+            etag = self._get_etag(s3_key)
+        except (ClientError, BotoCoreError) as e:
+            # The upload succeeded, the next read just misses the cache
+            log.warning(f"Could not read the ETag of {s3_file_path}: {e}")
+            etag = None
+        StorageCache.put(s3_file_path, etag, file_path)
+        return size, s3_file_path
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            return StorageCache.get(
+                file_path,
+                self._get_etag(s3_key),
+                self._get_local_file_path(s3_key),
+                lambda tmp_path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, tmp_path
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -190,6 +390,8 @@ class S3StorageProvider(StorageProvider):
         except ClientError as e:
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
+        StorageCache.invalidate(file_path)
+
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
 
@@ -210,6 +412,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        StorageCache.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -219,6 +422,10 @@ class S3StorageProvider(StorageProvider):
     def _get_local_file_path(self, s3_key: str) -> str:
         return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
 
+    def _get_etag(self, s3_key: str) -> Optional[str]:
+        response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        return response.get("ETag")
+
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -237,13 +444,16 @@ class GCSStorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob = self.bucket.blob(filename)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+
+            gcs_file_path = "gs://" + self.bucket_name + "/" + filename
+            StorageCache.put(gcs_file_path, blob.etag, file_path)
+            return size, gcs_file_path
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -251,11 +461,16 @@ class GCSStorageProvider(StorageProvider):
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
-
-            return local_file_path
+            if blob is None:
+                raise NotFound(f"{file_path} not found")
+
+            return StorageCache.get(
+                file_path,
+                blob.etag,
+                f"{UPLOAD_DIR}/{filename}",
+                blob.download_to_filename,
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -268,6 +483,8 @@ class GCSStorageProvider(StorageProvider):
         except NotFound as e:
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
+        StorageCache.invalidate(file_path)
+
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
 
@@ -283,6 +500,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        StorageCache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -309,13 +527,18 @@ class AzureStorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            with open(file_path, "rb") as data:
+                result = blob_client.upload_blob(data, length=size, overwrite=True)
+
+            azure_file_path = f"{self.endpoint}/{self.container_name}/{filename}"
+            if isinstance(result, dict):
+                StorageCache.put(azure_file_path, result.get("etag"), file_path)
+            return size, azure_file_path
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -323,11 +546,18 @@ class AzureStorageProvider(StorageProvider):
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def download(tmp_path: str):
+                with open(tmp_path, "wb") as download_file:
+                    blob_client.download_blob().readinto(download_file)
+
+            return StorageCache.get(
+                file_path,
+                blob_client.get_blob_properties().etag,
+                f"{UPLOAD_DIR}/{filename}",
+                download,
+            )
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -340,6 +570,8 @@ class AzureStorageProvider(StorageProvider):
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
+        StorageCache.invalidate(file_path)
+
         # Always delete from local storage
         LocalStorageProvider.delete_file(file_path)
 
@@ -353,6 +585,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        StorageCache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -66,10 +66,10 @@ class TestLocalStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
+        size, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -116,7 +116,7 @@ class TestS3StorageProvider:
         with pytest.raises(Exception):
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
@@ -124,7 +124,7 @@ class TestS3StorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -132,7 +132,7 @@ class TestS3StorageProvider:
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(s3_file_path)
@@ -142,7 +142,7 @@ class TestS3StorageProvider:
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         assert (upload_dir / self.filename).exists()
@@ -229,7 +229,7 @@ class TestGCSStorageProvider:
         with pytest.raises(Exception):
             self.Storage.bucket = monkeypatch(self.Storage, "bucket", None)
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.Storage.bucket.get_blob(self.filename)
@@ -237,7 +237,7 @@ class TestGCSStorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
@@ -245,7 +245,7 @@ class TestGCSStorageProvider:
 
     def test_get_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(gcs_file_path)
@@ -254,7 +254,7 @@ class TestGCSStorageProvider:
 
     def test_delete_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         # ensure that local directory has the uploaded file as well
@@ -348,16 +348,14 @@ class TestAzureStorageProvider:
         # Reset side effect and create container
         self.Storage.container_client.get_blob_client.side_effect = None
         self.Storage.create_container()
-        contents, azure_file_path = self.Storage.upload_file(
+        size, azure_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
-        assert contents == self.file_content
+        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once()
+        assert size == len(self.file_content)
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
@@ -375,7 +373,7 @@ class TestAzureStorageProvider:
         # Mock upload behavior
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         # Mock blob download behavior
-        self.Storage.container_client.get_blob_client().download_blob().readall.return_value = (
+        self.Storage.container_client.get_blob_client().download_blob().readinto.side_effect = lambda stream: stream.write(
             self.file_content
         )
 
@@ -433,3 +431,103 @@ class TestAzureStorageProvider:
         )
         with pytest.raises(Exception, match="Blob not found"):
             self.Storage.get_file(file_url)
+
+
+class TestLocalFileCache:
+    def setup_cache(self, monkeypatch, tmp_path, max_size=20):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setattr(provider, "CACHE_DIR", str(tmp_path / "cache"))
+        return upload_dir, provider.LocalFileCache(max_size=max_size)
+
+    def test_hit_miss_by_etag(self, monkeypatch, tmp_path):
+        upload_dir, cache = self.setup_cache(monkeypatch, tmp_path)
+        downloads = []
+
+        def download(tmp_path):
+            downloads.append(tmp_path)
+            with open(tmp_path, "wb") as f:
+                f.write(b"test content")
+
+        local_path = str(upload_dir / "a.txt")
+        assert cache.get("s3://bucket/a.txt", "1", local_path, download) == local_path
+        assert cache.get("s3://bucket/a.txt", "1", local_path, download) == local_path
+        assert len(downloads) == 1
+        cache.get("s3://bucket/a.txt", "2", local_path, download)
+        assert len(downloads) == 2
+        assert (upload_dir / "a.txt").read_bytes() == b"test content"
+
+    def test_lru_eviction(self, monkeypatch, tmp_path):
+        upload_dir, cache = self.setup_cache(monkeypatch, tmp_path)
+
+        def download(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(b"test content")
+
+        cache.get("key-a", "1", str(upload_dir / "a.txt"), download)
+        cache.get("key-b", "1", str(upload_dir / "b.txt"), download)
+        assert not (upload_dir / "a.txt").exists()
+        assert (upload_dir / "b.txt").exists()
+
+    def test_single_flight(self, monkeypatch, tmp_path):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        upload_dir, cache = self.setup_cache(monkeypatch, tmp_path, max_size=1024)
+        started = threading.Event()
+        release = threading.Event()
+        downloads = []
+
+        def download(tmp_path):
+            downloads.append(tmp_path)
+            started.set()
+            release.wait(5)
+            with open(tmp_path, "wb") as f:
+                f.write(b"test content")
+
+        local_path = str(upload_dir / "a.txt")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(cache.get, "key-a", "1", local_path, download)
+                for _ in range(4)
+            ]
+            started.wait(5)
+            release.set()
+            assert all(future.result() == local_path for future in futures)
+        assert len(downloads) == 1
+
+
+class TestS3UploadCache:
+    def setup_storage(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        monkeypatch.setattr(provider, "CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(
+            provider, "StorageCache", provider.LocalFileCache(max_size=1024)
+        )
+        storage = provider.S3StorageProvider()
+        storage.bucket_name = "my-bucket"
+        storage.s3_client = MagicMock()
+        return upload_dir, storage
+
+    def test_upload_seeds_the_cache(self, monkeypatch, tmp_path):
+        upload_dir, storage = self.setup_storage(monkeypatch, tmp_path)
+        storage.s3_client.head_object.return_value = {"ETag": '"abc"'}
+
+        _, s3_file_path = storage.upload_file(io.BytesIO(b"test content"), "a.txt", {})
+
+        assert storage.get_file(s3_file_path) == str(upload_dir / "a.txt")
+        storage.s3_client.download_file.assert_not_called()
+
+    def test_upload_survives_a_failed_etag_lookup(self, monkeypatch, tmp_path):
+        upload_dir, storage = self.setup_storage(monkeypatch, tmp_path)
+        storage.s3_client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject"
+        )
+
+        size, s3_file_path = storage.upload_file(
+            io.BytesIO(b"test content"), "a.txt", {}
+        )
+
+        assert size == len(b"test content")
+        assert s3_file_path == "s3://my-bucket/a.txt"
+        storage.s3_client.upload_file.assert_called_once()
+        assert (upload_dir / "a.txt").read_bytes() == b"test content"
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from open_webui.utils import admission, task_events
+from open_webui.utils.admission import AdmissionController
+
+
+class TestAdmissionController:
+    @pytest.mark.asyncio
+    async def test_queued_submissions_alternate_between_users(self, monkeypatch):
+        monkeypatch.setattr(admission, "MEDIA_TASK_USER_MAX_CONCURRENCY", 0)
+        controller = AdmissionController()
+
+        holder = await controller.acquire("p", "a", 1)
+        order = []
+
+        async def submit(user_id):
+            member = await controller.acquire("p", user_id, 1)
+            order.append(user_id)
+            await controller._release_member("p", user_id, member)
+
+        tasks = [asyncio.create_task(submit(u)) for u in ("a", "a", "b", "b")]
+        await asyncio.sleep(0.05)
+        await controller._release_member("p", "a", holder)
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_slot_is_held_until_the_task_finishes(self, monkeypatch):
+        monkeypatch.setattr(admission, "MEDIA_TASK_QUEUE_TIMEOUT", 0.2)
+        controller = AdmissionController()
+        controller._loop = asyncio.get_running_loop()
+
+        async with controller.admit("p", "a", 1) as ticket:
+            ticket.bind("task-1")
+
+        with pytest.raises(HTTPException) as e:
+            async with controller.admit("p", "b", 1):
+                pass
+        assert e.value.status_code == 429
+
+        controller.on_task_event(
+            {
+                "type": "task_update",
+                "provider": "p",
+                "user_id": "a",
+                "task": {"id": "task-1", "status": "SUCCESS"},
+            }
+        )
+        async with controller.admit("p", "b", 1):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_timed_out_waiter_does_not_keep_the_slot(self, monkeypatch):
+        monkeypatch.setattr(admission, "MEDIA_TASK_QUEUE_TIMEOUT", 0.2)
+        controller = AdmissionController()
+
+        holder = await controller.acquire("p", "a", 1)
+        waiter = asyncio.create_task(controller.acquire("p", "b", 1))
+        await asyncio.sleep(0.05)
+
+        # the dispatcher is still waiting on the store when the submission times out
+        try_acquire = controller._try_acquire
+
+        async def slow_try_acquire(*args):
+            await asyncio.sleep(0.3)
+            return await try_acquire(*args)
+
+        monkeypatch.setattr(controller, "_try_acquire", slow_try_acquire)
+        await controller._release_member("p", "a", holder)
+
+        with pytest.raises(HTTPException) as e:
+            await waiter
+        assert e.value.status_code == 429
+
+        await asyncio.sleep(0.3)
+        assert controller._active["p"] == {}
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_halves_the_limit(self):
+        controller = AdmissionController()
+
+        with pytest.raises(HTTPException):
+            async with controller.admit("p", "a", 4):
+                raise HTTPException(status_code=429, detail="请求过于频繁")
+
+        assert controller._penalties["p"][0] == 2
+        assert await controller.report_rate_limited("p", 4) == 2
+
+    @pytest.mark.asyncio
+    async def test_queue_positions_are_broadcast_off_the_loop(self, monkeypatch):
+        loop_thread = threading.get_ident()
+        pipelines = []
+
+        class Pipeline:
+            def __init__(self):
+                self.messages = []
+
+            def publish(self, channel, message):
+                self.messages.append(json.loads(message)["event"])
+
+            def execute(self):
+                pipelines.append((threading.get_ident(), self.messages))
+
+        monkeypatch.setattr(
+            task_events.task_event_bus,
+            "publisher",
+            SimpleNamespace(pipeline=lambda transaction: Pipeline()),
+        )
+        controller = AdmissionController()
+
+        holder = await controller.acquire("p", "a", 1)
+        waiters = [
+            asyncio.create_task(controller.acquire("p", user_id, 1))
+            for user_id in ("b", "c", "d")
+        ]
+        await asyncio.sleep(0.05)
+
+        assert pipelines
+        assert all(thread != loop_thread for thread, _ in pipelines)
+        # one round trip for the whole queue
+        assert [
+            (event["user_id"], event["position"]) for event in pipelines[-1][1]
+        ] == [("b", 1), ("c", 2), ("d", 3)]
+
+        for task in waiters:
+            task.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await controller._release_member("p", "a", holder)
@@ -0,0 +1,37 @@
+from open_webui.utils.audio import (
+    get_max_segment_duration,
+    parse_silences,
+    plan_segments,
+)
+
+
+class TestAudioSegmentation:
+    def test_parse_silences(self):
+        output = "\n".join(
+            [
+                "[silencedetect @ 0x1] silence_start: -0.01",
+                "[silencedetect @ 0x1] silence_end: 1.5 | silence_duration: 1.51",
+                "[silencedetect @ 0x1] silence_start: 10",
+                "[silencedetect @ 0x1] silence_end: 12 | silence_duration: 2",
+            ]
+        )
+        assert parse_silences(output) == [(0.0, 1.5), (10.0, 12.0)]
+
+    def test_max_segment_duration(self):
+        # 32 kbps == 4000 bytes/s, 10% headroom
+        assert get_max_segment_duration(40_000, 32) == 9.0
+        assert get_max_segment_duration(10, 32) == 1.0
+
+    def test_plan_segments_short_audio(self):
+        assert plan_segments(10, 30) == [(0.0, 10)]
+
+    def test_plan_segments_hard_cuts(self):
+        segments = plan_segments(70, 30)
+        assert segments == [(0.0, 30.0), (30.0, 60.0), (60.0, 70)]
+
+    def test_plan_segments_snaps_to_silence(self):
+        segments = plan_segments(100, 30, [(25, 27), (50, 51), (58, 59)])
+        assert segments[0] == (0.0, 26.0)
+        assert segments[1] == (26.0, 50.5)
+        assert all(end - start <= 30 for start, end in segments)
+        assert segments[-1][1] == 100
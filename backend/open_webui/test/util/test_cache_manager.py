@@ -0,0 +1,110 @@
+import threading
+
+from open_webui.utils.cache_manager import CacheConfig, CacheManager, MemoryCache
+
+
+class TestMemoryCache:
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_size=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+
+
+class TestCacheManager:
+    def test_get_or_load_and_invalidate(self):
+        manager = CacheManager(config=CacheConfig())
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"id": "model"}
+
+        assert manager.get_or_load("models", "model", loader) == {"id": "model"}
+        assert manager.get_or_load("models", "model", loader) == {"id": "model"}
+        assert len(calls) == 1
+
+        manager.invalidate("models", "model", broadcast=False)
+        manager.get_or_load("models", "model", loader)
+        assert len(calls) == 2
+
+    def test_none_is_not_cached_by_default(self):
+        manager = CacheManager(config=CacheConfig())
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return None
+
+        manager.get_or_load("models", "missing", loader)
+        manager.get_or_load("models", "missing", loader)
+        assert len(calls) == 2
+
+    def test_copies_are_handed_out(self):
+        manager = CacheManager(config=CacheConfig())
+        copy = lambda value: {**value, "params": dict(value["params"])}
+
+        first = manager.get_or_load(
+            "models", "m", lambda: {"params": {"t": 1}}, copy=copy
+        )
+        first["params"]["t"] = 2
+
+        assert manager.get_or_load("models", "m", None, copy=copy) == {
+            "params": {"t": 1}
+        }
+
+    def test_load_overlapping_invalidation_is_not_cached(self):
+        manager = CacheManager(config=CacheConfig())
+        loading, saved = threading.Event(), threading.Event()
+        values = iter(["old", "new"])
+
+        def slow_loader():
+            value = next(values)
+            loading.set()
+            saved.wait(5)
+            return value
+
+        reader = threading.Thread(
+            target=lambda: manager.get_or_load("models", "m", slow_loader)
+        )
+        reader.start()
+        loading.wait(5)
+        # a save commits and invalidates while the old row is being loaded
+        manager.invalidate("models", "m", broadcast=False)
+        saved.set()
+        reader.join()
+
+        assert manager.get_or_load("models", "m", lambda: next(values)) == "new"
+
+    def test_invalidations_leave_no_state_behind(self):
+        manager = CacheManager(config=CacheConfig())
+        loading, saved = threading.Event(), threading.Event()
+
+        def slow_loader():
+            loading.set()
+            saved.wait(5)
+            return "old"
+
+        reader = threading.Thread(
+            target=lambda: manager.get_or_load("files", "f-0", slow_loader)
+        )
+        reader.start()
+        loading.wait(5)
+        # the whole namespace is invalidated while the load runs
+        manager.invalidate("files", broadcast=False)
+        saved.set()
+        reader.join()
+        assert manager.peek("files", "f-0") is None
+
+        for index in range(100):
+            manager.get_or_load("files", f"f-{index}", lambda: "value")
+            manager.invalidate("files", f"f-{index}", broadcast=False)
+
+        assert manager._loads == {}
+        assert manager._stale == set()
+        assert manager._inflight == {}
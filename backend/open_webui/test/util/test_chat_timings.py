@@ -0,0 +1,140 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from open_webui.utils.telemetry import stages
+from open_webui.utils.telemetry.stages import (
+    CHAT_PROFILE_HEADER,
+    install_db_write_counter,
+    record_completion_tokens,
+    stage,
+    start_chat_timings,
+    track_upstream_response,
+)
+
+
+def make_request(headers=None):
+    return SimpleNamespace(headers=headers or {})
+
+
+class TestChatTimings:
+    def test_disabled_without_otel_or_profile(self, monkeypatch):
+        monkeypatch.setattr(stages, "ENABLE_OTEL", False)
+
+        async def chat():
+            timings = start_chat_timings(make_request(), None, "model")
+            with stage("filter_inlet"):
+                pass
+            return timings, stages.get_chat_timings()
+
+        assert asyncio.run(chat()) == (None, None)
+
+    def test_stream_stages(self, monkeypatch):
+        monkeypatch.setattr(stages, "ENABLE_OTEL", True)
+        engine = create_engine("sqlite://")
+        install_db_write_counter(engine)
+
+        async def upstream():
+            for chunk in ("a", "b", "c"):
+                await asyncio.sleep(0.01)
+                yield chunk
+            record_completion_tokens("task-model", 100)
+            record_completion_tokens("model", 30)
+
+        async def chat():
+            timings = start_chat_timings(make_request(), None, "model")
+            with stage("retrieval_embed"):
+                await asyncio.sleep(0.01)
+            with stage("retrieval_embed"):
+                await asyncio.sleep(0.01)
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE t (id INTEGER)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+                conn.execute(text("SELECT * FROM t"))
+
+            timings.upstream_started_at = stages.time.perf_counter()
+            response = track_upstream_response(
+                timings, SimpleNamespace(body_iterator=upstream())
+            )
+            assert not timings.finished
+
+            # consumed by a background task, as for chats with a chat_id
+            chunks = await asyncio.create_task(
+                asyncio.wait_for(collect(response.body_iterator), 5)
+            )
+            assert chunks == ["a", "b", "c"]
+            return timings
+
+        async def collect(iterator):
+            return [chunk async for chunk in iterator]
+
+        timings = asyncio.run(chat())
+        summary = timings.summary()
+
+        assert timings.finished
+        assert summary["stages"]["retrieval_embed"] >= 20
+        assert summary["stages"]["upstream_stream"] >= 30
+        assert summary["ttft_ms"] >= 10
+        assert summary["completion_tokens"] == 30
+        assert summary["tokens_per_second"] > 0
+        assert summary["db_writes"] == 1
+
+    def test_profile_capture(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(stages, "ENABLE_OTEL", False)
+        monkeypatch.setattr(stages, "ENABLE_CHAT_PROFILING", True)
+        monkeypatch.setattr(stages, "CHAT_PROFILING_DIR", str(tmp_path))
+        admin = SimpleNamespace(role="admin")
+        request = make_request({CHAT_PROFILE_HEADER: "1"})
+
+        async def chat(user):
+            timings = start_chat_timings(request, user, "model")
+            with stage("files"):
+                sum(range(1000))
+            if timings is not None:
+                timings.finish()
+            return timings
+
+        assert asyncio.run(chat(SimpleNamespace(role="user"))) is None
+        timings = asyncio.run(chat(admin))
+
+        files = sorted(os.listdir(tmp_path))
+        assert [os.path.splitext(name)[0] for name in files] == [timings.id] * 2
+        assert not stages.RequestProfiler._active
+
+    def test_profile_released_when_the_stream_is_not_consumed(
+        self, monkeypatch, tmp_path
+    ):
+        monkeypatch.setattr(stages, "ENABLE_OTEL", False)
+        monkeypatch.setattr(stages, "ENABLE_CHAT_PROFILING", True)
+        monkeypatch.setattr(stages, "CHAT_PROFILING_DIR", str(tmp_path))
+        request = make_request({CHAT_PROFILE_HEADER: "1"})
+        ran = []
+
+        async def upstream():
+            yield "a"
+
+        async def chat():
+            timings = start_chat_timings(request, SimpleNamespace(role="admin"), "m")
+            response = track_upstream_response(
+                timings,
+                StreamingResponse(
+                    upstream(), background=BackgroundTask(ran.append, "background")
+                ),
+            )
+            assert stages.RequestProfiler._active
+            # the client went away before the body was sent
+            await response.background()
+            return timings
+
+        timings = asyncio.run(chat())
+
+        assert timings.finished
+        assert ran == ["background"]
+        assert not stages.RequestProfiler._active
+        # the next capture can start
+        stages.RequestProfiler.start().stop("next", {})
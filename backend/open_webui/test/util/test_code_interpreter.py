@@ -0,0 +1,154 @@
+import contextlib
+import io
+import json
+import traceback
+import uuid
+
+import pytest
+from aiohttp import WSMsgType, web
+
+from open_webui.utils.code_interpreter import JupyterKernelPool
+
+
+class StandInJupyterServer:
+    """Minimal Jupyter server: kernels are Python namespaces driven over the channels websocket."""
+
+    def __init__(self):
+        self.kernels = {}
+        self.deleted = []
+        self.runner = None
+        self.base_url = ""
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/api/kernels", self.create_kernel)
+        app.router.add_delete("/api/kernels/{id}", self.delete_kernel)
+        app.router.add_post("/api/kernels/{id}/restart", self.restart_kernel)
+        app.router.add_get("/api/kernels/{id}/channels", self.channels)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def create_kernel(self, request):
+        kernel_id = uuid.uuid4().hex
+        self.kernels[kernel_id] = {}
+        return web.json_response({"id": kernel_id})
+
+    async def delete_kernel(self, request):
+        self.deleted.append(request.match_info["id"])
+        self.kernels.pop(request.match_info["id"], None)
+        return web.Response(status=204)
+
+    async def restart_kernel(self, request):
+        self.kernels[request.match_info["id"]] = {}
+        return web.json_response({"id": request.match_info["id"]})
+
+    async def channels(self, request):
+        kernel_id = request.match_info["id"]
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            message = json.loads(msg.data)
+            parent = {"msg_id": message["header"]["msg_id"]}
+            code = message["content"]["code"]
+            namespace = self.kernels[kernel_id]
+
+            stdout = io.StringIO()
+            error = None
+            if code.strip() == "%reset -f":
+                namespace.clear()
+            else:
+                try:
+                    with contextlib.redirect_stdout(stdout):
+                        exec(code, namespace)
+                except Exception:
+                    error = traceback.format_exc().splitlines()
+
+            if stdout.getvalue():
+                await ws.send_json(
+                    {
+                        "parent_header": parent,
+                        "msg_type": "stream",
+                        "content": {"name": "stdout", "text": stdout.getvalue()},
+                    }
+                )
+            if error:
+                await ws.send_json(
+                    {
+                        "parent_header": parent,
+                        "msg_type": "error",
+                        "content": {"traceback": error},
+                    }
+                )
+            await ws.send_json(
+                {
+                    "parent_header": parent,
+                    "msg_type": "status",
+                    "content": {"execution_state": "idle"},
+                }
+            )
+        return ws
+
+
+@contextlib.asynccontextmanager
+async def running_pool(**kwargs):
+    server = StandInJupyterServer()
+    await server.start()
+    pool = JupyterKernelPool(**kwargs)
+    try:
+        yield server, pool
+    finally:
+        await pool.shutdown()
+        await server.stop()
+
+
+class TestJupyterKernelPool:
+    @pytest.mark.asyncio
+    async def test_session_reuses_warm_kernel(self):
+        async with running_pool(max_size=2) as (server, pool):
+            await pool.execute(server.base_url, "x = 41", owner="a")
+            result = await pool.execute(server.base_url, "print(x + 1)", owner="a")
+
+            assert result.stdout == "42"
+            assert len(server.kernels) == 1
+            assert pool.get_metrics()["created"] == 1
+            assert pool.get_metrics()["reused"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handover_resets_state(self):
+        async with running_pool(max_size=1, isolation="reset") as (server, pool):
+            await pool.execute(server.base_url, "secret = 1", owner="a")
+            result = await pool.execute(server.base_url, "print(secret)", owner="b")
+
+            assert "NameError" in result.stderr
+            assert pool.get_metrics()["created"] == 1
+            assert pool.get_metrics()["reset"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handover_restarts_by_default(self):
+        async with running_pool(max_size=1) as (server, pool):
+            await pool.execute(server.base_url, "secret = 1", owner="a")
+            result = await pool.execute(server.base_url, "print(secret)", owner="b")
+
+            assert "NameError" in result.stderr
+            assert pool.get_metrics()["restarted"] == 1
+            assert pool.get_metrics()["reset"] == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_kernels_are_reaped(self):
+        async with running_pool(max_size=2, idle_timeout=0) as (server, pool):
+            await pool.execute(server.base_url, "print(1)", owner="a")
+            assert await pool.reap_idle() == 1
+
+            assert pool.get_metrics()["kernels"] == 0
+            assert len(server.deleted) == 1
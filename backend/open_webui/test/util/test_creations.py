@@ -0,0 +1,242 @@
+import asyncio
+import datetime
+import importlib.util
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from fastapi import HTTPException
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.models import creations as creations_module
+from open_webui.models.creations import Creation, Creations
+from open_webui.models.jimeng import JimengTask
+from open_webui.routers.creations import get_creations
+from open_webui.utils import task_events
+from open_webui.utils.task_events import record_task_write, wait_for_task_changes
+
+MIGRATION = os.path.join(
+    os.path.dirname(creations_module.__file__),
+    "..",
+    "migrations",
+    "versions",
+    "3c1e5a7b9d20_add_creation_table.py",
+)
+
+
+def make_task(task_id, created_at, user_id="user-1", status="SUCCESS", **fields):
+    return SimpleNamespace(
+        id=task_id,
+        user_id=user_id,
+        status=status,
+        prompt=f"prompt {task_id}",
+        created_at=datetime.datetime.fromtimestamp(created_at, datetime.UTC).replace(
+            tzinfo=None
+        ),
+        updated_at=None,
+        **fields,
+    )
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Creation.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(creations_module, "get_db", get_db)
+    return engine
+
+
+class TestCreations:
+    def test_upsert_keeps_creation_time(self, engine):
+        task = make_task("a", 1000, status="IN_PROGRESS")
+        Creations.upsert_from_task("midjourney", task)
+
+        task.status = "SUCCESS"
+        task.created_at = datetime.datetime(2030, 1, 1)
+        task.image_url = "https://example.com/a.png"
+        task.cloud_image_url = "https://cdn.example.com/a.png"
+        creation = Creations.upsert_from_task("midjourney", task)
+
+        assert creation.id == "midjourney:a"
+        assert creation.status == "SUCCESS"
+        assert creation.media_type == "image"
+        assert creation.url == "https://cdn.example.com/a.png"
+        assert creation.created_at == 1000
+
+    def test_pages_in_stable_order_with_duplicate_times(self, engine):
+        for task_id, created_at in [("a", 100), ("b", 200), ("c", 200), ("d", 300)]:
+            Creations.upsert_from_task("kling", make_task(task_id, created_at))
+        Creations.upsert_from_task("flux", make_task("e", 200, task_type="text"))
+        Creations.upsert_from_task("kling", make_task("f", 400, user_id="user-2"))
+
+        ids, cursor = [], None
+        while True:
+            page = Creations.get_creations_by_user_id("user-1", cursor=cursor, limit=2)
+            ids += [item.id for item in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert ids == ["kling:d", "kling:c", "kling:b", "flux:e", "kling:a"]
+        assert Creations.get_creations_by_user_id("user-3").items == []
+
+        page = Creations.get_creations_by_user_id("user-1", providers=["flux"])
+        assert [(item.id, item.action) for item in page.items] == [("flux:e", "text")]
+        assert page.next_cursor is None
+
+    def test_deleted_and_pruned_tasks_leave_the_index(self, engine):
+        for task_id, created_at in [("a", 100), ("b", 200), ("c", 300)]:
+            Creations.upsert_from_task("jimeng", make_task(task_id, created_at))
+        Creations.upsert_from_task("kling", make_task("a", 100))
+
+        Creations.record_task_change("jimeng", "c", None)
+        assert Creations.delete_by_provider_before("jimeng", 150) == 1
+
+        page = Creations.get_creations_by_user_id("user-1")
+        assert [item.id for item in page.items] == ["jimeng:b", "kling:a"]
+
+
+class TestGetCreations:
+    def call(self, **kwargs):
+        params = {"cursor": None, "limit": 30, "provider": None, "media_type": None}
+        params.update(kwargs)
+        return asyncio.run(get_creations(user=SimpleNamespace(id="user-1"), **params))
+
+    def test_filters_and_pages(self, engine):
+        for task_id, created_at in [("a", 100), ("b", 200)]:
+            Creations.upsert_from_task("midjourney", make_task(task_id, created_at))
+        Creations.upsert_from_task("kling", make_task("c", 300))
+
+        first = self.call(limit=1, provider="midjourney, flux")
+        assert [item.id for item in first.items] == ["midjourney:b"]
+        second = self.call(limit=1, provider="midjourney", cursor=first.next_cursor)
+        assert [item.id for item in second.items] == ["midjourney:a"]
+
+        assert [item.id for item in self.call(media_type="video").items] == ["kling:c"]
+
+    @pytest.mark.parametrize(
+        "params", [{"provider": "unknown"}, {"cursor": "not-a-cursor"}]
+    )
+    def test_bad_request(self, engine, params):
+        with pytest.raises(HTTPException) as error:
+            self.call(**params)
+        assert error.value.status_code == 400
+
+
+class TestCreationMigration:
+    def test_backfills_existing_tasks(self):
+        spec = importlib.util.spec_from_file_location("add_creation_table", MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE mj_tasks (id VARCHAR PRIMARY KEY, user_id VARCHAR, "
+                    "status VARCHAR, action VARCHAR, prompt TEXT, image_url TEXT, "
+                    "cloud_image_url TEXT, submit_time DATETIME)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE TABLE flux_tasks (id VARCHAR PRIMARY KEY, user_id VARCHAR, "
+                    "status VARCHAR, task_type VARCHAR, prompt TEXT, "
+                    "created_at DATETIME, updated_at DATETIME)"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO mj_tasks VALUES ('m1', 'user-1', 'SUCCESS', "
+                    "'IMAGINE', 'a cat', 'https://example.com/m1.png', NULL, "
+                    "'2025-01-01 00:00:00')"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO flux_tasks VALUES ('f1', 'user-2', 'FAILED', "
+                    "'text_to_image', 'a dog', '2025-01-02 00:00:00', "
+                    "'2025-01-03 00:00:00')"
+                )
+            )
+
+            with Operations.context(MigrationContext.configure(conn)):
+                migration.upgrade()
+
+            rows = conn.execute(text("SELECT * FROM creation ORDER BY id")).mappings()
+            rows = [dict(row) for row in rows]
+            indexes = {index["name"] for index in inspect(conn).get_indexes("creation")}
+
+        assert indexes == {
+            "idx_creation_user_created",
+            "idx_creation_user_provider_created",
+        }
+        assert rows == [
+            {
+                "id": "flux:f1",
+                "user_id": "user-2",
+                "provider": "flux",
+                "task_id": "f1",
+                "media_type": "image",
+                "action": "text_to_image",
+                "status": "FAILED",
+                "prompt": "a dog",
+                "url": None,
+                "created_at": 1735776000,
+                "updated_at": 1735862400,
+            },
+            {
+                "id": "midjourney:m1",
+                "user_id": "user-1",
+                "provider": "midjourney",
+                "task_id": "m1",
+                "media_type": "image",
+                "action": "IMAGINE",
+                "status": "SUCCESS",
+                "prompt": "a cat",
+                "url": "https://example.com/m1.png",
+                "created_at": 1735689600,
+                "updated_at": 1735689600,
+            },
+        ]
+
+
+class TestRecordTaskWrite:
+    def test_raw_writes_reach_the_handlers_after_the_call(self, monkeypatch):
+        changes, events = [], []
+        monkeypatch.setattr(
+            task_events,
+            "_change_handlers",
+            [lambda provider, task_id, task: changes.append((task_id, task.status))],
+        )
+        monkeypatch.setattr(task_events.task_event_bus, "_listeners", [events.append])
+
+        task = JimengTask(id="j1", user_id="user-1", status="processing")
+        record_task_write("jimeng", task)
+        # later edits of the instance are not part of the recorded write
+        task.status = "succeed"
+        wait_for_task_changes(5)
+
+        assert changes == [("j1", "processing")]
+        assert [(event["user_id"], event["task"]["status"]) for event in events] == [
+            ("user-1", "processing")
+        ]
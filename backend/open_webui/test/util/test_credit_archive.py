@@ -0,0 +1,233 @@
+import datetime
+import threading
+from decimal import Decimal
+
+import pytest
+
+from open_webui.models.credits import CreditLogModel
+from open_webui.utils.credit import archive as archive_module
+from open_webui.utils.credit.archive import (
+    ArchiveLock,
+    ArchiveLockLost,
+    LocalArchiveStorage,
+    archive_credit_logs,
+    get_archived_logs_by_cursor,
+    get_archived_logs_by_time,
+    iter_archived_logs,
+    read_archive_file,
+    serialize_logs,
+    to_log_models,
+)
+
+
+def timestamp(month, day):
+    return int(
+        datetime.datetime(2025, month, day, tzinfo=datetime.timezone.utc).timestamp()
+    )
+
+
+def make_log(index, created_at):
+    return CreditLogModel(
+        id=f"log-{index:03d}",
+        user_id=f"user-{index % 2}",
+        credit=Decimal("-0.123456789"),
+        detail={"usage": {"total_price": "0.1"}, "desc": f"请求 {index}"},
+        created_at=created_at,
+    )
+
+
+class FakeCreditLogs:
+    def __init__(self, logs):
+        self.logs = list(logs)
+
+    def get_logs_before(self, before, after=None, limit=1000):
+        logs = sorted(
+            (log for log in self.logs if log.created_at < before),
+            key=lambda log: (log.created_at, log.id),
+        )
+        if after:
+            logs = [log for log in logs if (log.created_at, log.id) > after]
+        return logs[:limit]
+
+    def delete_logs_by_ids(self, ids, chunk_size=1000):
+        ids = set(ids)
+        count = len(self.logs)
+        self.logs = [log for log in self.logs if log.id not in ids]
+        return count - len(self.logs)
+
+
+class FakeCreditLogArchives:
+    def __init__(self):
+        self.archives = {}
+
+    def insert_archive(self, archive):
+        self.archives[archive.id] = archive
+        return archive
+
+    def update_archive_status(self, id, status):
+        self.archives[id] = self.archives[id].model_copy(update={"status": status})
+
+    def get_archives(self, status="done", start_time=None, end_time=None):
+        archives = [
+            archive
+            for archive in self.archives.values()
+            if (not status or archive.status == status)
+            and (start_time is None or archive.end_time >= start_time)
+            and (end_time is None or archive.start_time < end_time)
+        ]
+        return sorted(archives, key=lambda archive: archive.end_time, reverse=True)
+
+
+class FakeRedis:
+    """Keys without expiry, the lock scripts are run as compare-and-set"""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def register_script(self, script):
+        def run(keys, args):
+            if self.values.get(keys[0]) != args[0]:
+                return 0
+            if script == archive_module.RELEASE_LOCK_SCRIPT:
+                del self.values[keys[0]]
+            return 1
+
+        return run
+
+
+LOGS = [make_log(index, timestamp(1, 1) + index) for index in range(5)] + [
+    make_log(index, timestamp(2, 1) + index) for index in range(5, 8)
+]
+
+
+@pytest.fixture
+def tables(monkeypatch, tmp_path):
+    storage = LocalArchiveStorage(str(tmp_path))
+    logs = FakeCreditLogs(LOGS)
+    archives = FakeCreditLogArchives()
+    monkeypatch.setattr(archive_module, "get_archive_storage", lambda *_: storage)
+    monkeypatch.setattr(archive_module, "CreditLogs", logs)
+    monkeypatch.setattr(archive_module, "CreditLogArchives", archives)
+    monkeypatch.setattr(archive_module, "REDIS_URL", None)
+    monkeypatch.setattr(archive_module, "CREDIT_LOG_ARCHIVE_BATCH_SIZE", 3)
+    monkeypatch.setattr(archive_module, "CREDIT_LOG_ARCHIVE_FILE_ROWS", 4)
+    return storage, logs, archives
+
+
+class TestCreditLogArchive:
+    def test_parquet_round_trip(self, tables):
+        storage, _, _ = tables
+        storage.write("2025/01/logs.parquet", serialize_logs(LOGS))
+
+        table = read_archive_file("local", "2025/01/logs.parquet")
+        assert to_log_models(table, CreditLogModel) == LOGS
+
+        table = read_archive_file(
+            "local",
+            "2025/01/logs.parquet",
+            user_ids=["user-1"],
+            start_time=timestamp(1, 1) + 2,
+        )
+        assert [log.id for log in to_log_models(table)] == [
+            "log-003",
+            "log-005",
+            "log-007",
+        ]
+
+    def test_archives_by_month_then_deletes(self, tables):
+        _, logs, archives = tables
+
+        result = archive_credit_logs(timestamp(2, 1) + 7)
+
+        assert result == {"status": "ok", "archives": 3, "rows": 7}
+        assert [log.id for log in logs.logs] == ["log-007"]
+        assert sorted(
+            (archive.start_time, archive.row_count)
+            for archive in archives.archives.values()
+        ) == [(timestamp(1, 1), 4), (timestamp(1, 1) + 4, 1), (timestamp(2, 1) + 5, 2)]
+        assert {archive.status for archive in archives.archives.values()} == {"done"}
+
+        archived = get_archived_logs_by_time(timestamp(1, 1), timestamp(3, 1))
+        assert sorted(log.id for log in archived) == [log.id for log in LOGS[:7]]
+
+    def test_cursor_pages_and_export_over_archives(self, tables):
+        archive_credit_logs(timestamp(3, 1))
+
+        ids, cursor = [], None
+        while True:
+            page, cursor = get_archived_logs_by_cursor(cursor=cursor, limit=3)
+            ids += [log.id for log in page]
+            if cursor is None:
+                break
+        assert ids == [log.id for log in reversed(LOGS)]
+
+        page, cursor = get_archived_logs_by_cursor(user_ids=["nobody"])
+        assert (page, cursor) == ([], None)
+
+        exported = iter_archived_logs(start_time=timestamp(1, 1) + 3)
+        assert [log.id for log in exported] == [log.id for log in LOGS[3:]]
+
+    def test_rows_are_kept_when_write_fails(self, tables, monkeypatch):
+        storage, logs, archives = tables
+
+        def write(path, data):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(storage, "write", write)
+        with pytest.raises(OSError):
+            archive_credit_logs(timestamp(3, 1))
+
+        assert logs.logs == LOGS
+        assert archives.archives == {}
+        # the lock is released after the failed run
+        assert archive_credit_logs(timestamp(1, 1))["status"] == "ok"
+
+    def test_local_lock_contention(self, tables, monkeypatch):
+        _, logs, _ = tables
+        started, finish = threading.Event(), threading.Event()
+        get_logs_before = logs.get_logs_before
+
+        def slow_get_logs_before(*args, **kwargs):
+            started.set()
+            finish.wait(5)
+            return get_logs_before(*args, **kwargs)
+
+        monkeypatch.setattr(logs, "get_logs_before", slow_get_logs_before)
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(archive_credit_logs(timestamp(3, 1)))
+        )
+        thread.start()
+        started.wait(5)
+
+        assert archive_credit_logs(timestamp(3, 1))["status"] == "locked"
+        finish.set()
+        thread.join()
+        assert results[0]["rows"] == len(LOGS)
+
+    def test_redis_lock_is_only_released_by_its_owner(self):
+        redis = FakeRedis()
+        first, second = ArchiveLock(redis, ttl=60), ArchiveLock(redis, ttl=60)
+
+        assert first.acquire()
+        assert not second.acquire()
+        assert first.renew()
+        first.check()
+
+        # the key expired while the first run was stalled
+        del redis.values[archive_module.ARCHIVE_LOCK_KEY]
+        assert second.acquire()
+        assert not first.renew()
+        with pytest.raises(ArchiveLockLost):
+            first.check()
+
+        first.release()
+        assert redis.values[archive_module.ARCHIVE_LOCK_KEY] == second.lock_id
+        second.release()
+        assert redis.values == {}
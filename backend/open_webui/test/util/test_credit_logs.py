@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import json
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from open_webui.models import credits as credits_module
+from open_webui.models.credits import (
+    CreditLog,
+    CreditLogs,
+    RedemptionCode,
+    RedemptionCodes,
+)
+from open_webui.utils.misc import decode_keyset_cursor, encode_keyset_cursor
+
+# (id, user_id, created_at), two pairs share a creation time
+ROWS = [
+    ("log-1", "user-1", 100),
+    ("log-2", "user-1", 200),
+    ("log-3", "user-2", 200),
+    ("log-4", "user-1", 200),
+    ("log-5", "user-1", 300),
+    ("log-6", "user-2", 300),
+]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    CreditLog.__table__.create(engine)
+    RedemptionCode.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(credits_module, "get_db", get_db)
+    with session_factory() as db:
+        for id, user_id, created_at in ROWS:
+            db.add(
+                CreditLog(
+                    id=id,
+                    user_id=user_id,
+                    credit=Decimal("-1"),
+                    detail={"desc": id},
+                    created_at=created_at,
+                )
+            )
+            db.add(
+                RedemptionCode(
+                    code=id.replace("log", "code"),
+                    purpose="promo",
+                    amount=Decimal("10"),
+                    created_at=created_at,
+                )
+            )
+        db.commit()
+    return engine
+
+
+def read_pages(get_page, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        items, cursor = get_page(cursor=cursor, limit=limit)
+        ids += [getattr(item, "id", None) or item.code for item in items]
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+class TestKeysetCursor:
+    def test_round_trip(self):
+        cursor = encode_keyset_cursor(1700000000, "log:1/2")
+        assert "=" not in cursor
+        assert decode_keyset_cursor(cursor) == (1700000000, "log:1/2")
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not a cursor",
+            encode_keyset_cursor(1, "id")[:-2],
+            encode_keyset_cursor(1, "id") + "x",
+            encode_keyset_cursor("soon", "id"),
+            encode_keyset_cursor(1, "id").replace("W", "e", 1),
+        ],
+    )
+    def test_tampered_cursor_is_rejected(self, cursor):
+        with pytest.raises(ValueError):
+            decode_keyset_cursor(cursor)
+
+    @pytest.mark.parametrize("payload", [[1], {"created_at": 1}, [1, "id", 3]])
+    def test_wrong_shape_is_rejected(self, payload):
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        with pytest.raises(ValueError):
+            decode_keyset_cursor(cursor)
+
+
+class TestCreditLogPages:
+    def test_stable_order_with_duplicate_times(self, engine):
+        ids, pages = read_pages(CreditLogs.get_credit_log_by_cursor, limit=2)
+
+        assert ids == ["log-6", "log-5", "log-4", "log-3", "log-2", "log-1"]
+        # the last full page is not followed by an empty one
+        assert pages == 3
+
+    def test_user_filter_and_last_page(self, engine):
+        logs, cursor = CreditLogs.get_credit_log_by_cursor(user_ids=["user-1"], limit=3)
+        assert [log.id for log in logs] == ["log-5", "log-4", "log-2"]
+
+        logs, cursor = CreditLogs.get_credit_log_by_cursor(
+            user_ids=["user-1"], cursor=cursor, limit=3
+        )
+        assert [log.id for log in logs] == ["log-1"]
+        assert cursor is None
+
+    def test_empty_pages(self, engine):
+        assert CreditLogs.get_credit_log_by_cursor(user_ids=["nobody"]) == ([], None)
+        past_the_end = encode_keyset_cursor(100, "log-1")
+        assert CreditLogs.get_credit_log_by_cursor(cursor=past_the_end) == ([], None)
+
+    def test_redemption_codes(self, engine):
+        ids, pages = read_pages(RedemptionCodes.get_codes_by_cursor, limit=4)
+
+        assert ids == ["code-6", "code-5", "code-4", "code-3", "code-2", "code-1"]
+        assert pages == 2
+
+    def test_export_is_streamed_in_batches(self, engine):
+        loaded = []
+
+        def on_load(target, context):
+            loaded.append(target.id)
+
+        event.listen(CreditLog, "load", on_load)
+
+        try:
+            logs = CreditLogs.iter_credit_logs(start_time=200, batch_size=2)
+            first = next(logs)
+            assert first.id == "log-2"
+            # only the first batch has been fetched
+            assert len(loaded) == 2
+
+            assert [first.id] + [log.id for log in logs] == [
+                "log-2",
+                "log-3",
+                "log-4",
+                "log-5",
+                "log-6",
+            ]
+            assert len(loaded) == 5
+        finally:
+            event.remove(CreditLog, "load", on_load)
+
+
+class TestExportRoute:
+    def test_ndjson_is_written_in_chunks(self, engine, monkeypatch):
+        credit_router = pytest.importorskip("open_webui.routers.credit")
+        monkeypatch.setattr(credit_router, "EXPORT_CHUNK_ROWS", 2)
+        monkeypatch.setattr(credit_router, "iter_archived_logs", lambda *_: iter(()))
+
+        async def export():
+            response = await credit_router.export_credit_logs(
+                format="ndjson", query=None, start_time=None, end_time=None, _=None
+            )
+            return [chunk async for chunk in response.body_iterator]
+
+        chunks = asyncio.run(export())
+        assert [len(chunk.splitlines()) for chunk in chunks] == [2, 2, 2]
+        assert [
+            json.loads(line)["id"] for chunk in chunks for line in chunk.splitlines()
+        ] == [row[0] for row in ROWS]
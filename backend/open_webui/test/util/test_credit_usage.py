@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import pytest
+
+usage_module = pytest.importorskip("open_webui.utils.credit.usage")
+CreditDeduct = usage_module.CreditDeduct
+
+MESSAGES = [
+    {"role": "system", "content": "be brief"},
+    {
+        "role": "user",
+        "content": [
+            {"type": "text", "text": "what is this"},
+            {"type": "image_url", "image_url": {"url": "https://example.com/a.png"}},
+        ],
+    },
+]
+
+
+def make_deduct(monkeypatch, messages):
+    monkeypatch.setattr(
+        usage_module.calculator,
+        "get_encoder",
+        lambda **kwargs: SimpleNamespace(encode=str.split),
+    )
+    deduct = object.__new__(CreditDeduct)
+    deduct.model_id = "gpt-4o"
+    deduct.body = {"messages": messages}
+    deduct.prompt_tokens = None
+    return deduct
+
+
+class TestPromptTokens:
+    def test_image_tokens_are_counted(self, monkeypatch):
+        monkeypatch.setattr(usage_module, "calculate_image_token", lambda *_: 100)
+        deduct = make_deduct(monkeypatch, MESSAGES)
+
+        assert deduct.prepare_prompt_tokens() == 2 + 3 + 100
+
+    def test_failed_count_is_not_retried(self, monkeypatch):
+        calls = []
+
+        def calculate_image_token(model_id, image):
+            calls.append(image.url)
+            raise OSError("unreachable")
+
+        monkeypatch.setattr(
+            usage_module, "calculate_image_token", calculate_image_token
+        )
+        deduct = make_deduct(monkeypatch, MESSAGES)
+
+        # every streamed chunk asks again, the image is only fetched once
+        for _ in range(3):
+            assert deduct.prepare_prompt_tokens() == 2 + 3
+        assert calls == ["https://example.com/a.png"]
+
+    def test_invalid_messages_count_as_zero(self, monkeypatch):
+        deduct = make_deduct(monkeypatch, [{"content": object()}])
+
+        assert deduct.prepare_prompt_tokens() == 0
+        assert deduct.prompt_tokens == 0
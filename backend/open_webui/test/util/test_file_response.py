@@ -0,0 +1,110 @@
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from open_webui.utils import file_response
+from open_webui.utils.file_response import (
+    etag_matches,
+    get_file_response,
+    make_etag,
+)
+
+CONTENT = b"0123456789" * 10
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(CONTENT)
+    return path
+
+
+@pytest.fixture
+def client(file_path, monkeypatch):
+    monkeypatch.setattr(file_response, "X_ACCEL_REDIRECT_LOCATION", None)
+
+    async def serve(request: Request):
+        return get_file_response(
+            request.headers,
+            file_path,
+            etag=request.query_params.get("etag"),
+            media_type="application/octet-stream",
+        )
+
+    return TestClient(Starlette(routes=[Route("/file", serve)]))
+
+
+class TestFileResponse:
+    def test_etag_follows_the_stored_file(self, client, file_path):
+        response = client.get("/file")
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["accept-ranges"] == "bytes"
+        etag = response.headers["etag"]
+
+        assert client.get("/file").headers["etag"] == etag
+
+        # same size, new bytes: the validator must not survive the rewrite
+        file_path.write_bytes(CONTENT[::-1])
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        response = client.get("/file", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.content == CONTENT[::-1]
+        assert response.headers["etag"] != etag
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/file").headers["etag"]
+
+        for header in (etag, f'"other", W/{etag}', "*"):
+            response = client.get("/file", headers={"If-None-Match": header})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+
+        response = client.get("/file", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+
+    def test_explicit_etag(self, client):
+        etag = make_etag("abc")
+        response = client.get("/file", params={"etag": etag})
+        assert response.headers["etag"] == etag
+
+        response = client.get(
+            "/file", params={"etag": etag}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_range_returns_206(self, client):
+        response = client.get("/file", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+        response = client.get("/file", headers={"Range": "bytes=-5"})
+        assert response.status_code == 206
+        assert response.content == CONTENT[-5:]
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get("/file", headers={"Range": "bytes=500-600"})
+        assert response.status_code == 416
+
+    def test_x_accel_redirect(self, client, file_path, monkeypatch):
+        monkeypatch.setattr(file_response, "X_ACCEL_REDIRECT_LOCATION", "/protected/")
+        monkeypatch.setattr(file_response, "DATA_DIR", file_path.parent.resolve())
+
+        response = client.get("/file")
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == "/protected/file.bin"
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"a"', '"a"')
+    assert not etag_matches(None, '"a"')
+    assert not etag_matches('"ab"', '"a"')
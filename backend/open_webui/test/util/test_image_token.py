@@ -0,0 +1,71 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from open_webui.utils.credit import utils
+from open_webui.utils.credit.utils import (
+    get_image_size,
+    get_image_size_from_header,
+    probe_data_url_image_size,
+)
+
+
+def make_image(format: str, size=(1234, 567), **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format=format, **kwargs)
+    return buffer.getvalue()
+
+
+def to_data_url(data: bytes, mime: str = "image/png") -> str:
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+class TestImageSize:
+    @pytest.mark.parametrize(
+        "format, kwargs",
+        [
+            ("PNG", {}),
+            ("GIF", {}),
+            ("JPEG", {}),
+            ("JPEG", {"progressive": True}),
+            ("WEBP", {}),
+            ("WEBP", {"lossless": True}),
+        ],
+    )
+    def test_header_size_matches_pillow(self, format, kwargs):
+        assert get_image_size_from_header(make_image(format, **kwargs)) == (1234, 567)
+
+    def test_data_url_reads_only_the_header(self, monkeypatch):
+        # noisy pixels keep the PNG large after compression
+        image = Image.frombytes("L", (2000, 1500), bytes(range(256)) * 11719)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        url = to_data_url(buffer.getvalue())
+        decoded = []
+        original = base64.b64decode
+        monkeypatch.setattr(
+            utils.base64,
+            "b64decode",
+            lambda data, *args: decoded.append(len(data)) or original(data, *args),
+        )
+
+        assert probe_data_url_image_size(url) == (2000, 1500)
+        assert decoded == [1368]
+
+    def test_slow_probes_are_memoized(self, monkeypatch):
+        # the size of this JPEG follows 4KB of metadata
+        data = make_image("JPEG", size=(10, 20))
+        data = data[:2] + b"\xff\xe1\x10\x02" + bytes(4096) + data[2:]
+        url = to_data_url(data, "image/jpeg")
+        calls = []
+        original = utils.probe_data_url_image_size
+        monkeypatch.setattr(
+            utils,
+            "probe_data_url_image_size",
+            lambda url: calls.append(url) or original(url),
+        )
+
+        assert get_image_size(url) == get_image_size(url) == (10, 20)
+        assert len(calls) == 1
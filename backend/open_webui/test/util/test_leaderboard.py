@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.utils import leaderboard as leaderboard_module
+from open_webui.utils.leaderboard import Leaderboard
+
+
+def make_data(model_id, rating, siblings, tags=()):
+    return {
+        "model_id": model_id,
+        "rating": rating,
+        "sibling_model_ids": [model_id, *siblings],
+        "tags": list(tags),
+    }
+
+
+FEEDBACKS = [
+    ("f1", make_data("a", 1, ["b"], ["code"]), 1),
+    ("f2", make_data("b", -1, ["c"], ["math"]), 2),
+    ("f3", make_data("a", 1, ["c"], ["code"]), 3),
+    ("f4", make_data("c", 1, ["b"]), 4),
+]
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    rows = list(FEEDBACKS)
+    monkeypatch.setattr(
+        leaderboard_module.Feedbacks, "get_rating_feedbacks", lambda: list(rows)
+    )
+    return rows
+
+
+class TestLeaderboard:
+    def test_elo_matches_sequential_updates(self, rows):
+        rankings = {item["model_id"]: item for item in Leaderboard().get_rankings()}
+
+        assert [rankings[model]["rating"] for model in "abc"] == [1032, 954, 1014]
+        assert (rankings["a"]["won"], rankings["a"]["lost"]) == (2, 0)
+        assert rankings["b"]["bt_rating"] < 1000 < rankings["a"]["bt_rating"]
+
+    def test_incremental_updates_match_rebuild(self, rows):
+        board = Leaderboard()
+        board.get_rankings()
+
+        rows.append(("f5", make_data("b", 1, ["a"]), 5))
+        board.on_feedback_saved(*rows[-1])
+        rows[1] = ("f2", make_data("b", 1, ["c"]), 2)
+        board.on_feedback_saved(*rows[1])
+        del rows[0]
+        board.on_feedback_deleted("f1")
+
+        assert board.get_rankings() == Leaderboard().get_rankings()
+
+    def test_tag_filter(self, rows):
+        rankings = Leaderboard().get_filtered_rankings(tag="code")
+
+        assert [item["model_id"] for item in rankings] == ["a", "c", "b"]
+        assert sum(item["count"] for item in rankings) == 4
+
+    def test_query_survives_a_concurrent_model_switch(self, rows):
+        board = Leaderboard()
+        vectors = {"code": [1.0, 0.0], "math": [0.0, 1.0]}
+
+        def failing_embed(texts):
+            raise RuntimeError("embedding service unavailable")
+
+        def embed(texts):
+            if texts == ["programming"]:
+                # another request switches the model and fails halfway
+                with pytest.raises(RuntimeError):
+                    board.get_filtered_rankings(
+                        query="x", embed=failing_embed, embedding_model="other"
+                    )
+                return [[1.0, 0.0]]
+            return [vectors[text] for text in texts]
+
+        rankings = board.get_filtered_rankings(
+            query="programming", embed=embed, embedding_model="model"
+        )
+        assert rankings == board.get_filtered_rankings(tag="code")
+
+
+class TestFeedbackRoutes:
+    def test_feedback_save_does_not_block_the_loop(self, rows, monkeypatch):
+        from open_webui.routers import evaluations
+
+        board = Leaderboard()
+        board.get_rankings()
+        feedback = SimpleNamespace(id="f5", data=make_data("b", 1, ["a"]), created_at=5)
+        monkeypatch.setattr(evaluations, "leaderboard", board)
+        monkeypatch.setattr(
+            evaluations.Feedbacks,
+            "insert_new_feedback",
+            lambda user_id, form_data: feedback,
+        )
+
+        async def save_during_rebuild():
+            ticks = 0
+            with board._lock:
+                # a rebuild holds the lock, the loop keeps serving other requests
+                save = asyncio.create_task(
+                    evaluations.create_feedback(
+                        None, None, user=SimpleNamespace(id="user")
+                    )
+                )
+                for _ in range(3):
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+                assert not save.done()
+            return ticks, await asyncio.wait_for(save, 5)
+
+        assert asyncio.run(save_during_rebuild()) == (3, feedback)
+        assert "f5" in board._feedbacks
@@ -0,0 +1,60 @@
+import logging
+import time
+
+from open_webui.utils.logger import (
+    InterceptHandler,
+    SamplingFilter,
+    get_log_context,
+    log_context,
+)
+
+
+def make_record(lineno: int = 10, **extra) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "open_webui.routers.midjourney",
+        logging.INFO,
+        "poll.py",
+        lineno,
+        "msg",
+        (),
+        None,
+    )
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestSamplingFilter:
+    def test_unmarked_records_always_pass(self):
+        sampler = SamplingFilter(interval=60)
+        assert all(sampler.filter(make_record()) for _ in range(5))
+
+    def test_sampled_records_pass_once_per_task(self):
+        sampler = SamplingFilter(interval=60)
+
+        with log_context(task_id="a"):
+            passed = [sampler.filter(make_record(sampled=True)) for _ in range(5)]
+        with log_context(task_id="b"):
+            assert sampler.filter(make_record(sampled=True))
+
+        assert passed == [True, False, False, False, False]
+
+    def test_suppressed_count_is_reported(self):
+        sampler = SamplingFilter(interval=0.05)
+        sampler.filter(make_record(sampled=True))
+        sampler.filter(make_record(sampled=True))
+
+        time.sleep(0.06)
+        record = make_record(sampled=True)
+
+        assert sampler.filter(record)
+        assert record.suppressed == 1
+
+
+class TestLogContext:
+    def test_context_fields_become_extras(self):
+        with log_context(provider="kling", task_id="t1"):
+            extras = InterceptHandler()._get_extras(make_record(user_id="u1"))
+
+        assert extras == {"provider": "kling", "task_id": "t1", "user_id": "u1"}
+        assert get_log_context() == {}
@@ -0,0 +1,132 @@
+import multiprocessing
+import time
+
+import pytest
+
+from open_webui.retrieval.loaders import pdf
+from open_webui.retrieval.loaders.pdf import (
+    ExtractionBudgetExceeded,
+    ParallelPDFLoader,
+    extract_pdf_pages,
+    get_extraction_pool,
+    reset_extraction_pool,
+)
+
+TEXTS = [f"Page number {index}" for index in range(1, 8)]
+
+
+def write_pdf(path, texts):
+    """A minimal PDF with one line of Helvetica text per page"""
+    page_ids = [4 + index * 2 for index in range(len(texts))]
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] "
+        f"/Count {len(texts)} >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, text in zip(page_ids, texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects[page_id + 1] = (
+            f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+        )
+
+    data = b"%PDF-1.4\n"
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(data)
+        data += f"{number} 0 obj\n{objects[number]}\nendobj\n".encode()
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for number in sorted(objects):
+        data += f"{offsets[number]:010d} 00000 n \n".encode()
+    data += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    path.write_bytes(data)
+    return str(path)
+
+
+def slow_extract_pdf_pages(file_path, start, end, labels):
+    """Stands in for a range that never finishes, runs in a pool worker"""
+    time.sleep(60)
+    return extract_pdf_pages(file_path, start, end, labels)
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    yield write_pdf(tmp_path / "doc.pdf", TEXTS)
+    reset_extraction_pool()
+
+
+class TestParallelPDFLoader:
+    def test_parallel_pages_in_order(self, file_path, monkeypatch):
+        monkeypatch.setattr(pdf, "DOCUMENT_EXTRACTION_MAX_WORKERS", 2)
+        progress = []
+        docs = ParallelPDFLoader(
+            file_path,
+            max_workers=2,
+            pages_per_task=2,
+            timeout=60,
+            on_progress=lambda done, total: progress.append((done, total)),
+        ).load()
+
+        assert [doc.page_content.strip() for doc in docs] == TEXTS
+        assert [doc.metadata["page"] for doc in docs] == list(range(7))
+        assert [doc.metadata["page_label"] for doc in docs] == [
+            str(page) for page in range(1, 8)
+        ]
+        assert {doc.metadata["total_pages"] for doc in docs} == {7}
+        assert progress == [(2, 7), (4, 7), (6, 7), (7, 7)]
+
+        sequential = ParallelPDFLoader(file_path, max_workers=1, timeout=60).load()
+        assert [doc.page_content for doc in sequential] == [
+            doc.page_content for doc in docs
+        ]
+
+    def test_character_budget(self, file_path):
+        loader = ParallelPDFLoader(
+            file_path, max_workers=1, pages_per_task=2, max_chars=30
+        )
+        pages = []
+        with pytest.raises(ExtractionBudgetExceeded):
+            for doc in loader.lazy_load():
+                pages.append(doc)
+        # the pages within the budget were yielded before it was exceeded
+        assert len(pages) == 2
+
+    def test_time_budget(self, file_path):
+        loader = ParallelPDFLoader(
+            file_path, max_workers=1, pages_per_task=1, timeout=1e-6
+        )
+
+        with pytest.raises(ExtractionBudgetExceeded, match="seconds"):
+            loader.load()
+
+    def test_timeout_frees_the_pool(self, file_path, monkeypatch):
+        monkeypatch.setattr(pdf, "DOCUMENT_EXTRACTION_MAX_WORKERS", 2)
+        monkeypatch.setattr(pdf, "extract_pdf_pages", slow_extract_pdf_pages)
+        pool = get_extraction_pool()
+        loader = ParallelPDFLoader(
+            file_path, max_workers=2, pages_per_task=2, timeout=2
+        )
+
+        with pytest.raises(ExtractionBudgetExceeded, match="seconds"):
+            loader.load()
+
+        # the workers stuck in the slow ranges are gone
+        deadline = time.monotonic() + 5
+        while multiprocessing.active_children() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert multiprocessing.active_children() == []
+        assert get_extraction_pool() is not pool
+
+        monkeypatch.setattr(pdf, "extract_pdf_pages", extract_pdf_pages)
+        docs = ParallelPDFLoader(
+            file_path, max_workers=2, pages_per_task=2, timeout=60
+        ).load()
+        assert [doc.page_content.strip() for doc in docs] == TEXTS
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from decimal import Decimal
+
+import pytest
+
+from open_webui.models.models import ModelModel
+from open_webui.utils.credit import pricing
+from open_webui.utils.credit.pricing import get_pricing_snapshot
+
+RULES = [
+    {
+        "path": "$.tools[*].type",
+        "name": "search",
+        "value": "web",
+        "exists": False,
+        "cost": 5,
+    },
+    {
+        "path": "$.tools[*].type",
+        "name": "code",
+        "value": "code",
+        "exists": False,
+        "cost": 7,
+    },
+    {
+        "path": "$.reasoning",
+        "name": "reasoning",
+        "value": None,
+        "exists": True,
+        "cost": 3,
+    },
+    {"path": "$.stream", "name": "free", "value": True, "exists": True, "cost": 0},
+    {"path": "$[", "name": "broken", "value": 1, "exists": True, "cost": 1},
+    {"path": "$.n", "name": "missing_cost", "value": 1, "exists": True},
+]
+
+
+class FakeConfig:
+    def __init__(self, value):
+        self.value = value
+
+
+@pytest.fixture
+def config(monkeypatch):
+    configs = {}
+    for name in (
+        "USAGE_CALCULATE_DEFAULT_TOKEN_PRICE",
+        "USAGE_CALCULATE_DEFAULT_REQUEST_PRICE",
+        "USAGE_CALCULATE_DEFAULT_EMBEDDING_PRICE",
+        "USAGE_CALCULATE_MINIMUM_COST",
+    ):
+        configs[name] = FakeConfig(2)
+        monkeypatch.setattr(pricing, name, configs[name])
+    configs["USAGE_CUSTOM_PRICE_CONFIG"] = FakeConfig(json.dumps(RULES))
+    monkeypatch.setattr(
+        pricing, "USAGE_CUSTOM_PRICE_CONFIG", configs["USAGE_CUSTOM_PRICE_CONFIG"]
+    )
+    features = {feature: FakeConfig(500) for feature in pricing.FEATURE_PRICE_CONFIGS}
+    monkeypatch.setattr(pricing, "FEATURE_PRICE_CONFIGS", features)
+    monkeypatch.setattr(pricing, "_snapshot", None)
+    return configs
+
+
+class TestPricingSnapshot:
+    def test_custom_fees(self, config):
+        snapshot = get_pricing_snapshot()
+        body = {"tools": [{"type": "code"}, {"type": "web"}], "reasoning": {}}
+
+        assert [rule.name for rule in snapshot.custom_fee_rules] == [
+            "search",
+            "code",
+            "reasoning",
+        ]
+        assert snapshot.get_custom_fees(body) == {
+            "search": 5,
+            "code": 7,
+            "reasoning": 3,
+        }
+        assert snapshot.get_custom_fees({"tools": [{"type": "image"}]}) == {}
+
+    def test_recompiled_only_on_change(self, config):
+        snapshot = get_pricing_snapshot()
+        assert get_pricing_snapshot() is snapshot
+        assert snapshot.get_feature_price(["web_search", "code_interpreter"]) == 1
+
+        config["USAGE_CALCULATE_MINIMUM_COST"].value = 10
+        assert get_pricing_snapshot() is not snapshot
+        assert get_pricing_snapshot().minimum_cost == Decimal(10)
+
+
+class FakeModels:
+    """Stores models like Models.update_model_by_id, which keeps updated_at"""
+
+    def __init__(self, model):
+        self.rows = {model.id: model.model_dump()}
+
+    def get_model_by_id(self, id):
+        row = self.rows.get(id)
+        return ModelModel.model_validate(row) if row else None
+
+    def update_model_by_id(self, id, model):
+        self.rows[id].update(model.model_dump(exclude={"id"}))
+        return self.get_model_by_id(id)
+
+
+class TestModelPrice:
+    @pytest.fixture
+    def models(self, config):
+        return FakeModels(
+            ModelModel(
+                id="gpt",
+                user_id="admin",
+                name="gpt",
+                params={},
+                meta={},
+                price={"prompt_price": 1},
+                is_active=True,
+                updated_at=1792368037,
+                created_at=1792368037,
+            )
+        )
+
+    def test_price_edit_is_used(self, models, monkeypatch):
+        credit_router = pytest.importorskip("open_webui.routers.credit")
+        monkeypatch.setattr(credit_router, "Models", models)
+        snapshot = get_pricing_snapshot()
+        assert snapshot.get_model_price(models.get_model_by_id("gpt")).prompt == 1
+
+        asyncio.run(
+            credit_router.update_model_price({"gpt": {"prompt_price": 5.0}}, None)
+        )
+
+        model = models.get_model_by_id("gpt")
+        assert model.updated_at == 1792368037
+        assert get_pricing_snapshot() is snapshot
+        assert snapshot.get_model_price(model).prompt == Decimal(5)
+
+    def test_same_row_version_with_new_price(self, models):
+        snapshot = get_pricing_snapshot()
+        model = models.get_model_by_id("gpt")
+        assert snapshot.get_model_price(model).prompt == 1
+
+        model.price = {"prompt_price": 5.0}
+        assert snapshot.get_model_price(model).prompt == Decimal(5)
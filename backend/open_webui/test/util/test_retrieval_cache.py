@@ -0,0 +1,57 @@
+from open_webui.retrieval.cache import (
+    get_cached_retrieval,
+    get_retrieval_cache_key,
+    invalidate_retrieval_cache,
+)
+
+
+def make_loader(calls, document="chunk"):
+    def loader():
+        calls.append(1)
+        return {
+            "distances": [[0.9]],
+            "documents": [[document]],
+            "metadatas": [[{"file_id": "file"}]],
+        }
+
+    return loader
+
+
+class TestRetrievalCache:
+    def test_repeated_queries_hit_the_cache(self):
+        calls = []
+        loader = make_loader(calls)
+
+        first = get_cached_retrieval(["test-hit"], ["what is  it "], loader, k=3)
+        first["metadatas"][0][0]["source"] = "mutated"
+        second = get_cached_retrieval(["test-hit"], ["what is it"], loader, k=3)
+
+        assert len(calls) == 1
+        assert second["metadatas"][0][0] == {"file_id": "file"}
+
+        get_cached_retrieval(["test-hit"], ["what is it"], loader, k=4)
+        assert len(calls) == 2
+
+    def test_invalidation_changes_the_key(self):
+        calls = []
+        loader = make_loader(calls)
+
+        key = get_retrieval_cache_key(["test-a", "test-b"], ["q"], k=3)
+        get_cached_retrieval(["test-a", "test-b"], ["q"], loader, k=3)
+
+        invalidate_retrieval_cache("test-b")
+
+        assert get_retrieval_cache_key(["test-b", "test-a"], ["q"], k=3) != key
+        get_cached_retrieval(["test-a", "test-b"], ["q"], loader, k=3)
+        assert len(calls) == 2
+
+    def test_empty_results_are_not_cached(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"distances": [[]], "documents": [[]], "metadatas": [[]]}
+
+        get_cached_retrieval(["test-empty"], ["q"], loader, k=3)
+        get_cached_retrieval(["test-empty"], ["q"], loader, k=3)
+        assert len(calls) == 2
@@ -0,0 +1,35 @@
+import pytest
+
+from open_webui.utils.startup import StartupProfile
+
+
+class TestStartupProfile:
+    def test_phases_are_recorded(self):
+        profile = StartupProfile()
+        with profile.phase("migrations"):
+            pass
+        profile.skip("peewee", "schema is current")
+
+        report = profile.get_report()
+        assert [phase["name"] for phase in report["phases"]] == [
+            "migrations",
+            "peewee",
+        ]
+        assert report["phases"][1]["status"] == "skipped"
+
+    @pytest.mark.asyncio
+    async def test_ready_after_warmups(self):
+        profile = StartupProfile()
+        loaded = []
+        profile.add_warmup("embedding", lambda: loaded.append("embedding"))
+        profile.add_warmup("whisper", lambda: 1 / 0)
+        assert not profile.is_ready()
+
+        await profile.run_warmups()
+
+        assert loaded == ["embedding"]
+        assert profile.is_ready()
+        assert profile.get_warmup_status() == {
+            "embedding": "ready",
+            "whisper": "failed",
+        }
@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from open_webui.internal.db import SessionLocal
+from open_webui.models.midjourney import MJTask
+from open_webui.services import stats_service
+from open_webui.utils.cache_manager import CacheConfig, CacheManager
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    MJTask.__table__.create(engine)
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal(bind=engine)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(stats_service, "get_db", get_db)
+    manager = CacheManager(config=CacheConfig())
+    monkeypatch.setattr(stats_service, "get_cache_manager", lambda: manager)
+    return engine
+
+
+def add_task(db, id, status="SUBMITTED"):
+    db.add(MJTask(id=id, user_id="user", status=status, mode="fast"))
+
+
+class TestTaskStatsSnapshot:
+    def test_committed_writes_update_the_snapshot(self, engine):
+        with SessionLocal(bind=engine) as db:
+            add_task(db, "a", "SUCCESS")
+            db.commit()
+        assert stats_service.get_task_stats("midjourney")["total_tasks"] == 1
+
+        with SessionLocal(bind=engine) as db:
+            add_task(db, "b")
+            db.flush()
+            # flushed but not committed yet
+            assert stats_service.get_task_stats("midjourney")["total_tasks"] == 1
+            db.commit()
+
+            db.get(MJTask, "b").status = "SUCCESS"
+            db.commit()
+
+        stats = stats_service.get_task_stats("midjourney")
+        assert stats["total_tasks"] == 2
+        assert stats["status_distribution"] == {"SUCCESS": 2}
+        assert stats["today_tasks"] == 2
+        assert (
+            stats
+            == stats_service.compute_task_stats(
+                stats_service.TASK_STATS_SPECS["midjourney"]
+            ).to_dict()
+        )
+
+    def test_rolled_back_writes_are_discarded(self, engine):
+        with SessionLocal(bind=engine) as db:
+            add_task(db, "a")
+            db.commit()
+        before = stats_service.get_task_stats("midjourney")
+
+        with SessionLocal(bind=engine) as db:
+            add_task(db, "b")
+            db.get(MJTask, "a").status = "FAILURE"
+            db.flush()
+            db.rollback()
+
+        assert stats_service.get_task_stats("midjourney") == before
+        assert before["status_distribution"] == {"SUBMITTED": 1}
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.routers import midjourney
+from open_webui.utils.task_events import iter_task_events, task_event_bus
+
+USER = SimpleNamespace(id="user-1")
+
+
+def mj_task(id, status):
+    return SimpleNamespace(
+        id=id, status=status, to_dict=lambda: {"id": id, "status": status}
+    )
+
+
+@pytest.fixture
+def recent_tasks(monkeypatch):
+    tasks = []
+    monkeypatch.setattr(
+        midjourney.MJConfig,
+        "get_config",
+        staticmethod(lambda: SimpleNamespace(enabled=True)),
+    )
+    monkeypatch.setattr(
+        midjourney.MJTask,
+        "get_user_recent_tasks",
+        staticmethod(lambda user_id, limit: tasks),
+    )
+    return tasks
+
+
+async def read_stream(response, on_event=None):
+    events = []
+    async for chunk in response.body_iterator:
+        if chunk.startswith("data: "):
+            events.append(json.loads(chunk[len("data: ") :]))
+            if on_event:
+                on_event(events[-1])
+    return events
+
+
+class TestMidjourneyStream:
+    def test_ends_right_away_without_active_tasks(self, recent_tasks):
+        async def run():
+            response = await midjourney.stream_user_tasks(user=USER)
+            return await asyncio.wait_for(read_stream(response), 5)
+
+        assert [event["type"] for event in asyncio.run(run())] == ["stream_end"]
+
+        recent_tasks.append(mj_task("done", "SUCCESS"))
+        events = asyncio.run(run())
+        assert [event.get("status") or event["type"] for event in events] == [
+            "SUCCESS",
+            "stream_end",
+        ]
+
+    def test_ends_when_the_active_tasks_finish(self, recent_tasks):
+        recent_tasks.append(mj_task("running", "IN_PROGRESS"))
+
+        def finish(event):
+            if event.get("id") == "running":
+                task_event_bus.publish(
+                    {
+                        "type": "task_update",
+                        "provider": "midjourney",
+                        "user_id": USER.id,
+                        "task": {"id": "running", "status": "SUCCESS"},
+                    },
+                    broadcast=False,
+                )
+
+        async def run():
+            response = await midjourney.stream_user_tasks(user=USER)
+            return await asyncio.wait_for(read_stream(response, finish), 5)
+
+        events = asyncio.run(run())
+        assert [event.get("status") or event["type"] for event in events] == [
+            "IN_PROGRESS",
+            "SUCCESS",
+            "stream_end",
+        ]
+        assert task_event_bus.subscriber_count() == 0
+
+
+def test_iter_task_events_stops_when_idle():
+    async def run():
+        queue = asyncio.Queue()
+        queue.put_nowait({"provider": "kling"})
+        return [
+            event
+            async for event in iter_task_events(
+                queue, keepalive_interval=0.01, idle_timeout=0.05
+            )
+        ]
+
+    events = asyncio.run(run())
+    assert events[0] == {"provider": "kling"}
+    assert events[1:] and all(event is None for event in events[1:])
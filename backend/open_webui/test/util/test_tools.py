@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.utils import tools as tools_module
+from open_webui.utils.tools import get_tool_specs, get_tools
+
+CONTENT = '''
+class Tools:
+    def add(self, a: int, b: int, __user__: dict = None) -> int:
+        """
+        Add two numbers.
+        :param a: first number
+        :param b: second number
+        """
+        return a + b + __user__["offset"]
+'''
+
+
+class FakeTools:
+    def __init__(self, tool):
+        self.tool = tool
+
+    def get_tool_by_id(self, id):
+        return self.tool if id == self.tool.id else None
+
+    def get_tool_valves_by_id(self, id):
+        return {}
+
+
+def make_tool(content: str):
+    module = {}
+    exec(content, module)
+    return SimpleNamespace(
+        id="calc", content=content, specs=get_tool_specs(module["Tools"]())
+    )
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    tool = make_tool(CONTENT)
+    monkeypatch.setattr(tools_module, "Tools", FakeTools(tool))
+    monkeypatch.setattr(tools_module, "_prepared_tools", {})
+
+    loads = []
+
+    def load_tool_module_by_id(tool_id):
+        loads.append(tool_id)
+        module = {}
+        exec(tool.content, module)
+        return module["Tools"](), {}
+
+    monkeypatch.setattr(tools_module, "load_tool_module_by_id", load_tool_module_by_id)
+    tool.loads = loads
+    return tool
+
+
+def make_request():
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(TOOLS={})))
+
+
+class TestGetTools:
+    async def call(self, request, offset):
+        tools = get_tools(request, ["calc"], None, {"__user__": {"offset": offset}})
+        return tools["add"]["spec"], await tools["add"]["callable"](a=1, b=2)
+
+    @pytest.mark.asyncio
+    async def test_tool_is_prepared_once(self, tool):
+        request = make_request()
+
+        spec, result = await self.call(request, 10)
+        assert result == 13
+        assert spec["description"].strip() == "Add two numbers."
+        assert set(spec["parameters"]["properties"]) == {"a", "b"}
+
+        assert await self.call(request, 20) == (spec, 23)
+        assert tool.loads == ["calc"]
+
+    @pytest.mark.asyncio
+    async def test_tool_is_reloaded_on_content_change(self, tool):
+        request = make_request()
+        await self.call(request, 0)
+
+        tool.content = CONTENT.replace("a + b", "a * b")
+        assert (await self.call(request, 0))[1] == 2
+        assert tool.loads == ["calc", "calc"]
@@ -0,0 +1,83 @@
+import contextlib
+
+import pytest
+from aiohttp import web
+
+from open_webui.utils.webhook import WebhookDeliveryQueue
+
+
+class StandInWebhookReceiver:
+    """Records posted payloads, failing the first `failures` requests with `status`."""
+
+    def __init__(self, failures=0, status=503):
+        self.failures = failures
+        self.status = status
+        self.payloads = []
+        self.runner = None
+        self.base_url = ""
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/{path:.*}", self.receive)
+
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def receive(self, request):
+        if self.failures > 0:
+            self.failures -= 1
+            return web.Response(status=self.status)
+        self.payloads.append(await request.json())
+        return web.Response(status=200)
+
+
+@contextlib.asynccontextmanager
+async def running_queue(receiver, **kwargs):
+    await receiver.start()
+    queue = WebhookDeliveryQueue(retry_base_delay=0.01, dead_letter_path=None, **kwargs)
+    await queue.start()
+    try:
+        yield queue
+    finally:
+        await queue.shutdown()
+        await receiver.stop()
+
+
+class TestWebhookDeliveryQueue:
+    @pytest.mark.asyncio
+    async def test_generic_webhooks_are_delivered(self):
+        receiver = StandInWebhookReceiver()
+        async with running_queue(receiver) as queue:
+            for i in range(3):
+                queue.enqueue("test", receiver.base_url, f"m{i}", {"message": i})
+            await queue.join()
+
+            assert sorted(p["message"] for p in receiver.payloads) == [0, 1, 2]
+            assert queue.get_metrics()["delivered"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_retried_then_dead_lettered(self):
+        receiver = StandInWebhookReceiver(failures=2)
+        async with running_queue(receiver, max_retries=2) as queue:
+            queue.enqueue("test", receiver.base_url, "m", {"message": "m"})
+            await queue.join()
+
+            assert len(receiver.payloads) == 1
+            assert queue.get_metrics()["retried"] == 2
+
+        receiver = StandInWebhookReceiver(failures=1, status=404)
+        async with running_queue(receiver, max_retries=2) as queue:
+            queue.enqueue("test", receiver.base_url, "m", {"message": "m"})
+            await queue.join()
+
+            metrics = queue.get_metrics()
+            assert metrics["retried"] == 0
+            assert metrics["dead_lettered"] == 1
+            assert metrics["dead_letters"][0]["error"].startswith("HTTP 404")
@@ -0,0 +1,567 @@
+"""
+媒体生成任务准入控制
+
+Midjourney / Kling / Jimeng / Flux / DreamWork / 对口型任务提交前先获取名额：
+
+- 名额：每个服务一个全局信号量（上限为服务配置的 max_concurrent_tasks），
+  每个用户在每个服务另有一个信号量；配置 Redis 时信号量保存在 Redis 有序集合中，
+  多个 worker 共享，否则保存在进程内
+- 占用时长：提交成功并 bind 任务后，名额保留到任务结束（任务事件总线上出现
+  终态事件），最长 MEDIA_TASK_LEASE_TTL 秒
+- 排队：超出上限的提交在进程内排队，按用户轮转调度，位置变化通过任务事件总线
+  推送（type=task_queued），等待超过 MEDIA_TASK_QUEUE_TIMEOUT 秒返回 429
+- 限流反馈：上游返回 429 时该服务的上限减半，之后每 MEDIA_TASK_RATE_LIMIT_RECOVERY
+  秒恢复一个名额
+"""
+
+import asyncio
+import logging
+import re
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+from fastapi import Depends, HTTPException, status
+
+from open_webui.env import (
+    ENABLE_MEDIA_TASK_ADMISSION,
+    MEDIA_TASK_DEFAULT_MAX_CONCURRENCY,
+    MEDIA_TASK_LEASE_TTL,
+    MEDIA_TASK_QUEUE_TIMEOUT,
+    MEDIA_TASK_RATE_LIMIT_RECOVERY,
+    MEDIA_TASK_USER_MAX_CONCURRENCY,
+    REDIS_KEY_PREFIX,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.auth import get_verified_user
+from open_webui.utils.task_events import task_event_bus
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+ADMITTED = 1
+PROVIDER_FULL = 0
+USER_FULL = -1
+
+# 其他 worker 释放的名额无法直接通知，排队时按此间隔重试
+RETRY_INTERVAL = 1.0
+# 连续的 429 在此时间内只收紧一次
+PENALTY_DEBOUNCE = 1.0
+
+FINISHED_STATUSES = {
+    "success",
+    "succeed",
+    "succeeded",
+    "completed",
+    "failure",
+    "failed",
+    "fail",
+    "error",
+    "cancelled",
+    "canceled",
+}
+
+RATE_LIMIT_PATTERN = re.compile(r"\(429\)|429 Too Many Requests|HTTP 429\b|^429:")
+
+# KEYS: 服务占用集合, 用户占用集合, 服务限流状态
+# ARGV: 当前时间, 到期时间, 服务上限, 用户上限, 成员, 恢复间隔, 键过期时间（均为毫秒）
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+
+local limit = tonumber(ARGV[3])
+local penalty = redis.call('HMGET', KEYS[3], 'reduction', 'since')
+if penalty[1] then
+    local reduction = tonumber(penalty[1])
+        - math.floor((now - tonumber(penalty[2])) / tonumber(ARGV[6]))
+    if reduction > 0 then
+        limit = math.max(1, limit - reduction)
+    end
+end
+
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+local user_limit = tonumber(ARGV[4])
+if user_limit > 0 and redis.call('ZCARD', KEYS[2]) >= user_limit then
+    return -1
+end
+
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[5])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[5])
+redis.call('PEXPIRE', KEYS[1], ARGV[7])
+redis.call('PEXPIRE', KEYS[2], ARGV[7])
+return 1
+"""
+
+# KEYS: 服务限流状态
+# ARGV: 当前时间, 服务上限, 恢复间隔, 防抖间隔（毫秒），返回收紧后的上限
+PENALIZE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local recovery = tonumber(ARGV[3])
+
+local effective = limit
+local penalty = redis.call('HMGET', KEYS[1], 'reduction', 'since')
+if penalty[1] then
+    local reduction = tonumber(penalty[1])
+        - math.floor((now - tonumber(penalty[2])) / recovery)
+    if reduction > 0 then
+        effective = math.max(1, limit - reduction)
+        if now - tonumber(penalty[2]) < tonumber(ARGV[4]) then
+            return effective
+        end
+    end
+end
+
+local reduction = limit - math.max(1, math.floor(effective / 2))
+if reduction > 0 then
+    redis.call('HSET', KEYS[1], 'reduction', reduction, 'since', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(reduction * recovery))
+end
+return limit - reduction
+"""
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """上游是否返回了 429（各服务客户端的异常形式不同）"""
+    status_code = getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if status_code == 429 or getattr(response, "status_code", None) == 429:
+        return True
+    message = str(getattr(error, "detail", "") or error)
+    return bool(RATE_LIMIT_PATTERN.search(message))
+
+
+def get_effective_limit(
+    limit: int, reduction: int, since: float, now: float, recovery: float
+) -> int:
+    """429 收紧后的上限，每 recovery 秒恢复一个名额"""
+    reduction -= int((now - since) / recovery)
+    return max(1, limit - reduction) if reduction > 0 else limit
+
+
+class Waiter:
+    __slots__ = ("user_id", "member", "limit", "future", "position")
+
+    def __init__(self, user_id: str, member: str, limit: int):
+        self.user_id = user_id
+        self.member = member
+        self.limit = limit
+        self.future = asyncio.get_running_loop().create_future()
+        self.position = None
+
+
+class FairQueue:
+    """按用户轮转的等待队列：A1 B1 C1 A2 B2 ...，刚获得名额的用户排到最后"""
+
+    def __init__(self):
+        self._users: "OrderedDict[str, deque]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self._users.values())
+
+    def push(self, waiter: Waiter):
+        self._users.setdefault(waiter.user_id, deque()).append(waiter)
+
+    def remove(self, waiter: Waiter, admitted: bool = False):
+        waiters = self._users.get(waiter.user_id)
+        if not waiters or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del self._users[waiter.user_id]
+        elif admitted:
+            self._users.move_to_end(waiter.user_id)
+
+    def fair_order(self) -> list[Waiter]:
+        queues = [list(waiters) for waiters in self._users.values()]
+        order = []
+        for i in range(max(map(len, queues), default=0)):
+            order.extend(waiters[i] for waiters in queues if i < len(waiters))
+        return order
+
+
+class AdmissionTicket:
+    """提交任务期间持有的名额，bind(task_id) 后保留到任务结束"""
+
+    def __init__(self, provider: str, user_id: str, member: Optional[str]):
+        self.provider = provider
+        self.user_id = user_id
+        self.member = member
+        self.task_id: Optional[str] = None
+
+    def bind(self, task_id):
+        self.task_id = str(task_id)
+
+
+class AdmissionController:
+    def __init__(self):
+        self.redis = None
+        self._acquire_script = None
+        self._penalize_script = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 本地模式：服务 -> 成员 -> (用户, 到期时间)
+        self._active: Dict[str, Dict[str, tuple]] = {}
+        # 本地模式：服务 -> (收紧的名额数, 收紧时间)
+        self._penalties: Dict[str, tuple] = {}
+
+        self._queues: Dict[str, FairQueue] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._dispatchers: Dict[str, asyncio.Task] = {}
+        # 最近结束的任务，处理 bind 之前就已完成的任务
+        self._finished: "OrderedDict[str, bool]" = OrderedDict()
+
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "rate_limited": 0}
+
+    def _keys(self, provider: str, user_id: str) -> list[str]:
+        # 同一服务的键使用相同的 hash tag，保证在 Redis Cluster 的同一个槽
+        prefix = f"{REDIS_KEY_PREFIX}:admission:{{{provider}}}"
+        return [f"{prefix}:active", f"{prefix}:user:{user_id}", f"{prefix}:penalty"]
+
+    ####################
+    # 信号量
+    ####################
+
+    async def _try_acquire(
+        self, provider: str, user_id: str, member: str, limit: int
+    ) -> int:
+        now = time.time()
+        user_limit = MEDIA_TASK_USER_MAX_CONCURRENCY
+
+        if self.redis is not None:
+            try:
+                return int(
+                    await self._acquire_script(
+                        keys=self._keys(provider, user_id),
+                        args=[
+                            int(now * 1000),
+                            int((now + MEDIA_TASK_LEASE_TTL) * 1000),
+                            limit,
+                            user_limit,
+                            member,
+                            int(MEDIA_TASK_RATE_LIMIT_RECOVERY * 1000),
+                            MEDIA_TASK_LEASE_TTL * 1000,
+                        ],
+                    )
+                )
+            except Exception as e:
+                # Redis 故障时放行，不因准入控制阻塞用户
+                log.error(f"Admission acquire failed for {provider}: {e}")
+                return ADMITTED
+
+        active = self._active.setdefault(provider, {})
+        for key in [key for key, (_, expiry) in active.items() if expiry <= now]:
+            del active[key]
+
+        if provider in self._penalties:
+            limit = get_effective_limit(
+                limit, *self._penalties[provider], now, MEDIA_TASK_RATE_LIMIT_RECOVERY
+            )
+        if len(active) >= limit:
+            return PROVIDER_FULL
+        if user_limit > 0 and (
+            sum(1 for owner, _ in active.values() if owner == user_id) >= user_limit
+        ):
+            return USER_FULL
+
+        active[member] = (user_id, now + MEDIA_TASK_LEASE_TTL)
+        return ADMITTED
+
+    async def _release_member(self, provider: str, user_id: str, member: str):
+        if self.redis is not None:
+            try:
+                active_key, user_key, _ = self._keys(provider, user_id)
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.zrem(active_key, member)
+                    pipe.zrem(user_key, member)
+                    await pipe.execute()
+            except Exception as e:
+                log.error(f"Admission release failed for {provider}: {e}")
+        else:
+            self._active.get(provider, {}).pop(member, None)
+
+        self._wake(provider)
+
+    async def _bind_member(self, provider: str, user_id: str, member: str, task_id):
+        task_member = f"task:{task_id}"
+        expiry = time.time() + MEDIA_TASK_LEASE_TTL
+
+        if self.redis is not None:
+            try:
+                active_key, user_key, _ = self._keys(provider, user_id)
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    for key in (active_key, user_key):
+                        pipe.zrem(key, member)
+                        pipe.zadd(key, {task_member: int(expiry * 1000)})
+                    await pipe.execute()
+            except Exception as e:
+                log.error(f"Admission bind failed for {provider}: {e}")
+        else:
+            active = self._active.setdefault(provider, {})
+            if active.pop(member, None) is not None:
+                active[task_member] = (user_id, expiry)
+
+    ####################
+    # 排队
+    ####################
+
+    async def acquire(self, provider: str, user_id: str, limit: int) -> str:
+        """获取名额，超出上限时排队等待，超时抛出 429"""
+        self._loop = asyncio.get_running_loop()
+        member = uuid.uuid4().hex
+
+        queue = self._queues.setdefault(provider, FairQueue())
+        if not queue and (
+            await self._try_acquire(provider, user_id, member, limit) == ADMITTED
+        ):
+            self.stats["admitted"] += 1
+            return member
+
+        waiter = Waiter(user_id, member, limit)
+        queue.push(waiter)
+        self.stats["queued"] += 1
+        self._wake(provider)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter.future), MEDIA_TASK_QUEUE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # 客户端断开：已分配的名额立即归还，分配中的名额由调度器归还
+            queue.remove(waiter)
+            if not waiter.future.cancel():
+                await self._release_member(provider, user_id, member)
+            raise
+
+        queue.remove(waiter)
+        # 超时：取消等待，调度器正在分配的名额见到已取消后归还
+        if not waiter.future.cancel():
+            self.stats["admitted"] += 1
+            return member
+
+        self.stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"当前任务较多，已排队 {int(MEDIA_TASK_QUEUE_TIMEOUT)} 秒仍未轮到（排在第 {waiter.position or 1} 位），请稍后重试",
+            headers={"Retry-After": str(int(MEDIA_TASK_RATE_LIMIT_RECOVERY))},
+        )
+
+    def _wake(self, provider: str):
+        queue = self._queues.get(provider)
+        if not queue:
+            return
+
+        self._wakeups.setdefault(provider, asyncio.Event()).set()
+        dispatcher = self._dispatchers.get(provider)
+        if dispatcher is None or dispatcher.done():
+            self._dispatchers[provider] = asyncio.create_task(self._dispatch(provider))
+
+    async def _dispatch(self, provider: str):
+        """按公平顺序为排队的提交分配名额，直到队列为空"""
+        queue = self._queues[provider]
+        wakeup = self._wakeups[provider]
+
+        while queue:
+            wakeup.clear()
+            blocked_users = set()
+
+            for waiter in queue.fair_order():
+                if waiter.future.done() or waiter.user_id in blocked_users:
+                    continue
+
+                result = await self._try_acquire(
+                    provider, waiter.user_id, waiter.member, waiter.limit
+                )
+                if result == ADMITTED:
+                    queue.remove(waiter, admitted=True)
+                    # 等待 Redis 期间提交可能已超时或断开
+                    if waiter.future.done():
+                        await self._release_member(
+                            provider, waiter.user_id, waiter.member
+                        )
+                    else:
+                        waiter.future.set_result(True)
+                elif result == USER_FULL:
+                    blocked_users.add(waiter.user_id)
+                else:
+                    break
+
+            await self._report_positions(provider, queue)
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), RETRY_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _report_positions(self, provider: str, queue: FairQueue):
+        order = queue.fair_order()
+        events = []
+        for position, waiter in enumerate(order, start=1):
+            if waiter.position == position:
+                continue
+            waiter.position = position
+            events.append(
+                {
+                    "type": "task_queued",
+                    "provider": provider,
+                    "user_id": waiter.user_id,
+                    "position": position,
+                    "queue_length": len(order),
+                    "timestamp": int(time.time() * 1000),
+                }
+            )
+        # Redis 广播是同步调用，整批放到线程中发送，避免排队较长时阻塞事件循环
+        if events:
+            await asyncio.to_thread(task_event_bus.publish_many, events)
+
+    ####################
+    # 任务生命周期
+    ####################
+
+    @asynccontextmanager
+    async def admit(self, provider: str, user_id: str, limit: Optional[int] = None):
+        """在提交期间持有名额；未 bind 任务则在退出时归还"""
+        if not ENABLE_MEDIA_TASK_ADMISSION:
+            yield AdmissionTicket(provider, user_id, None)
+            return
+
+        if not limit or limit <= 0:
+            limit = MEDIA_TASK_DEFAULT_MAX_CONCURRENCY
+
+        ticket = AdmissionTicket(
+            provider, user_id, await self.acquire(provider, user_id, limit)
+        )
+        try:
+            yield ticket
+        except Exception as e:
+            if is_rate_limited(e):
+                await self.report_rate_limited(provider, limit)
+            raise
+        finally:
+            if ticket.task_id is not None and ticket.task_id not in self._finished:
+                await self._bind_member(
+                    provider, user_id, ticket.member, ticket.task_id
+                )
+            else:
+                await self._release_member(provider, user_id, ticket.member)
+
+    async def release_task(self, provider: str, user_id: str, task_id: str):
+        await self._release_member(provider, user_id, f"task:{task_id}")
+
+    async def report_rate_limited(self, provider: str, limit: int) -> int:
+        """上游返回 429：收紧该服务的上限"""
+        self.stats["rate_limited"] += 1
+        now = time.time()
+
+        if self.redis is not None:
+            try:
+                effective = int(
+                    await self._penalize_script(
+                        keys=[self._keys(provider, "")[2]],
+                        args=[
+                            int(now * 1000),
+                            limit,
+                            int(MEDIA_TASK_RATE_LIMIT_RECOVERY * 1000),
+                            int(PENALTY_DEBOUNCE * 1000),
+                        ],
+                    )
+                )
+            except Exception as e:
+                log.error(f"Admission penalty failed for {provider}: {e}")
+                return limit
+        else:
+            effective = limit
+            if provider in self._penalties:
+                reduction, since = self._penalties[provider]
+                effective = get_effective_limit(
+                    limit, reduction, since, now, MEDIA_TASK_RATE_LIMIT_RECOVERY
+                )
+                if effective < limit and now - since < PENALTY_DEBOUNCE:
+                    return effective
+            effective = max(1, effective // 2)
+            self._penalties[provider] = (limit - effective, now)
+
+        log.warning(f"{provider} is rate limited, concurrency reduced to {effective}")
+        return effective
+
+    def on_task_event(self, event_data: dict):
+        """任务进入终态时归还名额（在发布事件的线程中调用）"""
+        if event_data.get("type") != "task_update" or self._loop is None:
+            return
+
+        task = event_data.get("task") or {}
+        if str(task.get("status", "")).lower() not in FINISHED_STATUSES:
+            return
+
+        args = (event_data["provider"], event_data["user_id"], str(task.get("id")))
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._on_task_finished(*args)
+        else:
+            self._loop.call_soon_threadsafe(self._on_task_finished, *args)
+
+    def _on_task_finished(self, provider: str, user_id: str, task_id: str):
+        self._finished[task_id] = True
+        while len(self._finished) > 1000:
+            self._finished.popitem(last=False)
+        asyncio.ensure_future(self.release_task(provider, user_id, task_id))
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "waiting": {
+                provider: len(queue)
+                for provider, queue in self._queues.items()
+                if queue
+            },
+        }
+
+
+admission_controller = AdmissionController()
+
+
+def init_admission_controller(redis_client=None) -> AdmissionController:
+    """启动时调用：接入 Redis（异步客户端）并订阅任务结束事件"""
+    admission_controller.redis = redis_client
+    if redis_client is not None:
+        admission_controller._acquire_script = redis_client.register_script(
+            ACQUIRE_SCRIPT
+        )
+        admission_controller._penalize_script = redis_client.register_script(
+            PENALIZE_SCRIPT
+        )
+    admission_controller._loop = asyncio.get_running_loop()
+    task_event_bus.add_listener(admission_controller.on_task_event)
+    return admission_controller
+
+
+def media_task_admission(
+    provider: str,
+    get_limit: Callable[[], Optional[int]],
+    get_user: Callable = get_verified_user,
+):
+    """FastAPI 依赖：提交前排队获取名额，接口内调用 ticket.bind(task_id)
+    让名额保留到任务结束，未 bind（提交失败）时请求结束即归还"""
+
+    async def dependency(user=Depends(get_user)):
+        try:
+            limit = get_limit()
+        except Exception as e:
+            log.debug(f"Failed to read {provider} concurrency limit: {e}")
+            limit = None
+
+        async with admission_controller.admit(provider, user.id, limit) as ticket:
+            yield ticket
+
+    return dependency
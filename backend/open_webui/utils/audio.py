@@ -0,0 +1,223 @@
+import logging
+import os
+import re
+import shutil
+import subprocess
+from typing import Iterator, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["AUDIO"])
+
+# Leave some headroom for container/frame overhead when estimating segment
+# sizes from the target bitrate.
+SEGMENT_SIZE_SAFETY_FACTOR = 0.9
+
+# How far (in seconds) before a planned cut point we look for silence.
+SILENCE_SEARCH_WINDOW = 30.0
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def _ffmpeg_binary() -> str:
+    binary = shutil.which("ffmpeg")
+    if not binary:
+        raise RuntimeError("ffmpeg is required for audio segmentation")
+    return binary
+
+
+def _ffprobe_binary() -> str:
+    binary = shutil.which("ffprobe")
+    if not binary:
+        raise RuntimeError("ffprobe is required for audio segmentation")
+    return binary
+
+
+def get_audio_duration(file_path: str) -> float:
+    """Return the duration of an audio file in seconds using ffprobe."""
+    result = subprocess.run(
+        [
+            _ffprobe_binary(),
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            file_path,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip())
+
+
+def parse_silences(output: str) -> list[tuple[float, float]]:
+    """Parse ffmpeg `silencedetect` stderr output into (start, end) pairs."""
+    silences = []
+    start = None
+    for line in output.splitlines():
+        match = _SILENCE_START_RE.search(line)
+        if match:
+            start = max(float(match.group(1)), 0.0)
+            continue
+
+        match = _SILENCE_END_RE.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def detect_silences(
+    file_path: str, noise_db: int = -35, min_silence: float = 0.5
+) -> list[tuple[float, float]]:
+    """
+    Detect silent ranges with ffmpeg's `silencedetect` filter.
+    The audio is decoded by ffmpeg and discarded, nothing is buffered in Python.
+    """
+    result = subprocess.run(
+        [
+            _ffmpeg_binary(),
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            file_path,
+            "-vn",
+            "-af",
+            f"silencedetect=noise={noise_db}dB:d={min_silence}",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    return parse_silences(result.stderr)
+
+
+def get_max_segment_duration(max_bytes: int, bitrate_kbps: int) -> float:
+    """Estimate the longest segment (seconds) that fits into max_bytes at a fixed bitrate."""
+    bytes_per_second = bitrate_kbps * 1000 / 8
+    return max((max_bytes * SEGMENT_SIZE_SAFETY_FACTOR) / bytes_per_second, 1.0)
+
+
+def plan_segments(
+    duration: float,
+    max_segment_duration: float,
+    silences: Optional[list[tuple[float, float]]] = None,
+) -> list[tuple[float, float]]:
+    """
+    Split [0, duration) into (start, end) ranges no longer than max_segment_duration.
+    Cut points are moved back to the middle of the latest silence inside the search
+    window so words are not cut in half; otherwise a hard cut is used.
+    """
+    silences = silences or []
+    midpoints = [(start + end) / 2 for start, end in silences]
+
+    segments = []
+    start = 0.0
+    while duration - start > max_segment_duration:
+        target = start + max_segment_duration
+        window_start = max(
+            start + max_segment_duration / 2, target - SILENCE_SEARCH_WINDOW
+        )
+
+        candidates = [m for m in midpoints if window_start <= m <= target]
+        end = candidates[-1] if candidates else target
+
+        segments.append((start, end))
+        start = end
+
+    if duration - start > 0 or not segments:
+        segments.append((start, duration))
+    return segments
+
+
+def export_segment(
+    file_path: str,
+    output_path: str,
+    start: float,
+    duration: float,
+    bitrate: str = "32k",
+    sample_rate: int = 16000,
+):
+    """Encode a single [start, start + duration) range to a mono, fixed-bitrate mp3."""
+    subprocess.run(
+        [
+            _ffmpeg_binary(),
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-ss",
+            f"{start:.3f}",
+            "-t",
+            f"{duration:.3f}",
+            "-i",
+            file_path,
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-b:a",
+            bitrate,
+            "-f",
+            "mp3",
+            output_path,
+        ],
+        capture_output=True,
+        check=True,
+    )
+
+
+def iter_audio_segments(
+    file_path: str,
+    max_bytes: int,
+    bitrate_kbps: int = 32,
+    silence_aware: bool = True,
+) -> Iterator[str]:
+    """
+    Lazily split an audio file into mp3 segments not exceeding max_bytes.
+
+    Segment lengths are derived from the fixed output bitrate, and cut points are
+    snapped to detected silences when possible. Each segment is encoded by ffmpeg
+    and yielded as soon as it has been written, so consumers can start working on
+    the first segment while the rest are still being produced.
+    """
+    duration = get_audio_duration(file_path)
+    max_segment_duration = get_max_segment_duration(max_bytes, bitrate_kbps)
+
+    silences = []
+    if silence_aware and duration > max_segment_duration:
+        try:
+            silences = detect_silences(file_path)
+        except Exception as e:
+            log.warning(f"Silence detection failed, using fixed cut points: {e}")
+
+    base, _ = os.path.splitext(file_path)
+    pending = list(reversed(plan_segments(duration, max_segment_duration, silences)))
+
+    i = 0
+    while pending:
+        start, end = pending.pop()
+        segment_path = f"{base}_chunk_{i}.mp3"
+        export_segment(file_path, segment_path, start, end - start, f"{bitrate_kbps}k")
+
+        if os.path.getsize(segment_path) > max_bytes:
+            os.remove(segment_path)
+            if end - start <= 5:
+                raise Exception("Audio chunk cannot be reduced below max file size.")
+
+            # The bitrate estimate was off (e.g. VBR fallback), split this range in two
+            middle = start + (end - start) / 2
+            pending.extend([(middle, end), (start, middle)])
+            continue
+
+        log.debug(f"Audio segment {i}: {start:.2f}s - {end:.2f}s -> {segment_path}")
+        yield segment_path
+        i += 1
@@ -1,19 +1,48 @@
 """
 高性能缓存管理器
 提供多层缓存策略和性能优化功能
+
+- 进程内缓存：基于 OrderedDict 的 O(1) LRU，按命名空间设置 TTL
+- 单飞加载：同一个键并发未命中时只执行一次加载函数
+- 跨进程失效：通过 Redis pub/sub 广播失效消息，各 worker 同步清理本地缓存
+- Redis 二级缓存：供可 JSON 序列化的异步结果使用（cache_result 装饰器）
 """
 
 import json
 import hashlib
 import time
 import asyncio
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from concurrent.futures import Future
 from functools import wraps
-from typing import Optional, Any, Dict, List, Callable
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from typing import Optional, Any, Dict, List, Callable, Set, Tuple
+from dataclasses import dataclass, field
 import logging
 
+from open_webui.env import (
+    CACHE_NAMESPACE_TTLS,
+    INSTANCE_ID,
+    REDIS_KEY_PREFIX,
+    SRC_LOG_LEVELS,
+)
+
 logger = logging.getLogger(__name__)
+logger.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# 失效消息广播频道
+CACHE_INVALIDATION_CHANNEL = f"{REDIS_KEY_PREFIX}:cache:invalidate"
+
+# 常用命名空间
+MODELS_NAMESPACE = "models"
+PROVIDER_CONFIG_NAMESPACE = "provider_config"
+STATS_NAMESPACE = "stats"
+RETRIEVAL_NAMESPACE = "retrieval"
+COLLECTION_VERSION_NAMESPACE = "collection_version"
+LEADERBOARD_NAMESPACE = "leaderboard"
+
+_MISSING = object()
 
 
 @dataclass
@@ -24,73 +53,88 @@ class CacheConfig:
     max_memory_items: int = 1000  # 内存缓存最大条目
     enable_compression: bool = False  # 启用数据压缩
     key_prefix: str = "wxiai"  # 缓存键前缀
+    # 按命名空间覆盖TTL（秒）
+    namespace_ttls: Dict[str, int] = field(
+        default_factory=lambda: {
+            MODELS_NAMESPACE: 60,
+            PROVIDER_CONFIG_NAMESPACE: 300,
+            STATS_NAMESPACE: 60,
+            RETRIEVAL_NAMESPACE: 600,
+            # 版本号过期只会导致一次缓存未命中，可以长于结果TTL
+            COLLECTION_VERSION_NAMESPACE: 86400,
+            LEADERBOARD_NAMESPACE: 86400,
+            **CACHE_NAMESPACE_TTLS,
+        }
+    )
 
 
 class MemoryCache:
-    """内存缓存实现"""
+    """内存缓存实现（O(1) LRU，线程安全）"""
 
     def __init__(self, max_size: int = 1000):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        # key -> (expires, data)，顺序即最近访问顺序，队首为最久未访问
+        self.cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
         self.max_size = max_size
-        self.access_times: Dict[str, float] = {}
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Any:
+        """获取缓存项，未命中返回 _MISSING（以便缓存 None 值）"""
+        with self._lock:
+            item = self.cache.get(key)
+            if item is None:
+                return _MISSING
+
+            expires, data = item
+            # 检查过期
+            if time.monotonic() > expires:
+                del self.cache[key]
+                return _MISSING
+
+            # 更新访问顺序
+            self.cache.move_to_end(key)
+            return data
 
     def get(self, key: str) -> Optional[Any]:
         """获取缓存项"""
-        if key not in self.cache:
-            return None
-
-        item = self.cache[key]
-
-        # 检查过期
-        if time.time() > item["expires"]:
-            self._remove(key)
-            return None
-
-        # 更新访问时间
-        self.access_times[key] = time.time()
-        return item["data"]
+        data = self.lookup(key)
+        return None if data is _MISSING else data
 
     def set(self, key: str, value: Any, ttl: int):
         """设置缓存项"""
-        # 如果缓存已满，移除最久未访问的项
-        if len(self.cache) >= self.max_size and key not in self.cache:
-            self._evict_lru()
-
-        self.cache[key] = {
-            "data": value,
-            "expires": time.time() + ttl,
-            "created_at": time.time(),
-        }
-        self.access_times[key] = time.time()
+        with self._lock:
+            self.cache[key] = (time.monotonic() + ttl, value)
+            self.cache.move_to_end(key)
+
+            # 如果缓存已满，移除最久未访问的项
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+                self.evictions += 1
 
     def delete(self, key: str):
         """删除缓存项"""
-        self._remove(key)
-
-    def _remove(self, key: str):
-        """内部删除方法"""
-        self.cache.pop(key, None)
-        self.access_times.pop(key, None)
-
-    def _evict_lru(self):
-        """移除最久未访问的项"""
-        if not self.access_times:
-            return
+        with self._lock:
+            self.cache.pop(key, None)
 
-        lru_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-        self._remove(lru_key)
+    def delete_prefix(self, prefix: str) -> int:
+        """删除指定前缀的缓存项"""
+        with self._lock:
+            keys = [key for key in self.cache if key.startswith(prefix)]
+            for key in keys:
+                del self.cache[key]
+            return len(keys)
 
     def clear(self):
         """清空缓存"""
-        self.cache.clear()
-        self.access_times.clear()
+        with self._lock:
+            self.cache.clear()
 
     def stats(self) -> Dict[str, Any]:
         """获取缓存统计"""
         return {
             "size": len(self.cache),
             "max_size": self.max_size,
-            "hit_rate": getattr(self, "_hit_rate", 0.0),
+            "evictions": self.evictions,
         }
 
 
@@ -102,6 +146,16 @@ class CacheManager:
         self.config = config or CacheConfig()
         self.memory_cache = MemoryCache(self.config.max_memory_items)
 
+        # 同步 Redis 客户端，用于在同步代码路径中广播失效消息
+        self.publisher = None
+
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # 正在进行的加载（含失效后已脱离 _inflight 的），加载结束即移除
+        self._loads: Dict[str, Set[Future]] = {}
+        # 加载期间发生失效的加载：读到的可能是旧值，不回填
+        self._stale: Set[Future] = set()
+
         # 统计信息
         self.stats = {
             "redis_hits": 0,
@@ -111,6 +165,7 @@ class CacheManager:
             "sets": 0,
             "deletes": 0,
         }
+        self.namespace_stats: Dict[str, Dict[str, int]] = {}
 
     def _make_key(self, prefix: str, *args, **kwargs) -> str:
         """生成缓存键"""
@@ -124,6 +179,147 @@ class CacheManager:
 
         return ":".join(key_parts)
 
+    def _namespace_key(self, namespace: str, key: Any) -> str:
+        return f"{self.config.key_prefix}:{namespace}:{key}"
+
+    def get_ttl(self, namespace: str) -> int:
+        """获取命名空间的TTL"""
+        return self.config.namespace_ttls.get(namespace, self.config.default_ttl)
+
+    def _count(self, namespace: str, counter: str):
+        stats = self.namespace_stats.setdefault(
+            namespace, {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0}
+        )
+        stats[counter] += 1
+
+    ####################
+    # 同步命名空间 API（供模型层热点查询使用）
+    ####################
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: Any,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        cache_none: bool = False,
+        copy: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """从进程内缓存获取，未命中时调用 loader 加载
+
+        同一个键的并发未命中共享一次加载（单飞），加载异常会传递给所有等待者。
+        默认不缓存 None，避免新建的数据在TTL内不可见。
+        缓存可变对象时传入 copy，调用方拿到的是副本，修改不会影响缓存。
+        """
+        cache_key = self._namespace_key(namespace, key)
+
+        value = self.memory_cache.lookup(cache_key)
+        if value is not _MISSING:
+            self._count(namespace, "hits")
+            return self._copy(value, copy)
+        self._count(namespace, "misses")
+
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[cache_key] = future
+                self._loads.setdefault(cache_key, set()).add(future)
+
+        if not owner:
+            return self._copy(future.result(), copy)
+
+        try:
+            self._count(namespace, "loads")
+            value = loader()
+            with self._inflight_lock:
+                # 加载期间被失效（例如并发保存），读到的可能是旧值，不回填
+                fresh = future not in self._stale
+            if fresh and (value is not None or cache_none):
+                self.memory_cache.set(
+                    cache_key,
+                    value,
+                    ttl if ttl is not None else self.get_ttl(namespace),
+                )
+            future.set_result(value)
+            return self._copy(value, copy)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                if self._inflight.get(cache_key) is future:
+                    del self._inflight[cache_key]
+                loads = self._loads[cache_key]
+                loads.discard(future)
+                if not loads:
+                    del self._loads[cache_key]
+                self._stale.discard(future)
+
+    @staticmethod
+    def _copy(value: Any, copy: Optional[Callable[[Any], Any]]) -> Any:
+        return copy(value) if copy is not None and value is not None else value
+
+    def peek(self, namespace: str, key: Any) -> Optional[Any]:
+        """读取已缓存的值，不触发加载，未缓存返回 None"""
+        return self.memory_cache.get(self._namespace_key(namespace, key))
+
+    def invalidate(self, namespace: str, key: Any = None, broadcast: bool = True):
+        """使命名空间（或其中一个键）失效，并通知其他 worker"""
+        cache_key = self._namespace_key(namespace, "" if key is None else key)
+        with self._inflight_lock:
+            # 失效后的读取重新加载，不再等待失效前开始的加载
+            for load_key, loads in self._loads.items():
+                if load_key == cache_key or (
+                    key is None and load_key.startswith(cache_key)
+                ):
+                    self._stale.update(loads)
+                    self._inflight.pop(load_key, None)
+        if key is None:
+            self.memory_cache.delete_prefix(cache_key)
+        else:
+            self.memory_cache.delete(cache_key)
+        self._count(namespace, "invalidations")
+
+        if broadcast and self.publisher is not None:
+            try:
+                self.publisher.publish(
+                    CACHE_INVALIDATION_CHANNEL,
+                    json.dumps(
+                        {
+                            "origin": INSTANCE_ID,
+                            "namespace": namespace,
+                            "key": key,
+                        }
+                    ),
+                )
+            except Exception as e:
+                logger.error(f"Cache invalidation publish error: {e}")
+
+    async def listen_for_invalidations(self):
+        """订阅失效频道，清理其他 worker 修改过的数据"""
+        if self.redis is None:
+            return
+
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                if data.get("origin") == INSTANCE_ID:
+                    continue
+                self.invalidate(data["namespace"], data.get("key"), broadcast=False)
+            except Exception as e:
+                logger.exception(f"Error handling cache invalidation: {e}")
+
+    ####################
+    # 异步两级缓存 API（内存 + Redis，值需可 JSON 序列化）
+    ####################
+
     async def get(self, key: str, use_memory: bool = True) -> Optional[Any]:
         """获取缓存值"""
 
@@ -203,14 +399,14 @@ class CacheManager:
 
     async def delete_pattern(self, pattern: str) -> int:
         """删除匹配模式的缓存"""
-        deleted_count = 0
+        deleted_count = self.memory_cache.delete_prefix(pattern.rstrip("*"))
 
         if self.redis:
             try:
-                # 获取匹配的键
-                keys = await self.redis.keys(pattern)
+                # 使用 SCAN 迭代匹配的键，避免 KEYS 阻塞 Redis
+                keys = [key async for key in self.redis.scan_iter(match=pattern)]
                 if keys:
-                    deleted_count = await self.redis.delete(*keys)
+                    deleted_count += await self.redis.delete(*keys)
                     logger.info(
                         f"Deleted {deleted_count} keys matching pattern: {pattern}"
                     )
@@ -247,11 +443,21 @@ class CacheManager:
             1, self.stats["memory_hits"] + self.stats["memory_misses"]
         )
 
+        namespaces = {}
+        for namespace, counters in self.namespace_stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            namespaces[namespace] = {
+                **counters,
+                "ttl": self.get_ttl(namespace),
+                "hit_rate": counters["hits"] / max(1, lookups),
+            }
+
         return {
             "total_requests": total_requests,
             "redis_hit_rate": redis_hit_rate,
             "memory_hit_rate": memory_hit_rate,
             "memory_cache": self.memory_cache.stats(),
+            "namespaces": namespaces,
             "counters": self.stats.copy(),
         }
 
@@ -269,6 +475,17 @@ class CacheManager:
         return status
 
 
+def copy_row(row: Any) -> Any:
+    """复制 ORM 实例的列值，得到一个与缓存对象互不影响的游离实例"""
+    from sqlalchemy import inspect
+
+    mapper = inspect(type(row))
+    clone = mapper.class_()
+    for attr in mapper.column_attrs:
+        setattr(clone, attr.key, deepcopy(getattr(row, attr.key, None)))
+    return clone
+
+
 # 缓存装饰器
 def cache_result(
     prefix: str, ttl: int = None, use_memory: bool = True, key_func: Callable = None
@@ -278,22 +495,16 @@ def cache_result(
     def decorator(func):
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            from open_webui.main import app
-
-            if not hasattr(app.state, "cache_manager"):
-                # 如果没有缓存管理器，直接执行函数
-                return await func(*args, **kwargs)
-
-            cache_manager = app.state.cache_manager
+            manager = get_cache_manager()
 
             # 生成缓存键
             if key_func:
                 cache_key = key_func(*args, **kwargs)
             else:
-                cache_key = cache_manager._make_key(prefix, *args, **kwargs)
+                cache_key = manager._make_key(prefix, *args, **kwargs)
 
             # 尝试从缓存获取
-            cached_result = await cache_manager.get(cache_key, use_memory)
+            cached_result = await manager.get(cache_key, use_memory)
             if cached_result is not None:
                 return cached_result
 
@@ -301,15 +512,22 @@ def cache_result(
             result = await func(*args, **kwargs)
 
             # 存入缓存
-            actual_ttl = ttl or cache_manager.config.default_ttl
-            await cache_manager.set(cache_key, result, actual_ttl, use_memory)
+            actual_ttl = ttl or manager.config.default_ttl
+            await manager.set(cache_key, result, actual_ttl, use_memory)
 
             return result
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            # 对于同步函数的处理
-            return func(*args, **kwargs)
+            manager = get_cache_manager()
+            cache_key = (
+                key_func(*args, **kwargs)
+                if key_func
+                else manager._make_key("", *args, **kwargs)
+            )
+            return manager.get_or_load(
+                prefix, cache_key, lambda: func(*args, **kwargs), ttl=ttl
+            )
 
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
 
@@ -322,22 +540,19 @@ def cache_invalidate(patterns: List[str]):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            from open_webui.main import app
-
             # 执行函数
             result = await func(*args, **kwargs)
 
             # 清理相关缓存
-            if hasattr(app.state, "cache_manager"):
-                cache_manager = app.state.cache_manager
-                for pattern in patterns:
-                    # 支持动态模式替换
-                    if callable(pattern):
-                        actual_pattern = pattern(*args, **kwargs)
-                    else:
-                        actual_pattern = pattern.format(*args, **kwargs)
+            manager = get_cache_manager()
+            for pattern in patterns:
+                # 支持动态模式替换
+                if callable(pattern):
+                    actual_pattern = pattern(*args, **kwargs)
+                else:
+                    actual_pattern = pattern.format(*args, **kwargs)
 
-                    await cache_manager.delete_pattern(actual_pattern)
+                await manager.delete_pattern(actual_pattern)
 
             return result
 
@@ -346,18 +561,28 @@ def cache_invalidate(patterns: List[str]):
     return decorator
 
 
-# 应用级缓存实例
-cache_manager: Optional[CacheManager] = None
+# 应用级缓存实例：进程内缓存始终可用，init_cache_manager 在启动时接入 Redis
+cache_manager: CacheManager = CacheManager()
+
 
+def init_cache_manager(redis_client=None, publisher=None, config: CacheConfig = None):
+    """初始化缓存管理器
 
-def init_cache_manager(redis_client=None, config: CacheConfig = None):
-    """初始化缓存管理器"""
+    Args:
+        redis_client: 异步 Redis 客户端（二级缓存与失效订阅）
+        publisher: 同步 Redis 客户端（同步代码路径广播失效消息）
+        config: 缓存配置
+    """
     global cache_manager
-    cache_manager = CacheManager(redis_client, config)
+    if config is not None:
+        cache_manager = CacheManager(redis_client, config)
+    else:
+        cache_manager.redis = redis_client
+    cache_manager.publisher = publisher
     return cache_manager
 
 
-def get_cache_manager() -> Optional[CacheManager]:
+def get_cache_manager() -> CacheManager:
     """获取缓存管理器实例"""
     return cache_manager
 
@@ -387,44 +612,22 @@ async def get_cached_user_info(user_id: str):
     }
 
 
-@cache_result("ai_config", ttl=1800)  # 30分钟
-async def get_cached_ai_config(service_name: str):
-    """缓存AI服务配置"""
-    if service_name == "midjourney":
-        from open_webui.models.midjourney import MJConfig
-
-        config = MJConfig.get_config()
-        return config.dict() if config else None
-    elif service_name == "flux":
-        from open_webui.models.flux import FluxConfig
-
-        config = FluxConfig.get_config()
-        return config.dict() if config else None
-    # 添加其他服务...
-
-    return None
-
-
-@cache_result("model_list", ttl=3600)  # 1小时
-async def get_cached_model_list():
-    """缓存模型列表"""
-    from open_webui.models.models import Models
-
-    models = Models.get_all_models()
-    return [model.dict() for model in models]
-
-
 # 缓存预热函数
 async def warm_up_cache():
     """缓存预热 - 在应用启动时调用"""
     try:
+        from open_webui.models.models import Models
+        from open_webui.models.midjourney import MJConfig
+        from open_webui.models.kling import KlingConfig
+        from open_webui.models.jimeng import JimengConfig
+
         # 预加载常用数据
-        await get_cached_model_list()
+        for model in Models.get_all_models():
+            Models.get_model_by_id(model.id)
 
         # 预加载AI服务配置
-        services = ["midjourney", "flux", "dreamwork", "jimeng", "kling"]
-        for service in services:
-            await get_cached_ai_config(service)
+        for config_class in (MJConfig, KlingConfig, JimengConfig):
+            config_class.get_config()
 
         logger.info("Cache warm-up completed")
     except Exception as e:
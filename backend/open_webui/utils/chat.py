@@ -57,6 +57,7 @@ from open_webui.utils.filter import (
     process_filter_functions,
 )
 
+from open_webui.utils.telemetry.stages import stage
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL, BYPASS_MODEL_ACCESS_CONTROL
 
 
@@ -280,7 +281,7 @@ async def generate_chat_completion(
                     background=response.background,
                 )
             else:
-                with CreditDeduct(
+                async with CreditDeduct(
                     user=user,
                     model_id=model_id,
                     body=payload,
@@ -320,7 +321,8 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
     model = models[model_id]
 
     try:
-        data = await process_pipeline_outlet_filter(request, data, user, models)
+        with stage("pipeline_outlet"):
+            data = await process_pipeline_outlet_filter(request, data, user, models)
     except Exception as e:
         return Exception(f"Error: {e}")
 
@@ -349,13 +351,14 @@ async def chat_completed(request: Request, form_data: dict, user: Any):
             )
         ]
 
-        result, _ = await process_filter_functions(
-            request=request,
-            filter_functions=filter_functions,
-            filter_type="outlet",
-            form_data=data,
-            extra_params=extra_params,
-        )
+        with stage("filter_outlet"):
+            result, _ = await process_filter_functions(
+                request=request,
+                filter_functions=filter_functions,
+                filter_type="outlet",
+                form_data=data,
+                extra_params=extra_params,
+            )
         return result
     except Exception as e:
         return Exception(f"Error: {e}")
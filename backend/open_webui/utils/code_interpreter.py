@@ -1,6 +1,7 @@
 import asyncio
 import json
 import logging
+import time
 import uuid
 from typing import Optional
 
@@ -8,7 +9,12 @@ import aiohttp
 import websockets
 from pydantic import BaseModel
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT,
+    CODE_INTERPRETER_JUPYTER_POOL_ISOLATION,
+    CODE_INTERPRETER_JUPYTER_POOL_SIZE,
+    SRC_LOG_LEVELS,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -55,6 +61,7 @@ class JupyterCodeExecuter:
         self.session = aiohttp.ClientSession(trust_env=True, base_url=self.base_url)
         self.params = {}
         self.result = ResultModel()
+        self.timed_out = False
 
     async def __aenter__(self):
         return self
@@ -194,15 +201,338 @@ class JupyterCodeExecuter:
 
             except asyncio.TimeoutError:
                 stderr += "\nExecution timed out."
+                self.timed_out = True
                 break
         self.result.stdout = stdout.strip()
         self.result.stderr = stderr.strip()
         self.result.result = "\n".join(result).strip() if result else ""
 
 
+class PooledKernel:
+    """
+    A kernel kept alive between executions, with the executor that owns its
+    authenticated HTTP session and the open channels websocket.
+    """
+
+    def __init__(self, executor: JupyterCodeExecuter, ws, server_key: tuple):
+        self.executor = executor
+        self.ws = ws
+        self.server_key = server_key
+        self.owner: Optional[str] = None
+        self.busy = False
+        self.last_used = time.monotonic()
+
+    @property
+    def kernel_id(self) -> str:
+        return self.executor.kernel_id
+
+    async def connect(self) -> None:
+        websocket_url, ws_headers = self.executor.init_ws()
+        self.ws = await websockets.connect(websocket_url, additional_headers=ws_headers)
+
+    async def execute(self, code: str, timeout: int) -> ResultModel:
+        if self.ws is None or self.ws.close_code is not None:
+            await self.connect()
+
+        self.executor.code = code
+        self.executor.timeout = timeout
+        self.executor.result = ResultModel()
+        self.executor.timed_out = False
+        await self.executor.execute_in_jupyter(self.ws)
+        return self.executor.result
+
+    async def restart(self) -> None:
+        async with self.executor.session.post(
+            f"api/kernels/{self.kernel_id}/restart", params=self.executor.params
+        ) as response:
+            response.raise_for_status()
+        await self.close_ws()
+        await self.connect()
+
+    async def close_ws(self) -> None:
+        if self.ws is not None:
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+
+    async def close(self) -> None:
+        await self.close_ws()
+        # Deletes the kernel and closes the HTTP session
+        await self.executor.__aexit__(None, None, None)
+
+
+class JupyterKernelPool:
+    """
+    Keeps warm Jupyter kernels so short snippets skip kernel startup.
+
+    - A session gets back the idle kernel it used last, with its state.
+    - Otherwise an idle kernel of the same server is handed over, after its
+      state is cleared according to `isolation` ("restart", "reset" or
+      "none"), or a new kernel is started while the pool has room. Only
+      "restart" isolates users from each other, "reset" leaves modules,
+      files and the process environment behind.
+    - A full pool evicts idle kernels of other servers; when every kernel is
+      busy, callers wait for one to be released.
+    - Kernels idle for longer than `idle_timeout` are shut down, and kernels
+      whose execution timed out or failed are discarded.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        idle_timeout: float = 300.0,
+        isolation: str = "restart",
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.isolation = isolation
+        self.kernels: list[PooledKernel] = []
+        self._starting = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self.metrics = {
+            "created": 0,
+            "reused": 0,
+            "reset": 0,
+            "restarted": 0,
+            "evicted": 0,
+            "reaped": 0,
+            "discarded": 0,
+            "waited": 0,
+        }
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _ensure_reaper(self) -> None:
+        if self.idle_timeout > 0 and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.create_task(self._reap_periodically())
+
+    async def _reap_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(min(max(self.idle_timeout / 2, 1), 30))
+            try:
+                await self.reap_idle()
+            except Exception as err:
+                logger.exception("reap idle kernels failed, %s", err)
+
+    async def reap_idle(self) -> int:
+        deadline = time.monotonic() - self.idle_timeout
+        async with self.condition:
+            expired = [
+                kernel
+                for kernel in self.kernels
+                if not kernel.busy and kernel.last_used < deadline
+            ]
+            for kernel in expired:
+                self.kernels.remove(kernel)
+            self.condition.notify_all()
+
+        for kernel in expired:
+            await kernel.close()
+        self.metrics["reaped"] += len(expired)
+        return len(expired)
+
+    async def _start_kernel(
+        self, base_url: str, token: str, password: str, timeout: int
+    ) -> PooledKernel:
+        executor = JupyterCodeExecuter(base_url, "", token, password, timeout)
+        try:
+            await executor.sign_in()
+            await executor.init_kernel()
+            kernel = PooledKernel(executor, None, (base_url, token, password))
+            await kernel.connect()
+            return kernel
+        except BaseException:
+            await executor.__aexit__(None, None, None)
+            raise
+
+    async def acquire(
+        self, base_url: str, token: str, password: str, owner: str, timeout: int
+    ) -> PooledKernel:
+        self._ensure_reaper()
+        server_key = (base_url, token, password)
+        deadline = time.monotonic() + timeout
+        evicted = None
+
+        async with self.condition:
+            while True:
+                idle = [
+                    kernel
+                    for kernel in self.kernels
+                    if not kernel.busy and kernel.server_key == server_key
+                ]
+                kernel = next((k for k in idle if k.owner == owner), None) or (
+                    # Prefer handing over the kernel that has been idle longest
+                    min(idle, key=lambda k: k.last_used)
+                    if idle
+                    else None
+                )
+                if kernel is not None:
+                    kernel.busy = True
+                    break
+
+                if len(self.kernels) + self._starting >= self.max_size:
+                    others = [k for k in self.kernels if not k.busy]
+                    if others:
+                        evicted = min(others, key=lambda k: k.last_used)
+                        self.kernels.remove(evicted)
+                        self.metrics["evicted"] += 1
+
+                if len(self.kernels) + self._starting < self.max_size:
+                    self._starting += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No Jupyter kernel available")
+                self.metrics["waited"] += 1
+                try:
+                    await asyncio.wait_for(self.condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    raise TimeoutError("No Jupyter kernel available")
+
+        if evicted is not None:
+            await evicted.close()
+
+        if kernel is None:
+            try:
+                kernel = await self._start_kernel(base_url, token, password, timeout)
+            finally:
+                async with self.condition:
+                    self._starting -= 1
+                    self.condition.notify_all()
+
+            kernel.busy = True
+            kernel.owner = owner
+            async with self.condition:
+                self.kernels.append(kernel)
+            self.metrics["created"] += 1
+            return kernel
+
+        try:
+            await self._isolate(kernel, owner)
+        except BaseException:
+            await self.release(kernel, healthy=False)
+            raise
+        return kernel
+
+    async def _isolate(self, kernel: PooledKernel, owner: str) -> None:
+        if kernel.owner == owner or kernel.owner is None:
+            self.metrics["reused"] += 1
+        elif self.isolation == "restart":
+            await kernel.restart()
+            self.metrics["restarted"] += 1
+        elif self.isolation == "reset":
+            result = await kernel.execute("%reset -f", kernel.executor.timeout)
+            if kernel.executor.timed_out or result.stderr:
+                raise RuntimeError(f"Failed to reset kernel {kernel.kernel_id}")
+            self.metrics["reset"] += 1
+        else:
+            self.metrics["reused"] += 1
+        kernel.owner = owner
+
+    async def release(self, kernel: PooledKernel, healthy: bool = True) -> None:
+        async with self.condition:
+            if healthy:
+                kernel.busy = False
+                kernel.last_used = time.monotonic()
+            elif kernel in self.kernels:
+                self.kernels.remove(kernel)
+            self.condition.notify_all()
+
+        if not healthy:
+            self.metrics["discarded"] += 1
+            await kernel.close()
+
+    async def execute(
+        self,
+        base_url: str,
+        code: str,
+        token: str = "",
+        password: str = "",
+        timeout: int = 60,
+        owner: str = "",
+    ) -> ResultModel:
+        try:
+            kernel = await self.acquire(base_url, token, password, owner, timeout)
+        except Exception as err:
+            logger.exception("acquire kernel failed, %s", err)
+            return ResultModel(stderr=f"Error: {err}")
+
+        healthy = False
+        try:
+            result = await kernel.execute(code, timeout)
+            # A timed out execution may still be running, don't hand it out again
+            healthy = not kernel.executor.timed_out
+            return result
+        except Exception as err:
+            logger.exception("execute code failed, %s", err)
+            return ResultModel(stderr=f"Error: {err}")
+        finally:
+            await self.release(kernel, healthy)
+
+    def get_metrics(self) -> dict:
+        busy = sum(1 for kernel in self.kernels if kernel.busy)
+        return {
+            "max_size": self.max_size,
+            "idle_timeout": self.idle_timeout,
+            "isolation": self.isolation,
+            "kernels": len(self.kernels),
+            "busy": busy,
+            "idle": len(self.kernels) - busy,
+            "starting": self._starting,
+            **self.metrics,
+        }
+
+    async def shutdown(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+        kernels, self.kernels = self.kernels, []
+        for kernel in kernels:
+            try:
+                await kernel.close()
+            except Exception as err:
+                logger.exception("close kernel failed, %s", err)
+
+
+kernel_pool: Optional[JupyterKernelPool] = (
+    JupyterKernelPool(
+        max_size=CODE_INTERPRETER_JUPYTER_POOL_SIZE,
+        idle_timeout=CODE_INTERPRETER_JUPYTER_POOL_IDLE_TIMEOUT,
+        isolation=CODE_INTERPRETER_JUPYTER_POOL_ISOLATION,
+    )
+    if CODE_INTERPRETER_JUPYTER_POOL_SIZE > 0
+    else None
+)
+
+
 async def execute_code_jupyter(
-    base_url: str, code: str, token: str = "", password: str = "", timeout: int = 60
+    base_url: str,
+    code: str,
+    token: str = "",
+    password: str = "",
+    timeout: int = 60,
+    session_id: Optional[str] = None,
 ) -> dict:
+    """
+    Execute code on a Jupyter server. With a session id and the kernel pool
+    enabled, the code runs on a warm pooled kernel; otherwise a kernel is
+    started for this execution and deleted afterwards.
+    """
+    if kernel_pool is not None and session_id:
+        result = await kernel_pool.execute(
+            base_url, code, token or "", password or "", timeout, owner=session_id
+        )
+        return result.model_dump()
+
     async with JupyterCodeExecuter(
         base_url, code, token, password, timeout
     ) as executor:
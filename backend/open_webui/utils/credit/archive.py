@@ -0,0 +1,539 @@
+import asyncio
+import datetime
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from open_webui.config import CACHE_DIR
+from open_webui.env import (
+    CREDIT_LOG_ARCHIVE_BATCH_SIZE,
+    CREDIT_LOG_ARCHIVE_DIR,
+    CREDIT_LOG_ARCHIVE_FILE_ROWS,
+    CREDIT_LOG_ARCHIVE_INTERVAL,
+    CREDIT_LOG_ARCHIVE_STORAGE,
+    CREDIT_LOG_DELETE_CHUNK_SIZE,
+    CREDIT_LOG_RETENTION_DAYS,
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.models.credits import (
+    CreditLogArchiveModel,
+    CreditLogArchives,
+    CreditLogModel,
+    CreditLogs,
+    CreditLogSimpleModel,
+)
+from open_webui.utils.misc import decode_keyset_cursor, encode_keyset_cursor
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+ARCHIVE_LOCK_KEY = f"{REDIS_KEY_PREFIX}:credit_log_archive:lock"
+# seconds, renewed every third of it while a run is going on
+ARCHIVE_LOCK_TTL = 60
+
+RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_local_lock = threading.Lock()
+
+
+####################
+# Storage
+####################
+
+
+class LocalArchiveStorage:
+    name = "local"
+
+    def __init__(self, base_dir: str = CREDIT_LOG_ARCHIVE_DIR):
+        self.base_dir = base_dir
+
+    def write(self, path: str, data: bytes) -> None:
+        file_path = os.path.join(self.base_dir, path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # write next to the target and rename, readers never see a partial file
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+
+    def get_local_path(self, path: str) -> str:
+        return os.path.join(self.base_dir, path)
+
+
+class CosArchiveStorage:
+    """Archives in the Tencent COS bucket of the cloud storage configuration"""
+
+    name = "cos"
+    prefix = "archive/credit_log"
+
+    def __init__(self, cache_dir: str = f"{CACHE_DIR}/credit_log_archive"):
+        self.cache_dir = cache_dir
+
+    def _get_service(self):
+        from open_webui.models.cloud_storage import CloudStorageConfigs
+        from open_webui.utils.cloud_storage.tencent_cos import TencentCOSService
+
+        config = CloudStorageConfigs().get_config()
+        service = TencentCOSService(config) if config else None
+        if not service or not service.is_available():
+            raise RuntimeError("Tencent COS storage is not configured")
+        return service
+
+    def write(self, path: str, data: bytes) -> None:
+        service = self._get_service()
+        # the bucket also holds public-read uploads, billing history must not
+        service.client.put_object(
+            Bucket=service.config.bucket,
+            Body=data,
+            Key=f"{self.prefix}/{path}",
+            ACL="private",
+            ContentType="application/vnd.apache.parquet",
+        )
+
+    def get_local_path(self, path: str) -> str:
+        # archives never change once written, so a downloaded copy stays valid
+        file_path = os.path.join(self.cache_dir, path)
+        if not os.path.exists(file_path):
+            service = self._get_service()
+            response = service.client.get_object(
+                Bucket=service.config.bucket, Key=f"{self.prefix}/{path}"
+            )
+            LocalArchiveStorage(self.cache_dir).write(
+                path, response["Body"].get_raw_stream().read()
+            )
+        return file_path
+
+
+STORAGES = {
+    LocalArchiveStorage.name: LocalArchiveStorage,
+    CosArchiveStorage.name: CosArchiveStorage,
+}
+
+
+def get_archive_storage(name: str = CREDIT_LOG_ARCHIVE_STORAGE):
+    if name not in STORAGES:
+        raise ValueError(f"Unknown credit log archive storage: {name}")
+    return STORAGES[name]()
+
+
+####################
+# Parquet files
+####################
+
+
+def serialize_logs(logs: list[CreditLogModel]) -> bytes:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table(
+        {
+            "id": pa.array([log.id for log in logs], pa.string()),
+            "user_id": pa.array([log.user_id for log in logs], pa.string()),
+            # decimals are kept as text so no precision is lost
+            "credit": pa.array([str(log.credit) for log in logs], pa.string()),
+            "detail": pa.array(
+                [json.dumps(log.detail, ensure_ascii=False) for log in logs],
+                pa.string(),
+            ),
+            "created_at": pa.array([log.created_at for log in logs], pa.int64()),
+        }
+    )
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def read_archive(
+    archive: CreditLogArchiveModel,
+    columns: Optional[list[str]] = None,
+    user_ids: Optional[list[str]] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+):
+    return read_archive_file(
+        archive.storage, archive.path, columns, user_ids, start_time, end_time
+    )
+
+
+def read_archive_file(
+    storage: str,
+    path: str,
+    columns: Optional[list[str]] = None,
+    user_ids: Optional[list[str]] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+):
+    import pyarrow.parquet as pq
+
+    filters = []
+    if user_ids:
+        filters.append(("user_id", "in", list(user_ids)))
+    if start_time is not None:
+        filters.append(("created_at", ">=", start_time))
+    if end_time is not None:
+        filters.append(("created_at", "<", end_time))
+
+    return pq.read_table(
+        get_archive_storage(storage).get_local_path(path),
+        columns=columns,
+        filters=filters or None,
+    )
+
+
+def to_log_models(table, model=CreditLogSimpleModel) -> list:
+    return [
+        model.model_validate(
+            {**row, "detail": json.loads(row["detail"]) if row["detail"] else {}}
+        )
+        for row in table.to_pylist()
+    ]
+
+
+@lru_cache(maxsize=1024)
+def _count_archive_rows(storage: str, path: str, user_ids: tuple) -> int:
+    # archives are immutable, and only the user_id column is read
+    return read_archive_file(
+        storage, path, columns=["user_id"], user_ids=list(user_ids)
+    ).num_rows
+
+
+def count_archive_rows(
+    archive: CreditLogArchiveModel, user_ids: Optional[list[str]] = None
+) -> int:
+    if not user_ids:
+        return archive.row_count
+    return _count_archive_rows(archive.storage, archive.path, tuple(sorted(user_ids)))
+
+
+####################
+# Queries
+####################
+
+
+def count_archived_logs(user_ids: Optional[list[str]] = None) -> int:
+    return sum(
+        count_archive_rows(archive, user_ids)
+        for archive in CreditLogArchives.get_archives()
+    )
+
+
+def get_archived_logs_by_page(
+    user_ids: Optional[list[str]] = None, offset: int = 0, limit: int = 30
+) -> list[CreditLogSimpleModel]:
+    """Archived logs newest first, continuing the order of the credit_log table"""
+    results = []
+    for archive in CreditLogArchives.get_archives():
+        if limit <= 0:
+            break
+        count = count_archive_rows(archive, user_ids)
+        if offset >= count:
+            offset -= count
+            continue
+
+        table = read_archive(archive, user_ids=user_ids).sort_by(
+            [("created_at", "descending"), ("id", "descending")]
+        )
+        page = table.slice(offset, limit)
+        results.extend(to_log_models(page))
+        limit -= page.num_rows
+        offset = 0
+    return results
+
+
+def get_archived_logs_by_cursor(
+    user_ids: Optional[list[str]] = None,
+    cursor: Optional[str] = None,
+    limit: int = 30,
+) -> tuple[list[CreditLogSimpleModel], Optional[str]]:
+    """Keyset page over the archives, same cursor format as the credit_log table"""
+    import pyarrow.compute as pc
+
+    created_at, id = decode_keyset_cursor(cursor) if cursor else (None, None)
+    results = []
+    for archive in CreditLogArchives.get_archives():
+        if len(results) > limit:
+            break
+        if created_at is not None and archive.start_time > created_at:
+            continue
+
+        table = read_archive(
+            archive,
+            user_ids=user_ids,
+            end_time=created_at + 1 if created_at is not None else None,
+        )
+        if created_at is not None:
+            table = table.filter(
+                pc.or_(
+                    pc.less(table["created_at"], created_at),
+                    pc.and_(
+                        pc.equal(table["created_at"], created_at),
+                        pc.less(table["id"], id),
+                    ),
+                )
+            )
+        table = table.sort_by([("created_at", "descending"), ("id", "descending")])
+        results.extend(to_log_models(table.slice(0, limit + 1 - len(results))))
+
+    page = results[:limit]
+    next_cursor = None
+    if len(results) > limit:
+        # with limit 0 only tells whether anything follows the given cursor
+        next_cursor = (
+            encode_keyset_cursor(page[-1].created_at, page[-1].id) if page else cursor
+        )
+    return page, next_cursor
+
+
+def iter_archived_logs(
+    user_ids: Optional[list[str]] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+) -> Iterator[CreditLogModel]:
+    """Archived logs oldest first, one record batch of one file in memory at a time"""
+    for archive in reversed(
+        CreditLogArchives.get_archives(start_time=start_time, end_time=end_time)
+    ):
+        table = read_archive(
+            archive, user_ids=user_ids, start_time=start_time, end_time=end_time
+        ).sort_by([("created_at", "ascending"), ("id", "ascending")])
+        for batch in table.to_batches(max_chunksize=1000):
+            yield from to_log_models(batch, CreditLogModel)
+
+
+def get_archived_logs_by_time(
+    start_time: int, end_time: int
+) -> list[CreditLogSimpleModel]:
+    results = []
+    for archive in reversed(
+        CreditLogArchives.get_archives(start_time=start_time, end_time=end_time)
+    ):
+        results.extend(
+            to_log_models(
+                read_archive(archive, start_time=start_time, end_time=end_time)
+            )
+        )
+    return results
+
+
+####################
+# Archival
+####################
+
+
+def get_partition(timestamp: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime(
+        "%Y/%m"
+    )
+
+
+class ArchiveLockLost(RuntimeError):
+    pass
+
+
+class ArchiveLock:
+    """
+    Only one worker archives at a time. With Redis the lock expires after
+    ARCHIVE_LOCK_TTL seconds and is renewed while the run goes on, so a crashed
+    worker does not block archival for long and a slow run is never overlapped.
+    """
+
+    def __init__(self, redis=None, ttl: int = ARCHIVE_LOCK_TTL):
+        self.redis = redis
+        self.ttl = ttl
+        self.lock_id = uuid.uuid4().hex
+        self.lost = False
+        self._renewed_at = time.monotonic()
+        self._stop = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+    def acquire(self) -> bool:
+        if self.redis is None:
+            return _local_lock.acquire(blocking=False)
+
+        if not self.redis.set(ARCHIVE_LOCK_KEY, self.lock_id, nx=True, ex=self.ttl):
+            return False
+        self._renewed_at = time.monotonic()
+        self._renewer = threading.Thread(
+            target=self._renew_periodically, name="credit-log-archive-lock", daemon=True
+        )
+        self._renewer.start()
+        return True
+
+    def renew(self) -> bool:
+        renewed = self.redis.register_script(RENEW_LOCK_SCRIPT)(
+            keys=[ARCHIVE_LOCK_KEY], args=[self.lock_id, self.ttl * 1000]
+        )
+        if not renewed:
+            self.lost = True
+            return False
+        self._renewed_at = time.monotonic()
+        return True
+
+    def _renew_periodically(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                if not self.renew():
+                    log.error("Credit log archive lock was taken over, stopping")
+                    return
+            except Exception as e:
+                log.warning(f"Could not renew the credit log archive lock: {e}")
+
+    def check(self) -> None:
+        """Raise before deleting rows once another worker may own the lock"""
+        # without a renewal for a whole TTL the key may have expired
+        if self.lost or (
+            self.redis is not None and time.monotonic() - self._renewed_at >= self.ttl
+        ):
+            raise ArchiveLockLost("Credit log archive lock was lost")
+
+    def release(self) -> None:
+        if self.redis is None:
+            _local_lock.release()
+            return
+
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join()
+        # only delete the key while it still holds our id
+        self.redis.register_script(RELEASE_LOCK_SCRIPT)(
+            keys=[ARCHIVE_LOCK_KEY], args=[self.lock_id]
+        )
+
+
+def get_archive_lock() -> ArchiveLock:
+    if not REDIS_URL:
+        return ArchiveLock()
+    return ArchiveLock(
+        get_redis_connection(
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            redis_cluster=REDIS_CLUSTER,
+        )
+    )
+
+
+def _remove_archived_rows(archive: CreditLogArchiveModel, lock: ArchiveLock) -> int:
+    lock.check()
+    ids = read_archive(archive, columns=["id"]).column("id").to_pylist()
+    deleted = CreditLogs.delete_logs_by_ids(ids, CREDIT_LOG_DELETE_CHUNK_SIZE)
+    CreditLogArchives.update_archive_status(archive.id, "done")
+    return deleted
+
+
+def _write_archive(storage, logs: list[CreditLogModel]) -> CreditLogArchiveModel:
+    start_time, end_time = logs[0].created_at, logs[-1].created_at
+    path = (
+        f"{get_partition(start_time)}/"
+        f"credit_log_{start_time}_{end_time}_{uuid.uuid4().hex[:8]}.parquet"
+    )
+    data = serialize_logs(logs)
+    storage.write(path, data)
+    # pending until the rows are gone from the table, queries skip it meanwhile
+    return CreditLogArchives.insert_archive(
+        CreditLogArchiveModel(
+            storage=storage.name,
+            path=path,
+            start_time=start_time,
+            end_time=end_time,
+            row_count=len(logs),
+            size=len(data),
+            status="pending",
+        )
+    )
+
+
+def archive_credit_logs(before: int) -> dict:
+    """
+    Move credit logs created before the timestamp into monthly Parquet files
+    and remove them from the table in small chunks.
+    """
+    lock = get_archive_lock()
+    if not lock.acquire():
+        return {"status": "locked", "archives": 0, "rows": 0}
+
+    try:
+        storage = get_archive_storage()
+        result = {"status": "ok", "archives": 0, "rows": 0}
+
+        # finish runs that stopped after writing their file
+        for archive in CreditLogArchives.get_archives(status="pending"):
+            _remove_archived_rows(archive, lock)
+
+        pending = []
+        after = None
+        while True:
+            batch = CreditLogs.get_logs_before(
+                before, after=after, limit=CREDIT_LOG_ARCHIVE_BATCH_SIZE
+            )
+            for log_item in batch:
+                if pending and (
+                    len(pending) >= CREDIT_LOG_ARCHIVE_FILE_ROWS
+                    or get_partition(log_item.created_at)
+                    != get_partition(pending[0].created_at)
+                ):
+                    archive = _write_archive(storage, pending)
+                    _remove_archived_rows(archive, lock)
+                    result["archives"] += 1
+                    result["rows"] += len(pending)
+                    pending = []
+                pending.append(log_item)
+
+            if len(batch) < CREDIT_LOG_ARCHIVE_BATCH_SIZE:
+                break
+            after = (batch[-1].created_at, batch[-1].id)
+
+        if pending:
+            archive = _write_archive(storage, pending)
+            _remove_archived_rows(archive, lock)
+            result["archives"] += 1
+            result["rows"] += len(pending)
+
+        log.info(
+            f"Archived {result['rows']} credit logs into {result['archives']} files"
+        )
+        return result
+    finally:
+        lock.release()
+
+
+def run_credit_log_retention() -> Optional[dict]:
+    if not CREDIT_LOG_RETENTION_DAYS:
+        return None
+    return archive_credit_logs(
+        int(time.time()) - CREDIT_LOG_RETENTION_DAYS * 24 * 60 * 60
+    )
+
+
+async def periodic_credit_log_archive():
+    while True:
+        try:
+            await asyncio.to_thread(run_credit_log_retention)
+        except Exception as e:
+            log.exception(f"Credit log archival failed: {e}")
+        await asyncio.sleep(CREDIT_LOG_ARCHIVE_INTERVAL)
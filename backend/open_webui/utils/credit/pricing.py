@@ -0,0 +1,263 @@
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Optional, Union
+
+from jsonpath_ng import parse as jsonpath_parse
+
+from open_webui.config import (
+    USAGE_CALCULATE_DEFAULT_EMBEDDING_PRICE,
+    USAGE_CALCULATE_DEFAULT_REQUEST_PRICE,
+    USAGE_CALCULATE_DEFAULT_TOKEN_PRICE,
+    USAGE_CALCULATE_FEATURE_CODE_EXECUTE_PRICE,
+    USAGE_CALCULATE_FEATURE_IMAGE_GEN_PRICE,
+    USAGE_CALCULATE_FEATURE_TOOL_SERVER_PRICE,
+    USAGE_CALCULATE_FEATURE_WEB_SEARCH_PRICE,
+    USAGE_CALCULATE_MINIMUM_COST,
+    USAGE_CUSTOM_PRICE_CONFIG,
+)
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.models import ModelModel, Models
+
+logger = logging.getLogger(__name__)
+logger.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# feature name -> config holding its price per 1000 requests
+FEATURE_PRICE_CONFIGS = {
+    "image_generation": USAGE_CALCULATE_FEATURE_IMAGE_GEN_PRICE,
+    "code_interpreter": USAGE_CALCULATE_FEATURE_CODE_EXECUTE_PRICE,
+    "web_search": USAGE_CALCULATE_FEATURE_WEB_SEARCH_PRICE,
+    "direct_tool_servers": USAGE_CALCULATE_FEATURE_TOOL_SERVER_PRICE,
+}
+
+# models whose price table is kept per snapshot
+MODEL_PRICE_CACHE_SIZE = 1024
+
+
+class ModelPrice(NamedTuple):
+    prompt: Decimal
+    prompt_cache: Decimal
+    completion: Decimal
+    request: Decimal
+    minimum_credit: Decimal
+
+
+@dataclass(frozen=True)
+class CustomFeeRule:
+    name: str
+    path: str
+    value: Any
+    exists: bool
+    cost: Union[int, float]
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    """
+    Prices compiled from the usage config. Immutable, a new snapshot is built
+    when any of the config values changes.
+    """
+
+    signature: tuple
+    default_token_price: Decimal
+    default_request_price: Decimal
+    embedding_price: Decimal
+    minimum_cost: Decimal
+    feature_prices: Mapping[str, Decimal]
+    custom_fee_rules: tuple[CustomFeeRule, ...]
+    # compiled expression of every distinct rule path
+    expressions: Mapping[str, Any]
+    _model_prices: dict = field(default_factory=dict, compare=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, compare=False, repr=False
+    )
+
+    @property
+    def default_price(self) -> ModelPrice:
+        return ModelPrice(
+            self.default_token_price,
+            self.default_token_price,
+            self.default_token_price,
+            self.default_request_price,
+            Decimal(0),
+        )
+
+    def get_feature_price(self, features) -> Decimal:
+        if not features:
+            return Decimal(0)
+        return sum(
+            (self.feature_prices.get(feature, Decimal(0)) for feature in features),
+            Decimal(0),
+        )
+
+    def get_model_price(
+        self,
+        model: Optional[ModelModel] = None,
+        is_embedding: bool = False,
+        get_model: Callable[[str], Optional[ModelModel]] = Models.get_model_by_id,
+    ) -> ModelPrice:
+        if is_embedding:
+            return ModelPrice(
+                self.embedding_price, Decimal(0), Decimal(0), Decimal(0), Decimal(0)
+            )
+        if not model or not isinstance(model, ModelModel):
+            return self.default_price
+        # preset models are billed with the price of their base model
+        if model.base_model_id:
+            base_model = get_model(model.base_model_id)
+            if base_model:
+                return self.get_model_price(base_model, get_model=get_model)
+
+        # updated_at is not bumped by price edits, so key on the price itself
+        key = (model.id, json.dumps(model.price, sort_keys=True, default=str))
+        price = self._model_prices.get(key)
+        if price is None:
+            price = self._compile_model_price(model.price or {})
+            with self._lock:
+                if len(self._model_prices) >= MODEL_PRICE_CACHE_SIZE:
+                    self._model_prices.clear()
+                self._model_prices[key] = price
+        return price
+
+    def _compile_model_price(self, model_price: dict) -> ModelPrice:
+        return ModelPrice(
+            Decimal(model_price.get("prompt_price", self.default_token_price)),
+            Decimal(model_price.get("prompt_cache_price", self.default_token_price)),
+            Decimal(model_price.get("completion_price", self.default_token_price)),
+            Decimal(model_price.get("request_price", self.default_request_price)),
+            Decimal(model_price.get("minimum_credit", 0)),
+        )
+
+    def get_custom_fees(self, body: dict) -> dict:
+        """Fees of every rule matching the request body, each path looked up once"""
+        custom_fees = {}
+        if not self.custom_fee_rules or not isinstance(body, dict):
+            return custom_fees
+
+        matches = {}
+        for rule in self.custom_fee_rules:
+            if rule.path not in matches:
+                try:
+                    matches[rule.path] = [
+                        match.value for match in self.expressions[rule.path].find(body)
+                    ]
+                except Exception as e:
+                    logger.warning(
+                        "[credit_deduct] Error parse custom price config %s: %s",
+                        rule.path,
+                        e,
+                    )
+                    matches[rule.path] = []
+
+            values = matches[rule.path]
+            if not values:
+                continue
+            if rule.exists or rule.value in values:
+                custom_fees[rule.name] = rule.cost
+        return custom_fees
+
+
+def compile_custom_fee_rules(
+    custom_config_str: str,
+) -> tuple[tuple[CustomFeeRule, ...], Mapping[str, Any]]:
+    if not custom_config_str or custom_config_str == "[]":
+        return (), MappingProxyType({})
+
+    try:
+        custom_configs = json.loads(custom_config_str)
+    except Exception as e:
+        logger.warning("[credit_deduct] Error parse custom price: %s", e)
+        return (), MappingProxyType({})
+    if not isinstance(custom_configs, list):
+        logger.warning("[credit_deduct] custom price config is not a list")
+        return (), MappingProxyType({})
+
+    rules = []
+    expressions = {}
+    for config in custom_configs:
+        if not isinstance(config, dict):
+            logger.warning("[credit_deduct] custom price config has no dict value")
+            continue
+        try:
+            rule = CustomFeeRule(
+                name=config["name"],
+                path=config["path"],
+                value=config["value"],
+                exists=config["exists"],
+                cost=config["cost"],
+            )
+            if not rule.path or rule.cost <= 0:
+                continue
+            if rule.path not in expressions:
+                expressions[rule.path] = jsonpath_parse(rule.path)
+        except Exception as e:
+            logger.warning(
+                "[credit_deduct] Error parse custom price config %s: %s", config, e
+            )
+            continue
+        rules.append(rule)
+    return tuple(rules), MappingProxyType(expressions)
+
+
+def get_pricing_signature() -> tuple:
+    return (
+        USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value,
+        USAGE_CALCULATE_DEFAULT_REQUEST_PRICE.value,
+        USAGE_CALCULATE_DEFAULT_EMBEDDING_PRICE.value,
+        USAGE_CALCULATE_MINIMUM_COST.value,
+        USAGE_CUSTOM_PRICE_CONFIG.value,
+        *(config.value for config in FEATURE_PRICE_CONFIGS.values()),
+    )
+
+
+def compile_pricing_snapshot(signature: tuple) -> PricingSnapshot:
+    (
+        default_token_price,
+        default_request_price,
+        embedding_price,
+        minimum_cost,
+        custom_config_str,
+        *feature_prices,
+    ) = signature
+    custom_fee_rules, expressions = compile_custom_fee_rules(custom_config_str)
+    return PricingSnapshot(
+        signature=signature,
+        default_token_price=Decimal(default_token_price),
+        default_request_price=Decimal(default_request_price),
+        embedding_price=Decimal(embedding_price),
+        minimum_cost=Decimal(minimum_cost),
+        # configured per 1000 requests
+        feature_prices=MappingProxyType(
+            {
+                feature: Decimal(price) / 1000
+                for feature, price in zip(FEATURE_PRICE_CONFIGS, feature_prices)
+            }
+        ),
+        custom_fee_rules=custom_fee_rules,
+        expressions=expressions,
+    )
+
+
+_snapshot: Optional[PricingSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_pricing_snapshot() -> PricingSnapshot:
+    """The current snapshot, recompiled only after the config values changed"""
+    global _snapshot
+    signature = get_pricing_signature()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.signature == signature:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.signature != signature:
+            _snapshot = compile_pricing_snapshot(signature)
+            logger.debug(
+                "[credit_deduct] pricing compiled with %d custom fee rules",
+                len(_snapshot.custom_fee_rules),
+            )
+        return _snapshot
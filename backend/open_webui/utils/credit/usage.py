@@ -1,20 +1,18 @@
+import asyncio
 import json
 import logging
 import time
 import math
 from decimal import Decimal
-from typing import List, Union
+from typing import List, Optional, Union
 
 import tiktoken
 from fastapi import HTTPException
 from tiktoken import Encoding
-from jsonpath_ng import parse as jsonpath_parse
 
 from open_webui.config import (
     USAGE_CALCULATE_MODEL_PREFIX_TO_REMOVE,
     USAGE_DEFAULT_ENCODING_MODEL,
-    USAGE_CALCULATE_MINIMUM_COST,
-    USAGE_CUSTOM_PRICE_CONFIG,
 )
 from open_webui.env import SRC_LOG_LEVELS
 from open_webui.models.credits import AddCreditForm, Credits, SetCreditFormDetail
@@ -27,11 +25,9 @@ from open_webui.utils.credit.models import (
     ChatCompletionChunk,
     MessageItem,
 )
-from open_webui.utils.credit.utils import (
-    get_model_price,
-    get_feature_price,
-    calculate_image_token,
-)
+from open_webui.utils.credit.pricing import get_pricing_snapshot
+from open_webui.utils.credit.utils import calculate_image_token
+from open_webui.utils.telemetry.stages import record_completion_tokens, stage
 
 logger = logging.getLogger(__name__)
 logger.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -65,6 +61,26 @@ class Calculator:
             return self.get_encoder(default_model_for_encoding)
         return self.get_encoder(model_id)
 
+    def calculate_prompt_tokens(
+        self,
+        encoder: Encoding,
+        model_id: str,
+        messages: List[dict],
+        count_images: bool = True,
+    ) -> int:
+        prompt_tokens = 0
+        for message in [MessageItem.model_validate(message) for message in messages]:
+            if isinstance(message.content, str):
+                prompt_tokens += len(encoder.encode(message.content or ""))
+            if isinstance(message.content, list):
+                for item in message.content:
+                    item: MessageContent
+                    if item.type == "text":
+                        prompt_tokens += len(encoder.encode(item.text or ""))
+                    elif item.type == "image_url" and count_images:
+                        prompt_tokens += calculate_image_token(model_id, item.image_url)
+        return prompt_tokens
+
     def calculate_usage(
         self,
         cached_usage: CompletionUsage,
@@ -73,6 +89,7 @@ class Calculator:
         response: Union[ChatCompletion, ChatCompletionChunk],
         model_prefix_to_remove: str = "",
         default_model_for_encoding: str = "gpt-4o",
+        prompt_tokens: Optional[int] = None,
     ) -> (bool, CompletionUsage):
         try:
             # use provider usage
@@ -91,27 +108,14 @@ class Calculator:
 
             # prompt tokens
             # only calculate once
-            if cached_usage.prompt_tokens:
+            if prompt_tokens is not None:
+                usage.prompt_tokens = prompt_tokens
+            elif cached_usage.prompt_tokens:
                 usage.prompt_tokens = cached_usage.prompt_tokens
             else:
-                for message in [
-                    MessageItem.model_validate(message) for message in messages
-                ]:
-                    if isinstance(message.content, str):
-                        usage.prompt_tokens += len(
-                            encoder.encode(message.content or "")
-                        )
-                    if isinstance(message.content, list):
-                        for item in message.content:
-                            item: MessageContent
-                            if item.type == "text":
-                                usage.prompt_tokens += len(
-                                    encoder.encode(item.text or "")
-                                )
-                            elif item.type == "image_url":
-                                usage.prompt_tokens += calculate_image_token(
-                                    model_id, item.image_url
-                                )
+                usage.prompt_tokens = self.calculate_prompt_tokens(
+                    encoder, model_id, messages
+                )
 
             # completion tokens
             choices = response.choices
@@ -145,6 +149,9 @@ class CreditDeduct:
 
     with CreditDeduct(xxx) as credit_deduct:
         credit_deduct.run(xxx)
+
+    In async code prefer `async with`, which counts the prompt tokens once in
+    a worker thread before the first response arrives
     """
 
     def round_credit(self, value: Decimal) -> Decimal:
@@ -169,13 +176,15 @@ class CreditDeduct:
         self.usage = CompletionUsage(
             prompt_tokens=0, completion_tokens=0, total_tokens=0
         )
+        # one snapshot per request, config changes apply from the next one
+        self.pricing = get_pricing_snapshot()
         (
             self.prompt_unit_price,
             self.prompt_cache_unit_price,
             self.completion_unit_price,
             self.request_unit_price,
             _,
-        ) = get_model_price(model=self.model, is_embedding=is_embedding)
+        ) = self.pricing.get_model_price(model=self.model, is_embedding=is_embedding)
         self.features = {
             k
             for k, v in (
@@ -185,13 +194,74 @@ class CreditDeduct:
         }
         self.custom_fees = self.build_custom_fees(body)
         self.is_official_usage = False
+        self.prompt_tokens: Optional[int] = None
 
     def __enter__(self):
         return self
 
+    async def __aenter__(self):
+        # image sizes may need a download, keep them off the event loop
+        if self.has_image_prompt():
+            try:
+                await asyncio.to_thread(self.prepare_prompt_tokens)
+            except Exception as e:
+                logger.warning("[credit_deduct] prompt tokens failed: %s", e)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return self.__exit__(exc_type, exc_val, exc_tb)
+
+    def has_image_prompt(self) -> bool:
+        messages = self.body.get("messages") if isinstance(self.body, dict) else None
+        return any(
+            isinstance(message, dict)
+            and isinstance(message.get("content"), list)
+            and any(
+                isinstance(item, dict) and item.get("type") == "image_url"
+                for item in message["content"]
+            )
+            for message in messages or []
+        )
+
+    def prepare_prompt_tokens(self) -> int:
+        """Count the prompt tokens once per request, a failed count is not retried"""
+        if self.prompt_tokens is None:
+            encoder = calculator.get_encoder(
+                model_id=self.model_id,
+                model_prefix_to_remove=USAGE_CALCULATE_MODEL_PREFIX_TO_REMOVE.value,
+                default_model_for_encoding=USAGE_DEFAULT_ENCODING_MODEL.value,
+            )
+            messages = self.body.get("messages", [])
+            try:
+                prompt_tokens = calculator.calculate_prompt_tokens(
+                    encoder=encoder, model_id=self.model_id, messages=messages
+                )
+            except Exception as e:
+                # e.g. an image that cannot be fetched, fall back to the text
+                logger.warning(
+                    "[credit_deduct] prompt tokens failed, counting text only: %s", e
+                )
+                try:
+                    prompt_tokens = calculator.calculate_prompt_tokens(
+                        encoder=encoder,
+                        model_id=self.model_id,
+                        messages=messages,
+                        count_images=False,
+                    )
+                except Exception as e:
+                    logger.warning("[credit_deduct] text prompt tokens failed: %s", e)
+                    prompt_tokens = 0
+            self.prompt_tokens = prompt_tokens
+        return self.prompt_tokens
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_val or self.is_error:
             return
+        record_completion_tokens(self.model_id, self.usage.completion_tokens)
+        with stage("credit"):
+            self.deduct()
+
+    def deduct(self) -> None:
         Credits.add_credit_by_user_id(
             form_data=AddCreditForm(
                 user_id=self.user.id,
@@ -268,7 +338,7 @@ class CreditDeduct:
 
     @property
     def feature_price(self) -> Decimal:
-        return get_feature_price(self.features)
+        return self.pricing.get_feature_price(self.features)
 
     @property
     def custom_price(self) -> Decimal:
@@ -285,7 +355,7 @@ class CreditDeduct:
                 + self.feature_price
                 + self.custom_price
             )
-        final_price = max(total_price, Decimal(USAGE_CALCULATE_MINIMUM_COST.value))
+        final_price = max(total_price, self.pricing.minimum_cost)
         return self.round_credit(final_price)
 
     def add_usage_to_resp(self, response: dict) -> dict:
@@ -328,60 +398,7 @@ class CreditDeduct:
         )
 
     def build_custom_fees(self, body: dict) -> dict:
-        # init
-        custom_fees = {}
-        # Check if body is a dictionary
-        if not isinstance(body, dict):
-            return custom_fees
-        # Check config not empty
-        custom_config_str = USAGE_CUSTOM_PRICE_CONFIG.value
-        if not custom_config_str or custom_config_str == "[]":
-            return custom_fees
-        # Parse the custom config string
-        try:
-            # load as json
-            custom_configs = json.loads(custom_config_str)
-            if not isinstance(custom_configs, list):
-                logger.warning("[credit_deduct] custom price config is not a list")
-                return custom_fees
-            # parse config from body
-            for config in custom_configs:
-                if not isinstance(config, dict):
-                    logger.warning(
-                        "[credit_deduct] custom price config has no dict value"
-                    )
-                    continue
-                # load config
-                path = config["path"]
-                name = config["name"]
-                value = config["value"]
-                exists_check = config["exists"]
-                cost = config["cost"]
-                if not path or cost <= 0:
-                    continue
-                # Apply jsonpath to the request body
-                try:
-                    jsonpath_expr = jsonpath_parse(path)
-                    matches = jsonpath_expr.find(self.body)
-                    if not matches:
-                        continue
-                    # check exists
-                    if exists_check:
-                        custom_fees[name] = cost
-                        continue
-                    for match in matches:
-                        if match.value == value:
-                            custom_fees[name] = cost
-                            break
-                except Exception as e:
-                    logger.warning(
-                        "[credit_deduct] Error parse custom price config %s: %s",
-                        path,
-                        e,
-                    )
-        except Exception as e:
-            logger.warning("[credit_deduct] Error parse custom price: %s", e)
-        return custom_fees
+        return self.pricing.get_custom_fees(body)
 
     def run(self, response: Union[dict, bytes, str]) -> None:
         try:
@@ -434,6 +451,8 @@ class CreditDeduct:
         self.remote_id = getattr(response, "id", "")
 
         # calculate
+        if getattr(response, "usage", None) is None:
+            self.prepare_prompt_tokens()
         is_official_usage, usage = calculator.calculate_usage(
             cached_usage=self.usage,
             model_id=self.model_id,
@@ -441,6 +460,7 @@ class CreditDeduct:
             response=response,
             model_prefix_to_remove=USAGE_CALCULATE_MODEL_PREFIX_TO_REMOVE.value,
             default_model_for_encoding=USAGE_DEFAULT_ENCODING_MODEL.value,
+            prompt_tokens=self.prompt_tokens,
         )
         if is_official_usage:
             self.is_official_usage = True
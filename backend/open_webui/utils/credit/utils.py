@@ -1,27 +1,23 @@
 import base64
+import hashlib
 import math
+import struct
+import threading
+from collections import OrderedDict
 from decimal import Decimal
 from io import BytesIO
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 
 import httpx
 from PIL import Image
 from fastapi import HTTPException
 from pydantic import BaseModel
 
-from open_webui.config import (
-    USAGE_CALCULATE_FEATURE_IMAGE_GEN_PRICE,
-    USAGE_CALCULATE_FEATURE_CODE_EXECUTE_PRICE,
-    USAGE_CALCULATE_FEATURE_WEB_SEARCH_PRICE,
-    USAGE_CALCULATE_FEATURE_TOOL_SERVER_PRICE,
-    USAGE_CALCULATE_DEFAULT_TOKEN_PRICE,
-    USAGE_CALCULATE_DEFAULT_REQUEST_PRICE,
-    CREDIT_NO_CREDIT_MSG,
-    USAGE_CALCULATE_DEFAULT_EMBEDDING_PRICE,
-)
+from open_webui.config import CREDIT_NO_CREDIT_MSG
 from open_webui.models.chats import Chats
 from open_webui.models.credits import Credits
 from open_webui.models.models import Models, ModelModel
+from open_webui.utils.credit.pricing import get_pricing_snapshot
 
 
 def get_model_price(
@@ -36,71 +32,13 @@ def get_model_price(
     - request price
     - minimum credit
     """
-    # embedding
-    if is_embedding:
-        return (
-            Decimal(USAGE_CALCULATE_DEFAULT_EMBEDDING_PRICE.value),
-            Decimal(0),
-            Decimal(0),
-            Decimal(0),
-            Decimal(0),
-        )
-    # no model provide
-    if not model or not isinstance(model, ModelModel):
-        return (
-            Decimal(USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value),
-            Decimal(USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value),
-            Decimal(USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value),
-            Decimal(USAGE_CALCULATE_DEFAULT_REQUEST_PRICE.value),
-            Decimal(0),
-        )
-    # base model
-    if model.base_model_id:
-        base_model = Models.get_model_by_id(model.base_model_id)
-        if base_model:
-            return get_model_price(base_model)
-    # model price
-    model_price = model.price or {}
-    return (
-        Decimal(
-            model_price.get("prompt_price", USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value)
-        ),
-        Decimal(
-            model_price.get(
-                "prompt_cache_price", USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value
-            )
-        ),
-        Decimal(
-            model_price.get(
-                "completion_price", USAGE_CALCULATE_DEFAULT_TOKEN_PRICE.value
-            )
-        ),
-        Decimal(
-            model_price.get(
-                "request_price", USAGE_CALCULATE_DEFAULT_REQUEST_PRICE.value
-            )
-        ),
-        Decimal(model_price.get("minimum_credit", 0)),
+    return get_pricing_snapshot().get_model_price(
+        model=model, is_embedding=is_embedding
     )
 
 
 def get_feature_price(features: Union[set, list]) -> Decimal:
-    if not features:
-        return Decimal(0)
-    price = Decimal(0)
-    for feature in features:
-        match feature:
-            case "image_generation":
-                price += Decimal(USAGE_CALCULATE_FEATURE_IMAGE_GEN_PRICE.value) / 1000
-            case "code_interpreter":
-                price += (
-                    Decimal(USAGE_CALCULATE_FEATURE_CODE_EXECUTE_PRICE.value) / 1000
-                )
-            case "web_search":
-                price += Decimal(USAGE_CALCULATE_FEATURE_WEB_SEARCH_PRICE.value) / 1000
-            case "direct_tool_servers":
-                price += Decimal(USAGE_CALCULATE_FEATURE_TOOL_SERVER_PRICE.value) / 1000
-    return price
+    return get_pricing_snapshot().get_feature_price(features)
 
 
 def is_free_request(model_price: list, form_data: dict) -> bool:
@@ -149,6 +87,150 @@ class ImageURL(BaseModel):
     detail: str
 
 
+# bytes of an image needed to read its size, the whole image is only fetched
+# or decoded when the header is not found within them
+IMAGE_HEADER_PROBE_SIZES = (1024, 64 * 1024)
+IMAGE_SIZE_CACHE_SIZE = 1024
+
+_image_size_cache: OrderedDict = OrderedDict()
+_image_size_cache_lock = threading.Lock()
+
+
+def get_image_size_from_header(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) of a PNG, GIF, WebP or JPEG from its leading bytes, None
+    for other formats or when the size is not within `data`
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = struct.unpack("<I", data[21:25])[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return (
+                int.from_bytes(data[24:27], "little") + 1,
+                int.from_bytes(data[27:30], "little") + 1,
+            )
+        return None
+
+    if data[:2] == b"\xff\xd8":
+        # walk the segments up to the start of frame marker
+        index = 2
+        while index + 9 < len(data):
+            if data[index] != 0xFF:
+                return None
+            marker = data[index + 1]
+            if marker == 0xFF:
+                index += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                index += 2
+                continue
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[index + 5 : index + 9])
+                return width, height
+            index += 2 + struct.unpack(">H", data[index + 2 : index + 4])[0]
+    return None
+
+
+def get_image_size_from_bytes(data: bytes) -> Tuple[int, int]:
+    size = get_image_size_from_header(data)
+    if size is None:
+        size = Image.open(BytesIO(data)).size
+    return size
+
+
+def get_base64_length(size: int) -> int:
+    """base64 characters holding the first `size` bytes"""
+    return (size + 2) // 3 * 4
+
+
+def probe_data_url_image_size(url: str) -> Tuple[int, int]:
+    # slice instead of split, data URLs can be megabytes long
+    start = url.find(",") + 1
+    # decode growing prefixes
+    for probe_size in IMAGE_HEADER_PROBE_SIZES:
+        end = start + get_base64_length(probe_size)
+        if end >= len(url):
+            break
+        size = get_image_size_from_header(base64.b64decode(url[start:end]))
+        if size is not None:
+            return size
+    return get_image_size_from_bytes(base64.b64decode(url[start:].encode("utf-8")))
+
+
+def probe_http_image_size(url: str) -> Tuple[int, int]:
+    probe_size = IMAGE_HEADER_PROBE_SIZES[-1]
+    with httpx.Client(trust_env=True, timeout=60) as client:
+        # servers without range support answer 200, the body is cut short anyway
+        with client.stream(
+            "GET", url, headers={"Range": f"bytes=0-{probe_size - 1}"}
+        ) as response:
+            response.raise_for_status()
+            data = b""
+            for chunk in response.iter_bytes():
+                data += chunk
+                if len(data) >= probe_size:
+                    break
+        size = get_image_size_from_header(data)
+        if size is not None:
+            return size
+
+        response = client.get(url)
+        response.raise_for_status()
+        return get_image_size_from_bytes(response.content)
+
+
+def get_image_size(url: str) -> Tuple[int, int]:
+    """
+    Image size from an http(s) or data URL. Downloads are memoized by URL.
+    A data URL whose size is in its first bytes is answered directly, since
+    hashing it would cost more; the slower ones are memoized by length and a
+    digest of the probed prefix, which holds the header.
+    """
+    if url.startswith("http"):
+        key = url
+    else:
+        start = url.find(",") + 1
+        size = get_image_size_from_header(
+            base64.b64decode(
+                url[start : start + get_base64_length(IMAGE_HEADER_PROBE_SIZES[0])]
+            )
+        )
+        if size is not None:
+            return size
+        prefix = url[: start + get_base64_length(IMAGE_HEADER_PROBE_SIZES[-1])]
+        key = (
+            len(url),
+            hashlib.blake2b(prefix.encode("utf-8"), digest_size=16).hexdigest(),
+        )
+
+    with _image_size_cache_lock:
+        if key in _image_size_cache:
+            _image_size_cache.move_to_end(key)
+            return _image_size_cache[key]
+
+    if url.startswith("http"):
+        size = probe_http_image_size(url)
+    else:
+        size = probe_data_url_image_size(url)
+
+    with _image_size_cache_lock:
+        _image_size_cache[key] = size
+        while len(_image_size_cache) > IMAGE_SIZE_CACHE_SIZE:
+            _image_size_cache.popitem(last=False)
+    return size
+
+
 def calculate_image_token(model_id: str, image: ImageURL) -> int:
     if not image or not image.url:
         return 0
@@ -170,20 +252,7 @@ def calculate_image_token(model_id: str, image: ImageURL) -> int:
     if model_id.find("gemini") != -1 or model_id.find("claude") != -1:
         return 3 * base_tokens
 
-    if image.url.startswith("http"):
-        with httpx.Client(trust_env=True, timeout=60) as client:
-            response = client.get(image.url)
-        response.raise_for_status()
-        image_data = base64.b64encode(response.content).decode("utf-8")
-    else:
-        if "," in image.url:
-            image_data = image.url.split(",", 1)[1]
-        else:
-            image_data = image.url
-
-    image_data = base64.b64decode(image_data.encode("utf-8"))
-    image = Image.open(BytesIO(image_data))
-    width, height = image.size
+    width, height = get_image_size(image.url)
 
     short_side = width
     other_side = height
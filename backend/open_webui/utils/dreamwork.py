@@ -3,6 +3,7 @@ DreamWork (即梦) 工具类
 包含API客户端、积分管理、任务处理等工具
 """
 
+import logging
 import httpx
 import asyncio
 import json
@@ -17,6 +18,10 @@ from open_webui.models.dreamwork import (
 )
 from open_webui.services.file_manager import get_file_manager
 from open_webui.internal.db import get_db
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["DREAMWORK"])
 
 
 class DreamWorkApiClient:
@@ -40,7 +45,7 @@ class DreamWorkApiClient:
             request.model if request.model else self.config.text_to_image_model
         )
         if not model_to_use or "t2i" not in model_to_use:
-            print(
+            log.warning(
                 f"⚠️ 【DreamWork API】模型可能不正确: {model_to_use}，强制使用文生图模型"
             )
             model_to_use = self.config.text_to_image_model
@@ -63,8 +68,8 @@ class DreamWorkApiClient:
         if request.watermark is not None:
             request_data["watermark"] = bool(request.watermark)
 
-        print(f"🎨 【DreamWork API】文生图请求URL: {url}")
-        print(
+        log.info(f"🎨 【DreamWork API】文生图请求URL: {url}")
+        log.info(
             f"🎨 【DreamWork API】请求参数: {json.dumps(request_data, ensure_ascii=False)}"
         )
 
@@ -78,25 +83,25 @@ class DreamWorkApiClient:
 
         try:
             async with httpx.AsyncClient(timeout=60.0) as client:
-                print(f"🎨 【DreamWork API】发送请求到: {url}")
+                log.info(f"🎨 【DreamWork API】发送请求到: {url}")
                 response = await client.post(url, json=request_data, headers=headers)
-                print(f"🎨 【DreamWork API】响应状态: {response.status_code}")
-                print(f"🎨 【DreamWork API】响应头: {dict(response.headers)}")
+                log.info(f"🎨 【DreamWork API】响应状态: {response.status_code}")
+                log.info(f"🎨 【DreamWork API】响应头: {dict(response.headers)}")
 
                 if response.status_code == 200:
                     result = response.json()
-                    print(f"🎨 【DreamWork API】响应成功: {result}")
+                    log.info(f"🎨 【DreamWork API】响应成功: {result}")
                     return result
                 else:
                     error_text = response.text
-                    print(
+                    log.error(
                         f"🎨 【DreamWork API】响应错误 ({response.status_code}): {error_text}"
                     )
 
                     # 尝试解析错误信息
                     try:
                         error_json = response.json()
-                        print(f"🎨 【DreamWork API】错误详情JSON: {error_json}")
+                        log.error(f"🎨 【DreamWork API】错误详情JSON: {error_json}")
 
                         # 提取具体错误信息
                         error_message = "API请求失败"
@@ -116,7 +121,7 @@ class DreamWorkApiClient:
                             f"DreamWork API错误 ({response.status_code}): {error_message}"
                         )
                     except json.JSONDecodeError:
-                        print(f"🎨 【DreamWork API】无法解析错误响应为JSON")
+                        log.error(f"🎨 【DreamWork API】无法解析错误响应为JSON")
                         raise ValueError(
                             f"DreamWork API错误 ({response.status_code}): {error_text[:200]}"
                         )
@@ -128,10 +133,7 @@ class DreamWorkApiClient:
         except Exception as e:
             if "DreamWork API错误" in str(e):
                 raise
-            print(f"🎨 【DreamWork API】请求异常: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"🎨 【DreamWork API】请求异常: {e}")
             raise ValueError(f"DreamWork API请求失败: {e}")
 
     async def generate_image_to_image(self, request: DreamWorkGenerateRequest) -> dict:
@@ -144,14 +146,14 @@ class DreamWorkApiClient:
 
         # 验证和清理base64数据格式
         image_data = request.image.strip()
-        print(f"🎨 【DreamWork API】原始图片数据长度: {len(image_data)}字符")
-        print(f"🎨 【DreamWork API】图片数据前缀: {image_data[:50]}...")
+        log.info(f"🎨 【DreamWork API】原始图片数据长度: {len(image_data)}字符")
+        log.info(f"🎨 【DreamWork API】图片数据前缀: {image_data[:50]}...")
 
         # 处理data URL格式
         if image_data.startswith("data:"):
             if "," in image_data:
                 header, image_data = image_data.split(",", 1)
-                print(f"🎨 【DreamWork API】移除data URL前缀: {header}")
+                log.info(f"🎨 【DreamWork API】移除data URL前缀: {header}")
             else:
                 raise ValueError("无效的data URL格式")
 
@@ -173,21 +175,21 @@ class DreamWorkApiClient:
 
             # 测试整个数据的解码，而不仅仅是前100字符
             decoded_data = base64.b64decode(image_data)
-            print(
+            log.info(
                 f"🎨 【DreamWork API】成功解码图片，解码后大小: {len(decoded_data)}字节"
             )
 
             # 验证图片文件头
             if decoded_data[:4] == b"\x89PNG":
-                print("🎨 【DreamWork API】检测到PNG图片")
+                log.info("🎨 【DreamWork API】检测到PNG图片")
             elif decoded_data[:2] == b"\xff\xd8":
-                print("🎨 【DreamWork API】检测到JPEG图片")
+                log.info("🎨 【DreamWork API】检测到JPEG图片")
             elif decoded_data[:6] in [b"GIF87a", b"GIF89a"]:
-                print("🎨 【DreamWork API】检测到GIF图片")
+                log.info("🎨 【DreamWork API】检测到GIF图片")
             elif decoded_data[:4] == b"RIFF" and decoded_data[8:12] == b"WEBP":
-                print("🎨 【DreamWork API】检测到WebP图片")
+                log.info("🎨 【DreamWork API】检测到WebP图片")
             else:
-                print(
+                log.warning(
                     f"🎨 【DreamWork API】警告: 未识别的图片格式，文件头: {decoded_data[:8].hex()}"
                 )
         except Exception as e:
@@ -198,7 +200,7 @@ class DreamWorkApiClient:
             request.model if request.model else self.config.image_to_image_model
         )
         if not model_to_use or "i2i" not in model_to_use:
-            print(
+            log.warning(
                 f"⚠️ 【DreamWork API】模型可能不正确: {model_to_use}，强制使用图生图模型"
             )
             model_to_use = self.config.image_to_image_model
@@ -222,13 +224,13 @@ class DreamWorkApiClient:
         if request.watermark is not None:
             request_data["watermark"] = bool(request.watermark)
 
-        print(f"🎨 【DreamWork API】图生图请求URL: {url}")
-        print(f"🎨 【DreamWork API】请求参数:")
+        log.info(f"🎨 【DreamWork API】图生图请求URL: {url}")
+        log.info(f"🎨 【DreamWork API】请求参数:")
         for key, value in request_data.items():
             if key == "image":
-                print(f"  - {key}: [base64 data, {len(value)} chars]")
+                log.info(f"  - {key}: [base64 data, {len(value)} chars]")
             else:
-                print(f"  - {key}: {value}")
+                log.info(f"  - {key}: {value}")
 
         # 确保headers正确
         headers = {
@@ -240,25 +242,25 @@ class DreamWorkApiClient:
 
         try:
             async with httpx.AsyncClient(timeout=60.0) as client:
-                print(f"🎨 【DreamWork API】发送请求到: {url}")
+                log.info(f"🎨 【DreamWork API】发送请求到: {url}")
                 response = await client.post(url, json=request_data, headers=headers)
-                print(f"🎨 【DreamWork API】响应状态: {response.status_code}")
-                print(f"🎨 【DreamWork API】响应头: {dict(response.headers)}")
+                log.info(f"🎨 【DreamWork API】响应状态: {response.status_code}")
+                log.info(f"🎨 【DreamWork API】响应头: {dict(response.headers)}")
 
                 if response.status_code == 200:
                     result = response.json()
-                    print(f"🎨 【DreamWork API】响应成功: {result}")
+                    log.info(f"🎨 【DreamWork API】响应成功: {result}")
                     return result
                 else:
                     error_text = response.text
-                    print(
+                    log.error(
                         f"🎨 【DreamWork API】响应错误 ({response.status_code}): {error_text}"
                     )
 
                     # 尝试解析错误信息
                     try:
                         error_json = response.json()
-                        print(f"🎨 【DreamWork API】错误详情JSON: {error_json}")
+                        log.error(f"🎨 【DreamWork API】错误详情JSON: {error_json}")
 
                         # 提取具体错误信息
                         error_message = "API请求失败"
@@ -278,7 +280,7 @@ class DreamWorkApiClient:
                             f"DreamWork API错误 ({response.status_code}): {error_message}"
                         )
                     except json.JSONDecodeError:
-                        print(f"🎨 【DreamWork API】无法解析错误响应为JSON")
+                        log.error(f"🎨 【DreamWork API】无法解析错误响应为JSON")
                         raise ValueError(
                             f"DreamWork API错误 ({response.status_code}): {error_text[:200]}"
                         )
@@ -290,10 +292,7 @@ class DreamWorkApiClient:
         except Exception as e:
             if "DreamWork API错误" in str(e):
                 raise
-            print(f"🎨 【DreamWork API】请求异常: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"🎨 【DreamWork API】请求异常: {e}")
             raise ValueError(f"DreamWork API请求失败: {e}")
 
 
@@ -342,7 +341,7 @@ def deduct_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error deducting DreamWork credits: {e}")
+        log.error(f"Error deducting DreamWork credits: {e}")
         return 0.0
 
 
@@ -367,7 +366,7 @@ def add_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error adding DreamWork credits: {e}")
+        log.error(f"Error adding DreamWork credits: {e}")
         return 0.0
 
 
@@ -403,51 +402,9 @@ def admin_deduct_credits_from_user(
 
 def get_system_dreamwork_stats() -> dict:
     """获取系统DreamWork统计"""
-    from open_webui.models.dreamwork import DreamWorkTask
-    from open_webui.internal.db import get_db
-    from sqlalchemy import func
-
-    with get_db() as db:
-        # 总任务数
-        total_tasks = db.query(DreamWorkTask).count()
-
-        # 成功任务数
-        success_tasks = (
-            db.query(DreamWorkTask).filter(DreamWorkTask.status == "SUCCESS").count()
-        )
-
-        # 今日任务数
-        today = datetime.utcnow().date()
-        today_tasks = (
-            db.query(DreamWorkTask)
-            .filter(func.date(DreamWorkTask.created_at) == today)
-            .count()
-        )
+    from open_webui.services.stats_service import get_task_stats
 
-        # 各状态任务数
-        status_stats = (
-            db.query(DreamWorkTask.status, func.count(DreamWorkTask.id))
-            .group_by(DreamWorkTask.status)
-            .all()
-        )
-
-        # 各动作类型统计
-        action_stats = (
-            db.query(DreamWorkTask.action, func.count(DreamWorkTask.id))
-            .group_by(DreamWorkTask.action)
-            .all()
-        )
-
-        return {
-            "total_tasks": total_tasks,
-            "success_tasks": success_tasks,
-            "today_tasks": today_tasks,
-            "success_rate": (
-                round(success_tasks / total_tasks * 100, 2) if total_tasks > 0 else 0
-            ),
-            "status_distribution": dict(status_stats),
-            "action_distribution": dict(action_stats),
-        }
+    return get_task_stats("dreamwork")
 
 
 def get_user_dreamwork_stats(user_id: str) -> dict:
@@ -514,23 +471,23 @@ async def process_dreamwork_generation(
     if not config or not config.enabled:
         raise Exception("DreamWork service not configured or disabled")
 
-    print(f"🎨 【DreamWork处理】开始处理: {action}, 用户: {user_id}")
-    print(
+    log.info(f"🎨 【DreamWork处理】开始处理: {action}, 用户: {user_id}")
+    log.info(
         f"🎨 【DreamWork处理】配置: base_url={config.base_url}, model={request.model}"
     )
-    print(
+    log.info(
         f"🎨 【DreamWork处理】请求: prompt={request.prompt[:50]}..., size={request.size}"
     )
 
     # 验证模型
     if action == "TEXT_TO_IMAGE" and request.model != config.text_to_image_model:
-        print(
+        log.warning(
             f"⚠️ 【DreamWork处理】模型不匹配: 请求={request.model}, 配置={config.text_to_image_model}"
         )
         # 使用配置中的模型
         request.model = config.text_to_image_model
     elif action == "IMAGE_TO_IMAGE" and request.model != config.image_to_image_model:
-        print(
+        log.warning(
             f"⚠️ 【DreamWork处理】模型不匹配: 请求={request.model}, 配置={config.image_to_image_model}"
         )
         # 使用配置中的模型
@@ -607,25 +564,22 @@ async def process_dreamwork_generation(
                         if update_task:
                             update_task.cloud_image_url = file_record.cloud_url
                             update_db.commit()
-                    print(
+                    log.info(
                         f"☁️ 【云存储】DreamWork{action}上传成功，已更新URL: {task.id}"
                     )
                 else:
-                    print(
+                    log.error(
                         f"☁️ 【云存储】DreamWork{action}上传失败: {task.id} - {message}"
                     )
             except Exception as upload_error:
-                print(
+                log.error(
                     f"☁️ 【云存储】DreamWork{action}自动上传异常: {task.id} - {upload_error}"
                 )
 
         return task
 
     except Exception as e:
-        print(f"❌ 【DreamWork处理】生成失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【DreamWork处理】生成失败: {e}")
 
         # 发生错误时退还积分
         add_user_credits(
@@ -645,8 +599,9 @@ async def process_dreamwork_generation(
 def cleanup_old_tasks(days: int = 30):
     """清理旧任务记录"""
     from open_webui.models.dreamwork import DreamWorkTask
+    from open_webui.models.creations import Creations
     from open_webui.internal.db import get_db
-    from datetime import timedelta
+    from datetime import timedelta, timezone
 
     cutoff_date = datetime.utcnow() - timedelta(days=days)
 
@@ -657,7 +612,12 @@ def cleanup_old_tasks(days: int = 30):
             .delete()
         )
         db.commit()
-        return deleted_count
+
+    # 批量删除不经过 ORM 事件，同步清理作品索引
+    Creations.delete_by_provider_before(
+        "dreamwork", int(cutoff_date.replace(tzinfo=timezone.utc).timestamp())
+    )
+    return deleted_count
 
 
 # ======================== 图片处理工具 ========================
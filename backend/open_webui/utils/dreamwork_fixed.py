@@ -3,10 +3,15 @@ DreamWork 修复版 API 客户端
 专门用于替换原有的图生图函数
 """
 
+import logging
 import httpx
 import json
 import base64
 from typing import Dict, Any
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["DREAMWORK"])
 
 
 async def generate_image_to_image_fixed(config, request) -> dict:
@@ -22,16 +27,16 @@ async def generate_image_to_image_fixed(config, request) -> dict:
 
     # 验证和清理图片数据
     image_data = request.image.strip()
-    print(f"🎨 【DreamWork修复版】原始图片数据长度: {len(image_data)}字符")
+    log.info(f"🎨 【DreamWork修复版】原始图片数据长度: {len(image_data)}字符")
 
     # 确保是完整的data URL格式
     if image_data.startswith("data:"):
-        print(f"🎨 【DreamWork修复版】检测到data URL格式")
+        log.info(f"🎨 【DreamWork修复版】检测到data URL格式")
         # 保持完整的data URL格式
         data_url = image_data
     else:
         # 如果只是base64数据，需要添加data URL前缀
-        print(f"🎨 【DreamWork修复版】检测到纯base64，添加data URL前缀")
+        log.info(f"🎨 【DreamWork修复版】检测到纯base64，添加data URL前缀")
 
         # 清理空白字符
         clean_image_data = "".join(image_data.split())
@@ -41,7 +46,7 @@ async def generate_image_to_image_fixed(config, request) -> dict:
             decoded = base64.b64decode(clean_image_data)
             if len(decoded) < 100:
                 raise ValueError(f"图片数据太小: {len(decoded)} bytes")
-            print(
+            log.info(
                 f"🎨 【DreamWork修复版】base64验证通过，解码后大小: {len(decoded)} bytes"
             )
 
@@ -58,7 +63,7 @@ async def generate_image_to_image_fixed(config, request) -> dict:
 
             # 构建完整的data URL
             data_url = f"data:image/{image_format};base64,{clean_image_data}"
-            print(
+            log.info(
                 f"🎨 【DreamWork修复版】构建data URL: data:image/{image_format};base64,[{len(clean_image_data)}字符]"
             )
 
@@ -76,12 +81,12 @@ async def generate_image_to_image_fixed(config, request) -> dict:
     if hasattr(request, "size") and request.size and request.size != "1024x1024":
         request_data["size"] = request.size
 
-    print(f"🎨 【DreamWork修复版】最简化请求参数:")
+    log.info(f"🎨 【DreamWork修复版】最简化请求参数:")
     for key, value in request_data.items():
         if key == "image":
-            print(f"  - {key}: [base64 data, {len(value)} chars]")
+            log.info(f"  - {key}: [base64 data, {len(value)} chars]")
         else:
-            print(f"  - {key}: {value}")
+            log.info(f"  - {key}: {value}")
 
     # 最简单的headers
     headers = {
@@ -91,17 +96,17 @@ async def generate_image_to_image_fixed(config, request) -> dict:
 
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            print(f"🎨 【DreamWork修复版】发送请求到: {url}")
+            log.info(f"🎨 【DreamWork修复版】发送请求到: {url}")
             response = await client.post(url, json=request_data, headers=headers)
-            print(f"🎨 【DreamWork修复版】响应状态: {response.status_code}")
+            log.info(f"🎨 【DreamWork修复版】响应状态: {response.status_code}")
 
             if response.status_code == 200:
                 result = response.json()
-                print(f"🎨 【DreamWork修复版】请求成功!")
+                log.info(f"🎨 【DreamWork修复版】请求成功!")
                 return result
             else:
                 error_text = response.text
-                print(f"🎨 【DreamWork修复版】错误响应: {error_text}")
+                log.error(f"🎨 【DreamWork修复版】错误响应: {error_text}")
 
                 # 专门处理code: 0的错误
                 try:
@@ -130,7 +135,7 @@ async def generate_image_to_image_fixed(config, request) -> dict:
     except Exception as e:
         if "DreamWork API" in str(e):
             raise
-        print(f"🎨 【DreamWork修复版】请求异常: {e}")
+        log.error(f"🎨 【DreamWork修复版】请求异常: {e}")
         raise ValueError(f"DreamWork API请求失败: {e}")
 
 
@@ -3,12 +3,17 @@ DreamWork API URL格式修复
 解决图生图API期望URL而不是base64的问题
 """
 
+import logging
 import httpx
 import json
 import base64
 import tempfile
 import os
 from typing import Dict, Any
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["DREAMWORK"])
 
 
 async def generate_image_to_image_url_fix(config, request) -> dict:
@@ -24,13 +29,13 @@ async def generate_image_to_image_url_fix(config, request) -> dict:
 
     # 验证和清理图片数据
     image_data = request.image.strip()
-    print(f"🎨 【DreamWork URL修复】原始图片数据长度: {len(image_data)}字符")
+    log.info(f"🎨 【DreamWork URL修复】原始图片数据长度: {len(image_data)}字符")
 
     # 处理data URL格式
     if image_data.startswith("data:"):
         if "," in image_data:
             header, image_data = image_data.split(",", 1)
-            print(f"🎨 【DreamWork URL修复】移除data URL前缀: {header}")
+            log.info(f"🎨 【DreamWork URL修复】移除data URL前缀: {header}")
         else:
             raise ValueError("无效的data URL格式")
 
@@ -42,7 +47,7 @@ async def generate_image_to_image_url_fix(config, request) -> dict:
         decoded_data = base64.b64decode(image_data)
         if len(decoded_data) < 100:
             raise ValueError(f"图片数据太小: {len(decoded_data)} bytes")
-        print(
+        log.info(
             f"🎨 【DreamWork URL修复】base64验证通过，解码后大小: {len(decoded_data)} bytes"
         )
     except Exception as e:
@@ -62,7 +67,7 @@ async def generate_image_to_image_url_fix(config, request) -> dict:
 
     # 构建正确的data URL
     data_url = f"data:image/{image_format};base64,{image_data}"
-    print(
+    log.info(
         f"🎨 【DreamWork URL修复】构建data URL: data:image/{image_format};base64,[{len(image_data)}字符]"
     )
 
@@ -73,14 +78,14 @@ async def generate_image_to_image_url_fix(config, request) -> dict:
         "image": data_url,  # 使用完整的data URL
     }
 
-    print(f"🎨 【DreamWork URL修复】请求参数:")
+    log.info(f"🎨 【DreamWork URL修复】请求参数:")
     for key, value in request_data.items():
         if key == "image":
-            print(
+            log.info(
                 f"  - {key}: data:image/{image_format};base64,[{len(image_data)} chars]"
             )
         else:
-            print(f"  - {key}: {value}")
+            log.info(f"  - {key}: {value}")
 
     headers = {
         "Authorization": f"Bearer {config.api_key}",
@@ -89,24 +94,24 @@ async def generate_image_to_image_url_fix(config, request) -> dict:
 
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            print(f"🎨 【DreamWork URL修复】发送请求到: {url}")
+            log.info(f"🎨 【DreamWork URL修复】发送请求到: {url}")
             response = await client.post(url, json=request_data, headers=headers)
-            print(f"🎨 【DreamWork URL修复】响应状态: {response.status_code}")
+            log.info(f"🎨 【DreamWork URL修复】响应状态: {response.status_code}")
 
             if response.status_code == 200:
                 result = response.json()
-                print(f"🎨 【DreamWork URL修复】请求成功!")
+                log.info(f"🎨 【DreamWork URL修复】请求成功!")
                 return result
             else:
                 error_text = response.text
-                print(f"🎨 【DreamWork URL修复】错误响应: {error_text}")
+                log.error(f"🎨 【DreamWork URL修复】错误响应: {error_text}")
 
                 # 如果data URL还是不行，尝试方案2
                 if (
                     "unsupported protocol scheme" in error_text
                     or "invalid image url" in error_text
                 ):
-                    print(
+                    log.error(
                         f"🎨 【DreamWork URL修复】data URL失败，尝试临时文件上传方案..."
                     )
                     return await _try_temp_file_upload(
@@ -135,7 +140,7 @@ async def generate_image_to_image_url_fix(config, request) -> dict:
     except Exception as e:
         if "DreamWork API" in str(e):
             raise
-        print(f"🎨 【DreamWork URL修复】请求异常: {e}")
+        log.error(f"🎨 【DreamWork URL修复】请求异常: {e}")
         raise ValueError(f"DreamWork API请求失败: {e}")
 
 
@@ -144,7 +149,7 @@ async def _try_temp_file_upload(config, request, decoded_data, image_format):
     尝试通过临时文件和可访问的URL来处理图片
     这是备用方案，如果data URL不被支持
     """
-    print(f"🎨 【DreamWork URL修复】尝试备用方案...")
+    log.info(f"🎨 【DreamWork URL修复】尝试备用方案...")
 
     # 注意：这个方案需要一个可以公开访问的临时文件服务
     # 由于没有这样的服务，我们直接返回错误说明
@@ -170,7 +175,7 @@ async def test_url_fix():
 
     config = DreamWorkConfig.get_config()
     if not config:
-        print("❌ 无法获取DreamWork配置")
+        log.error("❌ 无法获取DreamWork配置")
         return
 
     # 创建模拟请求
@@ -183,10 +188,10 @@ async def test_url_fix():
 
     try:
         result = await generate_image_to_image_url_fix(config, request)
-        print("✅ 修复成功!")
-        print(json.dumps(result, indent=2))
+        log.info("✅ 修复成功!")
+        log.info(json.dumps(result, indent=2))
     except Exception as e:
-        print(f"❌ 修复测试失败: {e}")
+        log.error(f"❌ 修复测试失败: {e}")
 
 
 if __name__ == "__main__":
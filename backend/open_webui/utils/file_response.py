@@ -0,0 +1,124 @@
+import logging
+import os
+from pathlib import Path
+from typing import Mapping, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from open_webui.env import DATA_DIR, SRC_LOG_LEVELS, X_ACCEL_REDIRECT_LOCATION
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+DEFAULT_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+
+def make_etag(value: str) -> str:
+    """Build a strong ETag from an opaque validator."""
+    return f'"{value}"'
+
+
+def stat_etag(stat_result: os.stat_result) -> str:
+    """ETag of the stored bytes, it changes whenever their size or mtime does."""
+    return make_etag(f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+class SendfileFileResponse(FileResponse):
+    """
+    FileResponse that lets the ASGI server send whole files itself when it
+    supports the `http.response.pathsend` extension, so the bytes never pass
+    through the worker. Range requests and servers without the extension fall
+    back to Starlette's chunked (and Range-aware) implementation.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        request_headers = Headers(scope=scope)
+
+        if (
+            "http.response.pathsend" not in extensions
+            or "range" in request_headers
+            or scope["method"].upper() == "HEAD"
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        if self.stat_result is None:
+            self.set_stat_headers(os.stat(self.path))
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        await send({"type": "http.response.pathsend", "path": str(self.path)})
+
+        if self.background is not None:
+            await self.background()
+
+
+def get_file_response(
+    request_headers: Headers,
+    file_path: str | os.PathLike,
+    etag: Optional[str] = None,
+    media_type: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Response:
+    """
+    Serve a local file with conditional-GET and Range support.
+
+    - `etag` must change whenever the served bytes do; when omitted it is
+      derived from the size and mtime of the file.
+    - A matching `If-None-Match` returns an empty 304.
+    - With X_ACCEL_REDIRECT_LOCATION configured, files below DATA_DIR are handed
+      to the reverse proxy via `X-Accel-Redirect` so it can sendfile them.
+    """
+    file_path = Path(file_path)
+    stat_result = file_path.stat()
+
+    etag = etag or stat_etag(stat_result)
+    response_headers = dict(headers or {})
+    response_headers["Cache-Control"] = cache_control
+    response_headers["ETag"] = etag
+
+    if etag_matches(request_headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=response_headers)
+
+    if X_ACCEL_REDIRECT_LOCATION:
+        try:
+            relative_path = file_path.resolve().relative_to(DATA_DIR)
+        except ValueError:
+            relative_path = None
+
+        if relative_path is not None:
+            response_headers["X-Accel-Redirect"] = (
+                f"{X_ACCEL_REDIRECT_LOCATION.rstrip('/')}/{relative_path.as_posix()}"
+            )
+            return Response(headers=response_headers, media_type=media_type)
+
+    return SendfileFileResponse(
+        file_path,
+        headers=response_headers,
+        media_type=media_type,
+        stat_result=stat_result,
+    )
@@ -3,6 +3,7 @@
 包含API客户端、积分管理、任务处理等工具
 """
 
+import logging
 import httpx
 import asyncio
 import json
@@ -15,6 +16,10 @@ from datetime import datetime
 
 from open_webui.models.jimeng import JimengConfig, JimengTask, JimengGenerateRequest
 from open_webui.config import CACHE_DIR
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["JIMENG"])
 
 
 def save_base64_to_temp_file(base64_data: str) -> str:
@@ -55,13 +60,13 @@ def save_base64_to_temp_file(base64_data: str) -> str:
         # 构建可访问的URL - 使用uploads静态文件服务
         relative_path = f"uploads/jimeng/{filename}"
 
-        print(f"🎬 【即梦】Base64图片已保存到uploads目录: {file_path}")
-        print(f"🎬 【即梦】可访问URL路径: {relative_path}")
+        log.info(f"🎬 【即梦】Base64图片已保存到uploads目录: {file_path}")
+        log.info(f"🎬 【即梦】可访问URL路径: {relative_path}")
 
         return relative_path
 
     except Exception as e:
-        print(f"❌ 【即梦】保存文件失败: {e}")
+        log.error(f"❌ 【即梦】保存文件失败: {e}")
         raise ValueError(f"无法处理图片数据: {e}")
 
 
@@ -81,11 +86,11 @@ class JimengApiClient:
         if config.detected_api_path:
             # 使用已检测到的有效路径
             self.api_path_prefix = config.detected_api_path
-            print(f"🎬 【即梦客户端】使用已检测的API路径: {self.api_path_prefix}")
+            log.info(f"🎬 【即梦客户端】使用已检测的API路径: {self.api_path_prefix}")
         else:
             # 使用默认路径
             self.api_path_prefix = "/jimeng/submit/videos"
-            print(f"🎬 【即梦客户端】使用默认API路径: {self.api_path_prefix}")
+            log.info(f"🎬 【即梦客户端】使用默认API路径: {self.api_path_prefix}")
 
     def _get_api_url(self, endpoint: str = "") -> str:
         """构建完整的API URL"""
@@ -94,7 +99,7 @@ class JimengApiClient:
         else:
             url = f"{self.base_url}{self.api_path_prefix}"
 
-        print(f"🎬 【即梦客户端】构建API URL: {url}")
+        log.info(f"🎬 【即梦客户端】构建API URL: {url}")
         return url
 
     def _parse_error_message(self, raw_message: str) -> str:
@@ -133,7 +138,7 @@ class JimengApiClient:
             return raw_message
 
         except Exception as e:
-            print(f"🎬 【即梦API】错误信息解析失败: {e}")
+            log.error(f"🎬 【即梦API】错误信息解析失败: {e}")
             return raw_message
 
     async def generate_video(self, request: JimengGenerateRequest) -> dict:
@@ -152,43 +157,45 @@ class JimengApiClient:
         # 如果有图片URL，添加图生视频参数（即梦API只支持image_url，不支持base64）
         if request.image_url:
             request_data["image_url"] = request.image_url
-            print(f"🎬 【即梦API】使用提供的图片URL: {request.image_url}")
+            log.info(f"🎬 【即梦API】使用提供的图片URL: {request.image_url}")
         elif request.image:
-            print("❌ 【即梦API】即梦API不支持base64图片数据，只支持image_url")
+            log.error("❌ 【即梦API】即梦API不支持base64图片数据，只支持image_url")
             raise ValueError("即梦API不支持base64图片数据，请提供图片URL")
         else:
             # 没有提供图片，这是正常的文生视频模式
-            print("🎬 【即梦API】文生视频模式，不需要图片数据")
+            log.info("🎬 【即梦API】文生视频模式，不需要图片数据")
 
-        print(f"🎬 【即梦API】视频生成请求URL: {url}")
-        print(
+        log.info(f"🎬 【即梦API】视频生成请求URL: {url}")
+        log.info(
             f"🎬 【即梦API】请求头: {json.dumps({k: '***' if k == 'Authorization' else v for k, v in self.headers.items()}, ensure_ascii=False)}"
         )
-        print(f"🎬 【即梦API】请求参数: {json.dumps(request_data, ensure_ascii=False)}")
+        log.info(
+            f"🎬 【即梦API】请求参数: {json.dumps(request_data, ensure_ascii=False)}"
+        )
 
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                print(f"🎬 【即梦API】开始发送HTTP请求到: {url}")
+                log.info(f"🎬 【即梦API】开始发送HTTP请求到: {url}")
                 response = await client.post(
                     url, json=request_data, headers=self.headers
                 )
-                print(f"🎬 【即梦API】响应状态: {response.status_code}")
-                print(f"🎬 【即梦API】响应头: {dict(response.headers)}")
+                log.info(f"🎬 【即梦API】响应状态: {response.status_code}")
+                log.info(f"🎬 【即梦API】响应头: {dict(response.headers)}")
 
                 if response.status_code == 200:
                     result = response.json()
-                    print(f"🎬 【即梦API】响应成功: {result}")
+                    log.info(f"🎬 【即梦API】响应成功: {result}")
                     return result
                 else:
                     error_text = response.text
-                    print(
+                    log.error(
                         f"🎬 【即梦API】响应错误 ({response.status_code}): {error_text}"
                     )
 
                     try:
                         error_json = response.json()
                         raw_message = error_json.get("message", "API请求失败")
-                        print(f"🎬 【即梦API】解析错误JSON: {error_json}")
+                        log.error(f"🎬 【即梦API】解析错误JSON: {error_json}")
 
                         # 解析嵌套的错误信息
                         user_friendly_message = self._parse_error_message(raw_message)
@@ -197,7 +204,7 @@ class JimengApiClient:
                             f"即梦API错误 ({response.status_code}): {user_friendly_message}"
                         )
                     except json.JSONDecodeError:
-                        print(f"🎬 【即梦API】无法解析错误响应为JSON")
+                        log.error(f"🎬 【即梦API】无法解析错误响应为JSON")
                         raise ValueError(
                             f"即梦API错误 ({response.status_code}): {error_text[:200]}"
                         )
@@ -209,31 +216,28 @@ class JimengApiClient:
         except Exception as e:
             if "即梦API错误" in str(e):
                 raise
-            print(f"🎬 【即梦API】请求异常: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"🎬 【即梦API】请求异常: {e}")
             raise ValueError(f"即梦API请求失败: {e}")
 
     async def query_task(self, task_id: str) -> dict:
         """查询任务状态"""
-        print(f"🔍 【即梦API】查询任务状态: {task_id}")
+        log.debug(f"🔍 【即梦API】查询任务状态: {task_id}")
 
         # 使用正确的即梦API查询端点
         query_path = f"/jimeng/fetch/{task_id}"
         url = f"{self.base_url}{query_path}"
 
         try:
-            print(f"🔍 【即梦API】查询URL: {url}")
+            log.debug(f"🔍 【即梦API】查询URL: {url}")
 
             async with httpx.AsyncClient(timeout=15.0) as client:
                 response = await client.get(url, headers=self.headers)
 
-                print(f"🔍 【即梦API】查询响应状态: {response.status_code}")
+                log.debug(f"🔍 【即梦API】查询响应状态: {response.status_code}")
 
                 if response.status_code == 200:
                     result = response.json()
-                    print(
+                    log.info(
                         f"✅ 【即梦API】查询成功: {json.dumps(result, ensure_ascii=False)}"
                     )
 
@@ -313,12 +317,14 @@ class JimengApiClient:
 
                                 if video_url:
                                     response_data["data"]["video_url"] = video_url
-                                    print(f"✅ 【即梦API】提取到视频URL: {video_url}")
+                                    log.info(
+                                        f"✅ 【即梦API】提取到视频URL: {video_url}"
+                                    )
                                 else:
-                                    print(f"⚠️ 【即梦API】任务成功但未找到视频URL")
+                                    log.warning(f"⚠️ 【即梦API】任务成功但未找到视频URL")
 
                             except Exception as e:
-                                print(f"❌ 【即梦API】提取视频URL失败: {e}")
+                                log.error(f"❌ 【即梦API】提取视频URL失败: {e}")
 
                         # 如果任务失败，提取失败原因
                         elif task_status == "FAILURE":
@@ -329,7 +335,7 @@ class JimengApiClient:
                     else:
                         # API返回错误
                         error_message = result.get("message", "查询失败")
-                        print(f"❌ 【即梦API】API返回错误: {error_message}")
+                        log.error(f"❌ 【即梦API】API返回错误: {error_message}")
                         return {
                             "code": "error",
                             "message": error_message,
@@ -341,7 +347,7 @@ class JimengApiClient:
                         }
                 else:
                     error_text = response.text
-                    print(
+                    log.error(
                         f"❌ 【即梦API】HTTP错误 ({response.status_code}): {error_text}"
                     )
                     return {
@@ -355,14 +361,14 @@ class JimengApiClient:
                     }
 
         except httpx.TimeoutException:
-            print(f"❌ 【即梦API】查询超时: {task_id}")
+            log.error(f"❌ 【即梦API】查询超时: {task_id}")
             return {
                 "code": "error",
                 "message": "查询超时",
                 "data": {"status": "processing", "progress": "50%"},
             }
         except Exception as e:
-            print(f"❌ 【即梦API】查询异常: {e}")
+            log.error(f"❌ 【即梦API】查询异常: {e}")
             return {
                 "code": "error",
                 "message": str(e),
@@ -415,7 +421,7 @@ def deduct_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error deducting Jimeng credits: {e}")
+        log.error(f"Error deducting Jimeng credits: {e}")
         return 0.0
 
 
@@ -440,7 +446,7 @@ def add_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error adding Jimeng credits: {e}")
+        log.error(f"Error adding Jimeng credits: {e}")
         return 0.0
 
 
@@ -476,51 +482,9 @@ def admin_deduct_credits_from_user(
 
 def get_system_jimeng_stats() -> dict:
     """获取系统即梦统计"""
-    from open_webui.models.jimeng import JimengTask
-    from open_webui.internal.db import get_db
-    from sqlalchemy import func
-
-    with get_db() as db:
-        # 总任务数
-        total_tasks = db.query(JimengTask).count()
-
-        # 成功任务数
-        success_tasks = (
-            db.query(JimengTask).filter(JimengTask.status == "succeed").count()
-        )
-
-        # 今日任务数
-        today = datetime.utcnow().date()
-        today_tasks = (
-            db.query(JimengTask)
-            .filter(func.date(JimengTask.created_at) == today)
-            .count()
-        )
+    from open_webui.services.stats_service import get_task_stats
 
-        # 各状态任务数
-        status_stats = (
-            db.query(JimengTask.status, func.count(JimengTask.id))
-            .group_by(JimengTask.status)
-            .all()
-        )
-
-        # 各动作类型统计
-        action_stats = (
-            db.query(JimengTask.action, func.count(JimengTask.id))
-            .group_by(JimengTask.action)
-            .all()
-        )
-
-        return {
-            "total_tasks": total_tasks,
-            "success_tasks": success_tasks,
-            "today_tasks": today_tasks,
-            "success_rate": (
-                round(success_tasks / total_tasks * 100, 2) if total_tasks > 0 else 0
-            ),
-            "status_distribution": dict(status_stats),
-            "action_distribution": dict(action_stats),
-        }
+    return get_task_stats("jimeng")
 
 
 def get_user_jimeng_stats(user_id: str) -> dict:
@@ -584,9 +548,9 @@ async def process_jimeng_generation(
     if not config or not config.enabled:
         raise Exception("即梦服务未配置或已禁用")
 
-    print(f"🎬 【即梦处理】开始处理: {action}, 用户: {user_id}")
-    print(f"🎬 【即梦处理】配置: base_url={config.base_url}")
-    print(
+    log.info(f"🎬 【即梦处理】开始处理: {action}, 用户: {user_id}")
+    log.info(f"🎬 【即梦处理】配置: base_url={config.base_url}")
+    log.info(
         f"🎬 【即梦处理】请求: prompt={request.prompt[:50]}..., duration={request.duration}"
     )
 
@@ -630,10 +594,7 @@ async def process_jimeng_generation(
         return task
 
     except Exception as e:
-        print(f"❌ 【即梦处理】生成失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【即梦处理】生成失败: {e}")
 
         # 发生错误时退还积分
         add_user_credits(user_id, credits_cost, f"即梦-{action}-error-refund", task.id)
@@ -648,8 +609,9 @@ async def process_jimeng_generation(
 def cleanup_old_tasks(days: int = 30):
     """清理旧任务记录"""
     from open_webui.models.jimeng import JimengTask
+    from open_webui.models.creations import Creations
     from open_webui.internal.db import get_db
-    from datetime import timedelta
+    from datetime import timedelta, timezone
 
     cutoff_date = datetime.utcnow() - timedelta(days=days)
 
@@ -658,7 +620,12 @@ def cleanup_old_tasks(days: int = 30):
             db.query(JimengTask).filter(JimengTask.created_at < cutoff_date).delete()
         )
         db.commit()
-        return deleted_count
+
+    # 批量删除不经过 ORM 事件，同步清理作品索引
+    Creations.delete_by_provider_before(
+        "jimeng", int(cutoff_date.replace(tzinfo=timezone.utc).timestamp())
+    )
+    return deleted_count
 
 
 # ======================== 错误处理 ========================
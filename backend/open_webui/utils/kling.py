@@ -3,6 +3,7 @@
 包含API客户端、积分管理、任务处理等工具
 """
 
+import logging
 import httpx
 import asyncio
 import json
@@ -11,6 +12,10 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from open_webui.models.kling import KlingConfig, KlingTask, KlingGenerateRequest
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["KLING"])
 
 
 class KlingApiClient:
@@ -31,11 +36,13 @@ class KlingApiClient:
             self.api_path_prefix = config.detected_api_path.replace(
                 "/text2video", ""
             ).replace("/image2video", "")
-            print(f"🎬 【可灵客户端】使用已检测的API路径前缀: {self.api_path_prefix}")
+            log.info(
+                f"🎬 【可灵客户端】使用已检测的API路径前缀: {self.api_path_prefix}"
+            )
         else:
             # 使用默认路径（向后兼容）
             self.api_path_prefix = "/kling/v1/videos"
-            print(f"🎬 【可灵客户端】使用默认API路径前缀: {self.api_path_prefix}")
+            log.info(f"🎬 【可灵客户端】使用默认API路径前缀: {self.api_path_prefix}")
 
     def _get_api_url(self, endpoint: str) -> str:
         """构建完整的API URL"""
@@ -49,7 +56,7 @@ class KlingApiClient:
             # 使用默认路径
             url = f"{self.base_url}{self.api_path_prefix}/{endpoint}"
 
-        print(f"🎬 【可灵客户端】构建API URL: {url}")
+        log.info(f"🎬 【可灵客户端】构建API URL: {url}")
         return url
 
     async def generate_text_to_video(self, request: KlingGenerateRequest) -> dict:
@@ -83,40 +90,42 @@ class KlingApiClient:
         if request.external_task_id:
             request_data["external_task_id"] = request.external_task_id
 
-        print(f"🎬 【可灵API】文生视频请求URL: {url}")
-        print(
+        log.info(f"🎬 【可灵API】文生视频请求URL: {url}")
+        log.info(
             f"🎬 【可灵API】请求头: {json.dumps({k: '***' if k == 'Authorization' else v for k, v in self.headers.items()}, ensure_ascii=False)}"
         )
-        print(f"🎬 【可灵API】请求参数: {json.dumps(request_data, ensure_ascii=False)}")
+        log.info(
+            f"🎬 【可灵API】请求参数: {json.dumps(request_data, ensure_ascii=False)}"
+        )
 
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
-                print(f"🎬 【可灵API】开始发送HTTP请求到: {url}")
+                log.info(f"🎬 【可灵API】开始发送HTTP请求到: {url}")
                 response = await client.post(
                     url, json=request_data, headers=self.headers
                 )
-                print(f"🎬 【可灵API】响应状态: {response.status_code}")
-                print(f"🎬 【可灵API】响应头: {dict(response.headers)}")
+                log.info(f"🎬 【可灵API】响应状态: {response.status_code}")
+                log.info(f"🎬 【可灵API】响应头: {dict(response.headers)}")
 
                 if response.status_code == 200:
                     result = response.json()
-                    print(f"🎬 【可灵API】响应成功: {result}")
+                    log.info(f"🎬 【可灵API】响应成功: {result}")
                     return result
                 else:
                     error_text = response.text
-                    print(
+                    log.error(
                         f"🎬 【可灵API】响应错误 ({response.status_code}): {error_text}"
                     )
 
                     try:
                         error_json = response.json()
                         error_message = error_json.get("message", "API请求失败")
-                        print(f"🎬 【可灵API】解析错误JSON: {error_json}")
+                        log.error(f"🎬 【可灵API】解析错误JSON: {error_json}")
                         raise ValueError(
                             f"可灵API错误 ({response.status_code}): {error_message}"
                         )
                     except json.JSONDecodeError:
-                        print(f"🎬 【可灵API】无法解析错误响应为JSON")
+                        log.error(f"🎬 【可灵API】无法解析错误响应为JSON")
                         raise ValueError(
                             f"可灵API错误 ({response.status_code}): {error_text[:200]}"
                         )
@@ -128,10 +137,7 @@ class KlingApiClient:
         except Exception as e:
             if "可灵API错误" in str(e):
                 raise
-            print(f"🎬 【可灵API】请求异常: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"🎬 【可灵API】请求异常: {e}")
             raise ValueError(f"可灵API请求失败: {e}")
 
     async def generate_image_to_video(self, request: KlingGenerateRequest) -> dict:
@@ -194,28 +200,28 @@ class KlingApiClient:
         if request.external_task_id:
             request_data["external_task_id"] = request.external_task_id
 
-        print(f"🎬 【可灵API】图生视频请求URL: {url}")
-        print(f"🎬 【可灵API】请求参数:")
+        log.info(f"🎬 【可灵API】图生视频请求URL: {url}")
+        log.info(f"🎬 【可灵API】请求参数:")
         for key, value in request_data.items():
             if key in ["image", "image_tail", "static_mask"] or "mask" in key:
-                print(f"  - {key}: [base64 data, {len(str(value))} chars]")
+                log.info(f"  - {key}: [base64 data, {len(str(value))} chars]")
             else:
-                print(f"  - {key}: {value}")
+                log.info(f"  - {key}: {value}")
 
         try:
             async with httpx.AsyncClient(timeout=60.0) as client:
                 response = await client.post(
                     url, json=request_data, headers=self.headers
                 )
-                print(f"🎬 【可灵API】响应状态: {response.status_code}")
+                log.info(f"🎬 【可灵API】响应状态: {response.status_code}")
 
                 if response.status_code == 200:
                     result = response.json()
-                    print(f"🎬 【可灵API】响应成功: {result}")
+                    log.info(f"🎬 【可灵API】响应成功: {result}")
                     return result
                 else:
                     error_text = response.text
-                    print(
+                    log.error(
                         f"🎬 【可灵API】响应错误 ({response.status_code}): {error_text}"
                     )
 
@@ -237,10 +243,7 @@ class KlingApiClient:
         except Exception as e:
             if "可灵API错误" in str(e):
                 raise
-            print(f"🎬 【可灵API】请求异常: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.exception(f"🎬 【可灵API】请求异常: {e}")
             raise ValueError(f"可灵API请求失败: {e}")
 
     async def query_task(self, task_id: str) -> dict:
@@ -284,14 +287,14 @@ class KlingApiClient:
             raise ValueError(f"{image_name}数据不能为空")
 
         image_data = image_data.strip()
-        print(f"🎬 【可灵API】处理{image_name}数据: {len(image_data)}字符")
+        log.info(f"🎬 【可灵API】处理{image_name}数据: {len(image_data)}字符")
 
         # 检查是否是data URL格式
         if image_data.startswith("data:"):
             if "," in image_data:
                 # 移除data URL前缀，保留纯base64数据
                 image_data = image_data.split(",")[1]
-                print(f"🎬 【可灵API】移除data URL前缀")
+                log.info(f"🎬 【可灵API】移除data URL前缀")
             else:
                 raise ValueError(f"{image_name}的data URL格式无效")
 
@@ -303,7 +306,7 @@ class KlingApiClient:
             decoded_data = base64.b64decode(image_data)
             if len(decoded_data) < 1000:  # 可灵要求较大的图片
                 raise ValueError(f"{image_name}数据太小: {len(decoded_data)} bytes")
-            print(
+            log.info(
                 f"🎬 【可灵API】{image_name}验证通过，解码后大小: {len(decoded_data)} bytes"
             )
         except Exception as e:
@@ -357,7 +360,7 @@ def deduct_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error deducting Kling credits: {e}")
+        log.error(f"Error deducting Kling credits: {e}")
         return 0.0
 
 
@@ -382,7 +385,7 @@ def add_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error adding Kling credits: {e}")
+        log.error(f"Error adding Kling credits: {e}")
         return 0.0
 
 
@@ -418,49 +421,9 @@ def admin_deduct_credits_from_user(
 
 def get_system_kling_stats() -> dict:
     """获取系统可灵统计"""
-    from open_webui.models.kling import KlingTask
-    from open_webui.internal.db import get_db
-    from sqlalchemy import func
-
-    with get_db() as db:
-        # 总任务数
-        total_tasks = db.query(KlingTask).count()
-
-        # 成功任务数
-        success_tasks = (
-            db.query(KlingTask).filter(KlingTask.status == "succeed").count()
-        )
-
-        # 今日任务数
-        today = datetime.utcnow().date()
-        today_tasks = (
-            db.query(KlingTask).filter(func.date(KlingTask.created_at) == today).count()
-        )
+    from open_webui.services.stats_service import get_task_stats
 
-        # 各状态任务数
-        status_stats = (
-            db.query(KlingTask.status, func.count(KlingTask.id))
-            .group_by(KlingTask.status)
-            .all()
-        )
-
-        # 各动作类型统计
-        action_stats = (
-            db.query(KlingTask.action, func.count(KlingTask.id))
-            .group_by(KlingTask.action)
-            .all()
-        )
-
-        return {
-            "total_tasks": total_tasks,
-            "success_tasks": success_tasks,
-            "today_tasks": today_tasks,
-            "success_rate": (
-                round(success_tasks / total_tasks * 100, 2) if total_tasks > 0 else 0
-            ),
-            "status_distribution": dict(status_stats),
-            "action_distribution": dict(action_stats),
-        }
+    return get_task_stats("kling")
 
 
 def get_user_kling_stats(user_id: str) -> dict:
@@ -524,11 +487,11 @@ async def process_kling_generation(
     if not config or not config.enabled:
         raise Exception("可灵服务未配置或已禁用")
 
-    print(f"🎬 【可灵处理】开始处理: {action}, 用户: {user_id}")
-    print(
+    log.info(f"🎬 【可灵处理】开始处理: {action}, 用户: {user_id}")
+    log.info(
         f"🎬 【可灵处理】配置: base_url={config.base_url}, model={request.model_name}"
     )
-    print(
+    log.info(
         f"🎬 【可灵处理】请求: prompt={request.prompt[:50]}..., mode={request.mode}, duration={request.duration}"
     )
 
@@ -593,10 +556,7 @@ async def process_kling_generation(
         return task
 
     except Exception as e:
-        print(f"❌ 【可灵处理】生成失败: {e}")
-        import traceback
-
-        traceback.print_exc()
+        log.exception(f"❌ 【可灵处理】生成失败: {e}")
 
         # 发生错误时退还积分
         add_user_credits(user_id, credits_cost, f"可灵-{action}-error-refund", task.id)
@@ -611,8 +571,9 @@ async def process_kling_generation(
 def cleanup_old_tasks(days: int = 30):
     """清理旧任务记录"""
     from open_webui.models.kling import KlingTask
+    from open_webui.models.creations import Creations
     from open_webui.internal.db import get_db
-    from datetime import timedelta
+    from datetime import timedelta, timezone
 
     cutoff_date = datetime.utcnow() - timedelta(days=days)
 
@@ -621,7 +582,12 @@ def cleanup_old_tasks(days: int = 30):
             db.query(KlingTask).filter(KlingTask.created_at < cutoff_date).delete()
         )
         db.commit()
-        return deleted_count
+
+    # 批量删除不经过 ORM 事件，同步清理作品索引
+    Creations.delete_by_provider_before(
+        "kling", int(cutoff_date.replace(tzinfo=timezone.utc).timestamp())
+    )
+    return deleted_count
 
 
 # ======================== 错误处理 ========================
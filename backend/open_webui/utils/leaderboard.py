@@ -0,0 +1,427 @@
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.feedbacks import Feedbacks
+from open_webui.utils.cache_manager import LEADERBOARD_NAMESPACE, get_cache_manager
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+K_FACTOR = 32
+INITIAL_RATING = 1000
+
+# Pseudo-games added to every played pair so a model that never won (or never
+# lost) still gets a finite Bradley-Terry rating
+BT_PRIOR = 0.5
+BT_MAX_ITERATIONS = 200
+BT_TOLERANCE = 1e-6
+
+
+@dataclass
+class RatedFeedback:
+    id: str
+    created_at: int
+    model_id: str
+    opponents: list[str]
+    outcome: float  # 1 when model_id won against its opponents, 0 when it lost
+    tags: list[str] = field(default_factory=list)
+
+    @property
+    def order(self) -> tuple:
+        return (self.created_at or 0, self.id)
+
+
+def parse_feedback(id: str, data: Optional[dict], created_at: int):
+    """The comparison recorded by an arena rating, None for anything else"""
+    data = data or {}
+    model_id = data.get("model_id")
+    rating = str(data.get("rating")) if data.get("rating") is not None else None
+    if not model_id or rating not in ("1", "-1"):
+        return None
+
+    return RatedFeedback(
+        id=id,
+        created_at=created_at,
+        model_id=model_id,
+        opponents=[
+            model for model in data.get("sibling_model_ids") or [] if model != model_id
+        ],
+        outcome=1.0 if rating == "1" else 0.0,
+        tags=[str(tag) for tag in data.get("tags") or []],
+    )
+
+
+def expected_score(rating_a: float, rating_b: float) -> float:
+    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+
+
+def compute_elo(
+    feedbacks: list[RatedFeedback], weights: Optional[np.ndarray] = None
+) -> dict[str, dict]:
+    """Sequential Elo over the feedbacks in the given order, each scaled by its weight"""
+    stats = {}
+
+    def get_stats(model_id):
+        if model_id not in stats:
+            stats[model_id] = {"rating": float(INITIAL_RATING), "won": 0, "lost": 0}
+        return stats[model_id]
+
+    for index, feedback in enumerate(feedbacks):
+        weight = 1.0 if weights is None else float(weights[index])
+        if weight <= 0:
+            continue
+        apply_elo(stats, get_stats, feedback, weight)
+    return stats
+
+
+def apply_elo(stats: dict, get_stats: Callable, feedback: RatedFeedback, weight=1.0):
+    stats_a = get_stats(feedback.model_id)
+    for opponent in feedback.opponents:
+        stats_b = get_stats(opponent)
+        change_a = (
+            K_FACTOR
+            * (feedback.outcome - expected_score(stats_a["rating"], stats_b["rating"]))
+            * weight
+        )
+        change_b = (
+            K_FACTOR
+            * (
+                1
+                - feedback.outcome
+                - expected_score(stats_b["rating"], stats_a["rating"])
+            )
+            * weight
+        )
+        stats_a["rating"] += change_a
+        stats_b["rating"] += change_b
+
+        winner, loser = (
+            (stats_a, stats_b) if feedback.outcome == 1 else (stats_b, stats_a)
+        )
+        winner["won"] += 1
+        loser["lost"] += 1
+
+
+def fit_bradley_terry(models: list[str], wins: np.ndarray) -> dict[str, float]:
+    """
+    Maximum likelihood Bradley-Terry strengths from a matrix where wins[i, j]
+    is the (weighted) number of times models[i] beat models[j], using the MM
+    algorithm. Strengths are reported on the Elo scale around INITIAL_RATING.
+    """
+    if not models:
+        return {}
+
+    games = wins + wins.T
+    wins = wins + BT_PRIOR * (games > 0)
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1)
+
+    played = games.sum(axis=1) > 0
+    strength = np.ones(len(models))
+    for _ in range(BT_MAX_ITERATIONS):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = np.where(
+            played, total_wins / np.maximum(denominator, 1e-12), strength
+        )
+        if played.any():
+            updated /= np.exp(np.log(updated[played]).mean())
+        updated[~played] = 1
+        converged = np.abs(updated - strength).max() < BT_TOLERANCE
+        strength = updated
+        if converged:
+            break
+
+    ratings = INITIAL_RATING + 400 * np.log10(strength)
+    return {model: float(rating) for model, rating in zip(models, ratings)}
+
+
+def get_pair_wins(feedbacks: list[RatedFeedback], weights=None):
+    models = sorted(
+        {feedback.model_id for feedback in feedbacks}
+        | {opponent for feedback in feedbacks for opponent in feedback.opponents}
+    )
+    index = {model: i for i, model in enumerate(models)}
+    wins = np.zeros((len(models), len(models)))
+    for i, feedback in enumerate(feedbacks):
+        weight = 1.0 if weights is None else float(weights[i])
+        if weight <= 0:
+            continue
+        for opponent in feedback.opponents:
+            winner, loser = (
+                (feedback.model_id, opponent)
+                if feedback.outcome == 1
+                else (opponent, feedback.model_id)
+            )
+            wins[index[winner], index[loser]] += weight
+    return models, wins
+
+
+def build_rankings(elo: dict[str, dict], bradley_terry: dict[str, float]) -> list[dict]:
+    rankings = [
+        {
+            "model_id": model_id,
+            "rating": round(stats["rating"]),
+            "bt_rating": round(bradley_terry.get(model_id, INITIAL_RATING)),
+            "won": stats["won"],
+            "lost": stats["lost"],
+            "count": stats["won"] + stats["lost"],
+        }
+        for model_id, stats in elo.items()
+    ]
+    return sorted(rankings, key=lambda item: (-item["rating"], item["model_id"]))
+
+
+class Leaderboard:
+    """
+    Arena ratings kept in memory and updated as feedback changes.
+
+    Bradley-Terry ratings depend only on the pairwise win counts, which are
+    adjusted exactly for every insert, update and delete and refitted on the
+    next read. Elo depends on the order of the comparisons (oldest first):
+    feedback appended after the newest one is applied in place, anything else
+    marks Elo for a replay from the feedback held in memory.
+
+    Workers share a version token through the cache manager. A change on one
+    worker issues a new token, and the others reload from the database when
+    they next see a token they did not build.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version: Optional[str] = None
+        self._feedbacks: dict[str, RatedFeedback] = {}
+        self._elo: dict[str, dict] = {}
+        self._elo_dirty = True
+        self._newest: Optional[tuple] = None
+        self._pair_wins: dict[tuple, float] = defaultdict(float)
+        self._bradley_terry: Optional[dict[str, float]] = None
+        self._tag_embeddings: dict[str, np.ndarray] = {}
+        self._embedding_model: Optional[str] = None
+
+    ####################
+    # Loading
+    ####################
+
+    def _get_shared_version(self) -> str:
+        return get_cache_manager().get_or_load(
+            LEADERBOARD_NAMESPACE, "version", lambda: uuid.uuid4().hex
+        )
+
+    def _publish_change(self):
+        """Issue a new version for the other workers and adopt it if loaded here"""
+        get_cache_manager().invalidate(LEADERBOARD_NAMESPACE, "version")
+        if self._version is not None:
+            self._version = self._get_shared_version()
+
+    def rebuild(self) -> int:
+        """Recompute everything from the feedback table (batch job)"""
+        with self._lock:
+            version = self._get_shared_version()
+            feedbacks = {}
+            for id, data, created_at in Feedbacks.get_rating_feedbacks():
+                feedback = parse_feedback(id, data, created_at)
+                if feedback is not None:
+                    feedbacks[id] = feedback
+
+            self._feedbacks = feedbacks
+            self._pair_wins = defaultdict(float)
+            for feedback in feedbacks.values():
+                self._count_pairs(feedback, 1)
+            self._bradley_terry = None
+            self._elo_dirty = True
+            self._version = version
+            log.info(f"Leaderboard rebuilt from {len(feedbacks)} rated feedbacks")
+            return len(feedbacks)
+
+    def _ensure_current(self):
+        if self._version is None or self._version != self._get_shared_version():
+            self.rebuild()
+
+    ####################
+    # Incremental updates
+    ####################
+
+    def _count_pairs(self, feedback: RatedFeedback, sign: int):
+        for opponent in feedback.opponents:
+            pair = (
+                (feedback.model_id, opponent)
+                if feedback.outcome == 1
+                else (opponent, feedback.model_id)
+            )
+            self._pair_wins[pair] += sign
+            if self._pair_wins[pair] <= 0:
+                del self._pair_wins[pair]
+        self._bradley_terry = None
+
+    def _remove(self, id: str):
+        previous = self._feedbacks.pop(id, None)
+        if previous is not None:
+            self._count_pairs(previous, -1)
+            self._elo_dirty = True
+        return previous
+
+    def on_feedback_saved(self, id: str, data: Optional[dict], created_at: int):
+        """Apply an inserted or updated feedback"""
+        with self._lock:
+            if self._version is None:
+                # Nothing loaded on this worker yet, the next read loads it all
+                self._publish_change()
+                return
+
+            feedback = parse_feedback(id, data, created_at)
+            previous = self._feedbacks.get(id)
+            if previous == feedback:
+                return
+
+            self._remove(id)
+            if feedback is not None:
+                self._feedbacks[id] = feedback
+                self._count_pairs(feedback, 1)
+                if (
+                    not self._elo_dirty
+                    and previous is None
+                    and (self._newest is None or feedback.order > self._newest)
+                ):
+
+                    def get_stats(model_id):
+                        return self._elo.setdefault(
+                            model_id,
+                            {"rating": float(INITIAL_RATING), "won": 0, "lost": 0},
+                        )
+
+                    apply_elo(self._elo, get_stats, feedback)
+                    self._newest = feedback.order
+                else:
+                    self._elo_dirty = True
+
+            self._publish_change()
+
+    def on_feedback_deleted(self, id: str):
+        with self._lock:
+            if self._version is not None:
+                self._remove(id)
+            self._publish_change()
+
+    def invalidate(self):
+        """Drop everything after bulk changes, every worker reloads on next read"""
+        with self._lock:
+            get_cache_manager().invalidate(LEADERBOARD_NAMESPACE, "version")
+            self._version = None
+
+    ####################
+    # Rankings
+    ####################
+
+    def _ordered_feedbacks(self) -> list[RatedFeedback]:
+        return sorted(self._feedbacks.values(), key=lambda feedback: feedback.order)
+
+    def get_rankings(self) -> list[dict]:
+        with self._lock:
+            self._ensure_current()
+
+            feedbacks = None
+            if self._elo_dirty:
+                feedbacks = self._ordered_feedbacks()
+                self._elo = compute_elo(feedbacks)
+                self._newest = feedbacks[-1].order if feedbacks else None
+                self._elo_dirty = False
+
+            if self._bradley_terry is None:
+                models = sorted(self._elo)
+                index = {model: i for i, model in enumerate(models)}
+                wins = np.zeros((len(models), len(models)))
+                for (winner, loser), count in self._pair_wins.items():
+                    wins[index[winner], index[loser]] = count
+                self._bradley_terry = fit_bradley_terry(models, wins)
+
+            return build_rankings(self._elo, self._bradley_terry)
+
+    def get_filtered_rankings(
+        self,
+        tag: Optional[str] = None,
+        query: Optional[str] = None,
+        embed: Optional[Callable[[list[str]], list[list[float]]]] = None,
+        embedding_model: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Rankings where every comparison counts with the similarity of its
+        feedback to the topic: 1/0 for an exact `tag`, or the best cosine
+        similarity between `query` and the feedback tags.
+        """
+        with self._lock:
+            self._ensure_current()
+            feedbacks = self._ordered_feedbacks()
+
+        if tag is not None:
+            weights = np.array(
+                [1.0 if tag in feedback.tags else 0.0 for feedback in feedbacks]
+            )
+        else:
+            weights = self._get_query_similarities(
+                feedbacks, query, embed, embedding_model
+            )
+
+        elo = compute_elo(feedbacks, weights)
+        models, wins = get_pair_wins(feedbacks, weights)
+        return build_rankings(elo, fit_bradley_terry(models, wins))
+
+    def _get_query_similarities(
+        self, feedbacks, query, embed, embedding_model
+    ) -> np.ndarray:
+        tags = sorted({tag for feedback in feedbacks for tag in feedback.tags})
+        with self._lock:
+            if embedding_model != self._embedding_model:
+                self._tag_embeddings = {}
+                self._embedding_model = embedding_model
+            tag_embeddings = {
+                tag: self._tag_embeddings[tag]
+                for tag in tags
+                if tag in self._tag_embeddings
+            }
+
+        # Embedding runs without the lock, concurrent requests may embed the
+        # same tags and a request for another model may reset the cache
+        missing = [tag for tag in tags if tag not in tag_embeddings]
+        if missing:
+            for tag, vector in zip(missing, embed(missing)):
+                vector = np.asarray(vector, dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                tag_embeddings[tag] = vector / norm if norm else vector
+            with self._lock:
+                if embedding_model == self._embedding_model:
+                    self._tag_embeddings.update(
+                        (tag, tag_embeddings[tag]) for tag in missing
+                    )
+
+        if not tags:
+            return np.zeros(len(feedbacks))
+
+        query_vector = np.asarray(embed([query])[0], dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        query_vector = query_vector / norm if norm else query_vector
+
+        tag_index = {tag: i for i, tag in enumerate(tags)}
+        tag_similarity = np.stack([tag_embeddings[tag] for tag in tags]) @ query_vector
+
+        # Best matching tag per feedback, feedback without tags weighs 0
+        lengths = np.array([len(feedback.tags) for feedback in feedbacks])
+        flat = np.array(
+            [tag_index[tag] for feedback in feedbacks for tag in feedback.tags],
+            dtype=np.int64,
+        )
+        weights = np.zeros(len(feedbacks))
+        has_tags = lengths > 0
+        if flat.size:
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[has_tags]
+            weights[has_tags] = np.maximum.reduceat(tag_similarity[flat], starts)
+        return np.clip(weights, 0, None)
+
+
+leaderboard = Leaderboard()
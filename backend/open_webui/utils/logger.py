@@ -1,8 +1,15 @@
 import json
 import logging
 import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import TYPE_CHECKING
 
+from fastapi import Request
 from loguru import logger
 from opentelemetry import trace
 from open_webui.env import (
@@ -13,6 +20,9 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     ENABLE_OTEL,
     ENABLE_OTEL_LOGS,
+    LOG_ENQUEUE,
+    LOG_FORMAT,
+    LOG_SAMPLE_INTERVAL,
 )
 
 
@@ -42,6 +52,90 @@ def stdout_format(record: "Record") -> str:
     )
 
 
+# Fields attached to every record logged while they are set, and the record
+# attributes (passed with `extra=`) copied into the structured output
+CONTEXT_FIELDS = ("provider", "task_id", "user_id")
+
+_log_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+
+def set_log_context(**fields):
+    """
+    Attach fields such as task_id and user_id to the records logged by the
+    current task (a request or a background job) from now on.
+    """
+    _log_context.set({**_log_context.get(), **fields})
+
+
+@contextmanager
+def log_context(**fields):
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context() -> dict:
+    return _log_context.get()
+
+
+def provider_log_context(provider: str):
+    """
+    Router dependency tagging every record logged while handling a request
+    with the provider and, for task routes, the task id.
+    """
+
+    async def set_request_log_context(request: Request):
+        fields = {"provider": provider}
+        if "task_id" in request.path_params:
+            fields["task_id"] = request.path_params["task_id"]
+        set_log_context(**fields)
+
+    return set_request_log_context
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limits records logged with `extra={"sampled": True}`: each call site
+    (per task when a task_id is in the log context) passes at most once per
+    `interval` seconds. The next record that passes carries the number of
+    records dropped in between as `suppressed`.
+    """
+
+    def __init__(self, interval: float = LOG_SAMPLE_INTERVAL, max_keys: int = 10000):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._seen: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0 or not getattr(record, "sampled", False):
+            return True
+
+        key = (
+            record.pathname,
+            record.lineno,
+            getattr(record, "task_id", None) or _log_context.get().get("task_id"),
+        )
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._seen.get(key, (None, 0))
+            if last is not None and now - last < self.interval:
+                self._seen[key] = (last, suppressed + 1)
+                return False
+
+            self._seen[key] = (now, 0)
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
 class InterceptHandler(logging.Handler):
     """
     Intercepts log records from Python's standard logging module
@@ -65,18 +159,23 @@ class InterceptHandler(logging.Handler):
             depth += 1
 
         logger.opt(depth=depth, exception=record.exc_info).bind(
-            **self._get_extras()
+            **self._get_extras(record)
         ).log(level, record.getMessage())
         if ENABLE_OTEL and ENABLE_OTEL_LOGS:
             from open_webui.utils.telemetry.logs import otel_handler
 
             otel_handler.emit(record)
 
-    def _get_extras(self):
+    def _get_extras(self, record):
+        extras = dict(_log_context.get())
+        for field in CONTEXT_FIELDS + ("suppressed",):
+            value = getattr(record, field, None)
+            if value is not None:
+                extras[field] = value
+
         if not ENABLE_OTEL:
-            return {}
+            return extras
 
-        extras = {}
         context = trace.get_current_span().get_span_context()
         if context.is_valid:
             extras["trace_id"] = trace.format_trace_id(context.trace_id)
@@ -84,6 +183,31 @@ class InterceptHandler(logging.Handler):
         return extras
 
 
+def json_format(record: "Record") -> str:
+    """
+    Formats log records that are output to the console as one JSON object per
+    line, with the context fields (task_id, user_id, ...) as top-level keys.
+    """
+    data = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        **{
+            key: value
+            for key, value in record["extra"].items()
+            if key not in ("json_line", "extra_json")
+        },
+    }
+    if record["exception"] is not None:
+        data["exception"] = "".join(traceback.format_exception(*record["exception"]))
+
+    record["extra"]["json_line"] = json.dumps(data, default=str)
+    return "{extra[json_line]}\n"
+
+
 def file_format(record: "Record"):
     """
     Formats audit log records into a structured JSON string for file output.
@@ -129,8 +253,9 @@ def start_logger():
     logger.add(
         sys.stdout,
         level=GLOBAL_LOG_LEVEL,
-        format=stdout_format,
+        format=json_format if LOG_FORMAT == "json" else stdout_format,
         filter=lambda record: "auditable" not in record["extra"],
+        enqueue=LOG_ENQUEUE,
     )
     if AUDIT_LOG_LEVEL != "NONE":
         try:
@@ -141,12 +266,15 @@ def start_logger():
                 compression="zip",
                 format=file_format,
                 filter=lambda record: record["extra"].get("auditable") is True,
+                enqueue=LOG_ENQUEUE,
             )
         except Exception as e:
             logger.error(f"Failed to initialize audit log file handler: {str(e)}")
 
+    intercept_handler = InterceptHandler()
+    intercept_handler.addFilter(SamplingFilter())
     logging.basicConfig(
-        handlers=[InterceptHandler()], level=GLOBAL_LOG_LEVEL, force=True
+        handlers=[intercept_handler], level=GLOBAL_LOG_LEVEL, force=True
     )
 
     for uvicorn_logger_name in ["uvicorn", "uvicorn.error"]:
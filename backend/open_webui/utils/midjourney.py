@@ -3,6 +3,7 @@ Midjourney 工具类
 包含API客户端、积分管理、Prompt构建等工具
 """
 
+import logging
 import httpx
 import asyncio
 import json
@@ -10,6 +11,10 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from open_webui.models.midjourney import MJConfig, MJCredit, MJGenerateRequest
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MIDJOURNEY"])
 
 
 class MJApiClient:
@@ -41,13 +46,13 @@ class MJApiClient:
 
         # 🔥 调试信息：检查参考图片数据
         if hasattr(request, "reference_images") and request.reference_images:
-            print(f"🖼️ 【调试】参考图片数量: {len(request.reference_images)}")
+            log.debug(f"🖼️ 【调试】参考图片数量: {len(request.reference_images)}")
             for i, img in enumerate(request.reference_images):
-                print(
+                log.debug(
                     f"🖼️ 【调试】图片{i+1}: 类型={img.type}, 权重={img.weight}, Base64长度={len(img.base64) if img.base64 else 0}"
                 )
         else:
-            print("🖼️ 【调试】没有参考图片数据")
+            log.debug("🖼️ 【调试】没有参考图片数据")
 
         # 添加高级参数
         if request.advanced_params:
@@ -122,7 +127,7 @@ class MJApiClient:
         if request.negative_prompt:
             prompt += f" --no {request.negative_prompt}"
 
-        print(f"🖼️ 【构建完成】最终prompt: {prompt}")
+        log.info(f"🖼️ 【构建完成】最终prompt: {prompt}")
         return prompt
 
     async def submit_imagine(self, data: dict) -> dict:
@@ -130,19 +135,19 @@ class MJApiClient:
         url = f"{self._get_mode_url(data.get('mode', 'fast'))}/submit/imagine"
 
         # 🔥 调试信息：检查发送到MJ API的数据
-        print(f"🚀 【MJ API调试】发送到 {url}")
-        print(f"🚀 【MJ API调试】请求数据keys: {list(data.keys())}")
+        log.debug(f"🚀 【MJ API调试】发送到 {url}")
+        log.debug(f"🚀 【MJ API调试】请求数据keys: {list(data.keys())}")
         if "base64Array" in data:
-            print(f"🚀 【MJ API调试】base64Array数量: {len(data['base64Array'])}")
+            log.debug(f"🚀 【MJ API调试】base64Array数量: {len(data['base64Array'])}")
         if "imageWeights" in data:
-            print(f"🚀 【MJ API调试】imageWeights: {data['imageWeights']}")
+            log.debug(f"🚀 【MJ API调试】imageWeights: {data['imageWeights']}")
 
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(url, json=data, headers=self.headers)
-            print(f"🚀 【MJ API调试】响应状态: {response.status_code}")
+            log.debug(f"🚀 【MJ API调试】响应状态: {response.status_code}")
             response.raise_for_status()
             result = response.json()
-            print(f"🚀 【MJ API调试】响应结果: {result}")
+            log.debug(f"🚀 【MJ API调试】响应结果: {result}")
             return result
 
     async def submit_blend(self, data: dict) -> dict:
@@ -185,17 +190,19 @@ class MJApiClient:
         """获取任务状态"""
         url = f"{self._get_mode_url('fast')}/task/{task_id}/fetch"
 
-        print(f"🔍 查询任务状态 - URL: {url}")
-        print(f"🔍 查询任务状态 - TaskID: {task_id}")
+        log.debug(f"🔍 查询任务状态 - URL: {url}", extra={"sampled": True})
+        log.debug(f"🔍 查询任务状态 - TaskID: {task_id}", extra={"sampled": True})
 
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.get(url, headers=self.headers)
-            print(f"🔍 API响应状态码: {response.status_code}")
+            log.debug(
+                f"🔍 API响应状态码: {response.status_code}", extra={"sampled": True}
+            )
 
             response.raise_for_status()
             result = response.json()
 
-            print(f"🔍 API响应内容: {result}")
+            log.debug(f"🔍 API响应内容: {result}", extra={"sampled": True})
             return result
 
     async def get_image_seed(self, task_id: str) -> dict:
@@ -253,7 +260,7 @@ def deduct_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error deducting credits: {e}")
+        log.error(f"Error deducting credits: {e}")
         return 0.0
 
 
@@ -278,7 +285,7 @@ def add_user_credits(
         result = Credits.add_credit_by_user_id(form_data)
         return float(result.credit) if result else 0.0
     except Exception as e:
-        print(f"Error adding credits: {e}")
+        log.error(f"Error adding credits: {e}")
         return 0.0
 
 
@@ -314,43 +321,9 @@ def admin_deduct_credits_from_user(
 
 def get_system_mj_stats() -> dict:
     """获取系统MJ统计"""
-    from open_webui.models.midjourney import MJTask
-    from open_webui.internal.db import get_db
-    from sqlalchemy import func
-
-    with get_db() as db:
-        # 总任务数
-        total_tasks = db.query(MJTask).count()
-
-        # 成功任务数
-        success_tasks = db.query(MJTask).filter(MJTask.status == "SUCCESS").count()
-
-        # 今日任务数
-        today = datetime.utcnow().date()
-        today_tasks = (
-            db.query(MJTask).filter(func.date(MJTask.created_at) == today).count()
-        )
+    from open_webui.services.stats_service import get_task_stats
 
-        # 各状态任务数
-        status_stats = (
-            db.query(MJTask.status, func.count(MJTask.id)).group_by(MJTask.status).all()
-        )
-
-        # 各模式使用统计
-        mode_stats = (
-            db.query(MJTask.mode, func.count(MJTask.id)).group_by(MJTask.mode).all()
-        )
-
-        return {
-            "total_tasks": total_tasks,
-            "success_tasks": success_tasks,
-            "today_tasks": today_tasks,
-            "success_rate": (
-                round(success_tasks / total_tasks * 100, 2) if total_tasks > 0 else 0
-            ),
-            "status_distribution": dict(status_stats),
-            "mode_distribution": dict(mode_stats),
-        }
+    return get_task_stats("midjourney")
 
 
 def get_user_mj_stats(user_id: str) -> dict:
@@ -407,8 +380,9 @@ def get_user_mj_stats(user_id: str) -> dict:
 def cleanup_old_tasks(days: int = 30):
     """清理旧任务记录"""
     from open_webui.models.midjourney import MJTask
+    from open_webui.models.creations import Creations
     from open_webui.internal.db import get_db
-    from datetime import timedelta
+    from datetime import timedelta, timezone
 
     cutoff_date = datetime.utcnow() - timedelta(days=days)
 
@@ -417,7 +391,12 @@ def cleanup_old_tasks(days: int = 30):
             db.query(MJTask).filter(MJTask.created_at < cutoff_date).delete()
         )
         db.commit()
-        return deleted_count
+
+    # 批量删除不经过 ORM 事件，同步清理作品索引
+    Creations.delete_by_provider_before(
+        "midjourney", int(cutoff_date.replace(tzinfo=timezone.utc).timestamp())
+    )
+    return deleted_count
 
 
 # ======================== 错误处理 ========================
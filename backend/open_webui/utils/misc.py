@@ -1,3 +1,4 @@
+import base64
 import hashlib
 import re
 import time
@@ -25,6 +26,22 @@ def deep_update(d, u):
     return d
 
 
+def encode_keyset_cursor(created_at: int, id: str) -> str:
+    """Opaque cursor for pages ordered by (created_at, id)"""
+    payload = json.dumps([created_at, id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[int, str]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(created_at), str(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 def get_message_list(messages, message_id):
     """
     Reconstructs a list of messages in order up to the specified message_id.
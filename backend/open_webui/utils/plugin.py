@@ -2,12 +2,19 @@ import os
 import re
 import subprocess
 import sys
-from importlib import util
+from importlib import metadata, util
 import types
 import tempfile
 import logging
-
-from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
+import hashlib
+import json
+
+from open_webui.env import (
+    DATA_DIR,
+    SRC_LOG_LEVELS,
+    PIP_OPTIONS,
+    PIP_PACKAGE_INDEX_OPTIONS,
+)
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
 
@@ -222,10 +229,68 @@ def get_function_module_from_cache(request, function_id, load_from_db=True):
     return function_module, function_type, frontmatter
 
 
+INSTALLED_REQUIREMENTS_FILE = f"{DATA_DIR}/cache/installed_requirements.json"
+
+
+def get_requirements_hash(req_list: list[str]) -> str:
+    key = json.dumps(
+        [
+            sys.prefix,
+            sorted(set(req_list)),
+            PIP_OPTIONS,
+            PIP_PACKAGE_INDEX_OPTIONS,
+        ]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_installed_requirements() -> set[str]:
+    try:
+        with open(INSTALLED_REQUIREMENTS_FILE, "r") as file:
+            return set(json.load(file))
+    except (OSError, ValueError):
+        return set()
+
+
+def save_installed_requirements(hashes: set[str]):
+    try:
+        os.makedirs(os.path.dirname(INSTALLED_REQUIREMENTS_FILE), exist_ok=True)
+        with open(INSTALLED_REQUIREMENTS_FILE, "w") as file:
+            json.dump(sorted(hashes), file)
+    except OSError as e:
+        log.debug(f"Could not record installed requirements: {e}")
+
+
+def requirements_satisfied(req_list: list[str]) -> bool:
+    """
+    Whether every requirement is installed in this environment. The data
+    directory may outlive the environment (e.g. a new container), so a
+    recorded hash alone is not trusted.
+    """
+    try:
+        from packaging.requirements import Requirement
+
+        for req in req_list:
+            requirement = Requirement(req)
+            version = metadata.version(requirement.name)
+            if not requirement.specifier.contains(version, prereleases=True):
+                return False
+        return True
+    except Exception:
+        return False
+
+
 def install_frontmatter_requirements(requirements: str):
     if requirements:
         try:
-            req_list = [req.strip() for req in requirements.split(",")]
+            req_list = [req.strip() for req in requirements.split(",") if req.strip()]
+
+            installed = load_installed_requirements()
+            requirements_hash = get_requirements_hash(req_list)
+            if requirements_hash in installed and requirements_satisfied(req_list):
+                log.info(f"Requirements already installed: {' '.join(req_list)}")
+                return
+
             log.info(f"Installing requirements: {' '.join(req_list)}")
             subprocess.check_call(
                 [sys.executable, "-m", "pip", "install"]
@@ -233,6 +298,7 @@ def install_frontmatter_requirements(requirements: str):
                 + req_list
                 + PIP_PACKAGE_INDEX_OPTIONS
             )
+            save_installed_requirements(installed | {requirements_hash})
         except Exception as e:
             log.error(f"Error installing packages: {' '.join(req_list)}")
             raise e
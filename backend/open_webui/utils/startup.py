@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class StartupProfile:
+    """
+    Records how long each startup phase takes, and the state of the background
+    warm-ups that have to finish before the instance reports itself ready.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: list[dict] = []
+        self.warmups: dict[str, dict] = {}
+        self.serving_after: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "failed"
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, status)
+
+    def record(self, name: str, duration: float, status: str = "ok"):
+        self.phases.append(
+            {"name": name, "duration": round(duration, 3), "status": status}
+        )
+
+    def skip(self, name: str, reason: str):
+        self.phases.append(
+            {"name": name, "duration": 0.0, "status": "skipped", "reason": reason}
+        )
+
+    def mark_imported(self):
+        """Time from the first database import until the app starts up"""
+        self.record("import", time.perf_counter() - self.started_at)
+
+    def mark_serving(self):
+        self.serving_after = round(time.perf_counter() - self.started_at, 3)
+
+    def add_warmup(self, name: str, loader: Callable[[], None]):
+        self.warmups[name] = {"status": "pending", "duration": None, "loader": loader}
+
+    async def run_warmups(self):
+        """Run the registered loaders one after another in a worker thread"""
+        for name, warmup in self.warmups.items():
+            if warmup["status"] != "pending":
+                continue
+
+            warmup["status"] = "loading"
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(warmup["loader"])
+                warmup["status"] = "ready"
+            except Exception as e:
+                log.error(f"Warm-up of {name} failed: {e}")
+                warmup["status"] = "failed"
+            warmup["duration"] = round(time.perf_counter() - start, 3)
+
+        log.info(f"Warm-up finished: {self.get_warmup_status()}")
+
+    def get_warmup_status(self) -> dict:
+        return {name: warmup["status"] for name, warmup in self.warmups.items()}
+
+    def is_ready(self) -> bool:
+        return all(
+            warmup["status"] in ("ready", "failed") for warmup in self.warmups.values()
+        )
+
+    def get_report(self) -> dict:
+        return {
+            "ready": self.is_ready(),
+            "serving_after": self.serving_after,
+            "phases": self.phases,
+            "warmups": {
+                name: {"status": warmup["status"], "duration": warmup["duration"]}
+                for name, warmup in self.warmups.items()
+            },
+        }
+
+    def log_report(self):
+        lines = [
+            f"  {phase['name']:<32} {phase['duration']:>8.3f}s  {phase['status']}"
+            for phase in self.phases
+        ]
+        log.info(
+            f"Startup profile (serving after {self.serving_after}s):\n"
+            + "\n".join(lines)
+        )
+
+
+startup_profile = StartupProfile()
@@ -0,0 +1,380 @@
+"""
+生成任务事件总线
+
+Midjourney / Kling / Jimeng / Flux / DreamWork / 对口型任务的状态变化在数据库提交后
+发布一次，SSE 连接只订阅事件而不再各自轮询数据库：
+
+- 采集：SQLAlchemy 会话事件记录任务表中状态、进度、结果字段发生变化的行，
+  提交成功后交给后台线程重新读取一次并发布（回滚则丢弃），不占用提交请求的连接；
+  绕过 ORM 的原生 SQL 写入提交后调用 record_task_write()
+- 分发：进程内按用户分发到订阅队列；配置 Redis 时通过 pub/sub 广播到其他 worker
+- 订阅：subscription() 返回只包含该用户（可按服务过滤）事件的队列
+- 变更处理：add_task_change_handler() 注册的回调在提交后收到每个变化的任务
+  （包括删除），用于维护作品索引等读模型
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from sqlalchemy import event, inspect
+
+from open_webui.env import INSTANCE_ID, REDIS_KEY_PREFIX, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+TASK_EVENT_CHANNEL = f"{REDIS_KEY_PREFIX}:task_events"
+
+# 服务名 -> 任务表模型
+TASK_MODELS = {
+    "midjourney": ("open_webui.models.midjourney", "MJTask"),
+    "kling": ("open_webui.models.kling", "KlingTask"),
+    "jimeng": ("open_webui.models.jimeng", "JimengTask"),
+    "flux": ("open_webui.models.flux", "FluxTask"),
+    "dreamwork": ("open_webui.models.dreamwork", "DreamWorkTask"),
+    "kling_lip_sync": ("open_webui.models.kling_lip_sync", "KlingLipSyncTask"),
+}
+
+# 这些字段变化时才发布事件，避免轮询器每次写入相同数据都推送
+TRACKED_FIELDS = (
+    "status",
+    "progress",
+    "queue_position",
+    "image_url",
+    "cloud_image_url",
+    "video_url",
+    "cloud_video_url",
+    "fail_reason",
+    "error_message",
+    "task_status_msg",
+)
+
+SUBSCRIBER_QUEUE_SIZE = 256
+SESSION_INFO_KEY = "task_events"
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def serialize_task(task) -> dict:
+    """任务的对外表示：优先使用模型自带的 to_dict，与各服务现有接口保持一致"""
+    if hasattr(task, "to_dict"):
+        return task.to_dict()
+    return {
+        attr.key: _jsonable(getattr(task, attr.key))
+        for attr in inspect(task).mapper.column_attrs
+    }
+
+
+class TaskEventBus:
+    """按用户分发任务事件，跨 worker 通过 Redis pub/sub 同步"""
+
+    def __init__(self):
+        self.redis = None
+        self.publisher = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listeners: list[Callable[[dict], None]] = []
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """注册回调，本进程发布的每个事件调用一次（在发布者线程中执行）"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def publish(self, event_data: dict, broadcast: bool = True):
+        """发布事件，可在任意线程调用"""
+        self.publish_many([event_data], broadcast)
+
+    def publish_many(self, events: list[dict], broadcast: bool = True):
+        """发布一批事件，Redis 广播合并为一次往返；可在任意线程调用"""
+        if not events:
+            return
+        self.stats["published"] += len(events)
+
+        for event_data in events:
+            for listener in self._listeners:
+                try:
+                    listener(event_data)
+                except Exception as e:
+                    log.error(f"Task event listener error: {e}")
+
+        if broadcast and self.publisher is not None:
+            try:
+                pipe = self.publisher.pipeline(transaction=False)
+                for event_data in events:
+                    pipe.publish(
+                        TASK_EVENT_CHANNEL,
+                        json.dumps(
+                            {"origin": INSTANCE_ID, "event": event_data}, default=str
+                        ),
+                    )
+                pipe.execute()
+            except Exception as e:
+                log.error(f"Task event publish error: {e}")
+
+        if self._loop is None or self._loop.is_closed():
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        for event_data in events:
+            if running_loop is self._loop:
+                self._dispatch(event_data)
+            else:
+                self._loop.call_soon_threadsafe(self._dispatch, event_data)
+
+    def _dispatch(self, event_data: dict):
+        for queue in list(self._subscribers.get(event_data.get("user_id"), ())):
+            if queue.full():
+                # 慢消费者丢弃最旧的事件，后续事件带有完整任务状态
+                queue.get_nowait()
+                self.stats["dropped"] += 1
+            queue.put_nowait(event_data)
+            self.stats["delivered"] += 1
+
+    @asynccontextmanager
+    async def subscription(self, user_id: str):
+        """订阅用户的任务事件"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    async def listen(self):
+        """订阅 Redis 频道，分发其他 worker 发布的事件"""
+        if self.redis is None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(TASK_EVENT_CHANNEL)
+
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                if data.get("origin") == INSTANCE_ID:
+                    continue
+                self._dispatch(data["event"])
+            except Exception as e:
+                log.exception(f"Error handling task event: {e}")
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "subscribers": self.subscriber_count()}
+
+
+task_event_bus = TaskEventBus()
+
+
+def init_task_event_bus(redis_client=None, publisher=None) -> TaskEventBus:
+    """接入 Redis
+
+    Args:
+        redis_client: 异步 Redis 客户端（订阅其他 worker 的事件）
+        publisher: 同步 Redis 客户端（在同步的数据库提交钩子中发布）
+    """
+    task_event_bus.redis = redis_client
+    task_event_bus.publisher = publisher
+    return task_event_bus
+
+
+####################
+# 数据库提交钩子
+####################
+
+_model_providers: Dict[type, str] = {}
+_change_handlers: list[Callable[[str, str, Any], None]] = []
+
+# 单线程按提交顺序处理变更，读模型写入不在提交请求的线程和连接上执行
+_post_commit = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-events")
+
+
+def add_task_change_handler(handler: Callable[[str, str, Any], None]):
+    """注册任务变更回调 handler(provider, task_id, task)，任务被删除时 task 为 None
+
+    只在提交事务的 worker 上调用一次，适合写入数据库的读模型
+    """
+    if handler not in _change_handlers:
+        _change_handlers.append(handler)
+
+
+def _collect_task_changes(session, flush_context):
+    changes = session.info.setdefault(SESSION_INFO_KEY, {})
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        provider = _model_providers.get(type(obj))
+        if provider is None:
+            continue
+
+        state = inspect(obj)
+        if (
+            obj not in session.new
+            and obj not in session.deleted
+            and not any(
+                key in state.attrs and state.attrs[key].history.has_changes()
+                for key in TRACKED_FIELDS
+            )
+        ):
+            continue
+
+        identity = state.identity or (getattr(obj, "id", None),)
+        if identity and identity[0] is not None:
+            changes[(type(obj), identity[0])] = provider
+
+
+def _publish_task_changes(session):
+    changes = session.info.pop(SESSION_INFO_KEY, None)
+    if changes:
+        _post_commit.submit(_process_task_changes, changes)
+
+
+def _process_task_changes(changes: dict):
+    from open_webui.internal.db import get_db
+
+    try:
+        # 提交后在新会话中读取一次最终状态，事件对所有订阅者共享
+        with get_db() as db:
+            for (model, task_id), provider in changes.items():
+                task = db.get(model, task_id)
+                _run_change_handlers(provider, task_id, task)
+                if task is not None:
+                    task_event_bus.publish(_task_update_event(provider, task))
+    except Exception as e:
+        log.error(f"Failed to publish task events: {e}")
+
+
+def _task_update_event(provider: str, task) -> dict:
+    return {
+        "type": "task_update",
+        "provider": provider,
+        "user_id": task.user_id,
+        "task": serialize_task(task),
+        "timestamp": int(time.time() * 1000),
+    }
+
+
+def record_task_write(provider: str, task):
+    """原生 SQL 写入任务表并提交后调用：会话钩子看不到这类写入，这里按提交后的
+    任务状态执行变更回调并发布事件，与 ORM 写入的效果相同"""
+    try:
+        # 调用方之后可能继续修改该对象，先在当前线程取出已加载的字段
+        snapshot = SimpleNamespace(
+            **{
+                key: value
+                for key, value in inspect(task).dict.items()
+                if not key.startswith("_")
+            }
+        )
+        event_data = _task_update_event(provider, task)
+    except Exception as e:
+        log.error(f"Failed to record {provider} task write: {e}")
+        return
+
+    def process():
+        _run_change_handlers(provider, snapshot.id, snapshot)
+        task_event_bus.publish(event_data)
+
+    _post_commit.submit(process)
+
+
+def wait_for_task_changes(timeout: Optional[float] = None):
+    """等待已提交的变更处理完成"""
+    _post_commit.submit(lambda: None).result(timeout)
+
+
+def _run_change_handlers(provider: str, task_id, task):
+    for handler in _change_handlers:
+        try:
+            handler(provider, str(task_id), task)
+        except Exception as e:
+            log.error(f"Task change handler error for {provider} {task_id}: {e}")
+
+
+def _discard_task_changes(session, previous_transaction):
+    session.info.pop(SESSION_INFO_KEY, None)
+
+
+def install_task_event_hooks(providers: Optional[Iterable[str]] = None):
+    """为任务表注册会话事件，启动时调用一次"""
+    from open_webui.internal.db import SessionLocal
+
+    for provider in providers or TASK_MODELS:
+        module_name, class_name = TASK_MODELS[provider]
+        try:
+            model = getattr(import_module(module_name), class_name)
+        except Exception as e:
+            log.warning(f"Task events disabled for {provider}: {e}")
+            continue
+        _model_providers[model] = provider
+
+    if not event.contains(SessionLocal, "after_flush", _collect_task_changes):
+        event.listen(SessionLocal, "after_flush", _collect_task_changes)
+        event.listen(SessionLocal, "after_commit", _publish_task_changes)
+        event.listen(SessionLocal, "after_soft_rollback", _discard_task_changes)
+
+
+####################
+# SSE
+####################
+
+KEEPALIVE_INTERVAL = 15
+STREAM_IDLE_TIMEOUT = 300  # 连续 5 分钟没有任务事件时结束事件流
+
+
+async def iter_task_events(
+    queue: asyncio.Queue,
+    providers: Optional[Iterable[str]] = None,
+    keepalive_interval: float = KEEPALIVE_INTERVAL,
+    idle_timeout: Optional[float] = None,
+):
+    """
+    逐个产出订阅队列中的事件，空闲 keepalive_interval 秒时产出 None 用于保活；
+    设置 idle_timeout 时，连续这么久没有匹配的事件则结束迭代
+    """
+    providers = set(providers) if providers else None
+    last_event = time.monotonic()
+    while True:
+        try:
+            event_data = await asyncio.wait_for(queue.get(), keepalive_interval)
+        except asyncio.TimeoutError:
+            if idle_timeout is not None and (
+                time.monotonic() - last_event >= idle_timeout
+            ):
+                return
+            yield None
+            continue
+        if providers is None or event_data.get("provider") in providers:
+            last_event = time.monotonic()
+            yield event_data
+
+
+def format_sse(data: dict) -> str:
+    return f"data: {json.dumps(data, default=str)}\n\n"
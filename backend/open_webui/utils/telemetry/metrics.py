@@ -11,6 +11,8 @@ Metrics collected:
 
 Attributes used: http.method, http.route, http.status_code
 
+The per-stage chat pipeline metrics are recorded in ``stages.py``.
+
 If you wish to add more attributes (e.g. user-agent) you can, but beware of
 high-cardinality label sets.
 """
@@ -99,6 +101,15 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active",
         ),
+        # chat pipeline stages, see utils/telemetry/stages.py
+        View(
+            instrument_name="webui.chat.stage.duration",
+            attribute_keys=["stage", "status"],
+        ),
+        View(
+            instrument_name="webui.chat.upstream.*",
+            attribute_keys=["model"],
+        ),
     ]
 
     provider = MeterProvider(
@@ -0,0 +1,369 @@
+"""Per-stage timing of the chat pipeline.
+
+A slow chat reply can come from the payload processing (filters, memory,
+web search, retrieval), the upstream model, the processing of the streamed
+response, or the accounting and database writes around it. Each stage is
+recorded as a span and in a histogram through the OpenTelemetry API, so the
+existing OpenTelemetry setup exports them; without a configured provider
+these calls are no-ops.
+
+Metrics collected:
+
+* webui.chat.stage.duration (histogram, milliseconds, attributes: stage, status)
+* webui.chat.duration (histogram, milliseconds)
+* webui.chat.upstream.ttft (histogram, milliseconds, attribute: model)
+* webui.chat.upstream.tokens_per_second (histogram, attribute: model)
+* webui.chat.db.writes (histogram, write statements per chat request)
+
+The timings of the current chat request are kept in a context variable.
+An admin can send the X-Chat-Profile header to capture one request with
+pyinstrument, or cProfile when it is not installed. The profile and the
+stage timings are written to CHAT_PROFILING_DIR.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+
+from opentelemetry import metrics, trace
+from sqlalchemy import Engine, event
+from starlette.background import BackgroundTask
+
+from open_webui.env import (
+    CHAT_PROFILING_DIR,
+    CHAT_PROFILING_SAMPLE_RATE,
+    ENABLE_CHAT_PROFILING,
+    ENABLE_OTEL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+CHAT_PROFILE_HEADER = "X-Chat-Profile"
+
+_DB_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+tracer = trace.get_tracer(__name__)
+meter = metrics.get_meter(__name__)
+
+stage_duration_histogram = meter.create_histogram(
+    name="webui.chat.stage.duration",
+    description="Duration of a chat pipeline stage",
+    unit="ms",
+)
+chat_duration_histogram = meter.create_histogram(
+    name="webui.chat.duration",
+    description="Duration of a chat request until its response is complete",
+    unit="ms",
+)
+ttft_histogram = meter.create_histogram(
+    name="webui.chat.upstream.ttft",
+    description="Time from the upstream request to the first streamed chunk",
+    unit="ms",
+)
+tokens_per_second_histogram = meter.create_histogram(
+    name="webui.chat.upstream.tokens_per_second",
+    description="Completion tokens per second of the upstream model",
+    unit="1/s",
+)
+db_writes_histogram = meter.create_histogram(
+    name="webui.chat.db.writes",
+    description="Database write statements per chat request",
+    unit="1",
+)
+
+_current_timings: contextvars.ContextVar[Optional[ChatTimings]] = (
+    contextvars.ContextVar("chat_timings", default=None)
+)
+
+
+class RequestProfiler:
+    """
+    Profiles the event loop thread while one chat request runs. Concurrent
+    requests on the same worker show up in the capture too, and only one
+    capture runs at a time.
+    """
+
+    _lock = threading.Lock()
+    _active = False
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+
+            self.profiler = Profiler(async_mode="disabled")
+            self.is_pyinstrument = True
+        except ImportError:
+            self.profiler = cProfile.Profile()
+            self.is_pyinstrument = False
+
+    @classmethod
+    def start(cls) -> Optional[RequestProfiler]:
+        with cls._lock:
+            if cls._active:
+                log.info("A chat profile is already being captured, skipping")
+                return None
+            cls._active = True
+
+        try:
+            profiler = cls()
+            if profiler.is_pyinstrument:
+                profiler.profiler.start()
+            else:
+                profiler.profiler.enable()
+            return profiler
+        except Exception as e:
+            log.warning(f"Could not start the chat profiler: {e}")
+            cls._active = False
+            return None
+
+    def stop(self, name: str, summary: dict) -> str:
+        """Write the profile and the stage timings, returns the profile path"""
+        try:
+            os.makedirs(CHAT_PROFILING_DIR, exist_ok=True)
+            path = os.path.join(CHAT_PROFILING_DIR, name)
+            if self.is_pyinstrument:
+                self.profiler.stop()
+                path = f"{path}.html"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(self.profiler.output_html())
+            else:
+                self.profiler.disable()
+                path = f"{path}.prof"
+                self.profiler.dump_stats(path)
+
+            with open(f"{os.path.splitext(path)[0]}.json", "w") as f:
+                json.dump(summary, f, indent=2)
+            return path
+        finally:
+            RequestProfiler._active = False
+
+
+class ChatTimings:
+    """Stage timings and counters of one chat request"""
+
+    def __init__(self, model_id: str, profiler: Optional[RequestProfiler] = None):
+        self.id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid4().hex[:8]}"
+        self.model_id = model_id or ""
+        self.profiler = profiler
+        self.started_at = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.db_writes = 0
+        self.completion_tokens = 0
+        self.upstream_started_at: Optional[float] = None
+        self.first_chunk_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        self.streaming = False
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, duration_ms: float) -> None:
+        # stages such as retrieval run once per query and are summed up
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def mark_chunk(self, now: float) -> None:
+        if self.first_chunk_at is None:
+            self.first_chunk_at = now
+            if self.upstream_started_at is not None:
+                ttft_histogram.record(
+                    (now - self.upstream_started_at) * 1000, {"model": self.model_id}
+                )
+        self.last_chunk_at = now
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_chunk_at is None or self.upstream_started_at is None:
+            return None
+        return (self.first_chunk_at - self.upstream_started_at) * 1000
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if not self.completion_tokens:
+            return None
+        if self.streaming:
+            if self.first_chunk_at is None or self.last_chunk_at is None:
+                return None
+            seconds = self.last_chunk_at - self.first_chunk_at
+        else:
+            seconds = self.stages.get("upstream", 0.0) / 1000
+        return self.completion_tokens / seconds if seconds > 0 else None
+
+    def summary(self) -> dict:
+        ttft_ms = self.ttft_ms
+        tokens_per_second = self.tokens_per_second
+        return {
+            "id": self.id,
+            "model": self.model_id,
+            "streaming": self.streaming,
+            "duration_ms": round((time.perf_counter() - self.started_at) * 1000, 2),
+            "stages": {name: round(ms, 2) for name, ms in self.stages.items()},
+            "ttft_ms": round(ttft_ms, 2) if ttft_ms is not None else None,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": (
+                round(tokens_per_second, 2) if tokens_per_second is not None else None
+            ),
+            "db_writes": self.db_writes,
+        }
+
+    def finish(self) -> None:
+        if self.finished:
+            return
+        self.finished = True
+
+        summary = self.summary()
+        chat_duration_histogram.record(summary["duration_ms"])
+        db_writes_histogram.record(self.db_writes)
+        if summary["tokens_per_second"] is not None:
+            tokens_per_second_histogram.record(
+                summary["tokens_per_second"], {"model": self.model_id}
+            )
+        log.debug(f"Chat timings: {summary}")
+
+        if self.profiler is not None:
+            try:
+                path = self.profiler.stop(self.id, summary)
+                log.info(f"Chat profile written to {path}")
+            except Exception as e:
+                log.exception(f"Could not write the chat profile: {e}")
+
+
+def get_chat_timings() -> Optional[ChatTimings]:
+    return _current_timings.get()
+
+
+def start_chat_timings(request, user, model_id: str) -> Optional[ChatTimings]:
+    """
+    Start timing a chat request. Returns None, and every stage stays a no-op,
+    unless OpenTelemetry is enabled or a profile is captured.
+    """
+    profiler = None
+    if (
+        ENABLE_CHAT_PROFILING
+        and request.headers.get(CHAT_PROFILE_HEADER)
+        and getattr(user, "role", None) == "admin"
+        and random.random() < CHAT_PROFILING_SAMPLE_RATE
+    ):
+        profiler = RequestProfiler.start()
+
+    if profiler is None and not ENABLE_OTEL:
+        return None
+
+    timings = ChatTimings(model_id, profiler)
+    _current_timings.set(timings)
+    return timings
+
+
+def finish_chat_timings(timings: Optional[ChatTimings], force: bool = False) -> None:
+    """Finish a non-streaming request, a stream finishes when it is consumed"""
+    if timings is not None and (force or not timings.streaming):
+        timings.finish()
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage of the current chat request"""
+    timings = _current_timings.get()
+    if timings is None and not ENABLE_OTEL:
+        yield
+        return
+
+    status = "ok"
+    start = time.perf_counter()
+    with tracer.start_as_current_span(f"chat.{name}"):
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            stage_duration_histogram.record(
+                duration_ms, {"stage": name, "status": status}
+            )
+            if timings is not None:
+                timings.add_stage(name, duration_ms)
+
+
+def record_completion_tokens(model_id: str, completion_tokens: int) -> None:
+    """Count the tokens of the requested model, not of task model calls"""
+    timings = _current_timings.get()
+    if timings is not None and completion_tokens and model_id == timings.model_id:
+        timings.completion_tokens += completion_tokens
+
+
+def track_upstream_response(timings: Optional[ChatTimings], response):
+    """
+    Measure the time to the first chunk and the split between waiting for
+    upstream and processing the chunks of a streamed response.
+
+    The timings finish when the stream is consumed, or in the response's
+    background task when it is closed before that: a generator that is never
+    iterated does not run its finally block, and a profile capture would
+    otherwise stay active.
+    """
+    if timings is None or not hasattr(response, "body_iterator"):
+        return response
+
+    timings.streaming = True
+    response.body_iterator = _timed_stream(response.body_iterator, timings)
+    response.background = BackgroundTask(
+        _finish_after_background, getattr(response, "background", None), timings
+    )
+    return response
+
+
+async def _finish_after_background(background, timings: ChatTimings) -> None:
+    try:
+        if background is not None:
+            await background()
+    finally:
+        timings.finish()
+
+
+async def _timed_stream(body_iterator, timings: ChatTimings) -> AsyncIterator:
+    # the stream may be consumed by a background task
+    _current_timings.set(timings)
+    iterator = body_iterator.__aiter__()
+    started = time.perf_counter()
+    waiting = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            now = time.perf_counter()
+            waiting += now - start
+            timings.mark_chunk(now)
+            yield chunk
+    finally:
+        total = time.perf_counter() - started
+        timings.add_stage("upstream_stream", waiting * 1000)
+        timings.add_stage("response_processing", (total - waiting) * 1000)
+        timings.finish()
+
+
+def install_db_write_counter(engine: Engine) -> None:
+    """Count the write statements each chat request sends to the database"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_db_write(conn, cursor, statement, parameters, context, executemany):
+        timings = _current_timings.get()
+        if timings is not None and statement.lstrip()[:6].upper() in (
+            _DB_WRITE_STATEMENTS
+        ):
+            timings.db_writes += 1
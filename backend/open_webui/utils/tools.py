@@ -1,7 +1,9 @@
+import hashlib
 import inspect
+import json
 import logging
 import re
-import inspect
+import time
 import aiohttp
 import asyncio
 import yaml
@@ -35,11 +37,12 @@ from langchain_core.utils.function_calling import (
 
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
-from open_webui.utils.plugin import load_tool_module_by_id
+from open_webui.utils.plugin import load_tool_module_by_id, replace_imports
 from open_webui.env import (
     SRC_LOG_LEVELS,
     AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
     AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL,
+    TOOL_SERVER_SPEC_REFRESH_INTERVAL,
 )
 
 import copy
@@ -49,10 +52,11 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 
 def get_async_tool_function_and_apply_extra_params(
-    function: Callable, extra_params: dict
+    function: Callable, extra_params: dict, parameters: Optional[set] = None
 ) -> Callable[..., Awaitable]:
-    sig = inspect.signature(function)
-    extra_params = {k: v for k, v in extra_params.items() if k in sig.parameters}
+    if parameters is None:
+        parameters = inspect.signature(function).parameters
+    extra_params = {k: v for k, v in extra_params.items() if k in parameters}
     partial_func = partial(function, **extra_params)
 
     if inspect.iscoroutinefunction(function):
@@ -67,10 +71,115 @@ def get_async_tool_function_and_apply_extra_params(
         return new_function
 
 
+class PreparedTool:
+    """
+    A loaded tool module with its specs and functions ready for chat requests,
+    built once per tool content.
+    """
+
+    def __init__(self, tool_id: str, content_hash: str, module: object, specs):
+        self.tool_id = tool_id
+        self.content_hash = content_hash
+        self.module = module
+        # valves data applied to the module last
+        self.valves: Optional[dict] = None
+        self.metadata = {
+            "file_handler": hasattr(module, "file_handler") and module.file_handler,
+            "citation": hasattr(module, "citation") and module.citation,
+        }
+        # (spec, function, parameter names)
+        self.functions: list[tuple[dict, Callable, frozenset]] = []
+        for spec in specs:
+            function_name = spec["name"]
+            function = getattr(module, function_name, None)
+            if function is None:
+                log.warning(f"Tool {tool_id} has no function {function_name}")
+                continue
+            self.functions.append(
+                (
+                    prepare_tool_spec(spec, function),
+                    function,
+                    frozenset(inspect.signature(function).parameters),
+                )
+            )
+
+
+# tool id -> prepared tool, rebuilt when the tool content changes
+_prepared_tools: dict[str, PreparedTool] = {}
+
+
+def prepare_tool_spec(spec: dict, function: Callable) -> dict:
+    spec = copy.deepcopy(spec)
+    properties = spec.setdefault("parameters", {}).get("properties", {})
+
+    # TODO: Fix hack for OpenAI API
+    # Some times breaks OpenAI but others don't. Leaving the comment
+    for val in properties.values():
+        if val.get("type") == "str":
+            val["type"] = "string"
+
+    # Remove internal reserved parameters (e.g. __id__, __user__)
+    spec["parameters"]["properties"] = {
+        key: val for key, val in properties.items() if not key.startswith("__")
+    }
+
+    # TODO: Support Pydantic models as parameters
+    if function.__doc__ and function.__doc__.strip() != "":
+        s = re.split(":(param|return)", function.__doc__, 1)
+        spec["description"] = s[0]
+    else:
+        spec["description"] = spec["name"]
+    return spec
+
+
+def get_prepared_tool(request: Request, tool) -> PreparedTool:
+    """
+    The prepared tool for the current content of `tool`. Workers share no
+    module cache, so a tool updated elsewhere is reloaded once its content
+    hash changes.
+    """
+    content_hash = hashlib.sha256(
+        replace_imports(tool.content).encode("utf-8")
+    ).hexdigest()
+    module = request.app.state.TOOLS.get(tool.id, None)
+    prepared = _prepared_tools.get(tool.id)
+    if (
+        prepared is not None
+        and prepared.module is module
+        and prepared.content_hash == content_hash
+    ):
+        return prepared
+
+    # reuse a module loaded by the tools router, unless it is the outdated one
+    if module is None or (prepared is not None and prepared.module is module):
+        module, _ = load_tool_module_by_id(tool.id)
+        request.app.state.TOOLS[tool.id] = module
+
+    prepared = PreparedTool(tool.id, content_hash, module, tool.specs)
+    _prepared_tools[tool.id] = prepared
+    return prepared
+
+
+def make_tool_server_function(
+    function_name: str, token: Optional[str], tool_server_data: dict
+) -> Callable[..., Awaitable]:
+    async def tool_function(**kwargs):
+        return await execute_tool_server(
+            token=token,
+            url=tool_server_data["url"],
+            name=function_name,
+            params=kwargs,
+            server_data=tool_server_data,
+        )
+
+    return tool_function
+
+
 def get_tools(
     request: Request, tool_ids: list[str], user: UserModel, extra_params: dict
 ) -> dict[str, dict]:
     tools_dict = {}
+    tool_servers = None
 
     for tool_id in tool_ids:
         tool = Tools.get_tool_by_id(tool_id)
@@ -80,44 +189,34 @@ def get_tools(
                 tool_server_connection = (
                     request.app.state.config.TOOL_SERVER_CONNECTIONS[server_idx]
                 )
-                tool_server_data = None
-                for server in request.app.state.TOOL_SERVERS:
-                    if server["idx"] == server_idx:
-                        tool_server_data = server
-                        break
+                if tool_servers is None:
+                    tool_servers = {
+                        server["idx"]: server
+                        for server in request.app.state.TOOL_SERVERS
+                    }
+                tool_server_data = tool_servers.get(server_idx)
                 assert tool_server_data is not None
                 specs = tool_server_data.get("specs", [])
 
-                for spec in specs:
-                    function_name = spec["name"]
+                auth_type = tool_server_connection.get("auth_type", "bearer")
+                token = None
 
-                    auth_type = tool_server_connection.get("auth_type", "bearer")
-                    token = None
-
-                    if auth_type == "bearer":
-                        token = tool_server_connection.get("key", "")
-                    elif auth_type == "session":
-                        token = request.state.token.credentials
-
-                    def make_tool_function(function_name, token, tool_server_data):
-                        async def tool_function(**kwargs):
-                            return await execute_tool_server(
-                                token=token,
-                                url=tool_server_data["url"],
-                                name=function_name,
-                                params=kwargs,
-                                server_data=tool_server_data,
-                            )
+                if auth_type == "bearer":
+                    token = tool_server_connection.get("key", "")
+                elif auth_type == "session":
+                    token = request.state.token.credentials
 
-                        return tool_function
+                for spec in specs:
+                    function_name = spec["name"]
 
-                    tool_function = make_tool_function(
+                    tool_function = make_tool_server_function(
                         function_name, token, tool_server_data
                     )
 
                     callable = get_async_tool_function_and_apply_extra_params(
                         tool_function,
                         {},
+                        frozenset(),
                     )
 
                     tool_dict = {
@@ -137,60 +236,35 @@ def get_tools(
             else:
                 continue
         else:
-            module = request.app.state.TOOLS.get(tool_id, None)
-            if module is None:
-                module, _ = load_tool_module_by_id(tool_id)
-                request.app.state.TOOLS[tool_id] = module
+            prepared = get_prepared_tool(request, tool)
+            module = prepared.module
 
             extra_params["__id__"] = tool_id
 
             # Set valves for the tool
             if hasattr(module, "valves") and hasattr(module, "Valves"):
                 valves = Tools.get_tool_valves_by_id(tool_id) or {}
-                module.valves = module.Valves(**valves)
+                if valves != prepared.valves:
+                    module.valves = module.Valves(**valves)
+                    prepared.valves = valves
             if hasattr(module, "UserValves"):
                 extra_params["__user__"]["valves"] = module.UserValves(  # type: ignore
                     **Tools.get_user_valves_by_id_and_user_id(tool_id, user.id)
                 )
 
-            for spec in tool.specs:
-                # TODO: Fix hack for OpenAI API
-                # Some times breaks OpenAI but others don't. Leaving the comment
-                for val in spec.get("parameters", {}).get("properties", {}).values():
-                    if val.get("type") == "str":
-                        val["type"] = "string"
-
-                # Remove internal reserved parameters (e.g. __id__, __user__)
-                spec["parameters"]["properties"] = {
-                    key: val
-                    for key, val in spec["parameters"]["properties"].items()
-                    if not key.startswith("__")
-                }
-
+            for spec, function, parameters in prepared.functions:
                 # convert to function that takes only model params and inserts custom params
                 function_name = spec["name"]
-                tool_function = getattr(module, function_name)
                 callable = get_async_tool_function_and_apply_extra_params(
-                    tool_function, extra_params
+                    function, extra_params, parameters
                 )
 
-                # TODO: Support Pydantic models as parameters
-                if callable.__doc__ and callable.__doc__.strip() != "":
-                    s = re.split(":(param|return)", callable.__doc__, 1)
-                    spec["description"] = s[0]
-                else:
-                    spec["description"] = function_name
-
                 tool_dict = {
                     "tool_id": tool_id,
                     "callable": callable,
                     "spec": spec,
                     # Misc info
-                    "metadata": {
-                        "file_handler": hasattr(module, "file_handler")
-                        and module.file_handler,
-                        "citation": hasattr(module, "citation") and module.citation,
-                    },
+                    "metadata": prepared.metadata,
                 }
 
                 # TODO: if collision, prepend toolkit name
@@ -442,6 +516,10 @@ def convert_openapi_to_tool_payload(openapi_spec):
     return tool_payload
 
 
+# url -> last fetched spec with its validators, reused while unchanged
+_tool_server_data_cache: dict[str, dict] = {}
+
+
 async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
     headers = {
         "Accept": "application/json",
@@ -450,6 +528,13 @@ async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
+    cached = _tool_server_data_cache.get(url)
+    if cached is not None and cached["token"] == token:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
     error = None
     try:
         timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA)
@@ -457,16 +542,16 @@ async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
             async with session.get(
                 url, headers=headers, ssl=AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL
             ) as response:
+                if response.status == 304 and cached is not None:
+                    log.debug(f"Tool server spec not modified: {url}")
+                    return cached["data"]
                 if response.status != 200:
                     error_body = await response.json()
                     raise Exception(error_body)
 
-                # Check if URL ends with .yaml or .yml to determine format
-                if url.lower().endswith((".yaml", ".yml")):
-                    text_content = await response.text()
-                    res = yaml.safe_load(text_content)
-                else:
-                    res = await response.json()
+                content = await response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
     except Exception as err:
         log.exception(f"Could not fetch tool server spec from {url}")
         if isinstance(err, dict) and "detail" in err:
@@ -475,13 +560,31 @@ async def get_tool_server_data(token: str, url: str) -> Dict[str, Any]:
             error = str(err)
         raise Exception(error)
 
-    data = {
-        "openapi": res,
-        "info": res.get("info", {}),
-        "specs": convert_openapi_to_tool_payload(res),
+    # servers without validators still skip the conversion for the same spec
+    content_hash = hashlib.sha256(content).hexdigest()
+    if cached is not None and cached["hash"] == content_hash:
+        data = cached["data"]
+    else:
+        # Check if URL ends with .yaml or .yml to determine format
+        if url.lower().endswith((".yaml", ".yml")):
+            res = yaml.safe_load(content.decode("utf-8"))
+        else:
+            res = json.loads(content)
+
+        data = {
+            "openapi": res,
+            "info": res.get("info", {}),
+            "specs": convert_openapi_to_tool_payload(res),
+        }
+        log.info(f"Fetched data: {data}")
+
+    _tool_server_data_cache[url] = {
+        "token": token,
+        "etag": etag,
+        "last_modified": last_modified,
+        "hash": content_hash,
+        "data": data,
     }
-
-    log.info(f"Fetched data: {data}")
     return data
 
 
@@ -519,13 +622,19 @@ async def get_tool_servers_data(
     results = []
     for (idx, server, url, info, _), response in zip(server_entries, responses):
         if isinstance(response, Exception):
-            log.error(f"Failed to connect to {url} OpenAPI tool server")
-            continue
+            cached = _tool_server_data_cache.get(url)
+            if cached is None:
+                log.error(f"Failed to connect to {url} OpenAPI tool server")
+                continue
+            # keep serving the last spec while the server is unreachable
+            log.warning(f"Failed to refresh {url} OpenAPI tool server, using cache")
+            response = cached["data"]
 
         openapi_data = response.get("openapi", {})
 
         if info and isinstance(openapi_data, dict):
-            openapi_data["info"] = openapi_data.get("info", {})
+            # the fetched spec is cached, override the info on a copy
+            openapi_data = {**openapi_data, "info": dict(openapi_data.get("info", {}))}
 
             if "name" in info:
                 openapi_data["info"]["title"] = info.get("name", "Tool Server")
@@ -546,6 +655,28 @@ async def get_tool_servers_data(
     return results
 
 
+async def periodic_tool_server_refresh(app) -> None:
+    """
+    Refetch the tool server specs in the background so chat requests only
+    read the prepared specs. Unchanged specs are answered by their ETag or
+    content hash without being converted again.
+    """
+    while True:
+        await asyncio.sleep(TOOL_SERVER_SPEC_REFRESH_INTERVAL)
+        connections = app.state.config.TOOL_SERVER_CONNECTIONS
+        if not connections:
+            continue
+        try:
+            start = time.perf_counter()
+            app.state.TOOL_SERVERS = await get_tool_servers_data(connections)
+            log.debug(
+                f"Refreshed {len(app.state.TOOL_SERVERS)} tool servers in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+        except Exception as e:
+            log.exception(f"Failed to refresh tool servers: {e}")
+
+
 async def execute_tool_server(
     token: str, url: str, name: str, params: Dict[str, Any], server_data: Dict[str, Any]
 ) -> Any:
@@ -1,60 +1,365 @@
+import asyncio
 import json
 import logging
+import random
+import time
+from collections import deque
+from typing import Optional
 
+import aiohttp
 import requests
 from open_webui.config import WEBUI_FAVICON_URL
-from open_webui.env import SRC_LOG_LEVELS, VERSION
+from open_webui.env import (
+    DATA_DIR,
+    SRC_LOG_LEVELS,
+    VERSION,
+    WEBHOOK_BATCH_SIZE,
+    WEBHOOK_MAX_CONCURRENCY_PER_URL,
+    WEBHOOK_MAX_RETRIES,
+    WEBHOOK_RETRY_BASE_DELAY,
+    WEBHOOK_TIMEOUT,
+    WEBHOOK_WORKERS,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["WEBHOOK"])
 
 
+def is_text_webhook(url: str) -> bool:
+    """Slack, Google Chat and Discord webhooks carry a single text message."""
+    return (
+        "https://hooks.slack.com" in url
+        or "https://chat.googleapis.com" in url
+        or "https://discord.com/api/webhooks" in url
+    )
+
+
+def build_webhook_payload(name: str, url: str, message: str, event_data: dict):
+    payload = {}
+
+    # Slack and Google Chat Webhooks
+    if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
+        payload["text"] = message
+    # Discord Webhooks
+    elif "https://discord.com/api/webhooks" in url:
+        payload["content"] = (
+            message if len(message) < 2000 else f"{message[: 2000 - 20]}... (truncated)"
+        )
+    # Microsoft Teams Webhooks
+    elif "webhook.office.com" in url:
+        action = event_data.get("action", "undefined")
+        facts = [
+            {"name": name, "value": value}
+            for name, value in json.loads(event_data.get("user", {})).items()
+        ]
+        payload = {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "themeColor": "0076D7",
+            "summary": message,
+            "sections": [
+                {
+                    "activityTitle": message,
+                    "activitySubtitle": f"{name} ({VERSION}) - {action}",
+                    "activityImage": WEBUI_FAVICON_URL,
+                    "facts": facts,
+                    "markdown": True,
+                }
+            ],
+        }
+    # Default Payload
+    else:
+        payload = {**event_data}
+
+    return payload
+
+
 def post_webhook(name: str, url: str, message: str, event_data: dict) -> bool:
     try:
         log.debug(f"post_webhook: {url}, {message}, {event_data}")
-        payload = {}
-
-        # Slack and Google Chat Webhooks
-        if "https://hooks.slack.com" in url or "https://chat.googleapis.com" in url:
-            payload["text"] = message
-        # Discord Webhooks
-        elif "https://discord.com/api/webhooks" in url:
-            payload["content"] = (
-                message
-                if len(message) < 2000
-                else f"{message[: 2000 - 20]}... (truncated)"
-            )
-        # Microsoft Teams Webhooks
-        elif "webhook.office.com" in url:
-            action = event_data.get("action", "undefined")
-            facts = [
-                {"name": name, "value": value}
-                for name, value in json.loads(event_data.get("user", {})).items()
-            ]
-            payload = {
-                "@type": "MessageCard",
-                "@context": "http://schema.org/extensions",
-                "themeColor": "0076D7",
-                "summary": message,
-                "sections": [
-                    {
-                        "activityTitle": message,
-                        "activitySubtitle": f"{name} ({VERSION}) - {action}",
-                        "activityImage": WEBUI_FAVICON_URL,
-                        "facts": facts,
-                        "markdown": True,
-                    }
-                ],
-            }
-        # Default Payload
-        else:
-            payload = {**event_data}
+        payload = build_webhook_payload(name, url, message, event_data)
 
         log.debug(f"payload: {payload}")
-        r = requests.post(url, json=payload)
+        r = requests.post(url, json=payload, timeout=WEBHOOK_TIMEOUT)
         r.raise_for_status()
         log.debug(f"r.text: {r.text}")
         return True
     except Exception as e:
         log.exception(e)
         return False
+
+
+class WebhookJob:
+    __slots__ = (
+        "name",
+        "url",
+        "message",
+        "event_data",
+        "attempts",
+        "last_error",
+        "created_at",
+    )
+
+    def __init__(self, name: str, url: str, message: str, event_data: dict):
+        self.name = name
+        self.url = url
+        self.message = message
+        self.event_data = event_data
+        self.attempts = 0
+        self.last_error = None
+        self.created_at = int(time.time())
+
+
+class WebhookDeliveryQueue:
+    """
+    Delivers webhook notifications in the background so request handlers only
+    enqueue them.
+
+    Notifications are queued per destination URL and picked up by a fixed set
+    of workers, with at most `max_concurrency_per_url` requests in flight per
+    URL. Pending text notifications for the same Slack, Google Chat or Discord
+    URL are combined into one request. Network errors, 429 and 5xx responses
+    are retried with exponential backoff; notifications that still fail (or
+    are rejected with another 4xx) are dead-lettered: logged, kept in memory
+    and appended to `dead_letter_path`.
+    """
+
+    def __init__(
+        self,
+        workers: int = WEBHOOK_WORKERS,
+        timeout: float = WEBHOOK_TIMEOUT,
+        max_concurrency_per_url: int = WEBHOOK_MAX_CONCURRENCY_PER_URL,
+        max_retries: int = WEBHOOK_MAX_RETRIES,
+        retry_base_delay: float = WEBHOOK_RETRY_BASE_DELAY,
+        batch_size: int = WEBHOOK_BATCH_SIZE,
+        dead_letter_path: Optional[str] = f"{DATA_DIR}/webhook_dead_letters.jsonl",
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_concurrency_per_url = max_concurrency_per_url
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.batch_size = batch_size
+        self.dead_letter_path = dead_letter_path
+
+        self.dead_letters: deque = deque(maxlen=100)
+        self.metrics = {
+            "enqueued": 0,
+            "delivered": 0,
+            "batched": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+        }
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Queue] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: list[asyncio.Task] = []
+        self._pending: dict[str, deque] = {}
+        self._scheduled: set[str] = set()
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._retries: dict[WebhookJob, asyncio.TimerHandle] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self):
+        if self.running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Queue()
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout), trust_env=True
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def enqueue(self, name: str, url: str, message: str, event_data: dict):
+        """Queue a notification. Safe to call from any thread."""
+        job = WebhookJob(name, url, message, event_data)
+        self.metrics["enqueued"] += 1
+
+        if not self.running:
+            # Scripts and tests run without the app lifespan, deliver inline
+            post_webhook(name, url, message, event_data)
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is self._loop:
+            self._schedule(job)
+        else:
+            self._loop.call_soon_threadsafe(self._schedule, job)
+
+    async def join(self):
+        """Wait until every queued notification was delivered or dead-lettered."""
+        while True:
+            await self._ready.join()
+            if not self._retries and not self._pending:
+                return
+            await asyncio.sleep(0.05)
+
+    async def shutdown(self, grace_period: float = 5.0):
+        if not self.running:
+            return
+
+        try:
+            await asyncio.wait_for(self.join(), timeout=grace_period)
+        except asyncio.TimeoutError:
+            log.warning("Webhook queue did not drain before shutdown")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for job, handle in list(self._retries.items()):
+            handle.cancel()
+            job.last_error = job.last_error or "shutdown"
+            await self._dead_letter(job)
+        for jobs in list(self._pending.values()):
+            for job in jobs:
+                job.last_error = job.last_error or "shutdown"
+                await self._dead_letter(job)
+
+        await self._session.close()
+        self._retries.clear()
+        self._pending.clear()
+        self._scheduled.clear()
+        self._semaphores.clear()
+        self._tasks = []
+        self._session = None
+        self._ready = None
+        self._loop = None
+
+    def get_metrics(self) -> dict:
+        return {
+            **self.metrics,
+            "pending": sum(len(jobs) for jobs in self._pending.values()),
+            "retrying": len(self._retries),
+            "dead_letters": [
+                {key: value for key, value in record.items() if key != "event_data"}
+                for record in self.dead_letters
+            ],
+        }
+
+    def _schedule(self, job: WebhookJob):
+        self._pending.setdefault(job.url, deque()).append(job)
+        if job.url not in self._scheduled:
+            self._scheduled.add(job.url)
+            self._ready.put_nowait(job.url)
+
+    def _take_batch(self, url: str) -> list[WebhookJob]:
+        pending = self._pending.get(url)
+        if not pending:
+            self._pending.pop(url, None)
+            self._scheduled.discard(url)
+            return []
+
+        size = self.batch_size if is_text_webhook(url) else 1
+        jobs = [pending.popleft() for _ in range(min(size, len(pending)))]
+
+        if pending:
+            # Let another worker pick up the rest, up to the URL's concurrency
+            self._ready.put_nowait(url)
+        else:
+            del self._pending[url]
+            self._scheduled.discard(url)
+        return jobs
+
+    async def _worker(self):
+        while True:
+            url = await self._ready.get()
+            try:
+                semaphore = self._semaphores.setdefault(
+                    url, asyncio.Semaphore(self.max_concurrency_per_url)
+                )
+                async with semaphore:
+                    jobs = self._take_batch(url)
+                    if jobs:
+                        await self._deliver(url, jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(e)
+            finally:
+                self._ready.task_done()
+
+    async def _deliver(self, url: str, jobs: list[WebhookJob]):
+        if len(jobs) > 1:
+            message = "\n\n".join(job.message for job in jobs)
+        else:
+            message = jobs[0].message
+
+        try:
+            payload = build_webhook_payload(
+                jobs[0].name, url, message, jobs[0].event_data
+            )
+            async with self._session.post(url, json=payload) as r:
+                if r.status < 400:
+                    self.metrics["delivered"] += len(jobs)
+                    if len(jobs) > 1:
+                        self.metrics["batched"] += len(jobs)
+                    return
+                error = f"HTTP {r.status}: {(await r.text())[:200]}"
+                retryable = r.status == 429 or r.status >= 500
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+            retryable = True
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            retryable = False
+
+        for job in jobs:
+            job.attempts += 1
+            job.last_error = error
+            if retryable and job.attempts <= self.max_retries:
+                delay = self.retry_base_delay * 2 ** (job.attempts - 1)
+                delay *= random.uniform(0.8, 1.2)
+                self._retries[job] = self._loop.call_later(delay, self._retry, job)
+                self.metrics["retried"] += 1
+            else:
+                await self._dead_letter(job)
+
+    def _retry(self, job: WebhookJob):
+        self._retries.pop(job, None)
+        self._schedule(job)
+
+    async def _dead_letter(self, job: WebhookJob):
+        record = {
+            "name": job.name,
+            "url": job.url,
+            "message": job.message,
+            "event_data": job.event_data,
+            "attempts": job.attempts,
+            "error": job.last_error,
+            "created_at": job.created_at,
+            "failed_at": int(time.time()),
+        }
+        self.dead_letters.append(record)
+        self.metrics["dead_lettered"] += 1
+        log.error(
+            f"Webhook to {job.url} dead-lettered after {job.attempts} attempts: "
+            f"{job.last_error}"
+        )
+
+        if self.dead_letter_path:
+            try:
+                await asyncio.to_thread(self._write_dead_letter, record)
+            except Exception as e:
+                log.warning(f"Failed to record dead-lettered webhook: {e}")
+
+    def _write_dead_letter(self, record: dict):
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+webhook_queue = WebhookDeliveryQueue()
+
+
+def enqueue_webhook(name: str, url: str, message: str, event_data: dict):
+    """Deliver a webhook notification in the background."""
+    webhook_queue.enqueue(name, url, message, event_data)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+计费规则性能基准
+对比每次请求都 json.loads + jsonpath 编译自定义计费规则（原计算方式）
+与使用已编译的计费快照，报告单次请求的 μs。
+
+用法:
+    python scripts/benchmark_credit_pricing.py --rules 20 --repeat 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault("VECTOR_DB", "pgvector")
+
+try:
+    from jsonpath_ng import parse as jsonpath_parse
+
+    from open_webui.utils.credit import pricing
+except ImportError as e:
+    print(f"❌ 导入失败: {e}")
+    print("请确保在项目根目录下运行此脚本，并已安装所有依赖")
+    sys.exit(1)
+
+
+def make_rules(count: int) -> str:
+    # 一半规则共用同一路径，模拟按取值区分的计费项
+    rules = []
+    for index in range(count):
+        path = "$.tools[*].type" if index % 2 else f"$.metadata.option_{index}"
+        rules.append(
+            {
+                "path": path,
+                "name": f"rule_{index}",
+                "value": f"value_{index}",
+                "exists": index % 4 == 0,
+                "cost": index + 1,
+            }
+        )
+    return json.dumps(rules)
+
+
+def make_body() -> dict:
+    return {
+        "model": "gpt-4o",
+        "messages": [{"role": "user", "content": "hello"}] * 10,
+        "tools": [{"type": f"value_{index}"} for index in range(1, 8, 2)],
+        "metadata": {"option_0": True, "option_4": "value_4"},
+    }
+
+
+def legacy_custom_fees(custom_config_str: str, body: dict) -> dict:
+    # 原实现: 每次请求解析配置并编译 jsonpath
+    custom_fees = {}
+    for config in json.loads(custom_config_str):
+        matches = jsonpath_parse(config["path"]).find(body)
+        if not matches:
+            continue
+        if config["exists"]:
+            custom_fees[config["name"]] = config["cost"]
+            continue
+        for match in matches:
+            if match.value == config["value"]:
+                custom_fees[config["name"]] = config["cost"]
+                break
+    return custom_fees
+
+
+def measure(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="计费规则性能基准")
+    parser.add_argument("--rules", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    custom_config_str = make_rules(args.rules)
+    body = make_body()
+    signature = (1, 0, 1, 0, custom_config_str, 0, 0, 0, 0)
+    snapshot = pricing.compile_pricing_snapshot(signature)
+
+    assert snapshot.get_custom_fees(body) == legacy_custom_fees(custom_config_str, body)
+
+    legacy_us = measure(
+        lambda: legacy_custom_fees(custom_config_str, body), args.repeat
+    )
+    compile_us = measure(
+        lambda: pricing.compile_pricing_snapshot(signature), args.repeat
+    )
+    snapshot_us = measure(lambda: snapshot.get_custom_fees(body), args.repeat)
+
+    print(f"📐 自定义计费规则 {args.rules} 条, 重复 {args.repeat} 次")
+    print(f"每次编译 + 匹配 {legacy_us:9.1f} μs")
+    print(f"编译快照(仅配置变更时) {compile_us:9.1f} μs")
+    print(f"快照匹配 {snapshot_us:9.1f} μs | 加速 {legacy_us / snapshot_us:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+图片 token 估算性能基准
+对比整图 base64 解码 + PIL 打开（原计算方式）与只解码文件头的尺寸探测，
+以及命中缓存时的耗时，分别报告 PNG/JPEG/WebP 大图的单次 ms。
+
+用法:
+    python scripts/benchmark_image_token.py --width 4000 --height 3000 --repeat 20
+"""
+
+import argparse
+import base64
+import io
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault("VECTOR_DB", "pgvector")
+
+try:
+    from PIL import Image
+
+    from open_webui.utils.credit import utils as credit_utils
+except ImportError as e:
+    print(f"❌ 导入失败: {e}")
+    print("请确保在项目根目录下运行此脚本，并已安装所有依赖")
+    sys.exit(1)
+
+
+def make_data_url(image_format: str, width: int, height: int) -> str:
+    # 随机像素，避免压缩后体积过小
+    image = Image.frombytes(
+        "RGB", (width, height), random.randbytes(width * height * 3)
+    )
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    payload = base64.b64encode(buffer.getvalue()).decode()
+    return f"data:image/{image_format.lower()};base64,{payload}"
+
+
+def full_decode_size(url: str):
+    payload = url.split(",", 1)[1]
+    return Image.open(io.BytesIO(base64.b64decode(payload.encode("utf-8")))).size
+
+
+def measure(func, url: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(url)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片 token 估算性能基准")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📐 图片尺寸: {args.width}x{args.height}, 重复 {args.repeat} 次")
+    for image_format in ("PNG", "JPEG", "WEBP"):
+        url = make_data_url(image_format, args.width, args.height)
+        size_mb = len(url) / 1024 / 1024
+
+        assert credit_utils.probe_data_url_image_size(url) == full_decode_size(url)
+
+        full_ms = measure(full_decode_size, url, args.repeat)
+        probe_ms = measure(credit_utils.probe_data_url_image_size, url, args.repeat)
+        credit_utils._image_size_cache.clear()
+        credit_utils.get_image_size(url)
+        cached_ms = measure(credit_utils.get_image_size, url, args.repeat)
+
+        print(
+            f"{image_format:5} {size_mb:7.1f} MB base64 | "
+            f"整图解码 {full_ms:8.2f} ms | 文件头探测 {probe_ms:6.3f} ms | "
+            f"缓存命中 {cached_ms:6.3f} ms | 加速 {full_ms / probe_ms:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+pgvector 写入性能基准
+对比逐行 INSERT（原写入方式）与 COPY 暂存表 + 集合合并（批量写入方式）的吞吐，
+分别报告明文与 pgcrypto 加密两种模式的 rows/sec。
+
+用法:
+    PGVECTOR_DB_URL=postgresql://... python scripts/benchmark_pgvector_ingest.py \\
+        --rows 10000 --dim 1536 --batch-size 2000
+
+基准使用独立的 bench_document_chunk_* 表，结束后自动删除，不影响 document_chunk。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+os.environ.setdefault("VECTOR_DB", "pgvector")
+
+try:
+    import psycopg2
+
+    from open_webui.retrieval.vector.dbs.pgvector import (
+        build_merge_sql,
+        copy_rows,
+        create_staging_table_sql,
+        encode_vector_binary,
+    )
+except ImportError as e:
+    print(f"❌ 导入失败: {e}")
+    print("请确保在项目根目录下运行此脚本，并已安装所有依赖")
+    sys.exit(1)
+
+STAGING_TABLE = "bench_document_chunk_staging"
+
+
+def generate_items(rows: int, dim: int) -> list:
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "vector": [random.random() for _ in range(dim)],
+            "text": f"benchmark chunk {i} " * 20,
+            "metadata": {"file_id": "benchmark", "chunk": i},
+        }
+        for i in range(rows)
+    ]
+
+
+def create_table(cursor, table: str, dim: int, encrypted: bool):
+    payload_type = "BYTEA" if encrypted else "TEXT"
+    metadata_type = "BYTEA" if encrypted else "JSONB"
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(
+        f"CREATE TABLE {table} ("
+        f"id TEXT PRIMARY KEY, vector vector({dim}), collection_name TEXT NOT NULL, "
+        f"text {payload_type}, vmetadata {metadata_type})"
+    )
+
+
+def ingest_row_by_row(conn, table: str, items: list, encrypted: bool, key: str):
+    """原写入方式：每个分块一条 INSERT"""
+    if encrypted:
+        sql = (
+            f"INSERT INTO {table} (id, vector, collection_name, text, vmetadata) "
+            "VALUES (%s, %s::vector, %s, pgp_sym_encrypt(%s, %s), "
+            "pgp_sym_encrypt(%s, %s)) ON CONFLICT (id) DO NOTHING"
+        )
+    else:
+        sql = (
+            f"INSERT INTO {table} (id, vector, collection_name, text, vmetadata) "
+            "VALUES (%s, %s::vector, %s, %s, %s::jsonb)"
+        )
+
+    with conn.cursor() as cursor:
+        for item in items:
+            vector = str(item["vector"])
+            metadata = json.dumps(item["metadata"])
+            if encrypted:
+                params = (
+                    item["id"],
+                    vector,
+                    "benchmark",
+                    item["text"],
+                    key,
+                    metadata,
+                    key,
+                )
+            else:
+                params = (item["id"], vector, "benchmark", item["text"], metadata)
+            cursor.execute(sql, params)
+    conn.commit()
+
+
+def ingest_bulk(
+    conn, table: str, items: list, encrypted: bool, key: str, dim: int, batch_size: int
+):
+    """批量写入方式：COPY 到暂存表后一次性合并，按批提交"""
+    merge_sql = build_merge_sql(table, STAGING_TABLE, encrypted, "update")
+    params = {"key": key} if encrypted else None
+
+    for start in range(0, len(items), batch_size):
+        batch = items[start : start + batch_size]
+        with conn.cursor() as cursor:
+            cursor.execute(create_staging_table_sql(STAGING_TABLE, dim))
+            copy_rows(
+                cursor,
+                STAGING_TABLE,
+                (
+                    (
+                        item["id"].encode(),
+                        encode_vector_binary(item["vector"]),
+                        b"benchmark",
+                        item["text"].encode(),
+                        json.dumps(item["metadata"]).encode(),
+                    )
+                    for item in batch
+                ),
+            )
+            cursor.execute(merge_sql, params)
+        conn.commit()
+
+
+def run(conn, items: list, dim: int, batch_size: int, encrypted: bool, key: str):
+    mode = "encrypted" if encrypted else "plain"
+    table = f"bench_document_chunk_{mode}"
+    results = {}
+
+    for name, ingest in (
+        ("row_by_row", lambda: ingest_row_by_row(conn, table, items, encrypted, key)),
+        (
+            "bulk_copy",
+            lambda: ingest_bulk(conn, table, items, encrypted, key, dim, batch_size),
+        ),
+    ):
+        with conn.cursor() as cursor:
+            create_table(cursor, table, dim, encrypted)
+        conn.commit()
+
+        started = time.perf_counter()
+        ingest()
+        elapsed = time.perf_counter() - started
+        results[name] = len(items) / elapsed
+        print(
+            f"  {mode:<10} {name:<12} {len(items):>8} rows "
+            f"{elapsed:>8.2f}s {results[name]:>10.0f} rows/sec"
+        )
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.commit()
+
+    print(
+        f"  {mode:<10} speedup      {results['bulk_copy'] / results['row_by_row']:.1f}x"
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pgvector 写入性能基准")
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("PGVECTOR_DB_URL") or os.environ.get("DATABASE_URL"),
+        help="PostgreSQL 连接串（默认读取 PGVECTOR_DB_URL / DATABASE_URL）",
+    )
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument(
+        "--modes",
+        default="plain,encrypted",
+        help="逗号分隔：plain, encrypted",
+    )
+    parser.add_argument(
+        "--key",
+        default=os.environ.get("PGVECTOR_PGCRYPTO_KEY") or "benchmark-key",
+        help="加密模式使用的 pgcrypto 密钥",
+    )
+    args = parser.parse_args()
+
+    if not args.url or not args.url.startswith("postgres"):
+        print("❌ 需要 PostgreSQL 连接串（--url 或 PGVECTOR_DB_URL）")
+        sys.exit(1)
+
+    conn = psycopg2.connect(args.url.replace("postgresql+psycopg2://", "postgresql://"))
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    conn.commit()
+
+    print(f"📊 生成 {args.rows} 条 {args.dim} 维测试数据...")
+    items = generate_items(args.rows, args.dim)
+
+    print("=" * 60)
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            run(
+                conn,
+                items,
+                args.dim,
+                args.batch_size,
+                encrypted=mode == "encrypted",
+                key=args.key,
+            )
+    finally:
+        conn.close()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()